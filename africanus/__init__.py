@@ -7,7 +7,14 @@
 # Imports at this level within this module should be avoided,
 # or should fail gracefully as this is the base africanus module.
 # The setup.py file accesses the ``africanus.install`` modules
-import africanus.util.jax_init  # noqa
+# Subpackages are imported on first access and jax is
+# configured by ``africanus.rime.jax``.
+from africanus.util.lazy import lazy_exports
+
+__getattr__, __dir__ = lazy_exports(__name__, {}, submodules=[
+    "averaging", "calibration", "constants", "coordinates",
+    "deconv", "dft", "gps", "gridding", "linalg", "model",
+    "rime", "testing", "util"])[:2]
 
 __author__ = """Simon Perkins"""
 __email__ = 'sperkins@ska.ac.za'
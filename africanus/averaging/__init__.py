@@ -1,5 +1,8 @@
 # -*- coding: utf-8 -*-
 
-__all__ = ["time_and_channel"]
+from africanus.util.lazy import lazy_exports
 
-from africanus.averaging.time_and_channel_avg import time_and_channel
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "time_and_channel": "africanus.averaging.time_and_channel_avg",
+    "bda": "africanus.averaging.bda_avg",
+})
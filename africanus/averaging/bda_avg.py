@@ -0,0 +1,423 @@
+# -*- coding: utf-8 -*-
+
+
+from collections import namedtuple
+
+import numpy as np
+
+from africanus.averaging.bda_mapping import bda_mapper
+from africanus.averaging.time_and_channel_avg import (
+                row_average, chan_corrs, merge_flags,
+                matching_flag_factory, is_chan_flagged_factory,
+                chan_output_factory, weight_sum_output_factory,
+                vis_add_factory, chan_add_factory,
+                sigma_spectrum_add_factory, vis_normaliser_factory,
+                sigma_spectrum_normaliser_factory,
+                weight_spectrum_normaliser_factory,
+                set_flagged_factory, ChannelAverageOutput,
+                RowChanAverageOutput, RowChannelAverageException,
+                _row_output_fields, _chan_output_fields,
+                _rowchan_output_fields)
+from africanus.util.docs import DocstringTemplate
+from africanus.util.numba import is_numba_type_none, generated_jit
+
+
+@generated_jit(nopython=True, nogil=True, cache=True)
+def bda_row_chan_average(row_meta, flag_row=None, weight=None,
+                         vis=None, flag=None,
+                         weight_spectrum=None, sigma_spectrum=None):
+    """
+    Averages :code:`(row, chan, corr)` data into flattened
+    :code:`(row_chan, corr)` arrays, where each output row
+    contains :code:`row_meta.num_chan[row]` channels starting
+    at :code:`row_meta.offsets[row]`.
+    """
+    have_flag_row = not is_numba_type_none(flag_row)
+    have_vis = not is_numba_type_none(vis)
+    have_flag = not is_numba_type_none(flag)
+    have_weight = not is_numba_type_none(weight)
+    have_weight_spectrum = not is_numba_type_none(weight_spectrum)
+    have_sigma_spectrum = not is_numba_type_none(sigma_spectrum)
+
+    flags_match = matching_flag_factory(have_flag_row)
+    is_chan_flagged = is_chan_flagged_factory(have_flag)
+
+    vis_factory = chan_output_factory(have_vis)
+    weight_sum_factory = weight_sum_output_factory(have_vis)
+    flag_factory = chan_output_factory(have_flag)
+    weight_factory = chan_output_factory(have_weight_spectrum)
+    sigma_factory = chan_output_factory(have_sigma_spectrum)
+
+    vis_adder = vis_add_factory(have_vis,
+                                have_weight,
+                                have_weight_spectrum)
+    weight_adder = chan_add_factory(have_weight_spectrum)
+    sigma_adder = sigma_spectrum_add_factory(have_sigma_spectrum,
+                                             have_weight,
+                                             have_weight_spectrum)
+
+    vis_normaliser = vis_normaliser_factory(have_vis)
+    sigma_normaliser = sigma_spectrum_normaliser_factory(have_sigma_spectrum)
+    weight_normaliser = weight_spectrum_normaliser_factory(
+                            have_weight_spectrum)
+
+    set_flagged = set_flagged_factory(have_flag)
+
+    dummy_chan_freq = None
+    dummy_chan_width = None
+
+    def impl(row_meta, flag_row=None, weight=None,
+             vis=None, flag=None,
+             weight_spectrum=None, sigma_spectrum=None):
+
+        nchan, ncorrs = chan_corrs(vis, flag,
+                                   weight_spectrum, sigma_spectrum,
+                                   dummy_chan_freq, dummy_chan_width,
+                                   dummy_chan_width, dummy_chan_width)
+
+        out_row_chans = row_meta.offsets[-1]
+
+        # Accumulate into (row_chan, 1, corr) arrays so that the
+        # (row, chan, corr) adders and normalisers can be reused
+        out_shape = (out_row_chans, 1, ncorrs)
+
+        vis_avg = vis_factory(out_shape, vis)
+        vis_weight_sum = weight_sum_factory(out_shape, vis)
+        weight_spectrum_avg = weight_factory(out_shape, weight_spectrum)
+        sigma_spectrum_avg = sigma_factory(out_shape, sigma_spectrum)
+        sigma_spectrum_weight_sum = sigma_factory(out_shape, sigma_spectrum)
+
+        flagged_vis_avg = vis_factory(out_shape, vis)
+        flagged_vis_weight_sum = weight_sum_factory(out_shape, vis)
+        flagged_weight_spectrum_avg = weight_factory(out_shape,
+                                                     weight_spectrum)
+        flagged_sigma_spectrum_avg = sigma_factory(out_shape,
+                                                   sigma_spectrum)
+        flagged_sigma_spectrum_weight_sum = sigma_factory(out_shape,
+                                                          sigma_spectrum)
+
+        flag_avg = flag_factory(out_shape, flag)
+
+        counts = np.zeros(out_shape, dtype=np.uint32)
+        flag_counts = np.zeros(out_shape, dtype=np.uint32)
+
+        # Iterate over input rows, accumulating into output rows
+        for in_row, out_row in enumerate(row_meta.map):
+            if not flags_match(flag_row, in_row, row_meta.flag_row, out_row):
+                continue
+
+            offset = row_meta.offsets[out_row]
+            bin_size = row_meta.chan_bin_size[out_row]
+
+            for in_chan in range(nchan):
+                out = offset + in_chan // bin_size
+
+                for corr in range(ncorrs):
+                    if is_chan_flagged(flag, in_row, in_chan, corr):
+                        flag_counts[out, 0, corr] += 1
+
+                        vis_adder(flagged_vis_avg, flagged_vis_weight_sum, vis,
+                                  weight, weight_spectrum,
+                                  out, 0, in_row, in_chan, corr)
+                        weight_adder(flagged_weight_spectrum_avg,
+                                     weight_spectrum,
+                                     out, 0, in_row, in_chan, corr)
+                        sigma_adder(flagged_sigma_spectrum_avg,
+                                    flagged_sigma_spectrum_weight_sum,
+                                    sigma_spectrum,
+                                    weight,
+                                    weight_spectrum,
+                                    out, 0, in_row, in_chan, corr)
+                    else:
+                        counts[out, 0, corr] += 1
+
+                        vis_adder(vis_avg, vis_weight_sum, vis,
+                                  weight, weight_spectrum,
+                                  out, 0, in_row, in_chan, corr)
+                        weight_adder(weight_spectrum_avg, weight_spectrum,
+                                     out, 0, in_row, in_chan, corr)
+                        sigma_adder(sigma_spectrum_avg,
+                                    sigma_spectrum_weight_sum,
+                                    sigma_spectrum,
+                                    weight,
+                                    weight_spectrum,
+                                    out, 0, in_row, in_chan, corr)
+
+        for o in range(out_row_chans):
+            for c in range(ncorrs):
+                if counts[o, 0, c] > 0:
+                    vis_normaliser(vis_avg, vis_avg,
+                                   o, 0, c,
+                                   vis_weight_sum)
+                    sigma_normaliser(sigma_spectrum_avg,
+                                     sigma_spectrum_avg,
+                                     o, 0, c,
+                                     sigma_spectrum_weight_sum)
+                elif flag_counts[o, 0, c] > 0:
+                    vis_normaliser(vis_avg, flagged_vis_avg,
+                                   o, 0, c,
+                                   flagged_vis_weight_sum)
+                    sigma_normaliser(sigma_spectrum_avg,
+                                     flagged_sigma_spectrum_avg,
+                                     o, 0, c,
+                                     flagged_sigma_spectrum_weight_sum)
+                    weight_normaliser(weight_spectrum_avg,
+                                      flagged_weight_spectrum_avg,
+                                      o, 0, c)
+
+                    set_flagged(flag_avg, o, 0, c)
+                else:
+                    raise RowChannelAverageException("Zero-filled bin")
+
+        flat_shape = (out_row_chans, ncorrs)
+
+        return RowChanAverageOutput(
+            None if vis is None else vis_avg.reshape(flat_shape),
+            None if flag is None else flag_avg.reshape(flat_shape),
+            (None if weight_spectrum is None else
+             weight_spectrum_avg.reshape(flat_shape)),
+            (None if sigma_spectrum is None else
+             sigma_spectrum_avg.reshape(flat_shape)))
+
+    return impl
+
+
+@generated_jit(nopython=True, nogil=True, cache=True)
+def bda_chan_average(row_meta, chan_freq=None, chan_width=None,
+                     effective_bw=None, resolution=None):
+    """
+    Averages channel data into flattened :code:`(row_chan,)` arrays
+    describing the channels of each output row.
+    """
+    dummy_row_chan = None
+
+    def impl(row_meta, chan_freq=None, chan_width=None,
+             effective_bw=None, resolution=None):
+        out_row_chans = row_meta.offsets[-1]
+
+        chan_freq_avg = (
+            None if chan_freq is None else
+            np.zeros(out_row_chans, dtype=chan_freq.dtype))
+
+        chan_width_avg = (
+            None if chan_width is None else
+            np.zeros(out_row_chans, dtype=chan_width.dtype))
+
+        effective_bw_avg = (
+            None if effective_bw is None else
+            np.zeros(out_row_chans, dtype=effective_bw.dtype))
+
+        resolution_avg = (
+            None if resolution is None else
+            np.zeros(out_row_chans, dtype=resolution.dtype))
+
+        nchan, _ = chan_corrs(dummy_row_chan, dummy_row_chan,
+                              dummy_row_chan, dummy_row_chan,
+                              chan_freq, chan_width,
+                              effective_bw, resolution)
+
+        for out_row in range(row_meta.num_chan.shape[0]):
+            offset = row_meta.offsets[out_row]
+            bin_size = row_meta.chan_bin_size[out_row]
+
+            for in_chan in range(nchan):
+                out = offset + in_chan // bin_size
+
+                if chan_freq is not None:
+                    chan_freq_avg[out] += chan_freq[in_chan]
+
+                if chan_width is not None:
+                    chan_width_avg[out] += chan_width[in_chan]
+
+                if effective_bw is not None:
+                    effective_bw_avg[out] += effective_bw[in_chan]
+
+                if resolution is not None:
+                    resolution_avg[out] += resolution[in_chan]
+
+            # Bins always contain bin_size channels
+            if chan_freq is not None:
+                for o in range(offset, row_meta.offsets[out_row + 1]):
+                    chan_freq_avg[o] /= bin_size
+
+        return ChannelAverageOutput(chan_freq_avg, chan_width_avg,
+                                    effective_bw_avg, resolution_avg)
+
+    return impl
+
+
+BDAAverageOutput = namedtuple("BDAAverageOutput",
+                              ["time", "interval", "flag_row"] +
+                              _row_output_fields +
+                              _chan_output_fields +
+                              _rowchan_output_fields +
+                              ["num_chan", "offsets"])
+
+
+@generated_jit(nopython=True, nogil=True, cache=True)
+def bda(time, interval, antenna1, antenna2, uvw,
+        chan_freq, chan_width,
+        time_centroid=None, exposure=None, flag_row=None,
+        weight=None, sigma=None,
+        effective_bw=None, resolution=None,
+        vis=None, flag=None,
+        weight_spectrum=None, sigma_spectrum=None,
+        decorrelation=0.98, max_fov=3.0,
+        max_time_bin_secs=np.inf):
+
+    def impl(time, interval, antenna1, antenna2, uvw,
+             chan_freq, chan_width,
+             time_centroid=None, exposure=None, flag_row=None,
+             weight=None, sigma=None,
+             effective_bw=None, resolution=None,
+             vis=None, flag=None,
+             weight_spectrum=None, sigma_spectrum=None,
+             decorrelation=0.98, max_fov=3.0,
+             max_time_bin_secs=np.inf):
+
+        # Check channel and correlation dimensions agree
+        chan_corrs(vis, flag, weight_spectrum, sigma_spectrum,
+                   chan_freq, chan_width, effective_bw, resolution)
+
+        # Merge flag_row and flag arrays
+        flag_row = merge_flags(flag_row, flag)
+
+        # Generate baseline-dependent row and channel metadata
+        row_meta = bda_mapper(time, interval, antenna1, antenna2, uvw,
+                              chan_freq, chan_width, flag_row=flag_row,
+                              decorrelation=decorrelation,
+                              max_fov=max_fov,
+                              max_time_bin_secs=max_time_bin_secs)
+
+        # Average row data
+        row_data = row_average(row_meta, antenna1, antenna2, flag_row=flag_row,
+                               time_centroid=time_centroid, exposure=exposure,
+                               uvw=uvw, weight=weight, sigma=sigma)
+
+        # Average channel data
+        chan_data = bda_chan_average(row_meta, chan_freq=chan_freq,
+                                     chan_width=chan_width,
+                                     effective_bw=effective_bw,
+                                     resolution=resolution)
+
+        # Average row and channel data
+        row_chan_data = bda_row_chan_average(
+                            row_meta, flag_row=flag_row, weight=weight,
+                            vis=vis, flag=flag,
+                            weight_spectrum=weight_spectrum,
+                            sigma_spectrum=sigma_spectrum)
+
+        return BDAAverageOutput(row_meta.time,
+                                row_meta.interval,
+                                row_meta.flag_row,
+                                row_data.antenna1,
+                                row_data.antenna2,
+                                row_data.time_centroid,
+                                row_data.exposure,
+                                row_data.uvw,
+                                row_data.weight,
+                                row_data.sigma,
+                                chan_data.chan_freq,
+                                chan_data.chan_width,
+                                chan_data.effective_bw,
+                                chan_data.resolution,
+                                row_chan_data.vis,
+                                row_chan_data.flag,
+                                row_chan_data.weight_spectrum,
+                                row_chan_data.sigma_spectrum,
+                                row_meta.num_chan,
+                                row_meta.offsets)
+
+    return impl
+
+
+BDA_DOCS = DocstringTemplate("""
+Averages in time and channel using baseline-dependent bins.
+
+The time and channel bin sizes of each baseline are chosen
+such that the amplitude of a source at the edge of the
+field of view is attenuated by no more than `decorrelation`.
+Short baselines, whose uvw coordinates change slowly,
+are therefore averaged more heavily than long baselines.
+
+Each output row has its own number of channels, :code:`num_chan[row]`,
+which always divides the number of input channels.
+Channel-dependent outputs are flattened into :code:`(row_chan, ...)`
+arrays, in which the channels of each row are contiguous.
+
+Parameters
+----------
+time : $(array_type)
+    Time values of shape :code:`(row,)`.
+interval : $(array_type)
+    Interval values of shape :code:`(row,)`.
+antenna1 : $(array_type)
+    First antenna indices of shape :code:`(row,)`
+antenna2 : $(array_type)
+    Second antenna indices of shape :code:`(row,)`
+uvw : $(array_type)
+    UVW coordinates of shape :code:`(row, 3)`.
+chan_freq : $(array_type)
+    Channel frequencies of shape :code:`(chan,)`.
+chan_width : $(array_type)
+    Channel widths of shape :code:`(chan,)`.
+time_centroid : $(array_type), optional
+    Time centroid values of shape :code:`(row,)`
+exposure : $(array_type), optional
+    Exposure values of shape :code:`(row,)`
+flag_row : $(array_type), optional
+    Flagged rows of shape :code:`(row,)`.
+weight : $(array_type), optional
+    Weight values of shape :code:`(row, corr)`.
+sigma : $(array_type), optional
+    Sigma values of shape :code:`(row, corr)`.
+effective_bw : $(array_type), optional
+    Effective channel bandwidth of shape :code:`(chan,)`.
+resolution : $(array_type), optional
+    Effective channel resolution of shape :code:`(chan,)`.
+vis : $(array_type), optional
+    Visibility data of shape :code:`(row, chan, corr)`.
+flag : $(array_type), optional
+    Flag data of shape :code:`(row, chan, corr)`.
+weight_spectrum : $(array_type), optional
+    Weight spectrum of shape :code:`(row, chan, corr)`.
+sigma_spectrum : $(array_type), optional
+    Sigma spectrum of shape :code:`(row, chan, corr)`.
+decorrelation : float, optional
+    Minimum fraction of a source's amplitude retained
+    after averaging. Defaults to 0.98.
+max_fov : float, optional
+    Radius of the field of view in degrees. Defaults to 3.0.
+max_time_bin_secs : float, optional
+    Upper limit on the time bin size in seconds.
+    Defaults to unlimited.
+
+Notes
+-----
+
+The implementation currently requires unique lexicographical
+combinations of (TIME, ANTENNA1, ANTENNA2). This can usually
+be achieved by suitably partitioning input data on indexing rows,
+DATA_DESC_ID and SCAN_NUMBER in particular.
+
+Returns
+-------
+namedtuple
+    A namedtuple whose entries correspond to the input arrays.
+    Output arrays will be ``None`` if the inputs were ``None``.
+    **chan_freq**, **chan_width**, **effective_bw** and **resolution**
+    have shape :code:`(row_chan,)`, while **vis**, **flag**,
+    **weight_spectrum** and **sigma_spectrum** have shape
+    :code:`(row_chan, corr)`.
+    **num_chan** holds the number of channels of shape :code:`(row,)`
+    and **offsets**, of shape :code:`(row + 1,)`, the offset of each
+    row's channels. $(offsets_note)
+""")
+
+
+try:
+    bda.__doc__ = BDA_DOCS.substitute(
+                        array_type=":class:`numpy.ndarray`",
+                        offsets_note="")
+except AttributeError:
+    pass
@@ -0,0 +1,262 @@
+# -*- coding: utf-8 -*-
+
+
+from collections import namedtuple
+
+import numpy as np
+
+from africanus.averaging.support import unique_time, unique_baselines
+from africanus.averaging.time_and_channel_mapping import sparse_row_map
+from africanus.constants import c as lightspeed
+from africanus.util.numba import generated_jit, njit
+
+#: Angular velocity of the Earth in radians per second
+EARTH_ROTATION_RATE = 7.292115e-5
+
+
+@njit(nogil=True, cache=True)
+def inv_sinc(sinc_x):
+    """
+    Returns :code:`x` in :code:`[0, 1]` such that
+    :code:`np.sinc(x) == sinc_x`, found by bisection
+    """
+    if sinc_x >= 1.0:
+        return 0.0
+
+    lower = 0.0
+    upper = 1.0
+
+    for _ in range(64):
+        x = 0.5 * (lower + upper)
+
+        if np.sinc(x) > sinc_x:
+            lower = x
+        else:
+            upper = x
+
+    return lower
+
+
+@njit(nogil=True, cache=True)
+def baseline_bin_sizes(time, uvw, bl_inv, nbl, time_inv, ntime,
+                       chan_freq, chan_width, decorrelation,
+                       max_fov, max_time_bin_secs):
+    """
+    Computes the time bin size in seconds and channel bin size
+    of each baseline in `bl_inv`, such that the amplitude of a
+    source at `max_fov` degrees from the phase centre is
+    attenuated by no more than a factor of `decorrelation`.
+
+    The phase of a source changes by
+    :math:`\\nu |\\Delta \\mathbf{u}| 2 \\sin(\\theta / 2) / c`
+    turns over a bin, whose visibilities then average to the
+    :math:`\\mathrm{sinc}` of this value. Both the time and channel
+    bins are allowed a decorrelation of :code:`sqrt(decorrelation)`.
+
+    1. The time bin is derived from the maximum rate of change of
+       the baseline's uvw coordinates, measured between consecutive
+       samples. Baselines with a single sample fall back
+       to the Earth rotation bound :math:`\\omega_E |\\mathbf{u}|`.
+    2. The channel bin is derived from the baseline's maximum
+       uvw length, and rounded down to a divisor of the number
+       of channels so that each bin holds the same number of
+       channels.
+
+    Returns
+    -------
+    time_bin_secs : :class:`numpy.ndarray`
+        Time bin size in seconds of shape :code:`(nbl,)`
+    chan_bin_size : :class:`numpy.ndarray`
+        Channel bin size of shape :code:`(nbl,)`
+    """
+    if not (0.0 < decorrelation <= 1.0):
+        raise ValueError("decorrelation must lie in (0, 1]")
+
+    nrow = time.shape[0]
+    nchan = chan_freq.shape[0]
+
+    if nchan == 0:
+        raise ValueError("No channels were supplied")
+
+    # Sort rows by baseline and then time
+    keys = np.empty(nrow, dtype=np.int64)
+
+    for r in range(nrow):
+        keys[r] = np.int64(bl_inv[r])*ntime + time_inv[r]
+
+    order = np.argsort(keys, kind='mergesort')
+
+    uvw_max = np.zeros(nbl, dtype=np.float64)
+    uvw_rate = np.zeros(nbl, dtype=np.float64)
+    have_rate = np.zeros(nbl, dtype=np.bool_)
+    prev_bl = -1
+    prev_r = -1
+
+    for i in range(nrow):
+        r = order[i]
+        bl = bl_inv[r]
+
+        length = np.sqrt(uvw[r, 0]**2 + uvw[r, 1]**2 + uvw[r, 2]**2)
+        uvw_max[bl] = max(uvw_max[bl], length)
+
+        # Rate of change between consecutive samples of the baseline
+        if bl == prev_bl:
+            dt = time[r] - time[prev_r]
+
+            if dt > 0.0:
+                du = uvw[r, 0] - uvw[prev_r, 0]
+                dv = uvw[r, 1] - uvw[prev_r, 1]
+                dw = uvw[r, 2] - uvw[prev_r, 2]
+                rate = np.sqrt(du**2 + dv**2 + dw**2) / dt
+                uvw_rate[bl] = max(uvw_rate[bl], rate)
+                have_rate[bl] = True
+
+        prev_bl = bl
+        prev_r = r
+
+    # Maximum phase change (turns) of a bin at the field edge
+    max_turns = inv_sinc(np.sqrt(decorrelation))
+    fov_factor = 2.0 * np.sin(0.5 * np.deg2rad(max_fov))
+    max_freq = np.max(chan_freq + 0.5*np.abs(chan_width))
+    max_width = np.max(np.abs(chan_width))
+
+    time_bin_secs = np.empty(nbl, dtype=np.float64)
+    chan_bin_size = np.empty(nbl, dtype=np.int32)
+
+    for bl in range(nbl):
+        if not have_rate[bl]:
+            uvw_rate[bl] = EARTH_ROTATION_RATE * uvw_max[bl]
+
+        # Phase turns per second at the highest frequency
+        turns = uvw_rate[bl] * fov_factor * max_freq / lightspeed
+
+        if turns * max_time_bin_secs > max_turns:
+            time_bin_secs[bl] = max_turns / turns
+        else:
+            time_bin_secs[bl] = max_time_bin_secs
+
+        # Phase turns across a channel
+        turns = uvw_max[bl] * fov_factor * max_width / lightspeed
+
+        if turns * nchan > max_turns:
+            size = max(1, int(max_turns / turns))
+        else:
+            size = nchan
+
+        while nchan % size != 0:
+            size -= 1
+
+        chan_bin_size[bl] = size
+
+    return time_bin_secs, chan_bin_size
+
+
+BDARowMapOutput = namedtuple("BDARowMapOutput",
+                             ["map", "time", "interval", "flag_row",
+                              "chan_bin_size", "num_chan", "offsets"])
+
+
+@generated_jit(nopython=True, nogil=True, cache=True)
+def bda_mapper(time, interval, antenna1, antenna2, uvw,
+               chan_freq, chan_width, flag_row=None,
+               decorrelation=0.98, max_fov=3.0,
+               max_time_bin_secs=np.inf):
+    """
+    Generates a baseline-dependent mapping from a high resolution
+    row index to a low resolution row index, as well as the
+    number of channels in each low resolution row.
+
+    Each baseline is averaged in time bins of its own size,
+    computed by :func:`baseline_bin_sizes`, but otherwise
+    rows are binned as in :func:`row_mapper`.
+    Output rows are ordered by time.
+
+    Parameters
+    ----------
+    time : :class:`numpy.ndarray`
+        Time values of shape :code:`(row,)`.
+    interval : :class:`numpy.ndarray`
+        Exposure times of shape :code:`(row,)`.
+    antenna1 : :class:`numpy.ndarray`
+        Antenna 1 values of shape :code:`(row,)`.
+    antenna2 : :class:`numpy.ndarray`
+        Antenna 2 values of shape :code:`(row,)`.
+    uvw : :class:`numpy.ndarray`
+        UVW coordinates of shape :code:`(row, 3)`.
+    chan_freq : :class:`numpy.ndarray`
+        Channel frequencies of shape :code:`(chan,)`.
+    chan_width : :class:`numpy.ndarray`
+        Channel widths of shape :code:`(chan,)`.
+    flag_row : :class:`numpy.ndarray`, optional
+        Positive values indicate that a row is flagged, while
+        zero implies unflagged. Has shape :code:`(row,)`.
+    decorrelation : float, optional
+        Minimum fraction of a source's amplitude retained
+        after averaging. Defaults to 0.98.
+    max_fov : float, optional
+        Radius of the field of view in degrees. Defaults to 3.0.
+    max_time_bin_secs : float, optional
+        Upper limit on the time bin size in seconds.
+        Defaults to unlimited.
+
+    Returns
+    -------
+    map : :class:`numpy.ndarray`
+        Mapping from `np.arange(row)` to output row indices
+        of shape :code:`(row,)`
+    time : :class:`numpy.ndarray`
+        Averaged time values of shape :code:`(out_row,)`
+    interval : :class:`numpy.ndarray`
+        Summed interval values of shape :code:`(out_row,)`
+    flag_row : :class:`numpy.ndarray` or None
+        Output flag rows of shape :code:`(out_row,)`.
+        None if no input flag_row was supplied.
+    chan_bin_size : :class:`numpy.ndarray`
+        Channel bin size of each output row of shape :code:`(out_row,)`
+    num_chan : :class:`numpy.ndarray`
+        Number of channels in each output row of shape :code:`(out_row,)`
+    offsets : :class:`numpy.ndarray`
+        Offset of each output row's channels in flattened
+        :code:`(row, chan)` arrays of shape :code:`(out_row + 1,)`
+    """
+    def impl(time, interval, antenna1, antenna2, uvw,
+             chan_freq, chan_width, flag_row=None,
+             decorrelation=0.98, max_fov=3.0,
+             max_time_bin_secs=np.inf):
+        ubl, _, bl_inv, _ = unique_baselines(antenna1, antenna2)
+        utime, _, time_inv, _ = unique_time(time)
+
+        nbl = ubl.shape[0]
+        ntime = utime.shape[0]
+        nchan = chan_freq.shape[0]
+
+        bl_time_bins, bl_chan_bins = baseline_bin_sizes(
+            time, uvw, bl_inv, nbl, time_inv, ntime,
+            chan_freq, chan_width, decorrelation,
+            max_fov, max_time_bin_secs)
+
+        # Bins differ per baseline, so the dense
+        # (baseline, time) lookups offer no advantage
+        row_meta = sparse_row_map(time, interval, bl_inv, nbl,
+                                  time_inv, ntime, flag_row,
+                                  bl_time_bins)
+
+        out_rows = row_meta.time.shape[0]
+        chan_bin_size = np.empty(out_rows, dtype=np.int32)
+
+        for in_row, out_row in enumerate(row_meta.map):
+            chan_bin_size[out_row] = bl_chan_bins[bl_inv[in_row]]
+
+        num_chan = np.empty(out_rows, dtype=np.int32)
+        offsets = np.empty(out_rows + 1, dtype=np.int64)
+        offsets[0] = 0
+
+        for out_row in range(out_rows):
+            num_chan[out_row] = nchan // chan_bin_size[out_row]
+            offsets[out_row + 1] = offsets[out_row] + num_chan[out_row]
+
+        return BDARowMapOutput(row_meta.map, row_meta.time,
+                               row_meta.interval, row_meta.flag_row,
+                               chan_bin_size, num_chan, offsets)
+
+    return impl
@@ -5,16 +5,24 @@ from operator import getitem
 
 from africanus.averaging.time_and_channel_mapping import (
                 row_mapper as np_row_mapper,
+                row_map_inverse as np_row_map_inverse,
                 channel_mapper as np_channel_mapper)
 from africanus.averaging.time_and_channel_avg import (
                 row_average as np_row_average,
                 row_chan_average as np_row_chan_average,
+                parallel_row_average as np_parallel_row_average,
+                parallel_row_chan_average as np_parallel_row_chan_average,
+                low_memory_row_chan_average as np_low_memory_row_chan_average,
                 chan_average as np_chan_average,
                 merge_flags as np_merge_flags,
                 AVERAGING_DOCS,
                 AverageOutput, ChannelAverageOutput,
                 RowAverageOutput, RowChanAverageOutput)
 
+from africanus.averaging.bda_avg import (
+                bda as np_bda,
+                BDA_DOCS,
+                BDAAverageOutput)
 from africanus.util.requirements import requires_optional
 
 import numpy as np
@@ -102,9 +110,31 @@ def _row_average_wrapper(row_meta, ant1, ant2, flag_row,
                           sigma[0] if sigma is not None else None)
 
 
+def _parallel_row_average_wrapper(row_meta, ant1, ant2, flag_row,
+                                  time_centroid, exposure, uvw,
+                                  weight, sigma):
+    return np_parallel_row_average(row_meta, np_row_map_inverse(row_meta),
+                                   ant1, ant2, flag_row,
+                                   time_centroid, exposure,
+                                   uvw[0] if uvw is not None else None,
+                                   weight[0] if weight is not None else None,
+                                   sigma[0] if sigma is not None else None)
+
+
+def _parallel_row_chan_average_wrapper(row_meta, chan_meta, flag_row=None,
+                                       weight=None, vis=None, flag=None,
+                                       weight_spectrum=None,
+                                       sigma_spectrum=None):
+    return np_parallel_row_chan_average(row_meta,
+                                        np_row_map_inverse(row_meta),
+                                        chan_meta, flag_row, weight,
+                                        vis, flag, weight_spectrum,
+                                        sigma_spectrum)
+
+
 def row_average(row_meta, ant1, ant2, flag_row=None,
                 time_centroid=None, exposure=None, uvw=None,
-                weight=None, sigma=None):
+                weight=None, sigma=None, parallel=False):
     """ Average row-based dask arrays """
 
     rd = ("row",)
@@ -121,7 +151,10 @@ def row_average(row_meta, ant1, ant2, flag_row=None,
             (True, weight, None if weight is None else rcd),
             (True, sigma, None if sigma is None else rcd)]
 
-    avg = da.blockwise(_row_average_wrapper, rd,
+    wrapper = (_parallel_row_average_wrapper if parallel
+               else _row_average_wrapper)
+
+    avg = da.blockwise(wrapper, rd,
                        *(v for pair in args for v in pair[1:]),
                        align_arrays=False,
                        adjust_chunks={"row": lambda x: np.nan},
@@ -159,7 +192,7 @@ _row_chan_avg_dims = ("row", "chan", "corr")
 def row_chan_average(row_meta, chan_meta, flag_row=None, weight=None,
                      vis=None, flag=None,
                      weight_spectrum=None, sigma_spectrum=None,
-                     chan_bin_size=1):
+                     chan_bin_size=1, parallel=False, low_memory=False):
     """ Average (row,chan,corr)-based dask arrays """
 
     if chan_meta is None:
@@ -179,7 +212,17 @@ def row_chan_average(row_meta, chan_meta, flag_row=None, weight=None,
     ws_dims = None if weight_spectrum is None else _row_chan_avg_dims
     ss_dims = None if sigma_spectrum is None else _row_chan_avg_dims
 
-    avg = da.blockwise(np_row_chan_average, _row_chan_avg_dims,
+    if parallel and low_memory:
+        raise ValueError("low_memory averaging is not "
+                         "supported in parallel")
+    elif parallel:
+        average_fn = _parallel_row_chan_average_wrapper
+    elif low_memory:
+        average_fn = np_low_memory_row_chan_average
+    else:
+        average_fn = np_row_chan_average
+
+    avg = da.blockwise(average_fn, _row_chan_avg_dims,
                        row_meta, ("row",),
                        chan_meta, ("chan",),
                        flag_row, flag_row_dims,
@@ -275,7 +318,8 @@ def time_and_channel(time, interval, antenna1, antenna2,
                      effective_bw=None, resolution=None,
                      vis=None, flag=None,
                      weight_spectrum=None, sigma_spectrum=None,
-                     time_bin_secs=1.0, chan_bin_size=1):
+                     time_bin_secs=1.0, chan_bin_size=1,
+                     parallel=False, low_memory=False):
 
     row_chan_arrays = (vis, flag, weight_spectrum, sigma_spectrum)
     chan_arrays = (chan_freq, chan_width, effective_bw, resolution)
@@ -300,7 +344,8 @@ def time_and_channel(time, interval, antenna1, antenna2,
                            flag_row=flag_row,
                            time_centroid=time_centroid,
                            exposure=exposure, uvw=uvw,
-                           weight=weight, sigma=sigma)
+                           weight=weight, sigma=sigma,
+                           parallel=parallel)
 
     # Average channel data
     row_chan_data = row_chan_average(row_meta, chan_meta,
@@ -308,7 +353,9 @@ def time_and_channel(time, interval, antenna1, antenna2,
                                      vis=vis, flag=flag,
                                      weight_spectrum=weight_spectrum,
                                      sigma_spectrum=sigma_spectrum,
-                                     chan_bin_size=chan_bin_size)
+                                     chan_bin_size=chan_bin_size,
+                                     parallel=parallel,
+                                     low_memory=low_memory)
 
     chan_data = chan_average(chan_meta,
                              chan_freq=chan_freq,
@@ -343,3 +390,117 @@ try:
                                     array_type=":class:`dask.array.Array`")
 except AttributeError:
     pass
+
+
+def _getitem_bda(avg, idx, dtype, shape=()):
+    """
+    Extract row-like and flattened (row_chan, ...) arrays
+    from a dask array of BDA tuples
+    """
+    dims = ("row",) + tuple("dim-%d" % d for d in range(len(shape)))
+    name = ("bda-getitem-%d-" % idx) + tokenize(avg, idx)
+    layers = db.blockwise(getitem, name, dims,
+                          avg.name, ("row",),
+                          idx, None,
+                          new_axes=dict(zip(dims[1:], shape)),
+                          numblocks={avg.name: avg.numblocks})
+    graph = HighLevelGraph.from_collections(name, layers, (avg,))
+    chunks = avg.chunks + tuple((s,) for s in shape)
+
+    return da.Array(graph, name, chunks,
+                    meta=np.empty((0,)*len(dims), dtype=dtype),
+                    dtype=dtype)
+
+
+@requires_optional("dask.array", dask_import_error)
+def bda(time, interval, antenna1, antenna2, uvw,
+        chan_freq, chan_width,
+        time_centroid=None, exposure=None, flag_row=None,
+        weight=None, sigma=None,
+        effective_bw=None, resolution=None,
+        vis=None, flag=None,
+        weight_spectrum=None, sigma_spectrum=None,
+        decorrelation=0.98, max_fov=3.0,
+        max_time_bin_secs=np.inf):
+
+    # Merge flag_row and flag arrays
+    flag_row = merge_flags(flag_row, flag)
+
+    rd = ("row",)
+    rcd = ("row", "corr")
+    rfcd = ("row", "chan", "corr")
+    cd = ("chan",)
+
+    # (array, dims)
+    args = [(time, rd),
+            (interval, rd),
+            (antenna1, rd),
+            (antenna2, rd),
+            (uvw, ("row", "uvw")),
+            (chan_freq, cd),
+            (chan_width, cd),
+            (time_centroid, rd),
+            (exposure, rd),
+            (flag_row, rd),
+            (weight, rcd),
+            (sigma, rcd),
+            (effective_bw, cd),
+            (resolution, cd),
+            (vis, rfcd),
+            (flag, rfcd),
+            (weight_spectrum, rfcd),
+            (sigma_spectrum, rfcd)]
+
+    # Channels are concatenated, as the channel bins
+    # of each baseline depend on the entire band
+    avg = da.blockwise(np_bda, rd,
+                       *(v for a, dims in args
+                         for v in (a, None if a is None else dims)),
+                       decorrelation=decorrelation,
+                       max_fov=max_fov,
+                       max_time_bin_secs=max_time_bin_secs,
+                       concatenate=True,
+                       adjust_chunks={"row": lambda x: np.nan},
+                       meta=np.empty((0,), dtype=np.object),
+                       dtype=np.object)
+
+    # (field, array, index of the first non-row/chan dimension)
+    # Row-like outputs retain their trailing dimensions, while
+    # channel outputs are flattened into a leading row_chan dimension
+    out_args = [("time", time, 1),
+                ("interval", interval, 1),
+                ("flag_row", flag_row, 1),
+                ("antenna1", antenna1, 1),
+                ("antenna2", antenna2, 1),
+                ("time_centroid", time_centroid, 1),
+                ("exposure", exposure, 1),
+                ("uvw", uvw, 1),
+                ("weight", weight, 1),
+                ("sigma", sigma, 1),
+                ("chan_freq", chan_freq, 1),
+                ("chan_width", chan_width, 1),
+                ("effective_bw", effective_bw, 1),
+                ("resolution", resolution, 1),
+                ("vis", vis, 2),
+                ("flag", flag, 2),
+                ("weight_spectrum", weight_spectrum, 2),
+                ("sigma_spectrum", sigma_spectrum, 2)]
+
+    fields = BDAAverageOutput._fields
+    outputs = {f: (None if a is None else
+                   _getitem_bda(avg, fields.index(f), a.dtype, a.shape[i:]))
+               for f, a, i in out_args}
+
+    num_chan = _getitem_bda(avg, fields.index("num_chan"), np.int32)
+
+    # Offsets are local to each row chunk, use num_chan instead
+    return BDAAverageOutput(num_chan=num_chan, offsets=None, **outputs)
+
+
+try:
+    bda.__doc__ = BDA_DOCS.substitute(
+                        array_type=":class:`dask.array.Array`",
+                        offsets_note="**offsets** is ``None`` as "
+                                     "offsets are local to each row chunk.")
+except AttributeError:
+    pass
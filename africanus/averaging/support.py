@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 
 
+import sys
+
 import numpy as np
 import numba
 
@@ -53,6 +55,158 @@ def _unique_internal(data):
     return aux[mask], perm[mask], inv_idx, np.diff(np.array(counts))
 
 
+@njit(nogil=True, cache=True)
+def _unique_runs(data):
+    """
+    Unique values of ``data`` formed by detecting runs of
+    equal values, as in MS TIME, which is nearly sorted.
+    Only the first value of each run is sorted,
+    so this is :math:`O(n)` if ``data`` is sorted.
+    """
+    if len(data.shape) != 1:
+        raise ValueError("_unique_runs currently "
+                         "only supports 1D arrays")
+
+    n = data.shape[0]
+
+    # Handle the empty array case
+    if n == 0:
+        return (data,
+                np.empty((0,), dtype=np.intp),
+                np.empty((0,), dtype=np.intp),
+                np.empty((0,), dtype=np.intp))
+
+    # Find the start of each run of equal values
+    run_start = np.empty(n + 1, dtype=np.intp)
+    run_start[0] = 0
+    nruns = 1
+    ascending = True
+
+    for i in range(1, n):
+        if data[i] != data[i - 1]:
+            # NaNs compare False and are treated as unsorted
+            ascending = ascending and data[i] > data[i - 1]
+            run_start[nruns] = i
+            nruns += 1
+
+    run_start[nruns] = n
+    run_counts = np.diff(run_start[:nruns + 1])
+    run_start = run_start[:nruns]
+    inv_idx = np.empty(n, dtype=np.intp)
+
+    if ascending:
+        # Runs are unique values
+        for r in range(nruns):
+            for i in range(run_start[r], run_start[r] + run_counts[r]):
+                inv_idx[i] = r
+
+        return data[run_start], run_start, inv_idx, run_counts
+
+    # Sort the first value of each run. The sort is stable
+    # so the first run of each unique value occurs first
+    heads = data[run_start]
+    perm = np.argsort(heads, kind='mergesort')
+    run_inv = np.empty(nruns, dtype=np.intp)
+    mask = np.empty(nruns, dtype=np.bool_)
+    counts = np.zeros(nruns, dtype=np.intp)
+
+    u = 0
+    run_inv[perm[0]] = 0
+    mask[0] = True
+    counts[0] = run_counts[perm[0]]
+
+    for i in range(1, nruns):
+        p = perm[i]
+        d = heads[p] != heads[perm[i - 1]]
+        mask[i] = d
+        u += d
+        run_inv[p] = u
+        counts[u] += run_counts[p]
+
+    for r in range(nruns):
+        for i in range(run_start[r], run_start[r] + run_counts[r]):
+            inv_idx[i] = run_inv[r]
+
+    perm = perm[mask]
+
+    # (uniques, indices, inverse index, counts)
+    return heads[perm], run_start[perm], inv_idx, counts[:u + 1]
+
+
+@njit(nogil=True, cache=True)
+def _unique_counting(keys, domain):
+    """
+    Unique values of integer ``keys`` in :code:`[0, domain)`,
+    computed in :math:`O(n + domain)` with a counting sort.
+    """
+    n = keys.shape[0]
+    first = np.full(domain, -1, dtype=np.intp)
+    key_counts = np.zeros(domain, dtype=np.intp)
+
+    for r in range(n):
+        k = keys[r]
+
+        if first[k] == -1:
+            first[k] = r
+
+        key_counts[k] += 1
+
+    nunique = 0
+
+    for k in range(domain):
+        nunique += key_counts[k] > 0
+
+    uniques = np.empty(nunique, dtype=keys.dtype)
+    indices = np.empty(nunique, dtype=np.intp)
+    counts = np.empty(nunique, dtype=np.intp)
+    u = 0
+
+    for k in range(domain):
+        if key_counts[k] > 0:
+            uniques[u] = k
+            indices[u] = first[k]
+            counts[u] = key_counts[k]
+            # Reuse first as the key to unique index map
+            first[k] = u
+            u += 1
+
+    inv_idx = np.empty(n, dtype=np.intp)
+
+    for r in range(n):
+        inv_idx[r] = first[keys[r]]
+
+    return uniques, indices, inv_idx, counts
+
+
+@njit(nogil=True, cache=True)
+def _unique_integer(data):
+    """
+    Unique values of integer ``data``, using a counting sort
+    if the range of values is small relative to the number of
+    values, and otherwise :func:`_unique_internal`.
+    """
+    n = data.shape[0]
+
+    if n == 0:
+        return _unique_internal(data)
+
+    lower = data.min()
+
+    # Floating point avoids overflow in the range of 64-bit integers
+    if float(data.max()) - float(lower) + 1.0 > max(2*n, 1 << 16):
+        return _unique_internal(data)
+
+    domain = np.intp(data.max() - lower) + 1
+
+    keys = np.empty(n, dtype=np.intp)
+
+    for r in range(n):
+        keys[r] = data[r] - lower
+
+    uniques, idx, inv, counts = _unique_counting(keys, domain)
+    return (uniques + lower).astype(data.dtype), idx, inv, counts
+
+
 @generated_jit(nopython=True, nogil=True, cache=True)
 def unique_time(time):
     """ Return unique time, inverse index and counts """
@@ -60,7 +214,7 @@ def unique_time(time):
         raise ValueError("time must be floating point but is %s" % time.dtype)
 
     def impl(time):
-        return _unique_internal(time)
+        return _unique_runs(time)
 
     return impl
 
@@ -74,20 +228,60 @@ def unique_baselines(ant1, ant2):
                          "but received %s and %s" %
                          (ant1.dtype, ant2.dtype))
 
+    # The packed int64 baseline key orders baselines
+    # by (ant2, ant1) on little endian and (ant1, ant2)
+    # on big endian systems, so match this ordering
+    little_endian = sys.byteorder == "little"
+
     def impl(ant1, ant2):
+        nrow = ant1.shape[0]
+
+        if nrow > 0:
+            amin = min(ant1.min(), ant2.min())
+            na = np.int64(max(ant1.max(), ant2.max())) + 1
+        else:
+            amin = 0
+            na = 0
+
+        # Counting sort on a packed baseline key
+        # if the baseline domain is small
+        if amin >= 0 and na*na <= max(2*nrow, 1 << 16):
+            keys = np.empty(nrow, dtype=np.intp)
+
+            for r in range(nrow):
+                if little_endian:
+                    keys[r] = ant2[r]*na + ant1[r]
+                else:
+                    keys[r] = ant1[r]*na + ant2[r]
+
+            ukeys, idx, inv, counts = _unique_counting(keys, na*na)
+            ubl = np.empty((ukeys.shape[0], 2), dtype=np.int32)
+
+            for u in range(ukeys.shape[0]):
+                hi, lo = divmod(ukeys[u], na)
+
+                if little_endian:
+                    ubl[u, 0] = lo
+                    ubl[u, 1] = hi
+                else:
+                    ubl[u, 0] = hi
+                    ubl[u, 1] = lo
+
+            return ubl, idx, inv, counts
+
         # Trickery, stack the two int32 antenna pairs in an array
         # and cast to int64
-        bl_32bit = np.empty((ant1.shape[0], 2), dtype=np.int32)
+        bl_32bit = np.empty((nrow, 2), dtype=np.int32)
 
         # Copy data
-        for r in range(ant1.shape[0]):
+        for r in range(nrow):
             bl_32bit[r, 0] = ant1[r]
             bl_32bit[r, 1] = ant2[r]
 
         # Cast to int64 for the unique operation
-        bl = bl_32bit.view(np.int64).reshape(ant1.shape[0])
+        bl = bl_32bit.view(np.int64).reshape(nrow)
 
-        ret, idx, inv, counts = _unique_internal(bl)
+        ret, idx, inv, counts = _unique_integer(bl)
 
         # Recast to int32 and reshape
         ubl = ret.view(np.int32).reshape(ret.shape[0], 2)
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+
+
+import numpy as np
+from numpy.testing import assert_array_equal, assert_allclose
+import pytest
+
+from africanus.averaging.bda_avg import bda
+from africanus.averaging.bda_mapping import (baseline_bin_sizes,
+                                             bda_mapper, inv_sinc)
+from africanus.averaging.support import unique_time, unique_baselines
+from africanus.averaging.time_and_channel_avg import time_and_channel
+from africanus.constants import c as lightspeed
+from africanus.testing.observation import SyntheticObservation
+
+COLUMNS = ("TIME", "TIME_CENTROID", "INTERVAL", "EXPOSURE",
+           "ANTENNA1", "ANTENNA2", "UVW", "FLAG_ROW", "FLAG",
+           "WEIGHT", "SIGMA", "WEIGHT_SPECTRUM", "DATA")
+
+
+@pytest.fixture
+def obs():
+    return SyntheticObservation(32, nchan=256, na=7, ncorr=2,
+                                missing_fraction=0.1, flag_fraction=0.1)
+
+
+def _bda_args(data):
+    return dict(time_centroid=data["TIME_CENTROID"],
+                exposure=data["EXPOSURE"],
+                flag_row=data["FLAG_ROW"].astype(np.uint8),
+                weight=data["WEIGHT"],
+                sigma=data["SIGMA"],
+                vis=data["DATA"],
+                flag=data["FLAG"].astype(np.uint8),
+                weight_spectrum=np.ascontiguousarray(data["WEIGHT_SPECTRUM"]))
+
+
+@pytest.mark.parametrize("decorrelation", [0.5, 0.9, 0.99, 0.999])
+def test_inv_sinc(decorrelation):
+    x = inv_sinc(decorrelation)
+    assert 0.0 <= x <= 1.0
+    assert_allclose(np.sinc(x), decorrelation)
+
+
+def test_baseline_bin_sizes(obs):
+    data = obs.rows(0, obs.nrow, columns=COLUMNS)
+    ubl, _, bl_inv, _ = unique_baselines(data["ANTENNA1"], data["ANTENNA2"])
+    utime, _, time_inv, _ = unique_time(data["TIME"])
+    decorrelation, max_fov = 0.98, 1.0
+
+    time_bins, chan_bins = baseline_bin_sizes(
+        data["TIME"], data["UVW"], bl_inv, ubl.shape[0],
+        time_inv, utime.shape[0], obs.chan_freq, obs.chan_width,
+        decorrelation, max_fov, np.inf)
+
+    # Channel bins evenly divide the band
+    assert np.all(obs.nchan % chan_bins == 0)
+
+    lengths = np.zeros(ubl.shape[0])
+    np.maximum.at(lengths, bl_inv, np.linalg.norm(data["UVW"], axis=1))
+    order = np.argsort(lengths)
+
+    # Longer baselines use smaller bins
+    assert np.all(np.diff(chan_bins[order]) <= 0)
+    assert time_bins[order[0]] > time_bins[order[-1]]
+
+    # The phase change across averaged channel bins at the
+    # field edge satisfies the decorrelation tolerance
+    averaged = chan_bins > 1
+    assert averaged.any()
+
+    fov_factor = 2.0 * np.sin(0.5 * np.deg2rad(max_fov))
+    turns = lengths * fov_factor * chan_bins * obs.chan_width[0] / lightspeed
+    assert np.all(np.sinc(turns[averaged]) >= np.sqrt(decorrelation))
+
+
+def test_bda_mapper(obs):
+    data = obs.rows(0, obs.nrow, columns=COLUMNS)
+
+    meta = bda_mapper(data["TIME"], data["INTERVAL"],
+                      data["ANTENNA1"], data["ANTENNA2"], data["UVW"],
+                      obs.chan_freq, obs.chan_width,
+                      flag_row=data["FLAG_ROW"].astype(np.uint8),
+                      max_fov=0.5)
+
+    out_rows = meta.time.shape[0]
+
+    # Short baselines are averaged in time
+    assert 0 < out_rows < obs.nrow
+    assert np.all(np.diff(meta.time) >= 0)
+    assert meta.map.max() == out_rows - 1
+
+    assert_array_equal(meta.num_chan * meta.chan_bin_size, obs.nchan)
+    assert meta.offsets[0] == 0
+    assert_array_equal(np.diff(meta.offsets), meta.num_chan)
+
+
+def test_bda_decorrelation(obs):
+    """ Averaged visibilities of a source at the field edge """
+    data = obs.rows(0, obs.nrow, columns=COLUMNS)
+    decorrelation, max_fov = 0.95, 1.0
+
+    # Point source at the edge of the field of view
+    theta = np.deg2rad(max_fov)
+    lmn = np.array([np.sin(theta), 0.0, np.cos(theta) - 1.0])
+    phase = data["UVW"].dot(lmn)[:, None] * obs.chan_freq[None, :]
+    vis = np.exp(2j*np.pi*phase / lightspeed)[:, :, None]
+
+    avg = bda(data["TIME"], data["INTERVAL"],
+              data["ANTENNA1"], data["ANTENNA2"], data["UVW"],
+              obs.chan_freq, obs.chan_width, vis=vis,
+              decorrelation=decorrelation, max_fov=max_fov)
+
+    assert avg.vis.shape == (avg.offsets[-1], 1)
+    assert avg.chan_freq.shape == (avg.offsets[-1],)
+    assert avg.time.shape[0] < obs.nrow
+    assert np.all(np.abs(avg.vis) >= decorrelation - 5e-3)
+
+
+def test_bda_matches_time_and_channel(obs):
+    """ Fixed bins if uvw are zero, matching time_and_channel """
+    data = obs.rows(0, obs.nrow, columns=COLUMNS)
+    args = _bda_args(data)
+    uvw = np.zeros_like(data["UVW"])
+    time_bin_secs = 4*obs.integration
+
+    avg = bda(data["TIME"], data["INTERVAL"],
+              data["ANTENNA1"], data["ANTENNA2"], uvw,
+              obs.chan_freq, obs.chan_width,
+              max_time_bin_secs=time_bin_secs, **args)
+
+    expected = time_and_channel(data["TIME"], data["INTERVAL"],
+                                data["ANTENNA1"], data["ANTENNA2"],
+                                uvw=uvw, chan_freq=obs.chan_freq,
+                                chan_width=obs.chan_width,
+                                time_bin_secs=time_bin_secs,
+                                chan_bin_size=obs.nchan, **args)
+
+    out_rows = expected.time.shape[0]
+    assert_array_equal(avg.num_chan, 1)
+    assert_array_equal(avg.offsets, np.arange(out_rows + 1))
+
+    for field in ("time", "interval", "flag_row",
+                  "antenna1", "antenna2", "time_centroid",
+                  "exposure", "uvw", "weight", "sigma"):
+        assert_allclose(getattr(avg, field), getattr(expected, field))
+
+    for field in ("chan_freq", "chan_width"):
+        assert_allclose(getattr(avg, field),
+                        np.tile(getattr(expected, field), out_rows))
+
+    for field in ("vis", "flag", "weight_spectrum"):
+        expected_field = getattr(expected, field)
+        assert_allclose(getattr(avg, field),
+                        expected_field.reshape(out_rows, obs.ncorr),
+                        rtol=1e-6)
+
+
+def test_dask_bda(obs):
+    da = pytest.importorskip("dask.array")
+    from africanus.averaging.dask import bda as dask_bda
+
+    # Row chunks containing whole timesteps
+    row_chunks = tuple(np.add.reduceat(obs.row_counts, [0, 10, 20]))
+    data = obs.rows(0, obs.nrow, columns=COLUMNS)
+    kw = dict(decorrelation=0.98, max_fov=0.5)
+
+    expected = []
+    start = 0
+
+    for chunk in row_chunks:
+        d = {c: a[start:start + chunk] for c, a in data.items()}
+        expected.append(bda(d["TIME"], d["INTERVAL"],
+                            d["ANTENNA1"], d["ANTENNA2"], d["UVW"],
+                            obs.chan_freq, obs.chan_width,
+                            **_bda_args(d), **kw))
+        start += chunk
+
+    def darray(a, chunks=row_chunks):
+        return da.from_array(a, chunks=(chunks,) + a.shape[1:])
+
+    dask_args = {k: darray(v) for k, v in _bda_args(data).items()}
+    # Channels should be concatenated within each row chunk
+    dask_args["vis"] = darray(data["DATA"]).rechunk({1: 16})
+
+    avg = dask_bda(darray(data["TIME"]), darray(data["INTERVAL"]),
+                   darray(data["ANTENNA1"]), darray(data["ANTENNA2"]),
+                   darray(data["UVW"]),
+                   da.from_array(obs.chan_freq, chunks=16),
+                   da.from_array(obs.chan_width, chunks=16),
+                   **dask_args, **kw)
+
+    assert avg.offsets is None
+
+    for field in ("time", "antenna1", "antenna2", "uvw", "weight",
+                  "num_chan", "chan_freq", "vis", "flag",
+                  "weight_spectrum"):
+        assert_allclose(getattr(avg, field).compute(),
+                        np.concatenate([getattr(e, field)
+                                        for e in expected]))
@@ -6,8 +6,9 @@ from numpy.testing import assert_array_equal, assert_array_almost_equal
 import pytest
 
 from africanus.averaging.support import unique_time, unique_baselines
-from africanus.averaging.time_and_channel_mapping import (row_mapper,
-                                                          channel_mapper)
+from africanus.averaging.time_and_channel_mapping import (
+    row_mapper, row_map_inverse, channel_mapper,
+    dense_row_map, sparse_row_map)
 
 
 @pytest.fixture
@@ -108,6 +109,79 @@ def test_row_mapper(time, interval, ant1, ant2,
     assert_array_almost_equal(new_exp, new_exp2)
 
 
+def _assert_row_map_equal(a, b):
+    assert_array_equal(a.map, b.map)
+    assert_array_equal(a.time, b.time)
+    assert_array_equal(a.interval, b.interval)
+
+    if a.flag_row is None:
+        assert b.flag_row is None
+    else:
+        assert_array_equal(a.flag_row, b.flag_row)
+
+
+@pytest.mark.parametrize("time_bin_secs", [0.1, 1, 4])
+@pytest.mark.parametrize("have_flag_row", [False, True])
+def test_sparse_row_mapper(time_bin_secs, have_flag_row):
+    rs = np.random.RandomState(42)
+    na, ntime = 16, 20
+    ant1, ant2 = (a.astype(np.int32) for a in np.triu_indices(na, 1))
+    nbl = ant1.size
+
+    # Baselines only present in a few timesteps, as in a subarray change
+    present = rs.random_sample((ntime, nbl)) < 0.2
+    t, bl = np.nonzero(present)
+    time = t.astype(np.float64) + rs.uniform(-0.01, 0.01)
+    interval = np.full(time.size, 0.9)
+    ant1, ant2 = ant1[bl], ant2[bl]
+    flag_row = (rs.random_sample(time.size) < 0.3).astype(np.uint8)
+    flag_row = flag_row if have_flag_row else None
+
+    # Shuffle rows
+    perm = rs.permutation(time.size)
+    args = (time[perm], interval[perm], ant1[perm], ant2[perm])
+    flag_row = None if flag_row is None else flag_row[perm]
+
+    _, _, time_inv, _ = unique_time(args[0])
+    ubl, _, bl_inv, _ = unique_baselines(args[2], args[3])
+    ntime = time_inv.max() + 1
+    map_args = (args[0], args[1], bl_inv, ubl.shape[0], time_inv, ntime,
+                flag_row, time_bin_secs)
+
+    dense = dense_row_map(*map_args)
+    sparse = sparse_row_map(*map_args)
+    _assert_row_map_equal(dense, sparse)
+
+    # row_mapper selects the sparse mapper
+    ret = row_mapper(*args, flag_row=flag_row, time_bin_secs=time_bin_secs)
+    _assert_row_map_equal(ret, dense)
+
+    # Duplicate rows are detected
+    dup = tuple(np.concatenate([a, a[:1]]) for a in args)
+
+    with pytest.raises(ValueError, match="Duplicate"):
+        sparse_row_map(dup[0], dup[1],
+                       np.concatenate([bl_inv, bl_inv[:1]]), ubl.shape[0],
+                       np.concatenate([time_inv, time_inv[:1]]), ntime,
+                       None, time_bin_secs)
+
+
+@pytest.mark.parametrize("time_bin_secs", [0.1, 1, 4])
+def test_row_map_inverse(time, interval, ant1, ant2, time_bin_secs):
+    row_meta = row_mapper(time, interval, ant1, ant2,
+                          time_bin_secs=time_bin_secs)
+    offsets, rows = row_map_inverse(row_meta)
+
+    out_rows = row_meta.time.shape[0]
+    assert offsets.shape == (out_rows + 1,)
+    assert offsets[0] == 0 and offsets[-1] == time.shape[0]
+    assert_array_equal(np.sort(rows), np.arange(time.shape[0]))
+
+    for out_row in range(out_rows):
+        in_rows = rows[offsets[out_row]:offsets[out_row + 1]]
+        assert_array_equal(in_rows, np.nonzero(row_meta.map == out_row)[0])
+
+
 def test_channel_mapper():
     chan_map, out_chans = channel_mapper(64, 17)
 
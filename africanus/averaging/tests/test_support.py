@@ -57,3 +57,53 @@ def test_unique_baselines(ant1, ant2):
     assert_array_equal(bl[inv], test_bl)
     assert_array_equal(test_bl[idx], bl)
     assert_array_equal(counts, [2, 3, 1, 3, 1])
+
+
+def _assert_unique_equal(result, data):
+    uniques, idx, inv, counts = result
+    np_uniques, np_idx, np_inv, np_counts = np.unique(data,
+                                                      return_index=True,
+                                                      return_inverse=True,
+                                                      return_counts=True)
+
+    assert_array_equal(uniques, np_uniques)
+    assert_array_equal(idx, np_idx)
+    assert_array_equal(inv, np_inv)
+    assert_array_equal(counts, np_counts)
+
+
+@pytest.mark.parametrize("order", ["sorted", "nearly-sorted", "random"])
+def test_unique_time_runs(order):
+    rs = np.random.RandomState(42)
+    time = np.repeat(np.arange(20.0), rs.randint(1, 10, 20))
+
+    if order == "nearly-sorted":
+        # Swap a few blocks of rows, as in a concatenated MS
+        time = np.concatenate([time[30:60], time[:30], time[60:]])
+    elif order == "random":
+        rs.shuffle(time)
+
+    _assert_unique_equal(unique_time(time), time)
+
+    utime, idx, inv, counts = unique_time(time[:0])
+    assert utime.shape == idx.shape == inv.shape == counts.shape == (0,)
+
+
+@pytest.mark.parametrize("na", [7, 64, 10000])
+def test_unique_baselines_packed(na):
+    rs = np.random.RandomState(42)
+    ant1 = rs.randint(0, na, 1000).astype(np.int32)
+    ant2 = rs.randint(0, na, 1000).astype(np.int32)
+    ubl, idx, inv, counts = unique_baselines(ant1, ant2)
+
+    # Baselines are ordered by the packed int64 (ant1, ant2) key
+    bl = np.stack([ant1, ant2], axis=1)
+    key = bl.view(np.int64).ravel()
+    _, np_idx, np_inv, np_counts = np.unique(key, return_index=True,
+                                             return_inverse=True,
+                                             return_counts=True)
+
+    assert_array_equal(ubl, bl[np_idx])
+    assert_array_equal(idx, np_idx)
+    assert_array_equal(inv, np_inv)
+    assert_array_equal(counts, np_counts)
@@ -6,7 +6,10 @@ from numpy.testing import assert_array_equal, assert_array_almost_equal
 import pytest
 
 from africanus.averaging.support import unique_time, unique_baselines
-from africanus.averaging.time_and_channel_avg import time_and_channel
+from africanus.averaging.time_and_channel_avg import (
+                                time_and_channel,
+                                row_chan_average,
+                                low_memory_row_chan_average)
 from africanus.averaging.time_and_channel_mapping import (row_mapper,
                                                           channel_mapper)
 
@@ -448,3 +451,149 @@ def test_dask_averager(time, ant1, ant2, flagged_rows,
     # Compute all the fields
     fields = [getattr(avg, f) for f in avg._fields]
     avg = type(avg)(*da.compute(fields)[0])
+
+
+@pytest.mark.parametrize("flagged_rows", [[], [8, 9], [0, 1]])
+@pytest.mark.parametrize("time_bin_secs", [1, 3])
+@pytest.mark.parametrize("chan_bin_size", [1, 3])
+def test_parallel_averager(time, ant1, ant2, flagged_rows,
+                           uvw, interval, weight, sigma,
+                           frequency, chan_width,
+                           vis, flag,
+                           weight_spectrum, sigma_spectrum,
+                           time_bin_secs, chan_bin_size):
+    vis = vis(time.shape[0], nchan, ncorr)
+    flag = flag(time.shape[0], nchan, ncorr)
+    flag_row = np.zeros(time.shape, dtype=np.uint8)
+    flag_row[flagged_rows] = 1
+    flag[flagged_rows, :, :] = 1
+
+    kwargs = dict(flag_row=flag_row,
+                  time_centroid=time, exposure=interval, uvw=uvw,
+                  weight=weight, sigma=sigma,
+                  chan_freq=frequency, chan_width=chan_width,
+                  vis=vis, flag=flag,
+                  weight_spectrum=weight_spectrum,
+                  sigma_spectrum=sigma_spectrum,
+                  time_bin_secs=time_bin_secs,
+                  chan_bin_size=chan_bin_size)
+
+    serial = time_and_channel(time, interval, ant1, ant2, **kwargs)
+    parallel = time_and_channel(time, interval, ant1, ant2,
+                                parallel=True, **kwargs)
+
+    # Input samples are added in the same order, so output is identical
+    for field in serial._fields:
+        assert_array_equal(getattr(serial, field), getattr(parallel, field))
+
+
+@pytest.mark.parametrize("flagged_rows", [[], [8, 9], [0, 1]])
+@pytest.mark.parametrize("time_bin_secs", [1, 3])
+@pytest.mark.parametrize("chan_bin_size", [1, 3])
+def test_low_memory_averager(time, ant1, ant2, flagged_rows,
+                             uvw, interval, weight, sigma,
+                             frequency, chan_width,
+                             vis, flag,
+                             weight_spectrum, sigma_spectrum,
+                             time_bin_secs, chan_bin_size):
+    vis = vis(time.shape[0], nchan, ncorr)
+    flag = flag(time.shape[0], nchan, ncorr)
+    flag_row = np.zeros(time.shape, dtype=np.uint8)
+    flag_row[flagged_rows] = 1
+    flag[flagged_rows, :, :] = 1
+
+    kwargs = dict(flag_row=flag_row,
+                  time_centroid=time, exposure=interval, uvw=uvw,
+                  weight=weight, sigma=sigma,
+                  chan_freq=frequency, chan_width=chan_width,
+                  vis=vis, flag=flag,
+                  weight_spectrum=weight_spectrum,
+                  sigma_spectrum=sigma_spectrum,
+                  time_bin_secs=time_bin_secs,
+                  chan_bin_size=chan_bin_size)
+
+    dense = time_and_channel(time, interval, ant1, ant2, **kwargs)
+    low_memory = time_and_channel(time, interval, ant1, ant2,
+                                  low_memory=True, **kwargs)
+
+    # Fully flagged bins receive the same flagged samples, in order
+    for field in dense._fields:
+        assert_array_equal(getattr(dense, field), getattr(low_memory, field))
+
+    with pytest.raises(ValueError, match="not supported in parallel"):
+        time_and_channel(time, interval, ant1, ant2,
+                         parallel=True, low_memory=True, **kwargs)
+
+
+@pytest.mark.parametrize("flag_fraction", [0.0, 0.3, 0.9, 1.0])
+def test_low_memory_side_table_growth(flag_fraction):
+    """ Enough fully flagged bins to grow the side table """
+    rs = np.random.RandomState(42)
+    ntime, nbl, nchan, ncorr = 16, 64, 256, 2
+    nrow = ntime*nbl
+
+    time = np.repeat(np.arange(ntime, dtype=np.float64), nbl)
+    interval = np.ones(nrow)
+    ant1 = np.tile(np.arange(nbl, dtype=np.int32), ntime)
+    ant2 = ant1 + 1
+    weight = rs.random_sample((nrow, ncorr))
+    vis = rs.random_sample((nrow, nchan, ncorr)) + 0j
+    weight_spectrum = rs.random_sample((nrow, nchan, ncorr))
+    sigma_spectrum = rs.random_sample((nrow, nchan, ncorr))
+    flag = (rs.random_sample((nrow, nchan, ncorr)) < flag_fraction)
+    flag = flag.astype(np.uint8)
+    flag_row = np.all(flag, axis=(1, 2)).astype(np.uint8)
+
+    row_meta = row_mapper(time, interval, ant1, ant2,
+                          flag_row=flag_row, time_bin_secs=2)
+    chan_meta = channel_mapper(nchan, 2)
+    args = (row_meta, chan_meta, flag_row, weight, vis, flag,
+            weight_spectrum, sigma_spectrum)
+
+    dense = row_chan_average(*args)
+    low_memory = low_memory_row_chan_average(*args)
+
+    for field in dense._fields:
+        assert_array_equal(getattr(dense, field), getattr(low_memory, field))
+
+
+def test_dask_parallel_averager(time, ant1, ant2, interval, uvw, weight,
+                                frequency, chan_width, vis, flag,
+                                weight_spectrum):
+    da = pytest.importorskip('dask.array')
+
+    from africanus.averaging.dask import time_and_channel as dask_avg
+
+    rc = (6, 4)
+    fc = (8, 8)
+    vis = vis(time.shape[0], nchan, ncorr)
+    flag = flag(time.shape[0], nchan, ncorr)
+    flag_row = np.all(flag, axis=(1, 2)).astype(flag.dtype)
+
+    def row_chunked(a):
+        return da.from_array(a, chunks=(rc,) + a.shape[1:])
+
+    def row_chan_chunked(a):
+        return da.from_array(a, chunks=(rc, fc, ncorr))
+
+    def average(parallel):
+        return dask_avg(row_chunked(time), row_chunked(interval),
+                        row_chunked(ant1), row_chunked(ant2),
+                        flag_row=row_chunked(flag_row),
+                        time_centroid=row_chunked(time),
+                        uvw=row_chunked(uvw), weight=row_chunked(weight),
+                        chan_freq=da.from_array(frequency, chunks=(fc,)),
+                        chan_width=da.from_array(chan_width, chunks=(fc,)),
+                        vis=row_chan_chunked(vis),
+                        flag=row_chan_chunked(flag),
+                        weight_spectrum=row_chan_chunked(weight_spectrum),
+                        time_bin_secs=2, chan_bin_size=3,
+                        parallel=parallel)
+
+    serial, parallel = average(False), average(True)
+    fields = serial._fields
+    serial, parallel = da.compute([getattr(serial, f) for f in fields],
+                                  [getattr(parallel, f) for f in fields])
+
+    for field, s, p in zip(fields, serial, parallel):
+        assert_array_equal(s, p, err_msg=field)
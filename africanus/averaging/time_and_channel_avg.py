@@ -7,9 +7,11 @@ from numba import types
 import numpy as np
 
 from africanus.averaging.time_and_channel_mapping import (row_mapper,
+                                                          row_map_inverse,
                                                           channel_mapper)
 from africanus.util.docs import DocstringTemplate
-from africanus.util.numba import is_numba_type_none, generated_jit, njit
+from africanus.util.numba import (is_numba_type_none, generated_jit,
+                                  njit, prange)
 
 
 def matching_flag_factory(present):
@@ -156,6 +158,141 @@ def row_average(meta, ant1, ant2, flag_row=None,
     return impl
 
 
+@generated_jit(nopython=True, nogil=True, cache=True, parallel=True)
+def parallel_row_average(meta, inverse, ant1, ant2, flag_row=None,
+                         time_centroid=None, exposure=None, uvw=None,
+                         weight=None, sigma=None):
+    """
+    Parallel :func:`row_average`, gathering the input rows of
+    each output row from the :func:`row_map_inverse` ``inverse``,
+    so that output rows are averaged independently on separate threads.
+    Input rows are added in the same order as :func:`row_average`.
+    """
+
+    have_flag_row = not is_numba_type_none(flag_row)
+    flags_match = matching_flag_factory(have_flag_row)
+
+    def impl(meta, inverse, ant1, ant2, flag_row=None,
+             time_centroid=None, exposure=None, uvw=None,
+             weight=None, sigma=None):
+
+        out_rows = meta.time.shape[0]
+
+        counts = np.zeros(out_rows, dtype=np.uint32)
+
+        # These outputs are always present
+        ant1_avg = np.empty(out_rows, ant1.dtype)
+        ant2_avg = np.empty(out_rows, ant2.dtype)
+
+        # Possibly present outputs for possibly present inputs
+        uvw_avg = (
+            None if uvw is None else
+            np.zeros((out_rows,) + uvw.shape[1:],
+                     dtype=uvw.dtype))
+
+        time_centroid_avg = (
+            None if time_centroid is None else
+            np.zeros((out_rows,) + time_centroid.shape[1:],
+                     dtype=time_centroid.dtype))
+
+        exposure_avg = (
+            None if exposure is None else
+            np.zeros((out_rows,) + exposure.shape[1:],
+                     dtype=exposure.dtype))
+
+        weight_avg = (
+            None if weight is None else
+            np.zeros((out_rows,) + weight.shape[1:],
+                     dtype=weight.dtype))
+
+        sigma_avg = (
+            None if sigma is None else
+            np.zeros((out_rows,) + sigma.shape[1:],
+                     dtype=sigma.dtype))
+
+        sigma_weight_sum = (
+            None if sigma is None else
+            np.zeros((out_rows,) + sigma.shape[1:],
+                     dtype=sigma.dtype))
+
+        for out_row in prange(out_rows):
+            # Gather input rows, accumulating into the output row
+            for i in range(inverse.offsets[out_row],
+                           inverse.offsets[out_row + 1]):
+                in_row = inverse.rows[i]
+
+                if flags_match(flag_row, in_row, meta.flag_row, out_row):
+                    if uvw is not None:
+                        uvw_avg[out_row, 0] += uvw[in_row, 0]
+                        uvw_avg[out_row, 1] += uvw[in_row, 1]
+                        uvw_avg[out_row, 2] += uvw[in_row, 2]
+
+                    if time_centroid is not None:
+                        time_centroid_avg[out_row] += time_centroid[in_row]
+
+                    if exposure is not None:
+                        exposure_avg[out_row] += exposure[in_row]
+
+                    if weight is not None:
+                        for co in range(weight.shape[1]):
+                            weight_avg[out_row, co] += weight[in_row, co]
+
+                    if sigma is not None:
+                        for co in range(sigma.shape[1]):
+                            sva = sigma[in_row, co]**2
+
+                            # Use provided weights
+                            if weight is not None:
+                                wt = weight[in_row, co]
+                                sva *= wt ** 2
+                                sigma_weight_sum[out_row, co] += wt
+                            # Natural weights
+                            else:
+                                sigma_weight_sum[out_row, co] += 1.0
+
+                            # Assign
+                            sigma_avg[out_row, co] += sva
+
+                    counts[out_row] += 1
+
+                # Input rows are ascending, so the last
+                # input row is assigned, as in row_average
+                ant1_avg[out_row] = ant1[in_row]
+                ant2_avg[out_row] = ant2[in_row]
+
+            # Normalise
+            count = counts[out_row]
+
+            if count > 0:
+                # Normalise uvw
+                if uvw is not None:
+                    uvw_avg[out_row, 0] /= count
+                    uvw_avg[out_row, 1] /= count
+                    uvw_avg[out_row, 2] /= count
+
+                # Normalise time centroid
+                if time_centroid is not None:
+                    time_centroid_avg[out_row] /= count
+
+                # Normalise sigma
+                if sigma is not None:
+                    for co in range(sigma.shape[1]):
+                        ssva = sigma_avg[out_row, co]
+                        wt = sigma_weight_sum[out_row, co]
+
+                        if wt != 0.0:
+                            ssva /= (wt**2)
+
+                        sigma_avg[out_row, co] = np.sqrt(ssva)
+
+        return RowAverageOutput(ant1_avg, ant2_avg,
+                                time_centroid_avg,
+                                exposure_avg, uvw_avg,
+                                weight_avg, sigma_avg)
+
+    return impl
+
+
 def weight_sum_output_factory(present):
     """ Returns function producing vis weight sum if vis present """
     if present:
@@ -638,6 +775,466 @@ def row_chan_average(row_meta, chan_meta, flag_row=None, weight=None,
     return impl
 
 
+@generated_jit(nopython=True, nogil=True, cache=True, parallel=True)
+def parallel_row_chan_average(row_meta, inverse, chan_meta,
+                              flag_row=None, weight=None,
+                              vis=None, flag=None,
+                              weight_spectrum=None, sigma_spectrum=None):
+    """
+    Parallel :func:`row_chan_average`, gathering the input rows of
+    each output row from the :func:`row_map_inverse` ``inverse``,
+    so that output rows are averaged independently on separate threads.
+    Input samples are added in the same order as :func:`row_chan_average`.
+    """
+
+    have_flag_row = not is_numba_type_none(flag_row)
+    have_vis = not is_numba_type_none(vis)
+    have_flag = not is_numba_type_none(flag)
+    have_weight = not is_numba_type_none(weight)
+    have_weight_spectrum = not is_numba_type_none(weight_spectrum)
+    have_sigma_spectrum = not is_numba_type_none(sigma_spectrum)
+
+    flags_match = matching_flag_factory(have_flag_row)
+    is_chan_flagged = is_chan_flagged_factory(have_flag)
+
+    vis_factory = chan_output_factory(have_vis)
+    weight_sum_factory = weight_sum_output_factory(have_vis)
+    flag_factory = chan_output_factory(have_flag)
+    weight_factory = chan_output_factory(have_weight_spectrum)
+    sigma_factory = chan_output_factory(have_sigma_spectrum)
+
+    vis_adder = vis_add_factory(have_vis,
+                                have_weight,
+                                have_weight_spectrum)
+    weight_adder = chan_add_factory(have_weight_spectrum)
+    sigma_adder = sigma_spectrum_add_factory(have_sigma_spectrum,
+                                             have_weight,
+                                             have_weight_spectrum)
+
+    vis_normaliser = vis_normaliser_factory(have_vis)
+    sigma_normaliser = sigma_spectrum_normaliser_factory(have_sigma_spectrum)
+    weight_normaliser = weight_spectrum_normaliser_factory(
+                            have_weight_spectrum)
+
+    set_flagged = set_flagged_factory(have_flag)
+
+    dummy_chan_freq = None
+    dummy_chan_width = None
+
+    def impl(row_meta, inverse, chan_meta, flag_row=None, weight=None,
+             vis=None, flag=None,
+             weight_spectrum=None, sigma_spectrum=None):
+
+        out_rows = row_meta.time.shape[0]
+        nchan, ncorrs = chan_corrs(vis, flag,
+                                   weight_spectrum, sigma_spectrum,
+                                   dummy_chan_freq, dummy_chan_width,
+                                   dummy_chan_width, dummy_chan_width)
+
+        chan_map, out_chans = chan_meta
+
+        out_shape = (out_rows, out_chans, ncorrs)
+
+        vis_avg = vis_factory(out_shape, vis)
+        vis_weight_sum = weight_sum_factory(out_shape, vis)
+        weight_spectrum_avg = weight_factory(out_shape, weight_spectrum)
+        sigma_spectrum_avg = sigma_factory(out_shape, sigma_spectrum)
+        sigma_spectrum_weight_sum = sigma_factory(out_shape, sigma_spectrum)
+
+        flagged_vis_avg = vis_factory(out_shape, vis)
+        flagged_vis_weight_sum = weight_sum_factory(out_shape, vis)
+        flagged_weight_spectrum_avg = weight_factory(out_shape,
+                                                     weight_spectrum)
+        flagged_sigma_spectrum_avg = sigma_factory(out_shape,
+                                                   sigma_spectrum)
+        flagged_sigma_spectrum_weight_sum = sigma_factory(out_shape,
+                                                          sigma_spectrum)
+
+        flag_avg = flag_factory(out_shape, flag)
+
+        counts = np.zeros(out_shape, dtype=np.uint32)
+        flag_counts = np.zeros(out_shape, dtype=np.uint32)
+
+        for r in prange(out_rows):
+            # Gather input rows, accumulating into the output row
+            for i in range(inverse.offsets[r], inverse.offsets[r + 1]):
+                in_row = inverse.rows[i]
+
+                if not flags_match(flag_row, in_row, row_meta.flag_row, r):
+                    continue
+
+                for in_chan in range(nchan):
+                    out_chan = chan_map[in_chan]
+
+                    for corr in range(ncorrs):
+                        if is_chan_flagged(flag, in_row, in_chan, corr):
+                            # Increment flagged averages and counts
+                            flag_counts[r, out_chan, corr] += 1
+
+                            vis_adder(flagged_vis_avg,
+                                      flagged_vis_weight_sum, vis,
+                                      weight, weight_spectrum,
+                                      r, out_chan, in_row, in_chan, corr)
+                            weight_adder(flagged_weight_spectrum_avg,
+                                         weight_spectrum,
+                                         r, out_chan, in_row, in_chan, corr)
+                            sigma_adder(flagged_sigma_spectrum_avg,
+                                        flagged_sigma_spectrum_weight_sum,
+                                        sigma_spectrum,
+                                        weight,
+                                        weight_spectrum,
+                                        r, out_chan, in_row, in_chan, corr)
+                        else:
+                            # Increment unflagged averages and counts
+                            counts[r, out_chan, corr] += 1
+
+                            vis_adder(vis_avg, vis_weight_sum, vis,
+                                      weight, weight_spectrum,
+                                      r, out_chan, in_row, in_chan, corr)
+                            weight_adder(weight_spectrum_avg,
+                                         weight_spectrum,
+                                         r, out_chan, in_row, in_chan, corr)
+                            sigma_adder(sigma_spectrum_avg,
+                                        sigma_spectrum_weight_sum,
+                                        sigma_spectrum,
+                                        weight,
+                                        weight_spectrum,
+                                        r, out_chan, in_row, in_chan, corr)
+
+            for f in range(out_chans):
+                for c in range(ncorrs):
+                    if counts[r, f, c] > 0:
+                        # We have some unflagged samples and
+                        # only these are used as averaged output
+                        vis_normaliser(vis_avg, vis_avg,
+                                       r, f, c,
+                                       vis_weight_sum)
+                        sigma_normaliser(sigma_spectrum_avg,
+                                         sigma_spectrum_avg,
+                                         r, f, c,
+                                         sigma_spectrum_weight_sum)
+                    elif flag_counts[r, f, c] > 0:
+                        # We only have flagged samples and
+                        # these are used as averaged output
+                        vis_normaliser(vis_avg, flagged_vis_avg,
+                                       r, f, c,
+                                       flagged_vis_weight_sum)
+                        sigma_normaliser(sigma_spectrum_avg,
+                                         flagged_sigma_spectrum_avg,
+                                         r, f, c,
+                                         flagged_sigma_spectrum_weight_sum)
+                        weight_normaliser(weight_spectrum_avg,
+                                          flagged_weight_spectrum_avg,
+                                          r, f, c)
+
+                        # Flag the output bin
+                        set_flagged(flag_avg, r, f, c)
+                    else:
+                        raise RowChannelAverageException("Zero-filled bin")
+
+        return RowChanAverageOutput(vis_avg, flag_avg,
+                                    weight_spectrum_avg,
+                                    sigma_spectrum_avg)
+
+    return impl
+
+
+def side_table_grow_factory(present):
+    """ Returns function growing a side table if the array is present """
+    if present:
+        def impl(table, capacity):
+            grown = np.zeros((capacity,) + table.shape[1:], dtype=table.dtype)
+            grown[:table.shape[0]] = table
+            return grown
+    else:
+        def impl(table, capacity):
+            return table
+
+    return njit(nogil=True, cache=True, inline='always')(impl)
+
+
+def vis_side_normaliser_factory(present):
+    """ Normalises visibilities from side table slot ``s`` """
+    if present:
+        def impl(vis_out, row, chan, corr, vis_in, weight_sum, s):
+            wsum = weight_sum[s, 0, corr]
+
+            if wsum != 0.0:
+                vis_out[row, chan, corr] = vis_in[s, 0, corr] / wsum
+    else:
+        def impl(vis_out, row, chan, corr, vis_in, weight_sum, s):
+            pass
+
+    return njit(nogil=True, cache=True, inline='always')(impl)
+
+
+def sigma_spectrum_side_normaliser_factory(present):
+    """ Normalises sigma spectrum from side table slot ``s`` """
+    if present:
+        def impl(sigma_out, row, chan, corr, sigma_in, weight_sum, s):
+            wsum = weight_sum[s, 0, corr]
+
+            if wsum == 0.0:
+                return
+
+            # sqrt(sigma**2 * weight**2 / (weight(sum**2)))
+            res = np.sqrt(sigma_in[s, 0, corr] / (wsum**2))
+            sigma_out[row, chan, corr] = res
+    else:
+        def impl(sigma_out, row, chan, corr, sigma_in, weight_sum, s):
+            pass
+
+    return njit(nogil=True, cache=True, inline='always')(impl)
+
+
+def weight_spectrum_side_normaliser_factory(present):
+    """ Assigns weight spectrum from side table slot ``s`` """
+    if present:
+        def impl(wt_spec_out, row, chan, corr, wt_spec_in, s):
+            wt_spec_out[row, chan, corr] = wt_spec_in[s, 0, corr]
+    else:
+        def impl(wt_spec_out, row, chan, corr, wt_spec_in, s):
+            pass
+
+    return njit(nogil=True, cache=True, inline='always')(impl)
+
+
+#: :func:`low_memory_row_chan_average` grows its side table
+#: to hold all :code:`(row, chan)` bins, as in :func:`row_chan_average`,
+#: once it holds more than this fraction of them
+LOW_MEMORY_DENSE_FRACTION = 0.25
+
+#: Initial number of :code:`(row, chan)` bins in the side table
+LOW_MEMORY_INITIAL_SLOTS = 1024
+
+
+@njit(nogil=True, cache=True)
+def side_table_capacity(capacity, nbins):
+    """ Returns the next capacity of a side table of ``nbins`` bins """
+    if capacity >= LOW_MEMORY_DENSE_FRACTION * nbins:
+        return nbins
+
+    return min(nbins, max(2*capacity, 1))
+
+
+@generated_jit(nopython=True, nogil=True, cache=True)
+def low_memory_row_chan_average(row_meta, chan_meta, flag_row=None,
+                                weight=None, vis=None, flag=None,
+                                weight_spectrum=None, sigma_spectrum=None):
+    """
+    :func:`row_chan_average`, without dense flagged accumulators.
+
+    Flagged samples only determine the average of bins which
+    contain no unflagged samples. These are accumulated
+    into a compact side table, with a slot for each
+    :code:`(row, chan)` bin that has received flagged samples
+    but no unflagged samples at that point. Slots are allocated
+    lazily and the table grows geometrically, up to all bins
+    past :data:`LOW_MEMORY_DENSE_FRACTION`.
+    Flagged samples are not accumulated once a bin
+    contains unflagged samples, so the output is identical
+    to :func:`row_chan_average`.
+    """
+
+    have_flag_row = not is_numba_type_none(flag_row)
+    have_vis = not is_numba_type_none(vis)
+    have_flag = not is_numba_type_none(flag)
+    have_weight = not is_numba_type_none(weight)
+    have_weight_spectrum = not is_numba_type_none(weight_spectrum)
+    have_sigma_spectrum = not is_numba_type_none(sigma_spectrum)
+
+    flags_match = matching_flag_factory(have_flag_row)
+    is_chan_flagged = is_chan_flagged_factory(have_flag)
+
+    vis_factory = chan_output_factory(have_vis)
+    weight_sum_factory = weight_sum_output_factory(have_vis)
+    flag_factory = chan_output_factory(have_flag)
+    weight_factory = chan_output_factory(have_weight_spectrum)
+    sigma_factory = chan_output_factory(have_sigma_spectrum)
+
+    vis_grow = side_table_grow_factory(have_vis)
+    weight_grow = side_table_grow_factory(have_weight_spectrum)
+    sigma_grow = side_table_grow_factory(have_sigma_spectrum)
+
+    vis_adder = vis_add_factory(have_vis,
+                                have_weight,
+                                have_weight_spectrum)
+    weight_adder = chan_add_factory(have_weight_spectrum)
+    sigma_adder = sigma_spectrum_add_factory(have_sigma_spectrum,
+                                             have_weight,
+                                             have_weight_spectrum)
+
+    vis_normaliser = vis_normaliser_factory(have_vis)
+    sigma_normaliser = sigma_spectrum_normaliser_factory(have_sigma_spectrum)
+
+    vis_side_normaliser = vis_side_normaliser_factory(have_vis)
+    sigma_side_normaliser = sigma_spectrum_side_normaliser_factory(
+                                have_sigma_spectrum)
+    weight_side_normaliser = weight_spectrum_side_normaliser_factory(
+                                have_weight_spectrum)
+
+    set_flagged = set_flagged_factory(have_flag)
+
+    dummy_chan_freq = None
+    dummy_chan_width = None
+
+    def impl(row_meta, chan_meta, flag_row=None, weight=None,
+             vis=None, flag=None,
+             weight_spectrum=None, sigma_spectrum=None):
+
+        out_rows = row_meta.time.shape[0]
+        nchan, ncorrs = chan_corrs(vis, flag,
+                                   weight_spectrum, sigma_spectrum,
+                                   dummy_chan_freq, dummy_chan_width,
+                                   dummy_chan_width, dummy_chan_width)
+
+        chan_map, out_chans = chan_meta
+
+        out_shape = (out_rows, out_chans, ncorrs)
+
+        vis_avg = vis_factory(out_shape, vis)
+        vis_weight_sum = weight_sum_factory(out_shape, vis)
+        weight_spectrum_avg = weight_factory(out_shape, weight_spectrum)
+        sigma_spectrum_avg = sigma_factory(out_shape, sigma_spectrum)
+        sigma_spectrum_weight_sum = sigma_factory(out_shape, sigma_spectrum)
+
+        flag_avg = flag_factory(out_shape, flag)
+
+        counts = np.zeros(out_shape, dtype=np.uint32)
+
+        # Side table slot of each (row, chan) bin, -1 if unallocated
+        nbins = out_rows * out_chans
+        slots = np.full((out_rows, out_chans), -1, dtype=np.intp)
+        nslots = 0
+        capacity = min(nbins, LOW_MEMORY_INITIAL_SLOTS)
+        side_shape = (capacity, 1, ncorrs)
+
+        flagged_vis_avg = vis_factory(side_shape, vis)
+        flagged_vis_weight_sum = weight_sum_factory(side_shape, vis)
+        flagged_weight_spectrum_avg = weight_factory(side_shape,
+                                                     weight_spectrum)
+        flagged_sigma_spectrum_avg = sigma_factory(side_shape,
+                                                   sigma_spectrum)
+        flagged_sigma_spectrum_weight_sum = sigma_factory(side_shape,
+                                                          sigma_spectrum)
+        flag_counts = np.zeros(side_shape, dtype=np.uint32)
+
+        # Iterate over input rows, accumulating into output rows
+        for in_row, out_row in enumerate(row_meta.map):
+            # TIME_CENTROID/EXPOSURE case applies here,
+            # must have flagged input and output OR unflagged input and output
+            if not flags_match(flag_row, in_row, row_meta.flag_row, out_row):
+                continue
+
+            for in_chan, out_chan in enumerate(chan_map):
+                for corr in range(ncorrs):
+                    if is_chan_flagged(flag, in_row, in_chan, corr):
+                        # Flagged samples are unused if
+                        # the bin has unflagged samples
+                        if counts[out_row, out_chan, corr] > 0:
+                            continue
+
+                        s = slots[out_row, out_chan]
+
+                        # Allocate a slot, growing the side table if full
+                        if s == -1:
+                            if nslots == capacity:
+                                capacity = side_table_capacity(capacity,
+                                                               nbins)
+                                flagged_vis_avg = vis_grow(
+                                    flagged_vis_avg, capacity)
+                                flagged_vis_weight_sum = vis_grow(
+                                    flagged_vis_weight_sum, capacity)
+                                flagged_weight_spectrum_avg = weight_grow(
+                                    flagged_weight_spectrum_avg, capacity)
+                                flagged_sigma_spectrum_avg = sigma_grow(
+                                    flagged_sigma_spectrum_avg, capacity)
+                                flagged_sigma_spectrum_weight_sum = (
+                                    sigma_grow(
+                                        flagged_sigma_spectrum_weight_sum,
+                                        capacity))
+                                grown = np.zeros((capacity, 1, ncorrs),
+                                                 dtype=np.uint32)
+                                grown[:nslots] = flag_counts
+                                flag_counts = grown
+
+                            s = nslots
+                            slots[out_row, out_chan] = s
+                            nslots += 1
+
+                        # Increment flagged averages and counts
+                        flag_counts[s, 0, corr] += 1
+
+                        vis_adder(flagged_vis_avg, flagged_vis_weight_sum, vis,
+                                  weight, weight_spectrum,
+                                  s, 0, in_row, in_chan, corr)
+                        weight_adder(flagged_weight_spectrum_avg,
+                                     weight_spectrum,
+                                     s, 0, in_row, in_chan, corr)
+                        sigma_adder(flagged_sigma_spectrum_avg,
+                                    flagged_sigma_spectrum_weight_sum,
+                                    sigma_spectrum,
+                                    weight,
+                                    weight_spectrum,
+                                    s, 0, in_row, in_chan, corr)
+                    else:
+                        # Increment unflagged averages and counts
+                        counts[out_row, out_chan, corr] += 1
+
+                        vis_adder(vis_avg, vis_weight_sum, vis,
+                                  weight, weight_spectrum,
+                                  out_row, out_chan, in_row, in_chan, corr)
+                        weight_adder(weight_spectrum_avg, weight_spectrum,
+                                     out_row, out_chan, in_row, in_chan, corr)
+                        sigma_adder(sigma_spectrum_avg,
+                                    sigma_spectrum_weight_sum,
+                                    sigma_spectrum,
+                                    weight,
+                                    weight_spectrum,
+                                    out_row, out_chan, in_row, in_chan, corr)
+
+        for r in range(out_rows):
+            for f in range(out_chans):
+                s = slots[r, f]
+
+                for c in range(ncorrs):
+                    if counts[r, f, c] > 0:
+                        # We have some unflagged samples and
+                        # only these are used as averaged output
+                        vis_normaliser(vis_avg, vis_avg,
+                                       r, f, c,
+                                       vis_weight_sum)
+                        sigma_normaliser(sigma_spectrum_avg,
+                                         sigma_spectrum_avg,
+                                         r, f, c,
+                                         sigma_spectrum_weight_sum)
+                    elif s != -1 and flag_counts[s, 0, c] > 0:
+                        # We only have flagged samples and
+                        # these are used as averaged output
+                        vis_side_normaliser(vis_avg, r, f, c,
+                                            flagged_vis_avg,
+                                            flagged_vis_weight_sum, s)
+                        sigma_side_normaliser(
+                            sigma_spectrum_avg, r, f, c,
+                            flagged_sigma_spectrum_avg,
+                            flagged_sigma_spectrum_weight_sum, s)
+                        weight_side_normaliser(weight_spectrum_avg,
+                                               r, f, c,
+                                               flagged_weight_spectrum_avg,
+                                               s)
+
+                        # Flag the output bin
+                        set_flagged(flag_avg, r, f, c)
+                    else:
+                        raise RowChannelAverageException("Zero-filled bin")
+
+        return RowChanAverageOutput(vis_avg, flag_avg,
+                                    weight_spectrum_avg,
+                                    sigma_spectrum_avg)
+
+    return impl
+
+
 _chan_output_fields = ["chan_freq", "chan_width", "effective_bw", "resolution"]
 ChannelAverageOutput = namedtuple("ChannelAverageOutput", _chan_output_fields)
 
@@ -761,16 +1358,73 @@ def merge_flags(flag_row, flag):
     return impl
 
 
-@generated_jit(nopython=True, nogil=True, cache=True)
-def time_and_channel(time, interval, antenna1, antenna2,
-                     time_centroid=None, exposure=None, flag_row=None,
-                     uvw=None, weight=None, sigma=None,
-                     chan_freq=None, chan_width=None,
-                     effective_bw=None, resolution=None,
-                     vis=None, flag=None,
-                     weight_spectrum=None, sigma_spectrum=None,
-                     time_bin_secs=1.0, chan_bin_size=1):
+def row_map_inverse_factory(parallel):
+    """ Returns function producing the inverse row map if parallel """
+    if parallel:
+        def impl(row_meta):
+            return row_map_inverse(row_meta)
+    else:
+        def impl(row_meta):
+            return None
+
+    return njit(nogil=True, cache=True, inline='always')(impl)
+
+
+def row_average_factory(parallel):
+    """ Returns the serial or parallel row averaging function """
+    if parallel:
+        def impl(row_meta, inverse, ant1, ant2, flag_row,
+                 time_centroid, exposure, uvw, weight, sigma):
+            return parallel_row_average(row_meta, inverse, ant1, ant2,
+                                        flag_row, time_centroid, exposure,
+                                        uvw, weight, sigma)
+    else:
+        def impl(row_meta, inverse, ant1, ant2, flag_row,
+                 time_centroid, exposure, uvw, weight, sigma):
+            return row_average(row_meta, ant1, ant2,
+                               flag_row, time_centroid, exposure,
+                               uvw, weight, sigma)
+
+    return njit(nogil=True, cache=True, inline='always')(impl)
+
+
+def row_chan_average_factory(parallel, low_memory=False):
+    """
+    Returns the serial, parallel or low memory
+    row and channel averaging function
+    """
+    if parallel:
+        def impl(row_meta, inverse, chan_meta, flag_row, weight,
+                 vis, flag, weight_spectrum, sigma_spectrum):
+            return parallel_row_chan_average(row_meta, inverse, chan_meta,
+                                             flag_row, weight, vis, flag,
+                                             weight_spectrum, sigma_spectrum)
+    elif low_memory:
+        def impl(row_meta, inverse, chan_meta, flag_row, weight,
+                 vis, flag, weight_spectrum, sigma_spectrum):
+            return low_memory_row_chan_average(row_meta, chan_meta,
+                                               flag_row, weight, vis, flag,
+                                               weight_spectrum,
+                                               sigma_spectrum)
+    else:
+        def impl(row_meta, inverse, chan_meta, flag_row, weight,
+                 vis, flag, weight_spectrum, sigma_spectrum):
+            return row_chan_average(row_meta, chan_meta,
+                                    flag_row, weight, vis, flag,
+                                    weight_spectrum, sigma_spectrum)
+
+    return njit(nogil=True, cache=True, inline='always')(impl)
 
+
+def time_and_channel_generator(time_bin_secs, chan_bin_size, parallel,
+                               low_memory=False):
+    """
+    Generates the serial, parallel or low memory time and channel
+    averaging implementation. The parallel implementation
+    averages each output row on a separate thread, while the
+    low memory implementation accumulates flagged samples
+    with :func:`low_memory_row_chan_average`.
+    """
     valid_types = (types.misc.Omitted, types.scalars.Float,
                    types.scalars.Integer)
 
@@ -782,6 +1436,10 @@ def time_and_channel(time, interval, antenna1, antenna2,
     if not isinstance(chan_bin_size, valid_types):
         raise TypeError("chan_bin_size must be a scalar integer")
 
+    inverse_fn = row_map_inverse_factory(parallel)
+    row_average_fn = row_average_factory(parallel)
+    row_chan_average_fn = row_chan_average_factory(parallel, low_memory)
+
     def impl(time, interval, antenna1, antenna2,
              time_centroid=None, exposure=None, flag_row=None,
              uvw=None, weight=None, sigma=None,
@@ -803,13 +1461,16 @@ def time_and_channel(time, interval, antenna1, antenna2,
         row_meta = row_mapper(time, interval, antenna1, antenna2,
                               flag_row=flag_row, time_bin_secs=time_bin_secs)
 
+        # Generate the inverse row mapping, if parallel
+        inverse = inverse_fn(row_meta)
+
         # Generate channel mapping metadata
         chan_meta = channel_mapper(nchan, chan_bin_size)
 
         # Average row data
-        row_data = row_average(row_meta, antenna1, antenna2, flag_row=flag_row,
-                               time_centroid=time_centroid, exposure=exposure,
-                               uvw=uvw, weight=weight, sigma=sigma)
+        row_data = row_average_fn(row_meta, inverse, antenna1, antenna2,
+                                  flag_row, time_centroid, exposure,
+                                  uvw, weight, sigma)
 
         # Average channel data
         chan_data = chan_average(chan_meta, chan_freq=chan_freq,
@@ -818,11 +1479,9 @@ def time_and_channel(time, interval, antenna1, antenna2,
                                  resolution=resolution)
 
         # Average row and channel data
-        row_chan_data = row_chan_average(row_meta, chan_meta,
-                                         flag_row=flag_row, weight=weight,
-                                         vis=vis, flag=flag,
-                                         weight_spectrum=weight_spectrum,
-                                         sigma_spectrum=sigma_spectrum)
+        row_chan_data = row_chan_average_fn(row_meta, inverse, chan_meta,
+                                            flag_row, weight, vis, flag,
+                                            weight_spectrum, sigma_spectrum)
 
         # Have to explicitly write it out because numba tuples
         # are highly constrained types
@@ -848,6 +1507,78 @@ def time_and_channel(time, interval, antenna1, antenna2,
     return impl
 
 
+@generated_jit(nopython=True, nogil=True, cache=True)
+def serial_time_and_channel(time, interval, antenna1, antenna2,
+                            time_centroid=None, exposure=None, flag_row=None,
+                            uvw=None, weight=None, sigma=None,
+                            chan_freq=None, chan_width=None,
+                            effective_bw=None, resolution=None,
+                            vis=None, flag=None,
+                            weight_spectrum=None, sigma_spectrum=None,
+                            time_bin_secs=1.0, chan_bin_size=1):
+    return time_and_channel_generator(time_bin_secs, chan_bin_size, False)
+
+
+# As with parallel_predict_vis, the parallel implementation is
+# compiled as a separate dispatcher with parallel=True so that
+# numba's threading layer is initialised when loaded from the cache.
+@generated_jit(nopython=True, nogil=True, cache=True, parallel=True)
+def parallel_time_and_channel(time, interval, antenna1, antenna2,
+                              time_centroid=None, exposure=None,
+                              flag_row=None, uvw=None,
+                              weight=None, sigma=None,
+                              chan_freq=None, chan_width=None,
+                              effective_bw=None, resolution=None,
+                              vis=None, flag=None,
+                              weight_spectrum=None, sigma_spectrum=None,
+                              time_bin_secs=1.0, chan_bin_size=1):
+    return time_and_channel_generator(time_bin_secs, chan_bin_size, True)
+
+
+@generated_jit(nopython=True, nogil=True, cache=True)
+def low_memory_time_and_channel(time, interval, antenna1, antenna2,
+                                time_centroid=None, exposure=None,
+                                flag_row=None, uvw=None,
+                                weight=None, sigma=None,
+                                chan_freq=None, chan_width=None,
+                                effective_bw=None, resolution=None,
+                                vis=None, flag=None,
+                                weight_spectrum=None, sigma_spectrum=None,
+                                time_bin_secs=1.0, chan_bin_size=1):
+    return time_and_channel_generator(time_bin_secs, chan_bin_size,
+                                      False, low_memory=True)
+
+
+def time_and_channel(time, interval, antenna1, antenna2,
+                     time_centroid=None, exposure=None, flag_row=None,
+                     uvw=None, weight=None, sigma=None,
+                     chan_freq=None, chan_width=None,
+                     effective_bw=None, resolution=None,
+                     vis=None, flag=None,
+                     weight_spectrum=None, sigma_spectrum=None,
+                     time_bin_secs=1.0, chan_bin_size=1,
+                     parallel=False, low_memory=False):
+
+    if parallel and low_memory:
+        raise ValueError("low_memory averaging is not "
+                         "supported in parallel")
+    elif parallel:
+        fn = parallel_time_and_channel
+    elif low_memory:
+        fn = low_memory_time_and_channel
+    else:
+        fn = serial_time_and_channel
+
+    return fn(time, interval, antenna1, antenna2,
+              time_centroid, exposure, flag_row,
+              uvw, weight, sigma,
+              chan_freq, chan_width,
+              effective_bw, resolution,
+              vis, flag,
+              weight_spectrum, sigma_spectrum,
+              time_bin_secs, chan_bin_size)
+
+
 AVERAGING_DOCS = DocstringTemplate("""
 Averages in time and channel.
 
@@ -895,6 +1626,17 @@ time_bin_secs : float, optional
 chan_bin_size : int, optional
     Number of bins to average together.
     Defaults to 1.
+parallel : {False, True}
+    Average output rows in parallel, on separate threads.
+    Each output row gathers its input rows, via an inverse
+    row map, so that output is identical to the serial version.
+low_memory : {False, True}
+    Only accumulate flagged samples for output bins
+    without unflagged samples, in a side table that
+    is allocated lazily, instead of in dense arrays of the
+    output shape. Output is identical to the default version,
+    but peak memory is reduced when few output bins are
+    fully flagged. Not supported with :code:`parallel`.
 
 Notes
 -----
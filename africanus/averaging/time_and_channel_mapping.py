@@ -5,6 +5,7 @@ from collections import namedtuple
 
 import numpy as np
 import numba
+from numba import types
 
 from africanus.averaging.support import unique_time, unique_baselines
 from africanus.util.numba import is_numba_type_none, generated_jit, njit, jit
@@ -52,9 +53,24 @@ def set_flag_row_factory(have_flag_row):
     return njit(nogil=True, cache=True)(impl)
 
 
+def time_bin_secs_factory(per_baseline):
+    if per_baseline:
+        def impl(time_bin_secs, bl):
+            return time_bin_secs[bl]
+    else:
+        def impl(time_bin_secs, bl):
+            return time_bin_secs
+
+    return njit(nogil=True, cache=True, inline='always')(impl)
+
+
 RowMapOutput = namedtuple("RowMapOutput",
                           ["map", "time", "interval", "flag_row"])
 
+#: :func:`row_mapper` uses :func:`sparse_row_map` if fewer than
+#: this fraction of (baseline, time) combinations are present
+SPARSE_FILL_FRACTION = 0.5
+
 
 @generated_jit(nopython=True, nogil=True, cache=True)
 def row_mapper(time, interval, antenna1, antenna2,
@@ -113,6 +129,16 @@ def row_mapper(time, interval, antenna1, antenna2,
     4. Input rows are then mapped via the `row_lookup`, `bin_lookup`
     and argsorted `time_lookup` arrays to an output row.
 
+    The above lookup arrays scale with the product of the number
+    of unique baselines and times, which is wasteful if
+    many baselines are missing or flagged in long tracks,
+    or when chunks span subarray changes.
+    If fewer than :data:`SPARSE_FILL_FRACTION` of the
+    `(ubl, utime)` combinations are present, rows are instead
+    sorted by `(bl, time)` and binned in a single pass,
+    using memory proportional to the number of rows.
+    Both approaches produce identical output.
+
     .. code-block:: python
 
         ret = row_mapper(time, interval,
@@ -178,12 +204,6 @@ def row_mapper(time, interval, antenna1, antenna2,
         Raised if an illegal condition occurs
 
     """
-    have_flag_row = not is_numba_type_none(flag_row)
-    is_flagged_fn = is_flagged_factory(have_flag_row)
-
-    output_flag_row = output_factory(have_flag_row)
-    set_flag_row = set_flag_row_factory(have_flag_row)
-
     def impl(time, interval, antenna1, antenna2,
              flag_row=None, time_bin_secs=1):
         ubl, _, bl_inv, _ = unique_baselines(antenna1, antenna2)
@@ -192,6 +212,35 @@ def row_mapper(time, interval, antenna1, antenna2,
         nbl = ubl.shape[0]
         ntime = utime.shape[0]
 
+        # Avoid dense (baseline, time) scratch space
+        # if few (baseline, time) combinations are present
+        if time.shape[0] < SPARSE_FILL_FRACTION * float(nbl) * ntime:
+            return sparse_row_map(time, interval, bl_inv, nbl,
+                                  time_inv, ntime, flag_row,
+                                  time_bin_secs)
+
+        return dense_row_map(time, interval, bl_inv, nbl,
+                             time_inv, ntime, flag_row,
+                             time_bin_secs)
+
+    return impl
+
+
+@generated_jit(nopython=True, nogil=True, cache=True)
+def dense_row_map(time, interval, bl_inv, nbl, time_inv, ntime,
+                  flag_row, time_bin_secs):
+    """
+    :func:`row_mapper` implementation using dense
+    :code:`(baseline, time)` lookup arrays.
+    """
+    have_flag_row = not is_numba_type_none(flag_row)
+    is_flagged_fn = is_flagged_factory(have_flag_row)
+
+    output_flag_row = output_factory(have_flag_row)
+    set_flag_row = set_flag_row_factory(have_flag_row)
+
+    def impl(time, interval, bl_inv, nbl, time_inv, ntime,
+             flag_row, time_bin_secs):
         sentinel = np.finfo(time.dtype).max
         out_rows = numba.uint32(0)
 
@@ -223,13 +272,13 @@ def row_mapper(time, interval, antenna1, antenna2,
 
         # Average times over each baseline and construct the
         # bin_lookup and time_lookup arrays
-        for bl in range(ubl.shape[0]):
+        for bl in range(nbl):
             tbin = numba.int32(0)
             bin_count = numba.int32(0)
             bin_flag_count = numba.int32(0)
             bin_low = time.dtype.type(0)
 
-            for t in range(utime.shape[0]):
+            for t in range(ntime):
                 # Lookup input row
                 r = row_lookup[bl, t]
 
@@ -335,6 +384,133 @@ def row_mapper(time, interval, antenna1, antenna2,
     return impl
 
 
+@generated_jit(nopython=True, nogil=True, cache=True)
+def sparse_row_map(time, interval, bl_inv, nbl, time_inv, ntime,
+                   flag_row, time_bin_secs):
+    """
+    :func:`row_mapper` implementation whose memory is
+    proportional to the number of rows. Rows are sorted by
+    :code:`(baseline, time)` and binned in a single pass,
+    producing the same bins, in the same order, as
+    :func:`dense_row_map`.
+
+    `time_bin_secs` may also be an array of shape :code:`(nbl,)`,
+    holding a bin size for each baseline in `bl_inv`.
+    """
+    have_flag_row = not is_numba_type_none(flag_row)
+    is_flagged_fn = is_flagged_factory(have_flag_row)
+    bin_secs_fn = time_bin_secs_factory(isinstance(time_bin_secs,
+                                                   types.Array))
+
+    output_flag_row = output_factory(have_flag_row)
+    set_flag_row = set_flag_row_factory(have_flag_row)
+
+    def impl(time, interval, bl_inv, nbl, time_inv, ntime,
+             flag_row, time_bin_secs):
+        nrow = time.shape[0]
+
+        # Sort rows by baseline and then time
+        keys = np.empty(nrow, dtype=np.int64)
+
+        for r in range(nrow):
+            keys[r] = np.int64(bl_inv[r])*ntime + time_inv[r]
+
+        order = np.argsort(keys, kind='mergesort')
+
+        # Bins are enumerated in (baseline, time) order,
+        # as in the flattened dense time lookup
+        row_bin = np.empty(nrow, dtype=np.intp)
+        bin_time = np.zeros(nrow, dtype=time.dtype)
+        bin_interval = np.zeros(nrow, dtype=interval.dtype)
+        bin_flagged = np.zeros(nrow, dtype=np.bool_)
+
+        nbins = 0
+        bin_count = numba.int32(0)
+        bin_flag_count = numba.int32(0)
+        bin_low = time.dtype.type(0)
+        prev_bl = -1
+        prev_key = -1
+
+        for i in range(nrow):
+            r = order[i]
+            bl = bl_inv[r]
+
+            if keys[r] == prev_key:
+                raise ValueError("Duplicate (TIME, ANTENNA1, ANTENNA2) "
+                                 "combinations were discovered in the input "
+                                 "data. This is usually caused by not "
+                                 "partitioning your data sufficiently "
+                                 "by indexing columns, DATA_DESC_ID "
+                                 "and SCAN_NUMBER in particular.")
+
+            prev_key = keys[r]
+
+            # Starting a new baseline, close the last bin
+            if bl != prev_bl:
+                if bin_count > 0:
+                    bin_time[nbins] /= bin_count
+                    bin_flagged[nbins] = bin_count == bin_flag_count
+                    nbins += 1
+
+                bin_count = 0
+                bin_flag_count = 0
+                prev_bl = bl
+
+            half_int = interval[r] * 0.5
+
+            # Binning logic matches dense_row_map
+            if bin_count == 0:
+                bin_low = time[r] - half_int
+            elif (time[r] + half_int - bin_low >
+                    bin_secs_fn(time_bin_secs, bl)):
+                bin_time[nbins] /= bin_count
+                bin_flagged[nbins] = bin_count == bin_flag_count
+                nbins += 1
+                bin_count = 0
+                bin_flag_count = 0
+
+            row_bin[r] = nbins
+            bin_time[nbins] += time[r]
+            bin_interval[nbins] += interval[r]
+            bin_count += 1
+
+            if is_flagged_fn(flag_row, r):
+                bin_flag_count += 1
+
+        # Close the last bin
+        if bin_count > 0:
+            bin_time[nbins] /= bin_count
+            bin_flagged[nbins] = bin_count == bin_flag_count
+            nbins += 1
+
+        # Stable sort of bins on time, as in dense_row_map
+        argsort = np.argsort(bin_time[:nbins], kind='mergesort')
+        inv_argsort = np.empty(nbins, dtype=np.intp)
+
+        for i, a in enumerate(argsort):
+            inv_argsort[a] = i
+
+        row_map = np.empty(nrow, dtype=np.uint32)
+        out_flag_row = output_flag_row(nbins, flag_row)
+
+        for in_row in range(nrow):
+            b = row_bin[in_row]
+            out_row = inv_argsort[b]
+
+            set_flag_row(flag_row, in_row,
+                         out_flag_row, out_row,
+                         bin_flagged[b])
+
+            row_map[in_row] = out_row
+
+        return RowMapOutput(row_map,
+                            bin_time[argsort],
+                            bin_interval[argsort],
+                            out_flag_row)
+
+    return impl
+
+
 @jit(nopython=True, nogil=True, cache=True)
 def channel_mapper(nchan, chan_bin_size=1):
     chan_map = np.empty(nchan, dtype=np.uint32)
@@ -354,3 +530,52 @@ def channel_mapper(nchan, chan_bin_size=1):
         chan_bin += 1
 
     return chan_map, chan_bin
+
+
+RowMapInverse = namedtuple("RowMapInverse", ["offsets", "rows"])
+
+
+@njit(nogil=True, cache=True)
+def row_map_inverse(row_meta):
+    """
+    Inverts the :code:`row_meta.map` produced by :func:`row_mapper`
+    into a CSR-style mapping from each output row to its input rows.
+
+    The input rows of output row :code:`r` are
+    :code:`rows[offsets[r]:offsets[r + 1]]`, in ascending order.
+    This allows output rows to be averaged independently
+    of each other, by gathering their input rows.
+
+    Parameters
+    ----------
+    row_meta : namedtuple
+        Output of :func:`row_mapper`
+
+    Returns
+    -------
+    offsets : :class:`numpy.ndarray`
+        Offsets into `rows` of shape :code:`(out_row + 1,)`
+    rows : :class:`numpy.ndarray`
+        Input rows, grouped by output row, of shape :code:`(row,)`
+    """
+    out_rows = row_meta.time.shape[0]
+    row_map = row_meta.map
+
+    offsets = np.zeros(out_rows + 1, dtype=np.intp)
+
+    for in_row in range(row_map.shape[0]):
+        offsets[row_map[in_row] + 1] += 1
+
+    for out_row in range(out_rows):
+        offsets[out_row + 1] += offsets[out_row]
+
+    # Counting sort, which is stable
+    rows = np.empty(row_map.shape[0], dtype=np.intp)
+    pos = offsets[:-1].copy()
+
+    for in_row in range(row_map.shape[0]):
+        out_row = row_map[in_row]
+        rows[pos[out_row]] = in_row
+        pos[out_row] += 1
+
+    return RowMapInverse(offsets, rows)
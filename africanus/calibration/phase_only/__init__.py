@@ -1,6 +1,10 @@
-# flake8: noqa
+# -*- coding: utf-8 -*-
 
-from africanus.calibration.phase_only.phase_only import gauss_newton
-from africanus.calibration.phase_only.phase_only import compute_jhj
-from africanus.calibration.phase_only.phase_only import compute_jhr
-from africanus.calibration.phase_only.phase_only import compute_jhj_and_jhr
+from africanus.util.lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "gauss_newton": "africanus.calibration.phase_only.phase_only",
+    "compute_jhj": "africanus.calibration.phase_only.phase_only",
+    "compute_jhr": "africanus.calibration.phase_only.phase_only",
+    "compute_jhj_and_jhr": "africanus.calibration.phase_only.phase_only",
+})
@@ -1,7 +1,13 @@
-# flake8: noqa
+# -*- coding: utf-8 -*-
 
-from .utils import check_type, chunkify_rows
-from africanus.calibration.utils.corrupt_vis import corrupt_vis
-from africanus.calibration.utils.correct_vis import correct_vis
-from africanus.calibration.utils.residual_vis import residual_vis
-from .compute_and_corrupt_vis import compute_and_corrupt_vis
+from africanus.util.lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "check_type": "africanus.calibration.utils.utils",
+    "chunkify_rows": "africanus.calibration.utils.utils",
+    "corrupt_vis": "africanus.calibration.utils.corrupt_vis",
+    "correct_vis": "africanus.calibration.utils.correct_vis",
+    "residual_vis": "africanus.calibration.utils.residual_vis",
+    "compute_and_corrupt_vis":
+        "africanus.calibration.utils.compute_and_corrupt_vis",
+})
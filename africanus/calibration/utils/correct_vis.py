@@ -2,9 +2,11 @@
 
 import numpy as np
 from africanus.util.docs import DocstringTemplate
-from africanus.util.numba import generated_jit, njit
+from africanus.util.numba import generated_jit, njit, is_numba_type_none
 from africanus.calibration.utils import check_type
-from africanus.calibration.utils.utils import DIAG_DIAG, DIAG, FULL
+from africanus.calibration.utils.utils import (DIAG_DIAG, DIAG, FULL,
+                                               JONES_INDEX_MAP_ARGS,
+                                               jones_index_factory)
 
 
 def jones_inverse_mul_factory(mode):
@@ -68,34 +70,41 @@ def jones_inverse_mul_factory(mode):
 
 @generated_jit(nopython=True, nogil=True, cache=True)
 def correct_vis(time_bin_indices, time_bin_counts,
-                antenna1, antenna2, jones, vis, flag):
+                antenna1, antenna2, jones, vis, flag,
+                time_map=None, chan_map=None):
 
     mode = check_type(jones, vis)
     jones_inverse_mul = jones_inverse_mul_factory(mode)
+    time_map_fn, chan_map_fn = jones_index_factory(
+                                    not is_numba_type_none(time_map),
+                                    not is_numba_type_none(chan_map))
 
     def _correct_vis_fn(time_bin_indices, time_bin_counts,
-                        antenna1, antenna2, jones, vis, flag):
+                        antenna1, antenna2, jones, vis, flag,
+                        time_map=None, chan_map=None):
         # for dask arrays we need to adjust the chunks to
         # start counting from zero
         time_bin_indices -= time_bin_indices.min()
         jones_shape = np.shape(jones)
-        n_tim = jones_shape[0]
+        n_tim = np.shape(time_bin_indices)[0]
         n_dir = jones_shape[3]
         if n_dir > 1:
             raise ValueError("Jones has n_dir > 1. Cannot correct "
                              "for direction dependent gains")
-        n_chan = jones_shape[2]
+        n_chan = np.shape(vis)[1]
         corrected_vis = np.zeros_like(vis, dtype=vis.dtype)
         for t in range(n_tim):
             for row in range(time_bin_indices[t],
                              time_bin_indices[t] + time_bin_counts[t]):
                 p = int(antenna1[row])
                 q = int(antenna2[row])
-                gp = jones[t, p]
-                gq = jones[t, q]
+                ti = time_map_fn(time_map, t)
+                gp = jones[ti, p]
+                gq = jones[ti, q]
                 for nu in range(n_chan):
+                    ci = chan_map_fn(chan_map, nu)
                     if not np.any(flag[row, nu]):
-                        jones_inverse_mul(gp[nu, 0], vis[row, nu], gq[nu, 0],
+                        jones_inverse_mul(gp[ci, 0], vis[row, nu], gq[ci, 0],
                                           corrected_vis[row, nu])
         return corrected_vis
 
@@ -148,6 +157,7 @@ vis : $(array_type)
 flag : $(array_type)
     Flag data of shape :code:`(row, chan, corr)`
     or :code:`(row, chan, corr, corr)`.
+$(extra_args)
 Returns
 -------
 corrected_vis : $(array_type)
@@ -156,6 +166,7 @@ corrected_vis : $(array_type)
 
 try:
     correct_vis.__doc__ = CORRECT_VIS_DOCS.substitute(
-                        array_type=":class:`numpy.ndarray`")
+                        array_type=":class:`numpy.ndarray`",
+                        extra_args=JONES_INDEX_MAP_ARGS)
 except AttributeError:
     pass
@@ -2,9 +2,11 @@
 
 import numpy as np
 from africanus.util.docs import DocstringTemplate
-from africanus.util.numba import generated_jit, njit
+from africanus.util.numba import generated_jit, njit, is_numba_type_none
 from africanus.calibration.utils import check_type
-from africanus.calibration.utils.utils import DIAG_DIAG, DIAG, FULL
+from africanus.calibration.utils.utils import (DIAG_DIAG, DIAG, FULL,
+                                               JONES_INDEX_MAP_ARGS,
+                                               jones_index_factory)
 
 
 def jones_mul_factory(mode):
@@ -58,13 +60,17 @@ def jones_mul_factory(mode):
 
 @generated_jit(nopython=True, nogil=True, cache=True)
 def corrupt_vis(time_bin_indices, time_bin_counts, antenna1,
-                antenna2, jones, model):
+                antenna2, jones, model, time_map=None, chan_map=None):
 
     mode = check_type(jones, model, vis_type='model')
     jones_mul = jones_mul_factory(mode)
+    time_map_fn, chan_map_fn = jones_index_factory(
+                                    not is_numba_type_none(time_map),
+                                    not is_numba_type_none(chan_map))
 
     def _corrupt_vis_fn(time_bin_indices, time_bin_counts, antenna1,
-                        antenna2, jones, model):
+                        antenna2, jones, model, time_map=None,
+                        chan_map=None):
         # for dask arrays we need to adjust the chunks to
         # start counting from zero
         time_bin_indices -= time_bin_indices.min()
@@ -78,10 +84,12 @@ def corrupt_vis(time_bin_indices, time_bin_counts, antenna1,
                              time_bin_indices[t] + time_bin_counts[t]):
                 p = int(antenna1[row])
                 q = int(antenna2[row])
-                gp = jones[t, p]
-                gq = jones[t, q]
+                ti = time_map_fn(time_map, t)
+                gp = jones[ti, p]
+                gq = jones[ti, q]
                 for nu in range(n_chan):
-                    jones_mul(gp[nu], model[row, nu], gq[nu], vis[row, nu])
+                    ci = chan_map_fn(chan_map, nu)
+                    jones_mul(gp[ci], model[row, nu], gq[ci], vis[row, nu])
         return vis
 
     return _corrupt_vis_fn
@@ -109,6 +117,7 @@ jones : $(array_type)
 model : $(array_type)
     Model data values of shape :code:`(row, chan, dir, corr)`
     or :code:`(row, chan, dir, corr, corr)`.
+$(extra_args)
 
 Returns
 -------
@@ -121,6 +130,7 @@ vis : $(array_type)
 
 try:
     corrupt_vis.__doc__ = CORRUPT_VIS_DOCS.substitute(
-                                    array_type=":class:`numpy.ndarray`")
+                                    array_type=":class:`numpy.ndarray`",
+                                    extra_args=JONES_INDEX_MAP_ARGS)
 except AttributeError:
     pass
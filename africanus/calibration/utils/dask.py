@@ -232,10 +232,12 @@ compute_and_corrupt_vis.__doc__ = COMPUTE_AND_CORRUPT_VIS_DOCS.substitute(
                                         array_type=":class:`dask.array.Array`")
 
 corrupt_vis.__doc__ = CORRUPT_VIS_DOCS.substitute(
-                        array_type=":class:`dask.array.Array`")
+                        array_type=":class:`dask.array.Array`",
+                        extra_args="")
 
 correct_vis.__doc__ = CORRECT_VIS_DOCS.substitute(
-                        array_type=":class:`dask.array.Array`")
+                        array_type=":class:`dask.array.Array`",
+                        extra_args="")
 
 residual_vis.__doc__ = RESIDUAL_VIS_DOCS.substitute(
                         array_type=":class:`dask.array.Array`")
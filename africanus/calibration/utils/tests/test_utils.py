@@ -149,6 +149,42 @@ def test_correct_vis(data_factory, corr_shape, jones_shape):
     assert_array_almost_equal(corrected_vis, model, decimal=10)
 
 
+@corr_shape_parametrization
+def test_index_map_vis(data_factory, corr_shape, jones_shape):
+    """
+    Tests corrupt_vis and correct_vis with jones terms at
+    solution interval resolution against broadcast jones terms
+    """
+    from africanus.calibration.utils import corrupt_vis, correct_vis
+    n_time = 12
+    n_chan = 16
+    data_dict = data_factory(0.0, 0.05, n_time, n_chan, 5, 1,
+                             corr_shape, jones_shape)
+    time = data_dict['TIME']
+    _, time_bin_indices, _, time_bin_counts = unique_time(time)
+    ant1 = data_dict['ANTENNA1']
+    ant2 = data_dict['ANTENNA2']
+    model = data_dict['MODEL_DATA']
+    flag = data_dict['FLAG']
+    # 4 times x 3 channels per solution interval
+    jones = data_dict['JONES'][::4, :, ::3]
+    time_map = np.arange(n_time) // 4
+    chan_map = np.arange(n_chan) // 3
+    full_jones = jones[time_map][:, :, chan_map]
+
+    vis = corrupt_vis(time_bin_indices, time_bin_counts, ant1, ant2,
+                      jones, model, time_map, chan_map)
+    expected = corrupt_vis(time_bin_indices, time_bin_counts, ant1, ant2,
+                           full_jones, model)
+    assert_array_almost_equal(vis, expected, decimal=10)
+
+    corrected = correct_vis(time_bin_indices, time_bin_counts, ant1, ant2,
+                            jones, vis, flag, time_map, chan_map)
+    expected = correct_vis(time_bin_indices, time_bin_counts, ant1, ant2,
+                           full_jones, vis, flag)
+    assert_array_almost_equal(corrected, expected, decimal=10)
+
+
 @corr_shape_parametrization
 def test_corrupt_vis_dask(data_factory, corr_shape, jones_shape):
     da = pytest.importorskip("dask.array")
@@ -2,6 +2,7 @@
 
 import numpy as np
 from africanus.util.docs import DocstringTemplate
+from africanus.util.numba import index_map_factory
 
 DIAG_DIAG = 0
 DIAG = 1
@@ -39,6 +40,17 @@ def check_type(jones, vis, vis_type='vis'):
     return mode
 
 
+def jones_index_factory(have_time_map, have_chan_map):
+    """
+    Factory function generating functions that map time and
+    channel indices onto the solution intervals of the Jones terms
+    """
+    time_map_fn = index_map_factory(have_time_map)
+    chan_map_fn = index_map_factory(have_chan_map)
+
+    return time_map_fn, chan_map_fn
+
+
 def chunkify_rows(time, utimes_per_chunk):
     utimes, time_bin_counts = np.unique(time, return_counts=True)
     n_time = len(utimes)
@@ -112,3 +124,13 @@ try:
                                     array_type=":class:`numpy.ndarray`")
 except AttributeError:
     pass
+
+JONES_INDEX_MAP_ARGS = """time_map : :class:`numpy.ndarray`, optional
+    Integer index mapping each time bin to the
+    solution interval of ``jones`` of shape :code:`(utime,)`.
+    If omitted, ``jones`` has a time per time bin.
+chan_map : :class:`numpy.ndarray`, optional
+    Integer index mapping each channel to the channel
+    solution interval of ``jones`` of shape :code:`(chan,)`.
+    If omitted, ``jones`` has the channels of the data.
+"""
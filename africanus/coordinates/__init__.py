@@ -1,6 +1,10 @@
-# flake8: noqa
+# -*- coding: utf-8 -*-
 
-from africanus.coordinates.coordinates import radec_to_lmn
-from africanus.coordinates.coordinates import radec_to_lm
-from africanus.coordinates.coordinates import lmn_to_radec
-from africanus.coordinates.coordinates import lm_to_radec
+from africanus.util.lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "radec_to_lmn": "africanus.coordinates.coordinates",
+    "radec_to_lm": "africanus.coordinates.coordinates",
+    "lmn_to_radec": "africanus.coordinates.coordinates",
+    "lm_to_radec": "africanus.coordinates.coordinates",
+})
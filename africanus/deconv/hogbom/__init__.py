@@ -1,5 +1,7 @@
 # -*- coding: utf-8 -*-
 
-__all__ = ["hogbom_clean"]
+from africanus.util.lazy import lazy_exports
 
-from .clean import hogbom_clean
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "hogbom_clean": "africanus.deconv.hogbom.clean",
+})
@@ -1,3 +1,8 @@
-# flake8: noqa
+# -*- coding: utf-8 -*-
 
-from .kernels import im_to_vis, vis_to_im
+from africanus.util.lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "im_to_vis": "africanus.dft.kernels",
+    "vis_to_im": "africanus.dft.kernels",
+})
@@ -17,14 +17,17 @@ else:
     dask_import_error = None
 
 
-def _im_to_vis_wrapper(image, uvw, lm, frequency, convention, dtype_):
+def _im_to_vis_wrapper(image, uvw, lm, frequency, convention, dtype_,
+                       recurrence):
     return np_im_to_vis(image[0], uvw[0], lm[0][0], frequency,
-                        convention=convention, dtype=dtype_)
+                        convention=convention, dtype=dtype_,
+                        recurrence=recurrence)
 
 
 @requires_optional('dask.array', dask_import_error)
 def im_to_vis(image, uvw, lm, frequency,
-              convention='fourier', dtype=np.complex128):
+              convention='fourier', dtype=np.complex128,
+              recurrence=False):
     """ Dask wrapper for im_to_vis function """
     if lm.chunks[0][0] != lm.shape[0]:
         raise ValueError("lm chunks must match lm shape "
@@ -45,7 +48,8 @@ def im_to_vis(image, uvw, lm, frequency,
                              frequency, ("chan",),
                              convention=convention,
                              dtype=dtype,
-                             dtype_=dtype)
+                             dtype_=dtype,
+                             recurrence=recurrence)
 
 
 def _vis_to_im_wrapper(vis, uvw, lm, frequency, flags,
@@ -3,6 +3,7 @@
 
 from africanus.util.numba import is_numba_type_none, generated_jit
 from africanus.util.docs import doc_tuple_to_str
+from africanus.util.phasor import phasors, regular_channel_width
 from collections import namedtuple
 
 import numba
@@ -13,7 +14,7 @@ from africanus.constants import minus_two_pi_over_c, two_pi_over_c
 
 @generated_jit(nopython=True, nogil=True, cache=True)
 def im_to_vis(image, uvw, lm, frequency,
-              convention='fourier', dtype=None):
+              convention='fourier', dtype=None, recurrence=False):
     # Infer complex output dtype if none provided
     if is_numba_type_none(dtype):
         out_dtype = np.result_type(np.complex64,
@@ -23,7 +24,7 @@ def im_to_vis(image, uvw, lm, frequency,
         out_dtype = dtype.dtype
 
     def impl(image, uvw, lm, frequency,
-             convention='fourier', dtype=None):
+             convention='fourier', dtype=None, recurrence=False):
         if convention == 'fourier':
             constant = minus_two_pi_over_c
         elif convention == 'casa':
@@ -36,6 +37,12 @@ def im_to_vis(image, uvw, lm, frequency,
         nchan = frequency.shape[0]
         ncorr = image.shape[-1]
         vis_of_im = np.zeros((nrows, nchan, ncorr), dtype=out_dtype)
+        phase = np.empty(nchan, dtype=out_dtype)
+
+        if recurrence:
+            regular, chan_width = regular_channel_width(frequency)
+        else:
+            regular, chan_width = False, 0.0
 
         # For each uvw coordinate
         for r in range(nrows):
@@ -48,14 +55,13 @@ def im_to_vis(image, uvw, lm, frequency,
 
                 # e^(-2*pi*(l*u + m*v + n*w)/c)
                 real_phase = constant * (l * u + m * v + n * w)
+                phasors(real_phase, frequency, regular, chan_width, phase)
 
                 # Multiple in frequency for each channel
                 for nu in range(nchan):
-                    p = real_phase * frequency[nu] * 1.0j
-
                     for c in range(ncorr):
                         if image[s, nu, c]:
-                            vis_of_im[r, nu, c] += np.exp(p)*image[s, nu, c]
+                            vis_of_im[r, nu, c] += phase[nu]*image[s, nu, c]
 
         return vis_of_im
 
@@ -170,6 +176,11 @@ im_to_vis_docs = _DFT_DOCSTRING(
         Datatype of result. Should be either np.complex64 or np.complex128.
         If ``None``, :func:`numpy.result_type` is used to infer the data type
         from the inputs.
+    recurrence : {False, True}
+        If ``True`` and ``frequency`` is evenly spaced,
+        per-channel phases are computed by a complex
+        multiply recurrence instead of complex exponentials.
+        See :mod:`africanus.util.phasor` for accuracy guarantees.
     """,
 
     returns="""
@@ -313,3 +313,18 @@ def test_symmetric_covariance():
         psf_source[:, source] = vis_to_im(Ki, uvw, lm, freq, flags).squeeze()
 
     assert_array_almost_equal(psf_source, psf_source.T, decimal=14)
+
+
+def test_im_to_vis_recurrence():
+    from africanus.dft.kernels import im_to_vis
+
+    rs = np.random.RandomState(42)
+    uvw = rs.normal(scale=1e3, size=(50, 3))
+    lm = rs.normal(scale=1e-2, size=(20, 2))
+    frequency = np.linspace(.856e9, .856e9*2, 256, endpoint=True)
+    image = rs.normal(size=(20, 256, 2))
+
+    direct = im_to_vis(image, uvw, lm, frequency)
+    recurrence = im_to_vis(image, uvw, lm, frequency, recurrence=True)
+
+    assert_array_almost_equal(direct, recurrence, decimal=10)
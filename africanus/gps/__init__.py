@@ -1,4 +1,8 @@
-# flake8: noqa
+# -*- coding: utf-8 -*-
 
-from africanus.gps.kernels import exponential_squared
-from africanus.gps.utils import abs_diff
+from africanus.util.lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "exponential_squared": "africanus.gps.kernels",
+    "abs_diff": "africanus.gps.utils",
+})
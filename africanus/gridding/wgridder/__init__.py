@@ -1,6 +1,10 @@
-# flake8: noqa
+# -*- coding: utf-8 -*-
 
-from africanus.gridding.wgridder.im2vis import model
-from africanus.gridding.wgridder.vis2im import dirty
-from africanus.gridding.wgridder.im2residim import residual
-from africanus.gridding.wgridder.hessian import hessian
+from africanus.util.lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "model": "africanus.gridding.wgridder.im2vis",
+    "dirty": "africanus.gridding.wgridder.vis2im",
+    "residual": "africanus.gridding.wgridder.im2residim",
+    "hessian": "africanus.gridding.wgridder.hessian",
+})
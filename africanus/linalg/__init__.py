@@ -1,3 +1,8 @@
-# flake8: noqa
+# -*- coding: utf-8 -*-
 
-from africanus.linalg.kronecker_tools import kron_matvec, kron_cholesky
+from africanus.util.lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "kron_matvec": "africanus.linalg.kronecker_tools",
+    "kron_cholesky": "africanus.linalg.kronecker_tools",
+})
@@ -1,3 +1,7 @@
-# flake8: noqa
+# -*- coding: utf-8 -*-
 
-from .conversion import convert
+from africanus.util.lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "convert": "africanus.model.coherency.conversion",
+})
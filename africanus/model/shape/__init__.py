@@ -1,3 +1,7 @@
-__all__ = ["gaussian"]
+# -*- coding: utf-8 -*-
 
-from africanus.model.shape.gaussian_shape import gaussian
+from africanus.util.lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "gaussian": "africanus.model.shape.gaussian_shape",
+})
@@ -1,3 +1,7 @@
-__all__ = ["spectral_model"]
+# -*- coding: utf-8 -*-
 
-from africanus.model.spectral.spec_model import spectral_model
+from africanus.util.lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "spectral_model": "africanus.model.spectral.spec_model",
+})
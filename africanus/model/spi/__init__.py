@@ -1,3 +1,7 @@
-# flake8: noqa
+# -*- coding: utf-8 -*-
 
-from africanus.model.spi.component_spi import fit_spi_components
+from africanus.util.lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "fit_spi_components": "africanus.model.spi.component_spi",
+})
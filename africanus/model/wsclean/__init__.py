@@ -1,4 +1,8 @@
-__all__ = ["load", "spectra"]
+# -*- coding: utf-8 -*-
 
-from africanus.model.wsclean.file_model import load
-from africanus.model.wsclean.spec_model import spectra
+from africanus.util.lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "load": "africanus.model.wsclean.file_model",
+    "spectra": "africanus.model.wsclean.spec_model",
+})
@@ -1,10 +1,23 @@
-# flake8: noqa
+# -*- coding: utf-8 -*-
 
-from africanus.rime.phase import phase_delay
-from africanus.rime.feeds import feed_rotation
-from africanus.rime.fast_beam_cubes import beam_cube_dde
-from africanus.rime.parangles import parallactic_angles
-from africanus.rime.transform import transform_sources
-from africanus.rime.zernike import zernike_dde
-from africanus.rime.predict import predict_vis, apply_gains
-from africanus.rime.wsclean_predict import wsclean_predict
+from africanus.util.lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "phase_delay": "africanus.rime.phase",
+    "feed_rotation": "africanus.rime.feeds",
+    "beam_cube_dde": "africanus.rime.fast_beam_cubes",
+    "parallactic_angles": "africanus.rime.parangles",
+    "transform_sources": "africanus.rime.transform",
+    "zernike_dde": "africanus.rime.zernike",
+    "fused_zernike_dde": "africanus.rime.zernike",
+    "zernike_fit": "africanus.rime.zernike_fit",
+    "predict_vis": "africanus.rime.predict",
+    "apply_gains": "africanus.rime.predict",
+    "stream_predict_vis": "africanus.rime.predict",
+    "fused_predict": "africanus.rime.fused_predict",
+    "hybrid_predict": "africanus.rime.hybrid_predict",
+    "component_delta": "africanus.rime.delta_predict",
+    "delta_predict_vis": "africanus.rime.delta_predict",
+    "delta_wsclean_predict": "africanus.rime.delta_predict",
+    "wsclean_predict": "africanus.rime.wsclean_predict",
+})
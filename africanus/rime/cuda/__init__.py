@@ -1,6 +1,10 @@
-# flake8: noqa
+# -*- coding: utf-8 -*-
 
-from africanus.rime.cuda.beam import beam_cube_dde
-from africanus.rime.cuda.feeds import feed_rotation
-from africanus.rime.cuda.phase import phase_delay
-from africanus.rime.cuda.predict import predict_vis
+from africanus.util.lazy import lazy_exports
+
+__getattr__, __dir__, __all__ = lazy_exports(__name__, {
+    "beam_cube_dde": "africanus.rime.cuda.beam",
+    "feed_rotation": "africanus.rime.cuda.feeds",
+    "phase_delay": "africanus.rime.cuda.phase",
+    "predict_vis": "africanus.rime.cuda.predict",
+})
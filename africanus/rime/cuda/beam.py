@@ -205,6 +205,7 @@ def beam_cube_dde(beam, beam_lm_ext, beam_freq_map,
 
 try:
     beam_cube_dde.__doc__ = BEAM_CUBE_DOCS.substitute(
-                                array_type=":class:`cupy.ndarray`")
+                                array_type=":class:`cupy.ndarray`",
+                                extra_args="")
 except AttributeError:
     pass
@@ -8,9 +8,15 @@ from africanus.rime.feeds import feed_rotation as np_feed_rotation
 from africanus.rime.feeds import FEED_ROTATION_DOCS
 from africanus.rime.transform import transform_sources as np_transform_sources
 from africanus.rime.fast_beam_cubes import (beam_cube_dde as np_beam_cube_dde,
-                                            BEAM_CUBE_DOCS)
+                                            BEAM_CUBE_DOCS,
+                                            BEAM_CUBE_EXTRA_ARGS)
 from africanus.rime.dask_predict import predict_vis, wsclean_predict  # noqa
+from africanus.rime.dask_predict import fused_predict  # noqa
+from africanus.rime.dask_predict import hybrid_predict  # noqa
+from africanus.rime.predict_planner import plan_predict_vis  # noqa
 from africanus.rime.zernike import zernike_dde as np_zernike_dde
+from africanus.rime.zernike import (fused_zernike_dde
+                                    as np_fused_zernike_dde)
 
 
 from africanus.util.docs import mod_docs
@@ -27,18 +33,20 @@ else:
     da_import_error = None
 
 
-def _phase_delay_wrap(lm, uvw, frequency, convention):
-    return np_phase_delay(lm[0], uvw[0], frequency, convention=convention)
+def _phase_delay_wrap(lm, uvw, frequency, convention, recurrence):
+    return np_phase_delay(lm[0], uvw[0], frequency, convention=convention,
+                          recurrence=recurrence)
 
 
 @requires_optional('dask.array', da_import_error)
-def phase_delay(lm, uvw, frequency, convention='fourier'):
+def phase_delay(lm, uvw, frequency, convention='fourier', recurrence=False):
     """ Dask wrapper for phase_delay function """
     return da.core.blockwise(_phase_delay_wrap, ("source", "row", "chan"),
                              lm, ("source", "(l,m)"),
                              uvw, ("row", "(u,v,w)"),
                              frequency, ("chan",),
                              convention=convention,
+                             recurrence=recurrence,
                              dtype=infer_complex_dtype(lm, uvw, frequency))
 
 
@@ -107,18 +115,20 @@ def transform_sources(lm, parallactic_angles, pointing_errors,
 def _beam_cube_dde_wrapper(beam, beam_lm_extents, beam_freq_map,
                            lm, parallactic_angles,
                            point_errors, antenna_scaling,
-                           frequencies):
+                           frequencies, **kwargs):
     return np_beam_cube_dde(beam[0][0][0], beam_lm_extents[0][0],
                             beam_freq_map[0], lm[0],
                             parallactic_angles, point_errors[0],
-                            antenna_scaling[0], frequencies)
+                            antenna_scaling[0], frequencies,
+                            **kwargs)
 
 
 @requires_optional('dask.array', da_import_error)
 def beam_cube_dde(beam, beam_lm_extents, beam_freq_map,
                   lm, parallactic_angles,
                   point_errors, antenna_scaling,
-                  frequencies):
+                  frequencies, parallel=False, antenna_dedup=False,
+                  pa_tolerance=0.0, broadcast=False, pa_step=None):
 
     if not all(len(c) == 1 for c in beam.chunks):
         raise ValueError("Beam chunking unsupported")
@@ -144,18 +154,24 @@ def beam_cube_dde(beam, beam_lm_extents, beam_freq_map,
                              point_errors, ("time", "ant", "chan", "pt-comp"),
                              antenna_scaling, ("ant", "chan", "scale-comp"),
                              frequencies, ("chan",),
+                             parallel=parallel,
+                             antenna_dedup=antenna_dedup,
+                             pa_tolerance=pa_tolerance,
+                             broadcast=broadcast,
+                             pa_step=pa_step,
                              dtype=beam.dtype)
 
 
-def _zernike_wrapper(coords, coeffs, noll_index):
+def _zernike_wrapper(coords, coeffs, noll_index, parallel=False):
     # coords loses "three" dim
     # coeffs loses "poly" dim
     # noll_index loses "poly" dim
-    return np_zernike_dde(coords[0], coeffs[0], noll_index[0])
+    return np_zernike_dde(coords[0], coeffs[0], noll_index[0],
+                          parallel=parallel)
 
 
 @requires_optional('dask.array', da_import_error)
-def zernike_dde(coords, coeffs, noll_index):
+def zernike_dde(coords, coeffs, noll_index, parallel=False):
     ncorrs = len(coeffs.shape[2:-1])
     corr_dims = tuple("corr-%d" % i for i in range(ncorrs))
 
@@ -167,6 +183,40 @@ def zernike_dde(coords, coeffs, noll_index):
                              ("ant", "chan") + corr_dims + ("poly",),
                              noll_index,
                              ("ant", "chan") + corr_dims + ("poly",),
+                             parallel=parallel,
+                             dtype=coeffs.dtype)
+
+
+def _fused_zernike_wrapper(lm, parallactic_angles, pointing_errors,
+                           antenna_scaling, frequency, coeffs, noll_index,
+                           parallel=False):
+    # lm and pointing_errors lose "lm" dim
+    # coeffs and noll_index lose "poly" dim
+    return np_fused_zernike_dde(lm[0], parallactic_angles,
+                                pointing_errors[0], antenna_scaling,
+                                frequency, coeffs[0], noll_index[0],
+                                parallel=parallel)
+
+
+@requires_optional('dask.array', da_import_error)
+def fused_zernike_dde(lm, parallactic_angles, pointing_errors,
+                      antenna_scaling, frequency, coeffs, noll_index,
+                      parallel=False):
+    ncorrs = len(coeffs.shape[2:-1])
+    corr_dims = tuple("corr-%d" % i for i in range(ncorrs))
+
+    return da.core.blockwise(_fused_zernike_wrapper,
+                             ("source", "time", "ant", "chan") + corr_dims,
+                             lm, ("source", "lm"),
+                             parallactic_angles, ("time", "ant"),
+                             pointing_errors, ("time", "ant", "lm"),
+                             antenna_scaling, ("ant", "chan"),
+                             frequency, ("chan",),
+                             coeffs,
+                             ("ant", "chan") + corr_dims + ("poly",),
+                             noll_index,
+                             ("ant", "chan") + corr_dims + ("poly",),
+                             parallel=parallel,
                              dtype=coeffs.dtype)
 
 
@@ -198,7 +248,8 @@ except AttributeError:
 
 try:
     beam_cube_dde.__doc__ = BEAM_CUBE_DOCS.substitute(
-                                array_type=":class:`dask.array.Array`")
+                                array_type=":class:`dask.array.Array`",
+                                extra_args=BEAM_CUBE_EXTRA_ARGS)
 except AttributeError:
     pass
 
@@ -208,3 +259,10 @@ try:
                                      ":class:`dask.array.Array`")])
 except AttributeError:
     pass
+
+try:
+    fused_zernike_dde.__doc__ = mod_docs(np_fused_zernike_dde.__doc__,
+                                         [(":class:`numpy.ndarray`",
+                                           ":class:`dask.array.Array`")])
+except AttributeError:
+    pass
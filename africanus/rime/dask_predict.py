@@ -1,8 +1,8 @@
 # -*- coding: utf-8 -*-
 
-from functools import reduce
+from functools import partial, reduce
 from itertools import product
-from operator import mul
+from operator import add, mul
 
 try:
     from collections.abc import Mapping
@@ -13,11 +13,20 @@ import numpy as np
 
 from africanus.util.requirements import requires_optional
 
-from africanus.rime.predict import (PREDICT_DOCS, predict_checks,
+from africanus.rime.predict import (PREDICT_DOCS, PARALLEL_ARGS,
+                                    predict_checks,
                                     predict_vis as np_predict_vis)
+from africanus.rime.fused_predict import (
+                                FUSED_PREDICT_DOCS, fused_predict_checks,
+                                fused_predict as np_fused_predict)
 from africanus.rime.wsclean_predict import (
-                                WSCLEAN_PREDICT_DOCS,
-                                wsclean_predict_impl as wsclean_predict_body)
+                                WSCLEAN_PREDICT_DOCS, wsclean_dtypes,
+                                wsclean_predict_impl as wsclean_predict_body,
+                                parallel_wsclean_predict_impl,
+                                source_type_enum)
+from africanus.rime.hybrid_predict import (
+                                HYBRID_PREDICT_DOCS, hybrid_split,
+                                rasterise_sources, degrid_image)
 from africanus.model.wsclean.spec_model import spectra as wsclean_spectra
 
 
@@ -57,7 +66,21 @@ def _ind_map(arg, ind, out_ind, dim_map, dim_blocks):
             yield out_ind[dim_idx]
 
 
+def _sum_streams(stream_results):
+    """ Sums the final results of each stream """
+    return reduce(add, stream_results)
+
+
 class LinearReduction(Mapping):
+    """
+    Reduces blocks along ``axis`` by feeding the result of each
+    block into the ``feed_index`` argument of the next.
+
+    The blocks along ``axis`` are partitioned into ``streams``
+    contiguous chains that are reduced independently,
+    after which the chain results are summed together.
+    Each chain holds at most two output blocks at a time.
+    """
     def __init__(
         self,
         func,
@@ -66,6 +89,7 @@ class LinearReduction(Mapping):
         numblocks,
         feed_index=0,
         axis=None,
+        streams=1,
     ):
         self.func = func
         self.output_indices = tuple(output_indices)
@@ -79,15 +103,20 @@ class LinearReduction(Mapping):
         if axis in self.output_indices:
             raise ValueError("axis in output_indices")
 
+        if streams < 1:
+            raise ValueError("streams %d < 1" % streams)
+
         self.feed_index = feed_index
         self.axis = axis
+        self.streams = streams
 
         token = tokenize(self.func,
                          self.output_indices,
                          self.indices,
                          self.numblocks,
                          self.feed_index,
-                         self.axis)
+                         self.axis,
+                         self.streams)
 
         self.func_name = funcname(self.func)
         self.name = "-".join((self.func_name, token))
@@ -103,7 +132,14 @@ class LinearReduction(Mapping):
 
             # Number of blocks for each dimension, derived from the input
             dim_blocks = db.broadcast_dimensions(self.indices, self.numblocks)
-            last_block = dim_blocks[ax] - 1
+            nblocks = dim_blocks[ax]
+            last_block = nblocks - 1
+
+            # Partition reduction blocks into contiguous streams
+            streams = min(self.streams, nblocks)
+            bounds = [s*nblocks // streams for s in range(streams + 1)]
+            first_blocks = set(bounds[:-1])
+            last_blocks = [b - 1 for b in bounds[1:]]
 
             out_dims = (ax,) + self.output_indices
             dim_map = {k: i for i, k in enumerate(out_dims)}
@@ -119,8 +155,8 @@ class LinearReduction(Mapping):
 
                 for i, (arg, ind) in enumerate(self.indices):
                     if i == feed_index:
-                        # First reduction block, feed in None
-                        if out_ind[0] == 0:
+                        # First reduction block of a stream, feed in None
+                        if out_ind[0] in first_blocks:
                             task.append(None)
 
                         # Otherwise feed in the result of the last operation
@@ -140,12 +176,22 @@ class LinearReduction(Mapping):
                                                    dim_map, dim_blocks)))
 
                 # Final block
-                if out_ind[0] == last_block:
+                if streams == 1 and out_ind[0] == last_block:
                     dsk[(self.name,) + out_ind[1:]] = tuple(task)
                 # Intermediate block
                 else:
                     dsk[(int_name,) + out_ind] = tuple(task)
 
+            # Sum the final block of each stream
+            if streams > 1:
+                out_blocks = [range(dim_blocks[d])
+                              for d in self.output_indices]
+
+                for out_ind in product(*out_blocks):
+                    dsk[(self.name,) + out_ind] = (
+                        _sum_streams,
+                        [(int_name, b) + out_ind for b in last_blocks])
+
             self._cached_dict = dsk
 
         return self._cached_dict
@@ -171,8 +217,15 @@ class LinearReduction(Mapping):
 
 def linear_reduction(time_index, antenna1, antenna2,
                      dde1_jones, source_coh, dde2_jones,
-                     predict_check_tup, out_dtype):
-
+                     predict_check_tup, out_dtype,
+                     source_to_direction=None,
+                     parallel=False,
+                     streams=1):
+    """
+    Sums source coherencies in ``streams`` linear chains,
+    accumulating each source chunk into the output
+    of the previous source chunk
+    """
     (have_ddes1, have_coh, have_ddes2,
      have_dies1, have_bvis, have_dies2) = predict_check_tup
 
@@ -185,15 +238,22 @@ def linear_reduction(time_index, antenna1, antenna2,
     else:
         raise ValueError("need ddes or source coherencies")
 
+    if source_to_direction is None:
+        ajones_dims = ("source", "row", "ant", "chan") + cdims
+    else:
+        # Direction-indexed DDEs are not chunked over source
+        ajones_dims = ("dir", "row", "ant", "chan") + cdims
+
     args = [(time_index, ("row",)),
             (antenna1, ("row",)),
             (antenna2, ("row",)),
-            (dde1_jones, ("source", "row", "ant", "chan") + cdims),
+            (dde1_jones, ajones_dims),
             (source_coh, ("source", "row", "chan") + cdims),
-            (dde2_jones, ("source", "row", "ant", "chan") + cdims),
+            (dde2_jones, ajones_dims),
+            (None, None),
             (None, None),
             (None, None),
-            (None, None)]
+            (source_to_direction, ("source",))]
 
     name_args = [(None, None) if a is None else
                  (a.name, i) if isinstance(a, da.Array) else
@@ -203,11 +263,15 @@ def linear_reduction(time_index, antenna1, antenna2,
                  for a, i in args
                  if a is not None}
 
-    lr = LinearReduction(np_predict_vis, ("row", "chan") + cdims,
+    predict_fn = (partial(np_predict_vis, parallel=True)
+                  if parallel else np_predict_vis)
+
+    lr = LinearReduction(predict_fn, ("row", "chan") + cdims,
                          name_args,
                          numblocks=numblocks,
                          feed_index=7,
-                         axis='source')
+                         axis='source',
+                         streams=streams)
 
     graph = HighLevelGraph.from_collections(lr.name, lr,
                                             [a for a, i in args
@@ -224,14 +288,22 @@ def linear_reduction(time_index, antenna1, antenna2,
 
 def _predict_coh_wrapper(time_index, antenna1, antenna2,
                          dde1_jones, source_coh, dde2_jones,
-                         base_vis,
-                         reduce_single_source=False):
+                         base_vis, source_to_direction=None,
+                         reduce_single_source=False,
+                         parallel=False):
 
     if reduce_single_source:
         # All these arrays contract over a single 'source' chunk
         dde1_jones = dde1_jones[0] if dde1_jones else None
         source_coh = source_coh[0] if source_coh else None
         dde2_jones = dde2_jones[0] if dde2_jones else None
+        source_to_direction = (source_to_direction[0]
+                               if source_to_direction else None)
+
+    if source_to_direction is not None:
+        # dde{1,2}_jones contract over a single 'dir' chunk
+        dde1_jones = dde1_jones[0]
+        dde2_jones = dde2_jones[0]
 
     vis = np_predict_vis(time_index, antenna1, antenna2,
                          # dde1_jones contracts over a single 'ant' chunk
@@ -241,7 +313,9 @@ def _predict_coh_wrapper(time_index, antenna1, antenna2,
                          dde2_jones[0] if dde2_jones else None,
                          None,
                          base_vis,
-                         None)
+                         None,
+                         source_to_direction,
+                         parallel=parallel)
 
     if reduce_single_source:
         return vis
@@ -250,7 +324,8 @@ def _predict_coh_wrapper(time_index, antenna1, antenna2,
 
 
 def _predict_dies_wrapper(time_index, antenna1, antenna2,
-                          die1_jones, base_vis, die2_jones):
+                          die1_jones, base_vis, die2_jones,
+                          parallel=False):
 
     return np_predict_vis(time_index, antenna1, antenna2,
                           None,
@@ -260,12 +335,15 @@ def _predict_dies_wrapper(time_index, antenna1, antenna2,
                           die1_jones[0] if die1_jones else None,
                           base_vis,
                           # die2_jones loses the 'ant' dim
-                          die2_jones[0] if die2_jones else None)
+                          die2_jones[0] if die2_jones else None,
+                          parallel=parallel)
 
 
 def parallel_reduction(time_index, antenna1, antenna2,
                        dde1_jones, source_coh, dde2_jones,
-                       predict_check_tup, out_dtype):
+                       predict_check_tup, out_dtype,
+                       source_to_direction=None,
+                       parallel=False):
     """ Does a standard dask tree reduction over source coherencies """
     (have_ddes1, have_coh, have_ddes2,
      have_dies1, have_bvis, have_dies2) = predict_check_tup
@@ -279,8 +357,14 @@ def parallel_reduction(time_index, antenna1, antenna2,
     else:
         raise ValueError("need ddes or source coherencies")
 
-    ajones_dims = ("src", "row", "ant", "chan") + cdims
+    if source_to_direction is None:
+        ajones_dims = ("src", "row", "ant", "chan") + cdims
+    else:
+        # Direction-indexed DDEs are not chunked over source
+        ajones_dims = ("dir", "row", "ant", "chan") + cdims
+
     src_coh_dims = ("src", "row", "chan") + cdims
+    src_dims = ("src",)
 
     coherencies = da.blockwise(
         _predict_coh_wrapper, src_coh_dims,
@@ -291,12 +375,14 @@ def parallel_reduction(time_index, antenna1, antenna2,
         source_coh, None if source_coh is None else src_coh_dims,
         dde2_jones, None if dde2_jones is None else ajones_dims,
         None, None,
+        source_to_direction, None if source_to_direction is None else src_dims,
         # time+row dimension chunks are equivalent but differently sized
         align_arrays=False,
         # Force row dimension to take row chunking scheme,
         # instead of time chunking scheme
         adjust_chunks={'row': time_index.chunks[0]},
         meta=np.empty((0,)*len(src_coh_dims), dtype=out_dtype),
+        parallel=parallel,
         dtype=out_dtype)
 
     return coherencies.sum(axis=0)
@@ -304,7 +390,8 @@ def parallel_reduction(time_index, antenna1, antenna2,
 
 def apply_dies(time_index, antenna1, antenna2,
                die1_jones, base_vis, die2_jones,
-               predict_check_tup, out_dtype):
+               predict_check_tup, out_dtype,
+               parallel=False):
     """ Apply any Direction-Independent Effects and Base Visibilities """
 
     # Now apply any Direction Independent Effect Terms
@@ -348,6 +435,7 @@ def apply_dies(time_index, antenna1, antenna2,
         # instead of time chunking scheme
         adjust_chunks={'row': time_index.chunks[0]},
         meta=np.empty((0,)*len(vis_dims), dtype=out_dtype),
+        parallel=parallel,
         dtype=out_dtype)
 
 
@@ -355,11 +443,12 @@ def apply_dies(time_index, antenna1, antenna2,
 def predict_vis(time_index, antenna1, antenna2,
                 dde1_jones=None, source_coh=None, dde2_jones=None,
                 die1_jones=None, base_vis=None, die2_jones=None,
-                streams=None):
+                source_to_direction=None, streams=None, parallel=False):
 
     predict_check_tup = predict_checks(time_index, antenna1, antenna2,
                                        dde1_jones, source_coh, dde2_jones,
-                                       die1_jones, base_vis, die2_jones)
+                                       die1_jones, base_vis, die2_jones,
+                                       source_to_direction=source_to_direction)
 
     (have_ddes1, have_coh, have_ddes2,
      have_dies1, have_bvis, have_dies2) = predict_check_tup
@@ -383,6 +472,15 @@ def predict_vis(time_index, antenna1, antenna2,
                              "number of time chunks (%s)." %
                              (time_index.chunks[0], dde1_jones.chunks[1]))
 
+    if source_to_direction is not None:
+        if dde1_jones.shape[0] != dde1_jones.chunks[0][0]:
+            raise ValueError("Subdivision of direction dimension into "
+                             "multiple chunks is not supported.")
+
+        if source_to_direction.chunks[0] != source_coh.chunks[0]:
+            raise ValueError("source_to_direction.chunks[0] != "
+                             "source_coh.chunks[0]")
+
     have_dies = have_dies1 and have_dies2
 
     if have_dies:
@@ -413,7 +511,7 @@ def predict_vis(time_index, antenna1, antenna2,
         # We create separate graphs for computing coherencies and applying
         # the gains because coherencies are chunked over source which
         # must be summed and added to the (possibly present) base visibilities
-        if streams is True:
+        if streams is not None and streams is not False:
             sum_coherencies = linear_reduction(time_index,
                                                antenna1,
                                                antenna2,
@@ -421,7 +519,10 @@ def predict_vis(time_index, antenna1, antenna2,
                                                source_coh,
                                                dde2_jones,
                                                predict_check_tup,
-                                               out_dtype)
+                                               out_dtype,
+                                               source_to_direction,
+                                               parallel=parallel,
+                                               streams=int(streams))
         else:
             sum_coherencies = parallel_reduction(time_index,
                                                  antenna1,
@@ -430,7 +531,9 @@ def predict_vis(time_index, antenna1, antenna2,
                                                  source_coh,
                                                  dde2_jones,
                                                  predict_check_tup,
-                                                 out_dtype)
+                                                 out_dtype,
+                                                 source_to_direction,
+                                                 parallel=parallel)
     else:
         assert have_dies or have_bvis
         sum_coherencies = None
@@ -452,7 +555,323 @@ def predict_vis(time_index, antenna1, antenna2,
     # Apply direction independent effects
     return apply_dies(time_index, antenna1, antenna2,
                       die1_jones, base_vis, die2_jones,
-                      predict_check_tup, out_dtype)
+                      predict_check_tup, out_dtype,
+                      parallel=parallel)
+
+
+def _fused_predict_wrapper(time_index, antenna1, antenna2,
+                           lm, uvw, frequency, brightness,
+                           gauss_shape, dde1_jones, dde2_jones,
+                           convention):
+
+    vis = np_fused_predict(time_index, antenna1, antenna2,
+                           # lm loses the 'lm' dim
+                           lm[0],
+                           # uvw loses the 'uvw' dim
+                           uvw[0],
+                           frequency, brightness,
+                           # gauss_shape loses the 'gauss' dim
+                           gauss_shape[0] if gauss_shape else None,
+                           # dde1_jones contracts over a single 'ant' chunk
+                           dde1_jones[0] if dde1_jones else None,
+                           # dde2_jones contracts over a single 'ant' chunk
+                           dde2_jones[0] if dde2_jones else None,
+                           convention=convention)
+
+    return vis[None, ...]
+
+
+@requires_optional('dask.array', opt_import_error)
+def fused_predict(time_index, antenna1, antenna2,
+                  lm, uvw, frequency, brightness,
+                  gauss_shape=None,
+                  dde1_jones=None, dde2_jones=None,
+                  die1_jones=None, die2_jones=None,
+                  convention='fourier'):
+
+    have_gauss, have_ddes, have_dies = fused_predict_checks(
+                                    time_index, antenna1, antenna2,
+                                    lm, uvw, frequency, brightness,
+                                    gauss_shape, dde1_jones, dde2_jones,
+                                    die1_jones, die2_jones,
+                                    lambda x: x is not None)
+
+    if have_ddes:
+        if dde1_jones.shape[2] != dde1_jones.chunks[2][0]:
+            raise ValueError("Subdivision of antenna dimension into "
+                             "multiple chunks is not supported.")
+
+        if dde1_jones.chunks != dde2_jones.chunks:
+            raise ValueError("dde1_jones.chunks != dde2_jones.chunks")
+
+        if len(dde1_jones.chunks[1]) != len(time_index.chunks[0]):
+            raise ValueError("Number of row chunks (%s) does not equal "
+                             "number of time chunks (%s)." %
+                             (time_index.chunks[0], dde1_jones.chunks[1]))
+
+    if have_dies:
+        if die1_jones.shape[1] != die1_jones.chunks[1][0]:
+            raise ValueError("Subdivision of antenna dimension into "
+                             "multiple chunks is not supported.")
+
+        if die1_jones.chunks != die2_jones.chunks:
+            raise ValueError("die1_jones.chunks != die2_jones.chunks")
+
+        if len(die1_jones.chunks[0]) != len(time_index.chunks[0]):
+            raise ValueError("Number of row chunks (%s) does not equal "
+                             "number of time chunks (%s)." %
+                             (time_index.chunks[0], die1_jones.chunks[0]))
+
+    # Infer the output dtype
+    dtype_arrays = [lm, uvw, frequency, brightness,
+                    dde1_jones, dde2_jones, die1_jones, die2_jones]
+    out_dtype = np.result_type(np.complex64,
+                               *(np.dtype(a.dtype.name)
+                                 for a in dtype_arrays
+                                 if a is not None))
+
+    cdims = tuple("corr-%d" % i for i in range(len(brightness.shape[2:])))
+    ajones_dims = ("src", "row", "ant", "chan") + cdims
+    vis_dims = ("src", "row", "chan") + cdims
+
+    # Each source chunk produces visibilities of size (1, row, chan, corr)
+    # which are subsequently summed in a tree reduction.
+    # As with predict_vis, "row" is substituted for "time"
+    # in the Direction-Dependent Effects
+    vis = da.blockwise(
+        _fused_predict_wrapper, vis_dims,
+        time_index, ("row",),
+        antenna1, ("row",),
+        antenna2, ("row",),
+        lm, ("src", "lm"),
+        uvw, ("row", "uvw"),
+        frequency, ("chan",),
+        brightness, ("src", "chan") + cdims,
+        gauss_shape, None if gauss_shape is None else ("src", "gauss"),
+        dde1_jones, None if dde1_jones is None else ajones_dims,
+        dde2_jones, None if dde2_jones is None else ajones_dims,
+        convention, None,
+        # time+row dimension chunks are equivalent but differently sized
+        align_arrays=False,
+        # Force row dimension to take row chunking scheme,
+        # instead of time chunking scheme
+        adjust_chunks={"src": 1, "row": time_index.chunks[0]},
+        meta=np.empty((0,)*len(vis_dims), dtype=out_dtype),
+        dtype=out_dtype)
+
+    vis = vis.sum(axis=0)
+
+    if not have_dies:
+        return vis
+
+    # Apply direction independent effects
+    return apply_dies(time_index, antenna1, antenna2,
+                      die1_jones, vis, die2_jones,
+                      (False, False, False, True, True, True),
+                      out_dtype)
+
+
+def _hybrid_split_wrapper(lm, brightness, gauss_shape, flux_threshold,
+                          nx, ny, cell, celly):
+    return hybrid_split(lm, brightness, flux_threshold, nx, ny, cell,
+                        celly=celly, gauss_shape=gauss_shape)
+
+
+def _hybrid_exact_wrapper(time_index, antenna1, antenna2, exact,
+                          lm, uvw, frequency, brightness,
+                          gauss_shape, dde1_jones, dde2_jones,
+                          convention):
+
+    vis = np_fused_predict(time_index, antenna1, antenna2,
+                           # lm loses the 'lm' dim
+                           lm[0][exact],
+                           # uvw loses the 'uvw' dim
+                           uvw[0],
+                           frequency, brightness[exact],
+                           # gauss_shape loses the 'gauss' dim
+                           gauss_shape[0][exact] if gauss_shape else None,
+                           # dde1_jones contracts over a single 'ant' chunk
+                           dde1_jones[0][exact] if dde1_jones else None,
+                           # dde2_jones contracts over a single 'ant' chunk
+                           dde2_jones[0][exact] if dde2_jones else None,
+                           convention=convention)
+
+    return vis[None, ...]
+
+
+def _hybrid_raster_wrapper(exact, lm, brightness,
+                           freq_bin_idx, freq_bin_counts,
+                           nx, ny, cell, celly, do_wstacking):
+    faint = ~exact
+    image = rasterise_sources(lm[0][faint], brightness[faint],
+                              freq_bin_idx, freq_bin_counts,
+                              nx, ny, cell, celly=celly,
+                              do_wstacking=do_wstacking)
+
+    return image[None, ...]
+
+
+def _hybrid_degrid_wrapper(uvw, frequency, image,
+                           freq_bin_idx, freq_bin_counts,
+                           cell, celly, epsilon, nthreads,
+                           do_wstacking, convention):
+    # uvw loses the 'uvw' dim while image contracts
+    # over single 'nx' and 'ny' chunks
+    return degrid_image(uvw[0], frequency, image[0][0],
+                        freq_bin_idx, freq_bin_counts,
+                        cell, celly=celly, epsilon=epsilon,
+                        nthreads=nthreads, do_wstacking=do_wstacking,
+                        convention=convention)
+
+
+@requires_optional('dask.array', opt_import_error)
+def hybrid_predict(time_index, antenna1, antenna2,
+                   lm, uvw, frequency, brightness,
+                   flux_threshold, nx, ny, cell, celly=None,
+                   gauss_shape=None,
+                   dde1_jones=None, dde2_jones=None,
+                   die1_jones=None, die2_jones=None,
+                   freq_bin_idx=None, freq_bin_counts=None,
+                   epsilon=1e-5, nthreads=1, do_wstacking=True,
+                   convention='fourier'):
+
+    fused_predict_checks(time_index, antenna1, antenna2,
+                         lm, uvw, frequency, brightness,
+                         gauss_shape, dde1_jones, dde2_jones,
+                         die1_jones, die2_jones,
+                         lambda x: x is not None)
+
+    if celly is None:
+        celly = cell
+
+    if not nthreads:
+        import multiprocessing
+        nthreads = multiprocessing.cpu_count()
+
+    if freq_bin_idx is None:
+        freq_bin_idx = da.arange(frequency.shape[0],
+                                 chunks=frequency.chunks)
+
+    if freq_bin_counts is None:
+        freq_bin_counts = da.ones_like(freq_bin_idx)
+
+    if len(freq_bin_idx.chunks[0]) != len(frequency.chunks[0]):
+        raise ValueError("Number of band chunks (%s) does not equal "
+                         "number of channel chunks (%s)." %
+                         (freq_bin_idx.chunks[0], frequency.chunks[0]))
+
+    if brightness.chunks[1] != frequency.chunks[0]:
+        raise ValueError("brightness.chunks[1] != frequency.chunks[0]")
+
+    if uvw.chunks[0] != time_index.chunks[0]:
+        raise ValueError("uvw.chunks[0] != time_index.chunks[0]")
+
+    # Infer the output dtype
+    dtype_arrays = [lm, uvw, frequency, brightness,
+                    dde1_jones, dde2_jones, die1_jones, die2_jones]
+    out_dtype = np.result_type(np.complex64,
+                               *(np.dtype(a.dtype.name)
+                                 for a in dtype_arrays
+                                 if a is not None))
+
+    cdims = tuple("corr-%d" % i for i in range(len(brightness.shape[2:])))
+    ajones_dims = ("src", "row", "ant", "chan") + cdims
+    vis_dims = ("src", "row", "chan") + cdims
+    image_dims = ("src", "chan", "nx", "ny") + cdims
+
+    # Decide which sources are predicted exactly,
+    # requiring all channels of each source
+    exact = da.blockwise(_hybrid_split_wrapper, ("src",),
+                         lm, ("src", "lm"),
+                         brightness, ("src", "chan") + cdims,
+                         gauss_shape,
+                         None if gauss_shape is None else ("src", "gauss"),
+                         flux_threshold, None,
+                         nx, None,
+                         ny, None,
+                         cell, None,
+                         celly, None,
+                         concatenate=True,
+                         meta=np.empty((0,), dtype=np.bool_),
+                         dtype=np.bool_)
+
+    # Exact prediction of each source chunk, summed in a tree reduction.
+    # As with predict_vis, "row" is substituted for "time"
+    # in the Direction-Dependent Effects
+    vis = da.blockwise(
+        _hybrid_exact_wrapper, vis_dims,
+        time_index, ("row",),
+        antenna1, ("row",),
+        antenna2, ("row",),
+        exact, ("src",),
+        lm, ("src", "lm"),
+        uvw, ("row", "uvw"),
+        frequency, ("chan",),
+        brightness, ("src", "chan") + cdims,
+        gauss_shape, None if gauss_shape is None else ("src", "gauss"),
+        dde1_jones, None if dde1_jones is None else ajones_dims,
+        dde2_jones, None if dde2_jones is None else ajones_dims,
+        convention, None,
+        # time+row dimension chunks are equivalent but differently sized
+        align_arrays=False,
+        # Force row dimension to take row chunking scheme,
+        # instead of time chunking scheme
+        adjust_chunks={"src": 1, "row": time_index.chunks[0]},
+        meta=np.empty((0,)*len(vis_dims), dtype=out_dtype),
+        dtype=out_dtype)
+
+    vis = vis.sum(axis=0)
+
+    # Rasterise the remaining sources of each source chunk into
+    # model images, summed in a tree reduction.
+    # "chan" is substituted for "band" in the model images
+    image = da.blockwise(
+        _hybrid_raster_wrapper, image_dims,
+        exact, ("src",),
+        lm, ("src", "lm"),
+        brightness, ("src", "chan") + cdims,
+        freq_bin_idx, ("chan",),
+        freq_bin_counts, ("chan",),
+        nx, None,
+        ny, None,
+        cell, None,
+        celly, None,
+        do_wstacking, None,
+        # chan+band dimension chunks are equivalent but differently sized
+        align_arrays=False,
+        adjust_chunks={"src": 1, "chan": freq_bin_idx.chunks[0]},
+        new_axes={"nx": nx, "ny": ny},
+        meta=np.empty((0,)*len(image_dims), dtype=brightness.dtype),
+        dtype=brightness.dtype)
+
+    image = image.sum(axis=0)
+
+    vis += da.blockwise(
+        _hybrid_degrid_wrapper, ("row", "chan") + cdims,
+        uvw, ("row", "uvw"),
+        frequency, ("chan",),
+        image, ("chan", "nx", "ny") + cdims,
+        freq_bin_idx, ("chan",),
+        freq_bin_counts, ("chan",),
+        cell, None,
+        celly, None,
+        epsilon, None,
+        nthreads, None,
+        do_wstacking, None,
+        convention, None,
+        align_arrays=False,
+        adjust_chunks={"chan": frequency.chunks[0]},
+        meta=np.empty((0,)*(2 + len(cdims)), dtype=out_dtype),
+        dtype=out_dtype)
+
+    if die1_jones is None and die2_jones is None:
+        return vis
+
+    # Apply direction independent effects
+    return apply_dies(time_index, antenna1, antenna2,
+                      die1_jones, vis, die2_jones,
+                      (False, False, False, True, True, True),
+                      out_dtype)
 
 
 def wsclean_spectrum_wrapper(flux, coeffs, log_poly, ref_freq, frequency):
@@ -460,15 +879,26 @@ def wsclean_spectrum_wrapper(flux, coeffs, log_poly, ref_freq, frequency):
 
 
 def wsclean_body_wrapper(uvw, lm, source_type, gauss_shape,
-                         frequency, spectrum, dtype_):
-    return wsclean_predict_body(uvw[0], lm[0], source_type,
-                                gauss_shape[0], frequency, spectrum,
-                                dtype_)[None, :]
+                         frequency, spectrum, dtype_, acc_dtype,
+                         recurrence, parallel):
+    real_dtype = np.finfo(dtype_).dtype
+    impl = (parallel_wsclean_predict_impl if parallel
+            else wsclean_predict_body)
+
+    return impl(uvw[0].astype(real_dtype),
+                lm[0].astype(real_dtype),
+                source_type,
+                gauss_shape[0].astype(real_dtype),
+                frequency.astype(real_dtype),
+                spectrum.astype(real_dtype),
+                dtype_, acc_dtype, recurrence)[None, :]
 
 
 @requires_optional('dask.array', opt_import_error)
 def wsclean_predict(uvw, lm, source_type, flux, coeffs,
-                    log_poly, ref_freq, gauss_shape, frequency):
+                    log_poly, ref_freq, gauss_shape, frequency,
+                    recurrence=False, dtype=None, double_accum=False,
+                    parallel=False):
     spectrum_dtype = np.result_type(*(a.dtype for a in (flux, coeffs,
                                                         log_poly, ref_freq,
                                                         frequency)))
@@ -481,8 +911,13 @@ def wsclean_predict(uvw, lm, source_type, flux, coeffs,
                             frequency, ("chan",),
                             dtype=spectrum_dtype)
 
-    out_dtype = np.result_type(uvw.dtype, lm.dtype, frequency.dtype,
-                               spectrum.dtype, np.complex64)
+    # Validate source types once up front
+    source_type = source_type.map_blocks(source_type_enum, dtype=np.int32)
+
+    arg_dtypes = tuple(a.dtype for a in (uvw, lm, flux, coeffs,
+                                         ref_freq, frequency))
+    out_dtype, _, acc_dtype = wsclean_dtypes(arg_dtypes, dtype=dtype,
+                                             double_accum=double_accum)
 
     vis = da.blockwise(wsclean_body_wrapper, ("source", "row", "chan", "corr"),
                        uvw, ("row", "uvw"),
@@ -492,6 +927,9 @@ def wsclean_predict(uvw, lm, source_type, flux, coeffs,
                        frequency, ("chan",),
                        spectrum, ("source", "chan"),
                        out_dtype, None,
+                       acc_dtype, None,
+                       recurrence, None,
+                       parallel, None,
                        adjust_chunks={"source": 1},
                        new_axes={"corr": 1},
                        dtype=out_dtype)
@@ -500,8 +938,14 @@ def wsclean_predict(uvw, lm, source_type, flux, coeffs,
 
 
 EXTRA_DASK_ARGS = """
-streams : {False, True}
+streams : {False, True} or int
     If ``True`` the coherencies are serially summed in a linear chain.
+    If an integer, the source chunks are partitioned into
+    ``streams`` linear chains which are summed in parallel
+    and then combined with a fan-in of ``streams``.
+    Peak memory is then bounded by roughly ``2*streams``
+    output blocks per row chunk, regardless of the number
+    of source chunks.
     If ``False``, dask uses a tree style reduction algorithm.
 """
 
@@ -572,7 +1016,25 @@ try:
                                 get_time_index=":code:`time.map_blocks("
                                                "lambda a: np.unique(a, "
                                                "return_inverse=True)[1])`",
-                                extra_args=EXTRA_DASK_ARGS,
+                                extra_args=(EXTRA_DASK_ARGS +
+                                            PARALLEL_ARGS.lstrip("\n")),
+                                extra_notes=EXTRA_DASK_NOTES)
+except AttributeError:
+    pass
+
+try:
+    fused_predict.__doc__ = FUSED_PREDICT_DOCS.substitute(
+                                array_type=":class:`dask.array.Array`",
+                                get_time_index=":code:`time.map_blocks("
+                                               "lambda a: np.unique(a, "
+                                               "return_inverse=True)[1])`",
+                                extra_notes=EXTRA_DASK_NOTES)
+except AttributeError:
+    pass
+
+try:
+    hybrid_predict.__doc__ = HYBRID_PREDICT_DOCS.substitute(
+                                array_type=":class:`dask.array.Array`",
                                 extra_notes=EXTRA_DASK_NOTES)
 except AttributeError:
     pass
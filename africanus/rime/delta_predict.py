@@ -0,0 +1,328 @@
+# -*- coding: utf-8 -*-
+
+from collections import namedtuple
+
+import numpy as np
+
+from africanus.rime.predict import predict_vis
+from africanus.rime.wsclean_predict import wsclean_predict
+
+
+ComponentDelta = namedtuple("ComponentDelta", ["added", "removed",
+                                               "changed", "old_changed",
+                                               "work_saved"])
+
+
+def _id_keys(ids, nsrc, name):
+    """ Converts component ids into a list of hashable keys """
+    if ids is None:
+        return list(range(nsrc))
+
+    ids = np.asarray(ids)
+
+    if ids.shape[0] != nsrc:
+        raise ValueError("%s.shape[0] (%d) does not match the "
+                         "number of components (%d)"
+                         % (name, ids.shape[0], nsrc))
+
+    return [tuple(r) for r in ids.reshape(nsrc, -1).tolist()]
+
+
+def _nsrc(model, name):
+    sizes = set(a.shape[0] for a in model if a is not None)
+
+    if len(sizes) != 1:
+        raise ValueError("Components of %s have mismatched "
+                         "source dimensions %s" % (name, sizes))
+
+    return sizes.pop()
+
+
+def component_delta(old_model, new_model, old_ids=None, new_ids=None):
+    """
+    Compares two component lists and determines which
+    components were added, removed and changed.
+
+    Components are identified by ``old_ids`` and ``new_ids``,
+    or by their position in the component list if these are ``None``.
+    A component is changed if it is present in both models,
+    but any of its parameters differ.
+
+    Parameters
+    ----------
+    old_model : tuple of :class:`numpy.ndarray`
+        Parameter arrays of the previous model,
+        each with a leading :code:`(source,)` dimension.
+        Elements may be ``None``.
+    new_model : tuple of :class:`numpy.ndarray`
+        Parameter arrays of the new model,
+        matching ``old_model``.
+    old_ids : :class:`numpy.ndarray`, optional
+        Unique identifiers of the previous components
+        of shape :code:`(source,)` or :code:`(source, ...)`.
+    new_ids : :class:`numpy.ndarray`, optional
+        Unique identifiers of the new components
+        of shape :code:`(source,)` or :code:`(source, ...)`.
+
+    Returns
+    -------
+    delta : :class:`ComponentDelta`
+        A namedtuple with the following fields:
+
+        - ``added``: Indices of added components in ``new_model``.
+        - ``removed``: Indices of removed components in ``old_model``.
+        - ``changed``: Indices of changed components in ``new_model``.
+        - ``old_changed``: Indices of changed components
+          in ``old_model``, aligned with ``changed``.
+        - ``work_saved``: Fraction of the component evaluations of a
+          full prediction of ``new_model`` that are avoided by
+          predicting the difference. Changed components are
+          evaluated twice, once in each model.
+    """
+    if len(old_model) != len(new_model):
+        raise ValueError("len(old_model) != len(new_model)")
+
+    for i, (o, n) in enumerate(zip(old_model, new_model)):
+        if (o is None) != (n is None):
+            raise ValueError("Component parameter %d is only "
+                             "present in one model" % i)
+
+    nold = _nsrc(old_model, "old_model")
+    nnew = _nsrc(new_model, "new_model")
+
+    old_keys = _id_keys(old_ids, nold, "old_ids")
+    new_keys = _id_keys(new_ids, nnew, "new_ids")
+
+    old_index = {k: i for i, k in enumerate(old_keys)}
+
+    if len(old_index) != nold or len(set(new_keys)) != nnew:
+        raise ValueError("Component ids must be unique")
+
+    added = []
+    new_common = []
+    old_common = []
+
+    for i, k in enumerate(new_keys):
+        try:
+            j = old_index.pop(k)
+        except KeyError:
+            added.append(i)
+        else:
+            new_common.append(i)
+            old_common.append(j)
+
+    removed = np.sort(np.fromiter(old_index.values(), dtype=np.intp,
+                                  count=len(old_index)))
+    added = np.asarray(added, dtype=np.intp)
+    new_common = np.asarray(new_common, dtype=np.intp)
+    old_common = np.asarray(old_common, dtype=np.intp)
+
+    # Compare the parameters of the common components
+    differs = np.zeros(new_common.shape[0], dtype=np.bool_)
+
+    for o, n in zip(old_model, new_model):
+        if o is None:
+            continue
+
+        o = np.asarray(o)[old_common].reshape(new_common.shape[0], -1)
+        n = np.asarray(n)[new_common].reshape(new_common.shape[0], -1)
+
+        if o.shape != n.shape:
+            raise ValueError("Component parameter shapes %s and %s "
+                             "do not match" % (o.shape, n.shape))
+
+        differs |= (o != n).any(axis=1)
+
+    changed = new_common[differs]
+    old_changed = old_common[differs]
+
+    work = added.shape[0] + removed.shape[0] + 2*changed.shape[0]
+    work_saved = 1.0 - work / nnew if nnew > 0 else 0.0
+
+    return ComponentDelta(added, removed, changed, old_changed,
+                          max(work_saved, 0.0))
+
+
+def _select(model, index):
+    return tuple(None if a is None else a[index] for a in model)
+
+
+def _full_predict(delta):
+    """ True if a full prediction requires less work """
+    return delta.work_saved == 0.0
+
+
+def delta_wsclean_predict(vis, uvw, frequency, old_model, new_model,
+                          old_ids=None, new_ids=None, **kwargs):
+    """
+    Updates model visibilities predicted by
+    :func:`~africanus.rime.wsclean_predict` from ``old_model``
+    so that they correspond to ``new_model``, in place.
+
+    Only added, removed and changed components are predicted:
+    the visibilities of the added components and new versions of
+    the changed components are added to ``vis``, while those of
+    the removed components and previous versions of the changed
+    components are subtracted.
+    If this would take more work than predicting ``new_model``,
+    ``vis`` is overwritten with a full prediction instead.
+
+    Parameters
+    ----------
+    vis : :class:`numpy.ndarray`
+        Model visibilities of ``old_model``
+        of shape :code:`(row, chan, 1)`. Updated in place.
+    uvw : :class:`numpy.ndarray`
+        UVW coordinates of shape :code:`(row, 3)`.
+    frequency : :class:`numpy.ndarray`
+        Frequencies of shape :code:`(chan,)`.
+    old_model : tuple of :class:`numpy.ndarray`
+        :code:`(lm, source_type, flux, coeffs, log_poly,
+        ref_freq, gauss_shape)` arguments of
+        :func:`~africanus.rime.wsclean_predict`
+        describing the previous model.
+    new_model : tuple of :class:`numpy.ndarray`
+        Arguments describing the new model, as in ``old_model``.
+    old_ids : :class:`numpy.ndarray`, optional
+        Unique identifiers of the previous components.
+        Defaults to the ``lm`` coordinates of ``old_model``.
+    new_ids : :class:`numpy.ndarray`, optional
+        Unique identifiers of the new components.
+        Defaults to the ``lm`` coordinates of ``new_model``.
+    **kwargs : optional
+        Keyword arguments passed to
+        :func:`~africanus.rime.wsclean_predict`.
+
+    Returns
+    -------
+    delta : :class:`ComponentDelta`
+        Describes the component differences and
+        the fraction of work saved.
+    """
+    if len(old_model) != 7 or len(new_model) != 7:
+        raise ValueError("Models must contain (lm, source_type, flux, "
+                         "coeffs, log_poly, ref_freq, gauss_shape)")
+
+    delta = component_delta(old_model, new_model,
+                            old_model[0] if old_ids is None else old_ids,
+                            new_model[0] if new_ids is None else new_ids)
+
+    if _full_predict(delta):
+        vis[:] = wsclean_predict(uvw, *new_model, frequency, **kwargs)
+        return delta
+
+    add = np.concatenate([delta.added, delta.changed])
+    sub = np.concatenate([delta.removed, delta.old_changed])
+
+    if add.shape[0] > 0:
+        vis += wsclean_predict(uvw, *_select(new_model, add),
+                               frequency, **kwargs)
+
+    if sub.shape[0] > 0:
+        vis -= wsclean_predict(uvw, *_select(old_model, sub),
+                               frequency, **kwargs)
+
+    return delta
+
+
+def delta_predict_vis(vis, time_index, antenna1, antenna2,
+                      old_model, new_model,
+                      die1_jones=None, die2_jones=None,
+                      old_ids=None, new_ids=None,
+                      parallel=False):
+    """
+    Updates model visibilities predicted by
+    :func:`~africanus.rime.predict_vis` from ``old_model``
+    so that they correspond to ``new_model``, in place.
+
+    The coherencies of the added components and new versions of
+    the changed components are summed, less those of the
+    removed components and previous versions of the changed
+    components. Direction-Independent Effects are applied
+    to this difference, which is then added to ``vis``.
+    If this would take more work than predicting ``new_model``,
+    ``vis`` is overwritten with a full prediction instead.
+
+    Parameters
+    ----------
+    vis : :class:`numpy.ndarray`
+        Model visibilities of ``old_model`` of
+        shape :code:`(row,chan,corr_1,corr_2)`. Updated in place.
+    time_index : :class:`numpy.ndarray`
+        Time index with shape :code:`(row,)`.
+    antenna1 : :class:`numpy.ndarray`
+        Antenna 1 index with shape :code:`(row,)`.
+    antenna2 : :class:`numpy.ndarray`
+        Antenna 2 index with shape :code:`(row,)`.
+    old_model : tuple of :class:`numpy.ndarray`
+        :code:`(dde1_jones, source_coh, dde2_jones)` arguments of
+        :func:`~africanus.rime.predict_vis` describing the previous
+        model. Elements may be ``None`` as in
+        :func:`~africanus.rime.predict_vis`.
+    new_model : tuple of :class:`numpy.ndarray`
+        Arguments describing the new model, as in ``old_model``.
+    die1_jones : :class:`numpy.ndarray`, optional
+        Direction-Independent Jones terms for the
+        first antenna of the baseline.
+    die2_jones : :class:`numpy.ndarray`, optional
+        Direction-Independent Jones terms for the
+        second antenna of the baseline.
+    old_ids : :class:`numpy.ndarray`, optional
+        Unique identifiers of the previous components.
+        Defaults to their position in ``old_model``.
+    new_ids : :class:`numpy.ndarray`, optional
+        Unique identifiers of the new components.
+        Defaults to their position in ``new_model``.
+    parallel : {False, True}
+        If ``True``, rows are distributed over numba threads.
+
+    Returns
+    -------
+    delta : :class:`ComponentDelta`
+        Describes the component differences and
+        the fraction of work saved.
+    """
+    if len(old_model) != 3 or len(new_model) != 3:
+        raise ValueError("Models must contain "
+                         "(dde1_jones, source_coh, dde2_jones)")
+
+    delta = component_delta(old_model, new_model, old_ids, new_ids)
+
+    if _full_predict(delta):
+        vis[:] = predict_vis(time_index, antenna1, antenna2,
+                             *new_model,
+                             die1_jones=die1_jones,
+                             die2_jones=die2_jones,
+                             parallel=parallel)
+        return delta
+
+    add = np.concatenate([delta.added, delta.changed])
+    sub = np.concatenate([delta.removed, delta.old_changed])
+
+    if add.shape[0] == 0 and sub.shape[0] == 0:
+        return delta
+
+    diff = None
+
+    if sub.shape[0] > 0:
+        diff = predict_vis(time_index, antenna1, antenna2,
+                           *_select(old_model, sub),
+                           parallel=parallel)
+        np.negative(diff, out=diff)
+
+    if add.shape[0] > 0:
+        diff = predict_vis(time_index, antenna1, antenna2,
+                           *_select(new_model, add),
+                           base_vis=diff,
+                           parallel=parallel)
+
+    if die1_jones is not None or die2_jones is not None:
+        diff = predict_vis(time_index, antenna1, antenna2,
+                           die1_jones=die1_jones,
+                           base_vis=diff,
+                           die2_jones=die2_jones,
+                           parallel=parallel)
+
+    vis += diff
+
+    return delta
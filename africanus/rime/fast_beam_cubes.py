@@ -4,7 +4,7 @@ from functools import reduce
 
 import numpy as np
 from africanus.util.docs import DocstringTemplate
-from africanus.util.numba import njit
+from africanus.util.numba import njit, prange
 
 
 @njit(nogil=True, cache=True)
@@ -56,12 +56,79 @@ def freq_grid_interp(frequency, beam_freq_map):
 
 
 @njit(nogil=True, cache=True)
-def beam_cube_dde(beam, beam_lm_extents, beam_freq_map,
-                  lm, parallactic_angles, point_errors, antenna_scaling,
-                  frequency):
+def antenna_cases(parallactic_angles, point_errors, antenna_scaling,
+                  pa_tolerance=0.0):
+    """
+    Groups the antennas of each timestep into cases with
+    identical beam inputs. Antennas belong to the same case if their
+    pointing errors and antenna scaling are identical and their
+    parallactic angles differ by at most ``pa_tolerance`` radians
+    from those of the first antenna of the case.
 
-    nsrc = lm.shape[0]
+    Parameters
+    ----------
+    parallactic_angles : :class:`numpy.ndarray`
+        Parallactic angles of shape :code:`(time, ant)`.
+    point_errors : :class:`numpy.ndarray`
+        Pointing errors of shape :code:`(time, ant, chan, 2)`.
+    antenna_scaling : :class:`numpy.ndarray`
+        Antenna scaling factors of shape :code:`(ant, chan, 2)`
+    pa_tolerance : float, optional
+        Parallactic angle tolerance in radians.
+
+    Returns
+    -------
+    case_map : :class:`numpy.ndarray`
+        Case of each timestep and antenna of shape :code:`(time, ant)`.
+    case_ta : :class:`numpy.ndarray`
+        The timestep and antenna of the first antenna
+        of each case, of shape :code:`(case, 2)`.
+    """
     ntime, nants = parallactic_angles.shape
+    case_map = np.empty((ntime, nants), dtype=np.intp)
+    case_ta = np.empty((ntime * nants, 2), dtype=np.intp)
+    ncase = 0
+
+    for t in range(ntime):
+        tcase_start = ncase
+
+        for a in range(nants):
+            pa = parallactic_angles[t, a]
+            found = False
+
+            # Search the cases of this timestep
+            for c in range(tcase_start, ncase):
+                ca = case_ta[c, 1]
+
+                if abs(pa - parallactic_angles[t, ca]) > pa_tolerance:
+                    continue
+
+                if not np.all(point_errors[t, a] == point_errors[t, ca]):
+                    continue
+
+                if not np.all(antenna_scaling[a] == antenna_scaling[ca]):
+                    continue
+
+                case_map[t, a] = c
+                found = True
+                break
+
+            if not found:
+                case_ta[ncase, 0] = t
+                case_ta[ncase, 1] = a
+                case_map[t, a] = ncase
+                ncase += 1
+
+    return case_map, case_ta[:ncase]
+
+
+@njit(nogil=True, inline='always')
+def _beam_cube_body(beam, beam_lm_extents, beam_freq_map,
+                    lm, parallactic_angles, point_errors, antenna_scaling,
+                    frequency, case_ta):
+
+    nsrc = lm.shape[0]
+    ncase = case_ta.shape[0]
     nchan = frequency.shape[0]
     beam_lw, beam_mh, beam_nud = beam.shape[:3]
     corrs = beam.shape[3:]
@@ -93,146 +160,323 @@ def beam_cube_dde(beam, beam_lm_extents, beam_freq_map,
     fbeam = beam.reshape((beam_lw, beam_mh, beam_nud, ncorrs))
 
     # Allocate output array with correlations flattened
-    fjones = np.empty((nsrc, ntime, nants, nchan, ncorrs), dtype=beam.dtype)
+    fjones = np.empty((nsrc, ncase, nchan, ncorrs), dtype=beam.dtype)
 
     # Compute frequency interpolation stuff
     freq_data = freq_grid_interp(frequency, beam_freq_map)
 
-    corr_sum = np.zeros((ncorrs,), dtype=beam.dtype)
-    absc_sum = np.zeros((ncorrs,), dtype=beam.real.dtype)
-    beam_scratch = np.zeros((ncorrs,), dtype=beam.dtype)
+    # Distribute each case and source over threads
+    for i in prange(ncase * nsrc):
+        ci = i // nsrc
+        s = i - ci * nsrc
+        t = case_ta[ci, 0]
+        a = case_ta[ci, 1]
+
+        sin_pa = np.sin(parallactic_angles[t, a])
+        cos_pa = np.cos(parallactic_angles[t, a])
+
+        # Extract lm coordinates
+        l = lm[s, 0]  # noqa
+        m = lm[s, 1]
+
+        for f in range(nchan):
+            # Unpack frequency data
+            freq_scale = freq_data[f, 0]
+            # lower and upper frequency weights
+            nud = freq_data[f, 1]
+            inv_nud = 1.0 - nud
+            # lower and upper frequency grid position
+            gc0 = np.int32(freq_data[f, 2])
+            gc1 = gc0 + 1
+
+            # Apply any frequency scaling
+            sl = l * freq_scale
+            sm = m * freq_scale
+
+            # Add pointing errors
+            tl = sl + point_errors[t, a, f, 0]
+            tm = sm + point_errors[t, a, f, 1]
+
+            # Rotate lm coordinate angle
+            vl = tl*cos_pa - tm*sin_pa
+            vm = tl*sin_pa + tm*cos_pa
+
+            # Scale by antenna scaling
+            vl *= antenna_scaling[a, f, 0]
+            vm *= antenna_scaling[a, f, 1]
+
+            # Shift into the cube coordinate system
+            vl = lscale*(vl - lower_l)
+            vm = mscale*(vm - lower_m)
+
+            # Clamp the coordinates to the edges of the cube
+            vl = max(zero, min(vl, lmaxf))
+            vm = max(zero, min(vm, mmaxf))
+
+            # Snap to the lower grid coordinates
+            gl0 = np.int32(np.floor(vl))
+            gm0 = np.int32(np.floor(vm))
+
+            # Snap to the upper grid coordinates
+            gl1 = min(gl0 + 1, lmaxi)
+            gm1 = min(gm0 + 1, mmaxi)
+
+            # Difference between grid and offset coordinates
+            ld = vl - gl0
+            md = vm - gm0
+
+            # Weights of the lower and upper cube corners
+            w000 = (one - ld)*(one - md)*nud
+            w100 = ld*(one - md)*nud
+            w010 = (one - ld)*md*nud
+            w110 = ld*md*nud
+            w001 = (one - ld)*(one - md)*inv_nud
+            w101 = ld*(one - md)*inv_nud
+            w011 = (one - ld)*md*inv_nud
+            w111 = ld*md*inv_nud
+
+            for c in range(ncorrs):
+                b000 = fbeam[gl0, gm0, gc0, c]
+                b100 = fbeam[gl1, gm0, gc0, c]
+                b010 = fbeam[gl0, gm1, gc0, c]
+                b110 = fbeam[gl1, gm1, gc0, c]
+                b001 = fbeam[gl0, gm0, gc1, c]
+                b101 = fbeam[gl1, gm0, gc1, c]
+                b011 = fbeam[gl0, gm1, gc1, c]
+                b111 = fbeam[gl1, gm1, gc1, c]
+
+                corr_sum = (w000*b000 + w100*b100 + w010*b010 + w110*b110 +
+                            w001*b001 + w101*b101 + w011*b011 + w111*b111)
+
+                absc_sum = (w000*np.abs(b000) + w100*np.abs(b100) +
+                            w010*np.abs(b010) + w110*np.abs(b110) +
+                            w001*np.abs(b001) + w101*np.abs(b101) +
+                            w011*np.abs(b011) + w111*np.abs(b111))
+
+                # Added all correlations, normalise
+                div = np.abs(corr_sum)
+
+                if div == 0.0:
+                    # This case probably works out to a zero assign
+                    corr_sum *= absc_sum
+                else:
+                    corr_sum *= absc_sum / div
+
+                # Assign normalised values
+                fjones[s, ci, f, c] = corr_sum
+
+    return fjones
+
+
+@njit(nogil=True, cache=True)
+def beam_cube_cases(beam, beam_lm_extents, beam_freq_map,
+                    lm, parallactic_angles, point_errors, antenna_scaling,
+                    frequency, case_ta):
+    """
+    Evaluates the beam for each timestep and antenna case in ``case_ta``,
+    producing an array of shape :code:`(source, case, chan, ncorrs)`
+    with flattened correlations.
+    """
+    return _beam_cube_body(beam, beam_lm_extents, beam_freq_map,
+                           lm, parallactic_angles, point_errors,
+                           antenna_scaling, frequency, case_ta)
+
+
+@njit(nogil=True, cache=True, parallel=True)
+def parallel_beam_cube_cases(beam, beam_lm_extents, beam_freq_map,
+                             lm, parallactic_angles, point_errors,
+                             antenna_scaling, frequency, case_ta):
+    return _beam_cube_body(beam, beam_lm_extents, beam_freq_map,
+                           lm, parallactic_angles, point_errors,
+                           antenna_scaling, frequency, case_ta)
+
+
+@njit(nogil=True, inline='always')
+def _wrap_angle(angle):
+    """ Wraps ``angle`` into :math:`[-\\pi, \\pi)` """
+    return (angle + np.pi) % (2*np.pi) - np.pi
+
+
+@njit(nogil=True, cache=True)
+def pa_sample_times(parallactic_angles, pa_step):
+    """
+    Selects the timesteps at which the beam is evaluated, such
+    that the parallactic angle of every antenna changes by at most
+    ``pa_step`` radians between consecutive selected timesteps.
+    The first and last timesteps are always selected.
+
+    Parameters
+    ----------
+    parallactic_angles : :class:`numpy.ndarray`
+        Parallactic angles of shape :code:`(time, ant)`.
+    pa_step : float
+        Maximum parallactic angle change in radians.
+
+    Returns
+    -------
+    samples : :class:`numpy.ndarray`
+        Increasing indices of the selected timesteps.
+    """
+    ntime, nants = parallactic_angles.shape
+    samples = np.empty(ntime, dtype=np.intp)
+
+    if ntime == 0:
+        return samples
+
+    samples[0] = 0
+    last = 0
+    nsamples = 1
+
+    for t in range(1, ntime):
+        change = 0.0
 
-    for t in range(ntime):
         for a in range(nants):
-            sin_pa = np.sin(parallactic_angles[t, a])
-            cos_pa = np.cos(parallactic_angles[t, a])
+            d = _wrap_angle(parallactic_angles[t, a] -
+                            parallactic_angles[last, a])
+            change = max(change, abs(d))
 
-            for s in range(nsrc):
-                # Extract lm coordinates
-                l, m = lm[s]
+        if change <= pa_step:
+            continue
 
-                for f in range(nchan):
-                    # Unpack frequency data
-                    freq_scale = freq_data[f, 0]
-                    # lower and upper frequency weights
-                    nud = freq_data[f, 1]
-                    inv_nud = 1.0 - nud
-                    # lower and upper frequency grid position
-                    gc0 = np.int32(freq_data[f, 2])
-                    gc1 = gc0 + 1
-
-                    # Apply any frequency scaling
-                    sl = l * freq_scale
-                    sm = m * freq_scale
-
-                    # Add pointing errors
-                    tl = sl + point_errors[t, a, f, 0]
-                    tm = sm + point_errors[t, a, f, 1]
-
-                    # Rotate lm coordinate angle
-                    vl = tl*cos_pa - tm*sin_pa
-                    vm = tl*sin_pa + tm*cos_pa
-
-                    # Scale by antenna scaling
-                    vl *= antenna_scaling[a, f, 0]
-                    vm *= antenna_scaling[a, f, 1]
-
-                    # Shift into the cube coordinate system
-                    vl = lscale*(vl - lower_l)
-                    vm = mscale*(vm - lower_m)
-
-                    # Clamp the coordinates to the edges of the cube
-                    vl = max(zero, min(vl, lmaxf))
-                    vm = max(zero, min(vm, mmaxf))
-
-                    # Snap to the lower grid coordinates
-                    gl0 = np.int32(np.floor(vl))
-                    gm0 = np.int32(np.floor(vm))
-
-                    # Snap to the upper grid coordinates
-                    gl1 = min(gl0 + 1, lmaxi)
-                    gm1 = min(gm0 + 1, mmaxi)
-
-                    # Difference between grid and offset coordinates
-                    ld = vl - gl0
-                    md = vm - gm0
-
-                    # Zero accumulation arrays
-                    corr_sum[:] = 0
-                    absc_sum[:] = 0
-
-                    # Accumulate lower cube correlations
-                    beam_scratch[:] = fbeam[gl0, gm0, gc0, :]
-                    weight = (one - ld)*(one - md)*nud
+        # Select the previous timestep if it isn't
+        # already selected, otherwise this one
+        last = t - 1 if t - 1 > last else t
+        samples[nsamples] = last
+        nsamples += 1
 
-                    for c in range(ncorrs):
-                        absc_sum[c] += weight * np.abs(beam_scratch[c])
-                        corr_sum[c] += weight * beam_scratch[c]
+        # The previous timestep may still be too far from this one
+        if last == t - 1:
+            change = 0.0
 
-                    beam_scratch[:] = fbeam[gl1, gm0, gc0, :]
-                    weight = ld*(one - md)*nud
+            for a in range(nants):
+                d = _wrap_angle(parallactic_angles[t, a] -
+                                parallactic_angles[last, a])
+                change = max(change, abs(d))
 
-                    for c in range(ncorrs):
-                        absc_sum[c] += weight * np.abs(beam_scratch[c])
-                        corr_sum[c] += weight * beam_scratch[c]
+            if change > pa_step:
+                last = t
+                samples[nsamples] = last
+                nsamples += 1
 
-                    beam_scratch[:] = fbeam[gl0, gm1, gc0, :]
-                    weight = (one - ld)*md*nud
+    if last != ntime - 1:
+        samples[nsamples] = ntime - 1
+        nsamples += 1
 
-                    for c in range(ncorrs):
-                        absc_sum[c] += weight * np.abs(beam_scratch[c])
-                        corr_sum[c] += weight * beam_scratch[c]
+    return samples[:nsamples]
 
-                    beam_scratch[:] = fbeam[gl1, gm1, gc0, :]
-                    weight = ld*md*nud
 
-                    for c in range(ncorrs):
-                        absc_sum[c] += weight * np.abs(beam_scratch[c])
-                        corr_sum[c] += weight * beam_scratch[c]
+@njit(nogil=True, inline='always')
+def _pa_interpolate_body(coarse_jones, samples, parallactic_angles):
+    nsrc, nsamples, nants, nchan, ncorrs = coarse_jones.shape
+    ntime = parallactic_angles.shape[0]
+    fjones = np.empty((nsrc, ntime, nants, nchan, ncorrs),
+                      dtype=coarse_jones.dtype)
 
-                    # Accumulate upper cube correlations
-                    beam_scratch[:] = fbeam[gl0, gm0, gc1, :]
-                    weight = (one - ld)*(one - md)*inv_nud
+    for t in prange(ntime):
+        # Find the bracketing samples
+        i1 = np.searchsorted(samples, t)
 
-                    for c in range(ncorrs):
-                        absc_sum[c] += weight * np.abs(beam_scratch[c])
-                        corr_sum[c] += weight * beam_scratch[c]
+        if samples[i1] == t:
+            fjones[:, t] = coarse_jones[:, i1]
+            continue
 
-                    beam_scratch[:] = fbeam[gl1, gm0, gc1, :]
-                    weight = ld*(one - md)*inv_nud
+        i0 = i1 - 1
+        t0 = samples[i0]
+        t1 = samples[i1]
 
+        for a in range(nants):
+            d01 = _wrap_angle(parallactic_angles[t1, a] -
+                              parallactic_angles[t0, a])
+            d0t = _wrap_angle(parallactic_angles[t, a] -
+                              parallactic_angles[t0, a])
+
+            # Interpolate in parallactic angle,
+            # or time if the angle is stationary
+            if abs(d01) > 0.0:
+                w = max(0.0, min(d0t / d01, 1.0))
+            else:
+                w = (t - t0) / (t1 - t0)
+
+            for s in range(nsrc):
+                for f in range(nchan):
                     for c in range(ncorrs):
-                        absc_sum[c] += weight * np.abs(beam_scratch[c])
-                        corr_sum[c] += weight * beam_scratch[c]
+                        fjones[s, t, a, f, c] = (
+                            (1.0 - w)*coarse_jones[s, i0, a, f, c] +
+                            w*coarse_jones[s, i1, a, f, c])
 
-                    beam_scratch[:] = fbeam[gl0, gm1, gc1, :]
-                    weight = (one - ld)*md*inv_nud
+    return fjones
 
-                    for c in range(ncorrs):
-                        absc_sum[c] += weight * np.abs(beam_scratch[c])
-                        corr_sum[c] += weight * beam_scratch[c]
 
-                    beam_scratch[:] = fbeam[gl1, gm1, gc1, :]
-                    weight = ld*md*inv_nud
+@njit(nogil=True, cache=True)
+def pa_interpolate(coarse_jones, samples, parallactic_angles):
+    """
+    Linearly interpolates Jones terms of shape
+    :code:`(source, sample, ant, chan, ncorrs)`, evaluated at the
+    ``samples`` timesteps, onto every timestep of
+    ``parallactic_angles``, producing an array of shape
+    :code:`(source, time, ant, chan, ncorrs)`.
+    """
+    return _pa_interpolate_body(coarse_jones, samples, parallactic_angles)
 
-                    for c in range(ncorrs):
-                        absc_sum[c] += weight * np.abs(beam_scratch[c])
-                        corr_sum[c] += weight * beam_scratch[c]
 
-                    for c in range(ncorrs):
-                        # Added all correlations, normalise
-                        div = np.abs(corr_sum[c])
+@njit(nogil=True, cache=True, parallel=True)
+def parallel_pa_interpolate(coarse_jones, samples, parallactic_angles):
+    return _pa_interpolate_body(coarse_jones, samples, parallactic_angles)
 
-                        if div == 0.0:
-                            # This case probably works out to a zero assign
-                            corr_sum[c] *= absc_sum[c]
-                        else:
-                            corr_sum[c] *= absc_sum[c] / div
 
-                    # Assign normalised values
-                    fjones[s, t, a, f, :] = corr_sum
+def beam_cube_dde(beam, beam_lm_extents, beam_freq_map,
+                  lm, parallactic_angles, point_errors, antenna_scaling,
+                  frequency, parallel=False, antenna_dedup=False,
+                  pa_tolerance=0.0, broadcast=False, pa_step=None):
+
+    ntime, nants = parallactic_angles.shape
+    nsrc = lm.shape[0]
+    nchan = frequency.shape[0]
+    corrs = beam.shape[3:]
 
-    return fjones.reshape((nsrc, ntime, nants, nchan) + corrs)
+    if pa_step is not None:
+        # Evaluate the beam at a subset of timesteps
+        # and interpolate onto the remainder
+        samples = pa_sample_times(parallactic_angles, pa_step)
+        coarse_jones = beam_cube_dde(beam, beam_lm_extents, beam_freq_map,
+                                     lm, parallactic_angles[samples],
+                                     point_errors[samples],
+                                     antenna_scaling, frequency,
+                                     parallel=parallel,
+                                     antenna_dedup=antenna_dedup,
+                                     pa_tolerance=pa_tolerance)
+
+        coarse_jones = coarse_jones.reshape(coarse_jones.shape[:4] + (-1,))
+        fn = parallel_pa_interpolate if parallel else pa_interpolate
+        fjones = fn(coarse_jones, samples, parallactic_angles)
+
+        return fjones.reshape((nsrc, ntime, nants, nchan) + corrs)
+
+    if antenna_dedup:
+        case_map, case_ta = antenna_cases(parallactic_angles, point_errors,
+                                          antenna_scaling, pa_tolerance)
+    else:
+        case_map = None
+        t, a = np.divmod(np.arange(ntime * nants), nants)
+        case_ta = np.stack([t, a], axis=1)
+
+    fn = parallel_beam_cube_cases if parallel else beam_cube_cases
+    fjones = fn(beam, beam_lm_extents, beam_freq_map,
+                lm, parallactic_angles, point_errors, antenna_scaling,
+                frequency, case_ta)
+
+    shape = (nsrc, ntime, nants, nchan) + corrs
+
+    if case_map is None:
+        # Cases are ordered by timestep and antenna
+        return fjones.reshape(shape)
+
+    if broadcast and case_ta.shape[0] == ntime:
+        # A single case per timestep, ordered by timestep
+        fjones = fjones.reshape((nsrc, ntime, 1, nchan) + corrs)
+        return np.broadcast_to(fjones, shape)
+
+    return fjones[:, case_map].reshape(shape)
 
 
 BEAM_CUBE_DOCS = DocstringTemplate(
@@ -278,6 +522,7 @@ BEAM_CUBE_DOCS = DocstringTemplate(
         Antenna scaling factors of shape :code:`(ant, chan, 2)`
     frequency : $(array_type)
         Frequencies of shape :code:`(chan,)`.
+    $(extra_args)
 
     Returns
     -------
@@ -286,9 +531,42 @@ BEAM_CUBE_DOCS = DocstringTemplate(
         :code:`(source, time, ant, chan, corr, corr)`
     """)
 
+BEAM_CUBE_EXTRA_ARGS = """parallel : {False, True}
+        If ``True``, sources and antennas are
+        distributed over numba threads.
+    antenna_dedup : {False, True}
+        If ``True``, the beam is evaluated once for each group of
+        antennas with identical beam inputs at a timestep.
+        This is effective for homogeneous arrays without
+        pointing errors or per-antenna scaling.
+    pa_tolerance : float, optional
+        Parallactic angle tolerance in radians
+        within which antennas are grouped when
+        ``antenna_dedup`` is set. Defaults to zero.
+    broadcast : {False, True}
+        If ``True`` and ``antenna_dedup`` finds a single group of
+        antennas at each timestep, a read-only zero-copy view
+        that broadcasts the beam over the antenna
+        dimension is returned.
+        Ignored if ``pa_step`` is set.
+    pa_step : float, optional
+        If set, the beam is only evaluated at timesteps between which
+        the parallactic angle of any antenna changes by at most
+        ``pa_step`` radians, and the complex Jones terms are
+        linearly interpolated in parallactic angle onto the
+        remaining timesteps.
+        Pointing errors are therefore only applied at the
+        selected timesteps.
+        The interpolation error is second order in ``pa_step``
+        and ``pa_step`` should be chosen so that the rotation of the
+        outermost source over ``pa_step`` is a small fraction
+        of a beam cube pixel.
+"""
+
 
 try:
     beam_cube_dde.__doc__ = BEAM_CUBE_DOCS.substitute(
-                                array_type=":class:`numpy.ndarray`")
+                                array_type=":class:`numpy.ndarray`",
+                                extra_args=BEAM_CUBE_EXTRA_ARGS)
 except AttributeError:
     pass
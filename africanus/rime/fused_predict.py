@@ -0,0 +1,422 @@
+# -*- coding: utf-8 -*-
+
+
+import numpy as np
+
+from africanus.constants import minus_two_pi_over_c, c as lightspeed
+from africanus.rime.predict import (JONES_NOT_PRESENT, JONES_1_OR_2,
+                                    JONES_2X2, _get_jones_types,
+                                    jones_mul_factory, apply_dies_factory)
+from africanus.util.docs import DocstringTemplate
+from africanus.util.numba import is_numba_type_none, generated_jit, njit
+
+
+# https://en.wikipedia.org/wiki/Full_width_at_half_maximum
+fwhm = 2.0 * np.sqrt(2.0 * np.log(2.0))
+fwhminv = 1.0 / fwhm
+gauss_scale = fwhminv * np.sqrt(2.0) * np.pi / lightspeed
+
+
+def shape_factory(have_gauss):
+    """
+    Factory function returning functions that compute
+    the (optional) gaussian shape term of each source
+    """
+    if have_gauss:
+        def shape_params(gauss_shape, nsrc, dtype):
+            params = np.empty((nsrc, 3), dtype=dtype)
+
+            for s in range(nsrc):
+                emaj, emin, angle = gauss_shape[s]
+
+                # Convert to l-projection, m-projection, ratio
+                params[s, 0] = emaj * np.sin(angle)
+                params[s, 1] = emaj * np.cos(angle)
+                params[s, 2] = emin / (1.0 if emaj == 0.0 else emaj)
+
+            return params
+
+        def shape_uv(params, s, u, v):
+            el = params[s, 0]
+            em = params[s, 1]
+            er = params[s, 2]
+
+            return (u*em - v*el)*er, u*el + v*em
+
+        def shape_fn(u1, v1, scaled_freq):
+            fu1 = u1*scaled_freq
+            fv1 = v1*scaled_freq
+            return np.exp(-(fu1*fu1 + fv1*fv1))
+    else:
+        def shape_params(gauss_shape, nsrc, dtype):
+            return np.empty((0, 3), dtype=dtype)
+
+        def shape_uv(params, s, u, v):
+            return u, v
+
+        def shape_fn(u1, v1, scaled_freq):
+            return 1.0
+
+    return (njit(nogil=True, inline='always')(shape_params),
+            njit(nogil=True, inline='always')(shape_uv),
+            njit(nogil=True, inline='always')(shape_fn))
+
+
+def scale_brightness_factory(jones_type):
+    """
+    Factory function returning a function that multiplies a
+    source brightness matrix by a complex scalar,
+    writing the result into a coherency buffer
+    """
+    if jones_type == JONES_1_OR_2:
+        def scale_brightness(brightness, scalar, coh):
+            for c in range(coh.shape[0]):
+                coh[c] = brightness[c] * scalar
+    elif jones_type == JONES_2X2:
+        def scale_brightness(brightness, scalar, coh):
+            coh[0, 0] = brightness[0, 0] * scalar
+            coh[0, 1] = brightness[0, 1] * scalar
+            coh[1, 0] = brightness[1, 0] * scalar
+            coh[1, 1] = brightness[1, 1] * scalar
+    else:
+        raise ValueError("Invalid Jones Type %s" % jones_type)
+
+    return njit(nogil=True, inline='always')(scale_brightness)
+
+
+def accumulate_coh_factory(have_ddes, jones_type):
+    """
+    Factory function returning a function that accumulates
+    a source coherency, optionally multiplied by
+    Direction-Dependent Effects, into the output
+    """
+    jones_mul = jones_mul_factory(have_ddes, True, jones_type, True)
+
+    if have_ddes:
+        def accumulate_coh(dde1_jones, dde2_jones, s, ti, a1, a2, f,
+                           coh, out):
+            jones_mul(dde1_jones[s, ti, a1, f], coh,
+                      dde2_jones[s, ti, a2, f], out)
+    else:
+        def accumulate_coh(dde1_jones, dde2_jones, s, ti, a1, a2, f,
+                           coh, out):
+            jones_mul(coh, out)
+
+    return njit(nogil=True, inline='always')(accumulate_coh)
+
+
+def fused_predict_checks(time_index, antenna1, antenna2,
+                         lm, uvw, frequency, brightness,
+                         gauss_shape, dde1_jones, dde2_jones,
+                         die1_jones, die2_jones,
+                         none_check):
+
+    have_gauss = none_check(gauss_shape)
+    have_ddes1 = none_check(dde1_jones)
+    have_ddes2 = none_check(dde2_jones)
+    have_dies1 = none_check(die1_jones)
+    have_dies2 = none_check(die2_jones)
+
+    if time_index.ndim != 1:
+        raise ValueError("time_index.ndim != 1")
+
+    if antenna1.ndim != 1:
+        raise ValueError("antenna1.ndim != 1")
+
+    if antenna2.ndim != 1:
+        raise ValueError("antenna2.ndim != 1")
+
+    if lm.ndim != 2:
+        raise ValueError("lm.ndim != 2")
+
+    if uvw.ndim != 2:
+        raise ValueError("uvw.ndim != 2")
+
+    if frequency.ndim != 1:
+        raise ValueError("frequency.ndim != 1")
+
+    if brightness.ndim not in (3, 4):
+        raise ValueError("brightness.ndim %d not in (3, 4)" % brightness.ndim)
+
+    if have_gauss and gauss_shape.ndim != 2:
+        raise ValueError("gauss_shape.ndim != 2")
+
+    if have_ddes1 ^ have_ddes2:
+        raise ValueError("Both dde1_jones and dde2_jones "
+                         "must be present or absent")
+
+    if have_dies1 ^ have_dies2:
+        raise ValueError("Both die1_jones and die2_jones "
+                         "must be present or absent")
+
+    have_ddes = have_ddes1 and have_ddes2
+    have_dies = have_dies1 and have_dies2
+
+    if have_ddes and dde1_jones.ndim != brightness.ndim + 2:
+        raise ValueError("dde{1,2}_jones.ndim != brightness.ndim + 2")
+
+    if have_ddes and dde1_jones.ndim != dde2_jones.ndim:
+        raise ValueError("dde1_jones.ndim != dde2_jones.ndim")
+
+    if have_dies and die1_jones.ndim != brightness.ndim + 1:
+        raise ValueError("die{1,2}_jones.ndim != brightness.ndim + 1")
+
+    if have_dies and die1_jones.ndim != die2_jones.ndim:
+        raise ValueError("die1_jones.ndim != die2_jones.ndim")
+
+    return have_gauss, have_ddes, have_dies
+
+
+@generated_jit(nopython=True, nogil=True, cache=True)
+def fused_predict(time_index, antenna1, antenna2,
+                  lm, uvw, frequency, brightness,
+                  gauss_shape=None,
+                  dde1_jones=None, dde2_jones=None,
+                  die1_jones=None, die2_jones=None,
+                  convention='fourier'):
+
+    have_gauss, have_ddes, have_dies = fused_predict_checks(
+                                    time_index, antenna1, antenna2,
+                                    lm, uvw, frequency, brightness,
+                                    gauss_shape, dde1_jones, dde2_jones,
+                                    die1_jones, die2_jones,
+                                    lambda x: not is_numba_type_none(x))
+
+    jones_types = [
+        _get_jones_types("brightness", brightness, 3, 4),
+        _get_jones_types("dde1_jones", dde1_jones, 5, 6),
+        _get_jones_types("dde2_jones", dde2_jones, 5, 6),
+        _get_jones_types("die1_jones", die1_jones, 4, 5),
+        _get_jones_types("die2_jones", die2_jones, 4, 5)]
+
+    ptypes = [t for t in jones_types if t != JONES_NOT_PRESENT]
+
+    if not all(ptypes[0] == p for p in ptypes[1:]):
+        raise ValueError("Jones Matrix Correlations were mismatched")
+
+    jones_type = ptypes[0]
+
+    # Infer the output dtype
+    dtype_arrays = (lm, uvw, frequency, brightness,
+                    dde1_jones, dde2_jones, die1_jones, die2_jones)
+
+    out_dtype = np.result_type(np.complex64,
+                               *(np.dtype(a.dtype.name)
+                                 for a in dtype_arrays
+                                 if not is_numba_type_none(a)))
+
+    real_dtype = np.result_type(*(np.dtype(a.dtype.name)
+                                  for a in (lm, uvw, frequency)))
+
+    # Bake constants in with the correct type
+    one = lm.dtype(1.0)
+    neg_two_pi_over_c = lm.dtype(minus_two_pi_over_c)
+    gscale = frequency.dtype(gauss_scale)
+
+    shape_params_fn, shape_uv_fn, shape_fn = shape_factory(have_gauss)
+    scale_brightness_fn = scale_brightness_factory(jones_type)
+    accumulate_coh_fn = accumulate_coh_factory(have_ddes, jones_type)
+    apply_dies_fn = apply_dies_factory(have_dies, True, jones_type)
+
+    def impl(time_index, antenna1, antenna2,
+             lm, uvw, frequency, brightness,
+             gauss_shape=None,
+             dde1_jones=None, dde2_jones=None,
+             die1_jones=None, die2_jones=None,
+             convention='fourier'):
+
+        if convention == 'fourier':
+            constant = neg_two_pi_over_c
+        elif convention == 'casa':
+            constant = -neg_two_pi_over_c
+        else:
+            raise ValueError("convention not in ('fourier', 'casa')")
+
+        nsrc = lm.shape[0]
+        nrow = uvw.shape[0]
+        nchan = frequency.shape[0]
+
+        if brightness.shape[0] != nsrc:
+            raise ValueError("brightness.shape[0] != lm.shape[0]")
+
+        if brightness.shape[1] != nchan:
+            raise ValueError("brightness.shape[1] != frequency.shape[0]")
+
+        if time_index.shape[0] != nrow:
+            raise ValueError("time_index.shape[0] != uvw.shape[0]")
+
+        corrs = brightness.shape[2:]
+        out = np.zeros((nrow, nchan) + corrs, dtype=out_dtype)
+
+        # Holds the coherency of a single source, row and channel
+        coh = np.empty(corrs, dtype=out_dtype)
+
+        scaled_freq = np.empty_like(frequency)
+
+        for f in range(nchan):
+            scaled_freq[f] = frequency[f] * gscale
+
+        # Precompute per-source lmn and shape parameters
+        n = np.empty(nsrc, dtype=lm.dtype)
+
+        for s in range(nsrc):
+            l = lm[s, 0]  # noqa
+            m = lm[s, 1]
+            n[s] = np.sqrt(one - l**2 - m**2) - one
+
+        shape_params = shape_params_fn(gauss_shape, nsrc, real_dtype)
+
+        # Minimum time index, used to normalise within function
+        tmin = time_index.min()
+
+        for r in range(nrow):
+            u = uvw[r, 0]
+            v = uvw[r, 1]
+            w = uvw[r, 2]
+            ti = time_index[r] - tmin
+            a1 = antenna1[r]
+            a2 = antenna2[r]
+
+            for s in range(nsrc):
+                real_phase = constant * (lm[s, 0] * u +
+                                         lm[s, 1] * v +
+                                         n[s] * w)
+
+                u1, v1 = shape_uv_fn(shape_params, s, u, v)
+
+                for f in range(nchan):
+                    p = real_phase * frequency[f]
+                    shape = shape_fn(u1, v1, scaled_freq[f])
+                    # Our phase is purely imaginary so we
+                    # can elide a call to exp
+                    kb = (np.cos(p) + np.sin(p)*1j) * shape
+
+                    scale_brightness_fn(brightness[s, f], kb, coh)
+                    accumulate_coh_fn(dde1_jones, dde2_jones,
+                                      s, ti, a1, a2, f,
+                                      coh, out[r, f])
+
+        # Apply direction independent effects, if any
+        apply_dies_fn(time_index, antenna1, antenna2,
+                      die1_jones, die2_jones,
+                      None, None,
+                      tmin, out)
+
+        return out
+
+    return impl
+
+
+FUSED_PREDICT_DOCS = DocstringTemplate(r"""
+Computes model visibilities directly from a sky model
+in a single pass, according to the following formula:
+
+.. math::
+
+
+    V_{pq} = G_{p} \left(
+        \sum_{s} E_{ps} K_{pqs} S_{pqs} B_{s} E_{qs}^H
+        \right) G_{q}^H
+
+where for antenna :math:`p` and :math:`q`, and source :math:`s`:
+
+- :math:`K_{pqs}` represents the phase delay term,
+  as computed by :func:`~africanus.rime.phase_delay`.
+- :math:`S_{pqs}` represents the (optional) gaussian shape term,
+  as computed by :func:`~africanus.model.shape.gaussian`.
+- :math:`B_{s}` represents the source brightness matrix.
+- :math:`E_{ps}` represents Direction-Dependent Jones terms.
+- :math:`G_{p}` represents Direction-Independent Jones terms.
+
+Unlike :func:`~africanus.rime.predict_vis`, the per-source
+coherencies are computed on the fly and accumulated directly into the
+output visibilities. A :code:`(source, row, chan, corr_1, corr_2)`
+coherency array is never formed, so that memory usage
+scales with the size of the output visibilities, rather than with
+the number of sources.
+
+Notes
+-----
+* The ``row`` dimension must be an increasing partial order in time.
+* ``brightness`` should already incorporate any spectral model.
+  For example, it can be obtained by passing the output of
+  :func:`~africanus.model.spectral.spectral_model` to
+  :func:`~africanus.model.coherency.convert`.
+* Point and gaussian sources may be mixed by setting the major
+  and minor axes of point sources to zero in ``gauss_shape``.
+* Direction-Dependent terms (dde{1,2}_jones) and
+  Independent (die{1,2}_jones) are optional,
+  but if one is present, the other must be present.
+$(extra_notes)
+
+Parameters
+----------
+time_index : $(array_type)
+    Time index used to look up the antenna Jones index
+    for a particular baseline with shape :code:`(row,)`.
+    Obtainable via $(get_time_index).
+antenna1 : $(array_type)
+    Antenna 1 index used to look up the antenna Jones
+    for a particular baseline.
+    with shape :code:`(row,)`.
+antenna2 : $(array_type)
+    Antenna 2 index used to look up the antenna Jones
+    for a particular baseline.
+    with shape :code:`(row,)`.
+lm : $(array_type)
+    LM coordinates of shape :code:`(source, 2)` with
+    L and M components in the last dimension.
+uvw : $(array_type)
+    UVW coordinates of shape :code:`(row, 3)` with
+    U, V and W components in the last dimension.
+frequency : $(array_type)
+    frequencies of shape :code:`(chan,)`
+brightness : $(array_type)
+    :math:`B_{s}` source brightness matrix of shape
+    :code:`(source,chan,corr_1,corr_2)`.
+gauss_shape : $(array_type), optional
+    Gaussian Shape Parameters of shape :code:`(source, 3)`
+    where the second dimension contains the
+    `(emajor, eminor, angle)` parameters describing
+    the shape of the Gaussian.
+    If ``None``, all sources are treated as point sources.
+dde1_jones : $(array_type), optional
+    :math:`E_{ps}` Direction-Dependent Jones terms for the first antenna.
+    shape :code:`(source,time,ant,chan,corr_1,corr_2)`
+dde2_jones : $(array_type), optional
+    :math:`E_{qs}` Direction-Dependent Jones terms for the second antenna.
+    This is usually the same array as ``dde1_jones`` as this
+    preserves the symmetry of the RIME. The conjugate transpose
+    is performed internally.
+    shape :code:`(source,time,ant,chan,corr_1,corr_2)`
+die1_jones : $(array_type), optional
+    :math:`G_{ps}` Direction-Independent Jones terms for the
+    first antenna of the baseline.
+    with shape :code:`(time,ant,chan,corr_1,corr_2)`
+die2_jones : $(array_type), optional
+    :math:`G_{ps}` Direction-Independent Jones terms for the
+    second antenna of the baseline.
+    This is usually the same array as ``die1_jones`` as this
+    preserves the symmetry of the RIME. The conjugate transpose
+    is performed internally.
+    shape :code:`(time,ant,chan,corr_1,corr_2)`
+convention : {'fourier', 'casa'}
+    Uses the :math:`e^{-2 \pi \mathit{i}}` sign convention
+    if ``fourier`` and :math:`e^{2 \pi \mathit{i}}` if
+    ``casa``.
+
+Returns
+-------
+visibilities : $(array_type)
+    Model visibilities of shape :code:`(row,chan,corr_1,corr_2)`
+""")
+
+
+try:
+    fused_predict.__doc__ = FUSED_PREDICT_DOCS.substitute(
+                            array_type=":class:`numpy.ndarray`",
+                            get_time_index=":code:`np.unique(time, "
+                                           "return_inverse=True)[1]`",
+                            extra_notes="")
+except AttributeError:
+    pass
@@ -0,0 +1,387 @@
+# -*- coding: utf-8 -*-
+
+try:
+    from ducc0.wgridder import dirty2ms  # noqa
+except ImportError as e:
+    ducc_import_error = e
+else:
+    ducc_import_error = None
+
+import numpy as np
+
+from africanus.gridding.wgridder.im2vis import _model_internal as degrid
+from africanus.rime.fused_predict import fused_predict as np_fused_predict
+from africanus.rime.predict import predict_vis as np_predict_vis
+from africanus.util.docs import DocstringTemplate
+from africanus.util.requirements import requires_optional
+
+
+def _pixel_coords(lm, cell, celly, nx, ny):
+    """ Nearest pixel of each lm coordinate """
+    if nx % 2 != 0 or ny % 2 != 0:
+        raise ValueError("nx (%d) and ny (%d) must be even" % (nx, ny))
+
+    ix = np.round(lm[:, 0] / cell).astype(np.intp) + nx // 2
+    iy = np.round(lm[:, 1] / celly).astype(np.intp) + ny // 2
+
+    return ix, iy
+
+
+def _freq_bins(freq_bin_idx, freq_bin_counts, nchan):
+    """ Default to a single band per channel """
+    if freq_bin_idx is None:
+        freq_bin_idx = np.arange(nchan)
+
+    if freq_bin_counts is None:
+        freq_bin_counts = np.ones_like(freq_bin_idx)
+
+    return freq_bin_idx, freq_bin_counts
+
+
+def hybrid_split(lm, brightness, flux_threshold, nx, ny, cell,
+                 celly=None, gauss_shape=None):
+    """
+    Decides which sources are predicted exactly by a DFT,
+    rather than rasterised and degridded.
+
+    A source is predicted exactly if:
+
+    1. The largest absolute value of its brightness over
+       all channels and correlations is
+       greater than or equal to ``flux_threshold``.
+    2. It has a non-zero gaussian shape in ``gauss_shape``.
+    3. It falls outside the :code:`(nx, ny)` model image.
+
+    Parameters
+    ----------
+    lm : :class:`numpy.ndarray`
+        LM coordinates of shape :code:`(source, 2)`.
+    brightness : :class:`numpy.ndarray`
+        Source brightness of shape :code:`(source, chan, corr_1, corr_2)`.
+    flux_threshold : float
+        Brightness threshold at which sources are predicted exactly.
+    nx : int
+        Number of pixels in the :math:`l` direction.
+    ny : int
+        Number of pixels in the :math:`m` direction.
+    cell : float
+        Cell size of a pixel along the :math:`l` direction in radians.
+    celly : float, optional
+        Cell size of a pixel along the :math:`m` direction in radians.
+        Defaults to ``cell``.
+    gauss_shape : :class:`numpy.ndarray`, optional
+        Gaussian shape parameters of shape :code:`(source, 3)`.
+
+    Returns
+    -------
+    exact : :class:`numpy.ndarray`
+        Boolean array of shape :code:`(source,)`, True
+        if the source should be predicted exactly.
+    """
+    if celly is None:
+        celly = cell
+
+    nsrc = lm.shape[0]
+    peak = np.abs(brightness.reshape(nsrc, -1)).max(axis=1, initial=0)
+    exact = peak >= flux_threshold
+
+    if gauss_shape is not None:
+        exact |= (gauss_shape[:, 0] != 0) | (gauss_shape[:, 1] != 0)
+
+    ix, iy = _pixel_coords(lm, cell, celly, nx, ny)
+    exact |= (ix < 0) | (ix >= nx) | (iy < 0) | (iy >= ny)
+
+    return exact
+
+
+def rasterise_sources(lm, brightness, freq_bin_idx, freq_bin_counts,
+                      nx, ny, cell, celly=None, do_wstacking=True):
+    """
+    Rasterises sources onto the nearest pixel of a model image
+    per imaging band. The brightness of each band is the
+    mean brightness of the band's channels.
+
+    Pixel values are scaled by :math:`n = \\sqrt{1 - l^2 - m^2}`
+    if ``do_wstacking`` is set, cancelling the :math:`1/n` factor
+    applied by the degridder.
+
+    Parameters
+    ----------
+    lm : :class:`numpy.ndarray`
+        LM coordinates of shape :code:`(source, 2)`.
+        All sources must lie within the model image.
+    brightness : :class:`numpy.ndarray`
+        Source brightness of shape :code:`(source, chan, corr_1, corr_2)`.
+    freq_bin_idx : :class:`numpy.ndarray`
+        Starting channel of each imaging band of shape :code:`(band,)`.
+    freq_bin_counts : :class:`numpy.ndarray`
+        Number of channels in each imaging band of shape :code:`(band,)`.
+    nx : int
+        Number of pixels in the :math:`l` direction.
+    ny : int
+        Number of pixels in the :math:`m` direction.
+    cell : float
+        Cell size of a pixel along the :math:`l` direction in radians.
+    celly : float, optional
+        Cell size of a pixel along the :math:`m` direction in radians.
+        Defaults to ``cell``.
+    do_wstacking : bool, optional
+        Whether the image will be degridded with w-stacking.
+
+    Returns
+    -------
+    image : :class:`numpy.ndarray`
+        Model image of shape :code:`(band, nx, ny, corr_1, corr_2)`.
+    """
+    if celly is None:
+        celly = cell
+
+    # Allow for chunked channels
+    freq_bin_idx = freq_bin_idx - freq_bin_idx.min()
+    nband = freq_bin_idx.shape[0]
+    corrs = brightness.shape[2:]
+
+    ix, iy = _pixel_coords(lm, cell, celly, nx, ny)
+    image = np.zeros((nband, nx, ny) + corrs, dtype=brightness.dtype)
+
+    if lm.shape[0] == 0:
+        return image
+
+    if do_wstacking:
+        x = (ix - nx // 2) * cell
+        y = (iy - ny // 2) * celly
+        n = np.sqrt(1.0 - x**2 - y**2)
+    else:
+        n = np.ones(lm.shape[0], dtype=lm.dtype)
+
+    n = n.reshape((-1,) + (1,)*len(corrs))
+
+    for b in range(nband):
+        ind = slice(freq_bin_idx[b], freq_bin_idx[b] + freq_bin_counts[b])
+        band_brightness = brightness[:, ind].mean(axis=1)
+        np.add.at(image[b], (ix, iy), band_brightness * n)
+
+    return image
+
+
+def degrid_image(uvw, frequency, image, freq_bin_idx, freq_bin_counts,
+                 cell, celly=None, epsilon=1e-5, nthreads=1,
+                 do_wstacking=True, convention='fourier'):
+    """
+    Degrids a :code:`(band, nx, ny, corr_1, corr_2)` model image
+    produced by :func:`rasterise_sources` with
+    :func:`~africanus.gridding.wgridder.model`, one correlation
+    at a time. The real and imaginary components of
+    complex images are degridded separately.
+
+    Returns
+    -------
+    vis : :class:`numpy.ndarray`
+        Visibilities of shape :code:`(row, chan, corr_1, corr_2)`.
+    """
+    if celly is None:
+        celly = cell
+
+    if convention == 'fourier':
+        # The degridder uses the opposite w sign convention
+        uvw = uvw * np.array([1, 1, -1], dtype=uvw.dtype)
+    elif convention == 'casa':
+        uvw = uvw * np.array([-1, -1, 1], dtype=uvw.dtype)
+    else:
+        raise ValueError("convention not in ('fourier', 'casa')")
+
+    nband, nx, ny = image.shape[:3]
+    corrs = image.shape[3:]
+    image = image.reshape((nband, nx, ny, -1))
+    real_image = image.real
+
+    vis = np.zeros((uvw.shape[0], frequency.shape[0], image.shape[-1]),
+                   dtype=np.result_type(image, np.complex64))
+
+    for c in range(image.shape[-1]):
+        if not real_image[..., c].any():
+            continue
+
+        vis[:, :, c] = degrid(uvw, frequency,
+                              np.ascontiguousarray(real_image[..., c]),
+                              freq_bin_idx, freq_bin_counts,
+                              cell, None, None, celly,
+                              epsilon, nthreads, do_wstacking)
+
+    if np.iscomplexobj(image):
+        imag_image = image.imag
+
+        for c in range(image.shape[-1]):
+            if not imag_image[..., c].any():
+                continue
+
+            vis[:, :, c] += 1j*degrid(uvw, frequency,
+                                      np.ascontiguousarray(imag_image[..., c]),
+                                      freq_bin_idx, freq_bin_counts,
+                                      cell, None, None, celly,
+                                      epsilon, nthreads, do_wstacking)
+
+    return vis.reshape(vis.shape[:2] + corrs)
+
+
+@requires_optional('ducc0.wgridder', ducc_import_error)
+def hybrid_predict(time_index, antenna1, antenna2,
+                   lm, uvw, frequency, brightness,
+                   flux_threshold, nx, ny, cell, celly=None,
+                   gauss_shape=None,
+                   dde1_jones=None, dde2_jones=None,
+                   die1_jones=None, die2_jones=None,
+                   freq_bin_idx=None, freq_bin_counts=None,
+                   epsilon=1e-5, nthreads=1, do_wstacking=True,
+                   convention='fourier'):
+
+    if celly is None:
+        celly = cell
+
+    if not nthreads:
+        import multiprocessing
+        nthreads = multiprocessing.cpu_count()
+
+    freq_bin_idx, freq_bin_counts = _freq_bins(freq_bin_idx,
+                                               freq_bin_counts,
+                                               frequency.shape[0])
+
+    exact = hybrid_split(lm, brightness, flux_threshold, nx, ny, cell,
+                         celly=celly, gauss_shape=gauss_shape)
+    faint = ~exact
+
+    vis = np_fused_predict(time_index, antenna1, antenna2,
+                           lm[exact], uvw, frequency, brightness[exact],
+                           None if gauss_shape is None
+                           else gauss_shape[exact],
+                           None if dde1_jones is None else dde1_jones[exact],
+                           None if dde2_jones is None else dde2_jones[exact],
+                           convention=convention)
+
+    if faint.any():
+        image = rasterise_sources(lm[faint], brightness[faint],
+                                  freq_bin_idx, freq_bin_counts,
+                                  nx, ny, cell, celly=celly,
+                                  do_wstacking=do_wstacking)
+
+        vis += degrid_image(uvw, frequency, image,
+                            freq_bin_idx, freq_bin_counts,
+                            cell, celly=celly, epsilon=epsilon,
+                            nthreads=nthreads, do_wstacking=do_wstacking,
+                            convention=convention)
+
+    if die1_jones is None and die2_jones is None:
+        return vis
+
+    return np_predict_vis(time_index, antenna1, antenna2,
+                          die1_jones=die1_jones, base_vis=vis,
+                          die2_jones=die2_jones)
+
+
+HYBRID_PREDICT_DOCS = DocstringTemplate(r"""
+Predicts model visibilities from a large sky model by combining
+an exact Direct Fourier Transform of bright or extended sources
+with degridding of a rasterised model image of the remaining
+components.
+
+Sources are predicted exactly by
+:func:`~africanus.rime.fused_predict` if the largest absolute value
+of their brightness is greater than or equal to ``flux_threshold``,
+if they have a non-zero gaussian shape, or if they fall outside
+the :code:`(nx, ny)` model image.
+The remaining sources are added to the nearest pixel of a
+model image per imaging band and degridded with
+:func:`~africanus.gridding.wgridder.model`.
+The two sets of visibilities are summed, after which any
+Direction-Independent Effects are applied.
+
+The cost of the exact part scales with the number of bright sources,
+while the cost of the degridded part is largely independent of the
+number of faint sources.
+
+Notes
+-----
+* Faint sources are moved to the centre of their nearest pixel,
+  so ``cell`` should be small enough that this displacement is
+  acceptable at the longest baselines.
+* The brightness of a faint source in an imaging band is the mean
+  of its brightness over the band's channels.
+* Direction-Dependent Effects are only applied to exactly
+  predicted sources.
+* ``nx`` and ``ny`` must be even.
+$(extra_notes)
+
+Parameters
+----------
+time_index : $(array_type)
+    Time index used to look up the antenna Jones index
+    for a particular baseline with shape :code:`(row,)`.
+antenna1 : $(array_type)
+    Antenna 1 index of shape :code:`(row,)`.
+antenna2 : $(array_type)
+    Antenna 2 index of shape :code:`(row,)`.
+lm : $(array_type)
+    LM coordinates of shape :code:`(source, 2)`.
+uvw : $(array_type)
+    UVW coordinates of shape :code:`(row, 3)`.
+frequency : $(array_type)
+    frequencies of shape :code:`(chan,)`
+brightness : $(array_type)
+    Source brightness matrix of shape
+    :code:`(source,chan,corr_1,corr_2)`.
+flux_threshold : float
+    Brightness at, or above which sources are predicted exactly.
+nx : int
+    Number of model image pixels in the :math:`l` direction.
+ny : int
+    Number of model image pixels in the :math:`m` direction.
+cell : float
+    The cell size of a pixel along the :math:`l` direction in radians.
+celly : float, optional
+    The cell size of a pixel along the :math:`m` direction in radians.
+    By default same as cell size along :math:`l` direction.
+gauss_shape : $(array_type), optional
+    Gaussian Shape Parameters of shape :code:`(source, 3)`.
+dde1_jones : $(array_type), optional
+    Direction-Dependent Jones terms for the first antenna.
+    shape :code:`(source,time,ant,chan,corr_1,corr_2)`
+dde2_jones : $(array_type), optional
+    Direction-Dependent Jones terms for the second antenna.
+    shape :code:`(source,time,ant,chan,corr_1,corr_2)`
+die1_jones : $(array_type), optional
+    Direction-Independent Jones terms for the first antenna.
+    shape :code:`(time,ant,chan,corr_1,corr_2)`
+die2_jones : $(array_type), optional
+    Direction-Independent Jones terms for the second antenna.
+    shape :code:`(time,ant,chan,corr_1,corr_2)`
+freq_bin_idx : $(array_type), optional
+    Starting channel of each imaging band of shape :code:`(band,)`.
+    Defaults to a band per channel.
+freq_bin_counts : $(array_type), optional
+    The number of channels in each imaging band of shape :code:`(band,)`.
+epsilon : float, optional
+    Accuracy of the degridder with respect to the
+    direct Fourier transform.
+nthreads : int, optional
+    The number of degridder threads. Defaults to one.
+    If set to zero will use all available cores.
+do_wstacking : bool, optional
+    Whether the degridder corrects for the w-term. Defaults to True.
+convention : {'fourier', 'casa'}
+    Uses the :math:`e^{-2 \pi \mathit{i}}` sign convention
+    if ``fourier`` and :math:`e^{2 \pi \mathit{i}}` if
+    ``casa``.
+
+Returns
+-------
+visibilities : $(array_type)
+    Model visibilities of shape :code:`(row,chan,corr_1,corr_2)`
+""")
+
+
+try:
+    hybrid_predict.__doc__ = HYBRID_PREDICT_DOCS.substitute(
+                                array_type=":class:`numpy.ndarray`",
+                                extra_notes="")
+except AttributeError:
+    pass
@@ -0,0 +1,4 @@
+# -*- coding: utf-8 -*-
+
+# Enable 64 bit precision in jax when its kernels are first imported
+import africanus.util.jax_init  # noqa
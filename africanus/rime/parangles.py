@@ -7,8 +7,9 @@ from .parangles_astropy import (have_astropy_parangles,
                                 astropy_parallactic_angles)
 from .parangles_casa import (have_casa_parangles,
                              casa_parallactic_angles)
+from .parangles_numba import numba_parallactic_angles
 
-_discovered_backends = []
+_discovered_backends = ['numba']
 
 if have_astropy_parangles:
     _discovered_backends.append('astropy')
@@ -17,7 +18,7 @@ if have_casa_parangles:
     _discovered_backends.append('casa')
 
 
-_standard_backends = set(['casa', 'astropy', 'test'])
+_standard_backends = set(['casa', 'astropy', 'numba', 'test'])
 
 
 def parallactic_angles(times, antenna_positions, field_centre,
@@ -36,12 +37,18 @@ def parallactic_angles(times, antenna_positions, field_centre,
         in *metres* in the *ITRF* frame.
     field_centre : :class:`numpy.ndarray`
         Field centre of shape :code:`(2,)` in *radians*
-    backend : {'casa', 'test'}, optional
+    backend : {'casa', 'numba', 'test'}, optional
         Backend to use for calculating the parallactic angles.
 
         * ``casa`` defers to an implementation
           depending on ``python-casacore``.
           This backend should be used by default.
+        * ``numba`` computes sidereal time, precession, nutation
+          and aberration in numba, without per-sample calls into
+          ``python-casacore``. It agrees with the ``casa`` backend to
+          within a few arcseconds, but ignores the difference
+          between UT1 and UTC and polar motion.
+          See ``africanus.rime.parangles_numba``.
         * ``test`` creates parallactic angles
           by multiplying the ``times`` and ``antenna_position``
           arrays. It exist solely for testing.
@@ -69,6 +76,10 @@ def parallactic_angles(times, antenna_positions, field_centre,
         return casa_parallactic_angles(times,
                                        antenna_positions,
                                        field_centre)
+    elif backend == 'numba':
+        return numba_parallactic_angles(times,
+                                        antenna_positions,
+                                        field_centre)
     elif backend == 'test':
         return times[:, None]*(antenna_positions.sum(axis=1)[None, :])
     else:
@@ -5,17 +5,19 @@ import numpy as np
 from africanus.constants import minus_two_pi_over_c
 from africanus.util.docs import DocstringTemplate
 from africanus.util.numba import generated_jit
+from africanus.util.phasor import phasors, regular_channel_width
 from africanus.util.type_inference import infer_complex_dtype
 
 
 @generated_jit(nopython=True, nogil=True, cache=True)
-def phase_delay(lm, uvw, frequency, convention='fourier'):
+def phase_delay(lm, uvw, frequency, convention='fourier', recurrence=False):
     # Bake constants in with the correct type
     one = lm.dtype(1.0)
     neg_two_pi_over_c = lm.dtype(minus_two_pi_over_c)
     out_dtype = infer_complex_dtype(lm, uvw, frequency)
 
-    def _phase_delay_impl(lm, uvw, frequency, convention='fourier'):
+    def _phase_delay_impl(lm, uvw, frequency, convention='fourier',
+                          recurrence=False):
         if convention == 'fourier':
             constant = neg_two_pi_over_c
         elif convention == 'casa':
@@ -26,6 +28,11 @@ def phase_delay(lm, uvw, frequency, convention='fourier'):
         shape = (lm.shape[0], uvw.shape[0], frequency.shape[0])
         complex_phase = np.zeros(shape, dtype=out_dtype)
 
+        if recurrence:
+            regular, chan_width = regular_channel_width(frequency)
+        else:
+            regular, chan_width = False, 0.0
+
         # For each source
         for source in range(lm.shape[0]):
             l, m = lm[source]
@@ -38,14 +45,11 @@ def phase_delay(lm, uvw, frequency, convention='fourier'):
                 real_phase = constant * (l * u + m * v + n * w)
 
                 # Multiple in frequency for each channel
-                for chan in range(frequency.shape[0]):
-                    p = real_phase * frequency[chan]
-
-                    # Our phase input is purely imaginary
-                    # so we can can elide a call to exp
-                    # and just compute the cos and sin
-                    complex_phase.real[source, row, chan] = np.cos(p)
-                    complex_phase.imag[source, row, chan] = np.sin(p)
+                # Our phase input is purely imaginary
+                # so we can can elide a call to exp
+                # and just compute the cos and sin
+                phasors(real_phase, frequency, regular, chan_width,
+                        complex_phase[source, row])
 
         return complex_phase
 
@@ -88,6 +92,12 @@ PHASE_DELAY_DOCS = DocstringTemplate(
         Uses the :math:`e^{-2 \pi \mathit{i}}` sign convention
         if ``fourier`` and :math:`e^{2 \pi \mathit{i}}` if
         ``casa``.
+    recurrence : {False, True}
+        If ``True`` and ``frequency`` is evenly spaced,
+        the phase delay of each channel is obtained from
+        that of the previous channel by a complex multiply,
+        instead of evaluating ``cos`` and ``sin``.
+        See :mod:`africanus.util.phasor` for accuracy guarantees.
 
     Returns
     -------
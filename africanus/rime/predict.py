@@ -4,7 +4,8 @@
 import numpy as np
 
 from africanus.util.docs import DocstringTemplate
-from africanus.util.numba import is_numba_type_none, generated_jit, njit
+from africanus.util.numba import (is_numba_type_none, generated_jit,
+                                  index_map_factory, njit, prange)
 
 
 JONES_NOT_PRESENT = 0
@@ -185,40 +186,115 @@ def jones_mul_factory(have_ddes, have_coh, jones_type, accumulate):
     return njit(nogil=True, inline='always')(jones_mul)
 
 
-def sum_coherencies_factory(have_ddes, have_coh, jones_type):
+def parallel_sum_coherencies_factory(have_ddes, have_coh, jones_type,
+                                     have_time_map=False,
+                                     have_chan_map=False):
+    """
+    Factory function generating a function that sums coherencies,
+    distributing rows over threads.
+
+    As each row of the output is only written by a single thread,
+    sources are summed without requiring locks or atomics.
+    """
+    jones_mul = jones_mul_factory(have_ddes, have_coh, jones_type, True)
+    time_map_fn = index_map_factory(have_time_map)
+    chan_map_fn = index_map_factory(have_chan_map)
+
+    if have_ddes and have_coh:
+        def sum_coh_fn(time, ant1, ant2, a1j, blj, a2j,
+                       time_map, chan_map, tmin, out):
+            for r in prange(time.shape[0]):
+                ti = time_map_fn(time_map, time[r] - tmin)
+                a1 = ant1[r]
+                a2 = ant2[r]
+
+                for s in range(a1j.shape[0]):
+                    for f in range(out.shape[1]):
+                        fi = chan_map_fn(chan_map, f)
+                        jones_mul(a1j[s, ti, a1, fi],
+                                  blj[s, r, f],
+                                  a2j[s, ti, a2, fi],
+                                  out[r, f])
+
+    elif have_ddes and not have_coh:
+        def sum_coh_fn(time, ant1, ant2, a1j, blj, a2j,
+                       time_map, chan_map, tmin, out):
+            for r in prange(time.shape[0]):
+                ti = time_map_fn(time_map, time[r] - tmin)
+                a1 = ant1[r]
+                a2 = ant2[r]
+
+                for s in range(a1j.shape[0]):
+                    for f in range(out.shape[1]):
+                        fi = chan_map_fn(chan_map, f)
+                        jones_mul(a1j[s, ti, a1, fi],
+                                  a2j[s, ti, a2, fi],
+                                  out[r, f])
+
+    elif not have_ddes and have_coh:
+        def sum_coh_fn(time, ant1, ant2, a1j, blj, a2j,
+                       time_map, chan_map, tmin, out):
+            for r in prange(blj.shape[1]):
+                for s in range(blj.shape[0]):
+                    for f in range(blj.shape[2]):
+                        jones_mul(blj[s, r, f], out[r, f])
+    else:
+        # noop
+        def sum_coh_fn(time, ant1, ant2, a1j, blj, a2j,
+                       time_map, chan_map, tmin, out):
+            pass
+
+    return njit(nogil=True, inline='always')(sum_coh_fn)
+
+
+def sum_coherencies_factory(have_ddes, have_coh, jones_type, parallel=False,
+                            have_time_map=False, have_chan_map=False):
     """ Factory function generating a function that sums coherencies """
+    if parallel:
+        return parallel_sum_coherencies_factory(have_ddes, have_coh,
+                                                jones_type,
+                                                have_time_map,
+                                                have_chan_map)
+
     jones_mul = jones_mul_factory(have_ddes, have_coh, jones_type, True)
+    time_map_fn = index_map_factory(have_time_map)
+    chan_map_fn = index_map_factory(have_chan_map)
 
     if have_ddes and have_coh:
-        def sum_coh_fn(time, ant1, ant2, a1j, blj, a2j, tmin, out):
+        def sum_coh_fn(time, ant1, ant2, a1j, blj, a2j,
+                       time_map, chan_map, tmin, out):
             for s in range(a1j.shape[0]):
                 for r in range(time.shape[0]):
-                    ti = time[r] - tmin
+                    ti = time_map_fn(time_map, time[r] - tmin)
                     a1 = ant1[r]
                     a2 = ant2[r]
 
-                    for f in range(a1j.shape[3]):
-                        jones_mul(a1j[s, ti, a1, f],
+                    for f in range(out.shape[1]):
+                        fi = chan_map_fn(chan_map, f)
+                        jones_mul(a1j[s, ti, a1, fi],
                                   blj[s, r, f],
-                                  a2j[s, ti, a2, f],
+                                  a2j[s, ti, a2, fi],
                                   out[r, f])
 
     elif have_ddes and not have_coh:
-        def sum_coh_fn(time, ant1, ant2, a1j, blj, a2j, tmin, out):
+        def sum_coh_fn(time, ant1, ant2, a1j, blj, a2j,
+                       time_map, chan_map, tmin, out):
             for s in range(a1j.shape[0]):
                 for r in range(time.shape[0]):
-                    ti = time[r] - tmin
+                    ti = time_map_fn(time_map, time[r] - tmin)
                     a1 = ant1[r]
                     a2 = ant2[r]
 
-                    for f in range(a1j.shape[3]):
-                        jones_mul(a1j[s, ti, a1, f],
-                                  a2j[s, ti, a2, f],
+                    for f in range(out.shape[1]):
+                        fi = chan_map_fn(chan_map, f)
+                        jones_mul(a1j[s, ti, a1, fi],
+                                  a2j[s, ti, a2, fi],
                                   out[r, f])
 
     elif not have_ddes and have_coh:
         if jones_type == JONES_2X2:
-            def sum_coh_fn(time, ant1, ant2, a1j, blj, a2j, tmin, out):
+            def sum_coh_fn(time, ant1, ant2, a1j, blj, a2j,
+                           time_map, chan_map, tmin, out):
                 for s in range(blj.shape[0]):
                     for r in range(blj.shape[1]):
                         for f in range(blj.shape[2]):
@@ -226,7 +302,8 @@ def sum_coherencies_factory(have_ddes, have_coh, jones_type):
                                 for c2 in range(blj.shape[4]):
                                     out[r, f, c1, c2] += blj[s, r, f, c1, c2]
         else:
-            def sum_coh_fn(time, ant1, ant2, a1j, blj, a2j, tmin, out):
+            def sum_coh_fn(time, ant1, ant2, a1j, blj, a2j,
+                           time_map, chan_map, tmin, out):
                 for s in range(blj.shape[0]):
                     for r in range(blj.shape[1]):
                         for f in range(blj.shape[2]):
@@ -234,38 +311,112 @@ def sum_coherencies_factory(have_ddes, have_coh, jones_type):
                                 out[r, f, c] += blj[s, r, f, c]
     else:
         # noop
-        def sum_coh_fn(time, ant1, ant2, a1j, blj, a2j, tmin, out):
+        def sum_coh_fn(time, ant1, ant2, a1j, blj, a2j,
+                       time_map, chan_map, tmin, out):
             pass
 
     return njit(nogil=True, inline='always')(sum_coh_fn)
 
 
-def output_factory(have_ddes, have_coh, have_dies, have_base_vis, out_dtype):
+def sum_direction_coherencies_factory(jones_type, out_dtype,
+                                      have_time_map=False,
+                                      have_chan_map=False):
+    """
+    Factory function generating a function that sums coherencies
+    of sources grouped into directions.
+
+    Source coherencies are first summed per direction,
+    after which the direction's Jones terms are applied once.
+    Rows are distributed over threads if the calling
+    function is compiled with ``parallel=True``.
+    """
+    coh_add = jones_mul_factory(False, True, jones_type, True)
+    jones_mul = jones_mul_factory(True, True, jones_type, True)
+    time_map_fn = index_map_factory(have_time_map)
+    chan_map_fn = index_map_factory(have_chan_map)
+
+    def sum_coh_fn(time, ant1, ant2, a1j, blj, a2j, src_dir,
+                   time_map, chan_map, tmin, out):
+        ndir = a1j.shape[0]
+        nchan = out.shape[1]
+        corrs = out.shape[2:]
+
+        for r in prange(time.shape[0]):
+            ti = time_map_fn(time_map, time[r] - tmin)
+            a1 = ant1[r]
+            a2 = ant2[r]
+
+            # Sum source coherencies within each direction
+            dir_coh = np.zeros((ndir, nchan) + corrs, dtype=out_dtype)
+
+            for s in range(blj.shape[0]):
+                d = src_dir[s]
+
+                for f in range(nchan):
+                    coh_add(blj[s, r, f], dir_coh[d, f])
+
+            # Apply the direction's Jones terms once
+            for d in range(ndir):
+                for f in range(nchan):
+                    fi = chan_map_fn(chan_map, f)
+                    jones_mul(a1j[d, ti, a1, fi],
+                              dir_coh[d, f],
+                              a2j[d, ti, a2, fi],
+                              out[r, f])
+
+    return njit(nogil=True, inline='always')(sum_coh_fn)
+
+
+def chan_count_factory(have_chan_map):
+    """
+    Factory function generating a function returning the
+    number of output channels, which is the length of the
+    channel index map, if present
+    """
+    if have_chan_map:
+        def chan_count(nchan, chan_map):
+            return chan_map.shape[0]
+    else:
+        def chan_count(nchan, chan_map):
+            return nchan
+
+    return njit(nogil=True, inline='always')(chan_count)
+
+
+def output_factory(have_ddes, have_coh, have_dies, have_base_vis, out_dtype,
+                   have_dde_chan_map=False, have_die_chan_map=False):
     """ Factory function generating a function that creates function output """
+    dde_chan_count = chan_count_factory(have_dde_chan_map)
+    die_chan_count = chan_count_factory(have_die_chan_map)
+
     if have_ddes:
         def output(time_index, dde1_jones, source_coh, dde2_jones,
-                   die1_jones, base_vis, die2_jones):
+                   die1_jones, base_vis, die2_jones,
+                   dde_chan_map, die_chan_map):
             row = time_index.shape[0]
-            chan = dde1_jones.shape[3]
+            chan = dde_chan_count(dde1_jones.shape[3], dde_chan_map)
             corrs = dde1_jones.shape[4:]
             return np.zeros((row, chan) + corrs, dtype=out_dtype)
     elif have_coh:
         def output(time_index, dde1_jones, source_coh, dde2_jones,
-                   die1_jones, base_vis, die2_jones):
+                   die1_jones, base_vis, die2_jones,
+                   dde_chan_map, die_chan_map):
             row = time_index.shape[0]
             chan = source_coh.shape[2]
             corrs = source_coh.shape[3:]
             return np.zeros((row, chan) + corrs, dtype=out_dtype)
     elif have_dies:
         def output(time_index, dde1_jones, source_coh, dde2_jones,
-                   die1_jones, base_vis, die2_jones):
+                   die1_jones, base_vis, die2_jones,
+                   dde_chan_map, die_chan_map):
             row = time_index.shape[0]
-            chan = die1_jones.shape[2]
+            chan = die_chan_count(die1_jones.shape[2], die_chan_map)
             corrs = die1_jones.shape[3:]
             return np.zeros((row, chan) + corrs, dtype=out_dtype)
     elif have_base_vis:
         def output(time_index, dde1_jones, source_coh, dde2_jones,
-                   die1_jones, base_vis, die2_jones):
+                   die1_jones, base_vis, die2_jones,
+                   dde_chan_map, die_chan_map):
             row = time_index.shape[0]
             chan = base_vis.shape[1]
             corrs = base_vis.shape[2:]
@@ -293,7 +444,8 @@ def add_coh_factory(have_bvis):
     return njit(nogil=True, inline='always')(add_coh)
 
 
-def apply_dies_factory(have_dies, have_bvis, jones_type):
+def apply_dies_factory(have_dies, have_bvis, jones_type, parallel=False,
+                       have_time_map=False, have_chan_map=False):
     """
     Factory function returning a function that applies
     Direction Independent Effects
@@ -301,41 +453,65 @@ def apply_dies_factory(have_dies, have_bvis, jones_type):
 
     # We always "have visibilities", (the output array)
     jones_mul = jones_mul_factory(have_dies, True, jones_type, False)
+    time_map_fn = index_map_factory(have_time_map)
+    chan_map_fn = index_map_factory(have_chan_map)
 
-    if have_dies and have_bvis:
+    if have_dies and parallel:
         def apply_dies(time, ant1, ant2,
                        die1_jones, die2_jones,
+                       time_map, chan_map,
+                       tmin, out):
+            # Distribute rows over threads
+            for r in prange(time.shape[0]):
+                ti = time_map_fn(time_map, time[r] - tmin)
+                a1 = ant1[r]
+                a2 = ant2[r]
+
+                # Iterate over channels
+                for c in range(out.shape[1]):
+                    ci = chan_map_fn(chan_map, c)
+                    jones_mul(die1_jones[ti, a1, ci], out[r, c],
+                              die2_jones[ti, a2, ci], out[r, c])
+
+    elif have_dies and have_bvis:
+        def apply_dies(time, ant1, ant2,
+                       die1_jones, die2_jones,
+                       time_map, chan_map,
                        tmin, out):
             # Iterate over rows
             for r in range(time.shape[0]):
-                ti = time[r] - tmin
+                ti = time_map_fn(time_map, time[r] - tmin)
                 a1 = ant1[r]
                 a2 = ant2[r]
 
                 # Iterate over channels
                 for c in range(out.shape[1]):
-                    jones_mul(die1_jones[ti, a1, c], out[r, c],
-                              die2_jones[ti, a2, c], out[r, c])
+                    ci = chan_map_fn(chan_map, c)
+                    jones_mul(die1_jones[ti, a1, ci], out[r, c],
+                              die2_jones[ti, a2, ci], out[r, c])
 
     elif have_dies and not have_bvis:
         def apply_dies(time, ant1, ant2,
                        die1_jones, die2_jones,
+                       time_map, chan_map,
                        tmin, out):
             # Iterate over rows
             for r in range(time.shape[0]):
-                ti = time[r] - tmin
+                ti = time_map_fn(time_map, time[r] - tmin)
                 a1 = ant1[r]
                 a2 = ant2[r]
 
                 # Iterate over channels
                 for c in range(out.shape[1]):
-                    jones_mul(die1_jones[ti, a1, c], out[r, c],
-                              die2_jones[ti, a2, c],
+                    ci = chan_map_fn(chan_map, c)
+                    jones_mul(die1_jones[ti, a1, ci], out[r, c],
+                              die2_jones[ti, a2, ci],
                               out[r, c])
     else:
         # noop
         def apply_dies(time, ant1, ant2,
                        die1_jones, die2_jones,
+                       time_map, chan_map,
                        tmin, out):
             pass
 
@@ -349,7 +525,8 @@ def _default_none_check(arg):
 def predict_checks(time_index, antenna1, antenna2,
                    dde1_jones, source_coh, dde2_jones,
                    die1_jones, base_vis, die2_jones,
-                   none_check=_default_none_check):
+                   none_check=_default_none_check,
+                   source_to_direction=None):
 
     have_ddes1 = none_check(dde1_jones)
     have_coh = none_check(source_coh)
@@ -382,6 +559,15 @@ def predict_checks(time_index, antenna1, antenna2,
     if have_ddes and dde1_jones.ndim != dde2_jones.ndim:
         raise ValueError("dde1_jones.ndim != dde2_jones.ndim")
 
+    if none_check(source_to_direction):
+        if not (have_ddes and have_coh):
+            raise ValueError("source_to_direction requires dde1_jones, "
+                             "source_coh and dde2_jones")
+
+        if source_to_direction.ndim != 1:
+            raise ValueError("source_to_direction.ndim %d != 1" %
+                             source_to_direction.ndim)
+
     if have_coh and source_coh.ndim not in (4, 5):
         raise ValueError("source_coh.ndim %d not in (4, 5)" % source_coh.ndim)
 
@@ -426,15 +612,23 @@ def predict_checks(time_index, antenna1, antenna2,
             have_dies1, have_bvis, have_dies2)
 
 
-@generated_jit(nopython=True, nogil=True, cache=True)
-def predict_vis(time_index, antenna1, antenna2,
-                dde1_jones=None, source_coh=None, dde2_jones=None,
-                die1_jones=None, base_vis=None, die2_jones=None):
-
+def predict_vis_generator(time_index, antenna1, antenna2,
+                          dde1_jones, source_coh, dde2_jones,
+                          die1_jones, base_vis, die2_jones,
+                          source_to_direction,
+                          dde_time_map, dde_chan_map,
+                          die_time_map, die_chan_map,
+                          parallel):
+    """
+    Generates the numba implementation of :func:`predict_vis`
+    from the numba types of the arguments.
+    If ``parallel`` is True, rows are distributed over threads
+    """
     tup = predict_checks(time_index, antenna1, antenna2,
                          dde1_jones, source_coh, dde2_jones,
                          die1_jones, base_vis, die2_jones,
-                         lambda x: not is_numba_type_none(x))
+                         lambda x: not is_numba_type_none(x),
+                         source_to_direction)
 
     (have_ddes1, have_coh, have_ddes2, have_dies1, have_bvis, have_dies2) = tup
 
@@ -467,20 +661,48 @@ def predict_vis(time_index, antenna1, antenna2,
     have_ddes = have_ddes1 and have_ddes2
     have_dies = have_dies1 and have_dies2
 
+    have_dde_tmap = not is_numba_type_none(dde_time_map)
+    have_dde_cmap = not is_numba_type_none(dde_chan_map)
+    have_die_tmap = not is_numba_type_none(die_time_map)
+    have_die_cmap = not is_numba_type_none(die_chan_map)
+
     # Create functions that we will use inside our predict function
     out_fn = output_factory(have_ddes, have_coh,
-                            have_dies, have_bvis, out_dtype)
-    sum_coh_fn = sum_coherencies_factory(have_ddes, have_coh, jones_type)
-    apply_dies_fn = apply_dies_factory(have_dies, have_bvis, jones_type)
+                            have_dies, have_bvis, out_dtype,
+                            have_dde_cmap, have_die_cmap)
+
+    if not is_numba_type_none(source_to_direction):
+        sum_coh_fn = sum_direction_coherencies_factory(jones_type,
+                                                       out_dtype,
+                                                       have_dde_tmap,
+                                                       have_dde_cmap)
+    else:
+        coh_fn = sum_coherencies_factory(have_ddes, have_coh,
+                                         jones_type, parallel,
+                                         have_dde_tmap, have_dde_cmap)
+
+        @njit(nogil=True, inline='always')
+        def sum_coh_fn(time, ant1, ant2, a1j, blj, a2j, src_dir,
+                       time_map, chan_map, tmin, out):
+            coh_fn(time, ant1, ant2, a1j, blj, a2j,
+                   time_map, chan_map, tmin, out)
+
+    apply_dies_fn = apply_dies_factory(have_dies, have_bvis,
+                                       jones_type, parallel,
+                                       have_die_tmap, have_die_cmap)
     add_coh_fn = add_coh_factory(have_bvis)
 
     def _predict_vis_fn(time_index, antenna1, antenna2,
                         dde1_jones=None, source_coh=None, dde2_jones=None,
-                        die1_jones=None, base_vis=None, die2_jones=None):
+                        die1_jones=None, base_vis=None, die2_jones=None,
+                        source_to_direction=None,
+                        dde_time_map=None, dde_chan_map=None,
+                        die_time_map=None, die_chan_map=None):
 
         # Get the output shape
         out = out_fn(time_index, dde1_jones, source_coh, dde2_jones,
-                     die1_jones, base_vis, die2_jones)
+                     die1_jones, base_vis, die2_jones,
+                     dde_chan_map, die_chan_map)
 
         # Minimum time index, used to normalise within function
         tmin = time_index.min()
@@ -488,6 +710,7 @@ def predict_vis(time_index, antenna1, antenna2,
         # Sum coherencies if any
         sum_coh_fn(time_index, antenna1, antenna2,
                    dde1_jones, source_coh, dde2_jones,
+                   source_to_direction, dde_time_map, dde_chan_map,
                    tmin, out)
 
         # Add base visibilities to the output, if any
@@ -496,6 +719,7 @@ def predict_vis(time_index, antenna1, antenna2,
         # Apply direction independent effects, if any
         apply_dies_fn(time_index, antenna1, antenna2,
                       die1_jones, die2_jones,
+                      die_time_map, die_chan_map,
                       tmin, out)
 
         return out
@@ -504,17 +728,219 @@ def predict_vis(time_index, antenna1, antenna2,
 
 
 @generated_jit(nopython=True, nogil=True, cache=True)
+def serial_predict_vis(time_index, antenna1, antenna2,
+                       dde1_jones=None, source_coh=None, dde2_jones=None,
+                       die1_jones=None, base_vis=None, die2_jones=None,
+                       source_to_direction=None,
+                       dde_time_map=None, dde_chan_map=None,
+                       die_time_map=None, die_chan_map=None):
+    return predict_vis_generator(time_index, antenna1, antenna2,
+                                 dde1_jones, source_coh, dde2_jones,
+                                 die1_jones, base_vis, die2_jones,
+                                 source_to_direction,
+                                 dde_time_map, dde_chan_map,
+                                 die_time_map, die_chan_map, False)
+
+
+# NOTE(sjperkins)
+# The parallel implementation is compiled as a separate dispatcher
+# with parallel=True, rather than calling parallel kernels
+# from the serial implementation.
+# This ensures that numba's threading layer is initialised
+# when the implementation is loaded from the cache.
+@generated_jit(nopython=True, nogil=True, cache=True, parallel=True)
+def parallel_predict_vis(time_index, antenna1, antenna2,
+                         dde1_jones=None, source_coh=None, dde2_jones=None,
+                         die1_jones=None, base_vis=None, die2_jones=None,
+                         source_to_direction=None,
+                         dde_time_map=None, dde_chan_map=None,
+                         die_time_map=None, die_chan_map=None):
+    return predict_vis_generator(time_index, antenna1, antenna2,
+                                 dde1_jones, source_coh, dde2_jones,
+                                 die1_jones, base_vis, die2_jones,
+                                 source_to_direction,
+                                 dde_time_map, dde_chan_map,
+                                 die_time_map, die_chan_map, True)
+
+
+def _check_index_map(name, index_map, jones_name, jones_size):
+    """ Checks that ``index_map`` indexes an axis of size ``jones_size`` """
+    if index_map.ndim != 1:
+        raise ValueError("%s.ndim %d != 1" % (name, index_map.ndim))
+
+    if not np.issubdtype(index_map.dtype, np.integer):
+        raise TypeError("%s.dtype %s is not an integer type"
+                        % (name, index_map.dtype))
+
+    if index_map.size > 0 and (index_map.min() < 0 or
+                               index_map.max() >= jones_size):
+        raise ValueError("%s values must lie in [0, %d), the size "
+                         "of the corresponding %s axis"
+                         % (name, jones_size, jones_name))
+
+
+def index_map_checks(time_index, dde1_jones, source_coh,
+                     die1_jones, base_vis,
+                     dde_time_map, dde_chan_map,
+                     die_time_map, die_chan_map):
+    """
+    Checks that the time and channel index maps
+    are consistent with the Jones terms they index
+    """
+    maps = (("dde_time_map", dde_time_map, "dde1_jones", dde1_jones, 1),
+            ("dde_chan_map", dde_chan_map, "dde1_jones", dde1_jones, 3),
+            ("die_time_map", die_time_map, "die1_jones", die1_jones, 0),
+            ("die_chan_map", die_chan_map, "die1_jones", die1_jones, 2))
+
+    for name, index_map, jones_name, jones, axis in maps:
+        if index_map is None:
+            continue
+
+        if jones is None:
+            raise ValueError("%s was supplied without %s"
+                             % (name, jones_name))
+
+        _check_index_map(name, index_map, jones_name, jones.shape[axis])
+
+    # Each time index must have a map entry
+    ntime = time_index.max() - time_index.min() + 1 if time_index.size else 0
+
+    for name, index_map in (("dde_time_map", dde_time_map),
+                            ("die_time_map", die_time_map)):
+        if index_map is not None and index_map.shape[0] < ntime:
+            raise ValueError("%s.shape[0] %d < %d, the number of timesteps "
+                             "spanned by time_index"
+                             % (name, index_map.shape[0], ntime))
+
+    # All inputs must agree on the number of channels
+    chans = []
+
+    if dde1_jones is not None:
+        chans.append(("dde1_jones", dde1_jones.shape[3]
+                      if dde_chan_map is None else dde_chan_map.shape[0]))
+
+    if source_coh is not None:
+        chans.append(("source_coh", source_coh.shape[2]))
+
+    if die1_jones is not None:
+        chans.append(("die1_jones", die1_jones.shape[2]
+                      if die_chan_map is None else die_chan_map.shape[0]))
+
+    if base_vis is not None:
+        chans.append(("base_vis", base_vis.shape[1]))
+
+    if len(set(c for _, c in chans)) > 1:
+        raise ValueError("Mismatched channels %s. Channel index maps "
+                         "have a channel per output channel" % chans)
+
+
+def predict_vis(time_index, antenna1, antenna2,
+                dde1_jones=None, source_coh=None, dde2_jones=None,
+                die1_jones=None, base_vis=None, die2_jones=None,
+                source_to_direction=None,
+                dde_time_map=None, dde_chan_map=None,
+                die_time_map=None, die_chan_map=None,
+                parallel=False):
+
+    if not (dde_time_map is None and dde_chan_map is None and
+            die_time_map is None and die_chan_map is None):
+        index_map_checks(time_index, dde1_jones, source_coh,
+                         die1_jones, base_vis,
+                         dde_time_map, dde_chan_map,
+                         die_time_map, die_chan_map)
+
+    fn = parallel_predict_vis if parallel else serial_predict_vis
+
+    return fn(time_index, antenna1, antenna2,
+              dde1_jones, source_coh, dde2_jones,
+              die1_jones, base_vis, die2_jones,
+              source_to_direction,
+              dde_time_map, dde_chan_map,
+              die_time_map, die_chan_map)
+
+
 def apply_gains(time_index, antenna1, antenna2,
-                die1_jones, corrupted_vis, die2_jones):
+                die1_jones, corrupted_vis, die2_jones,
+                time_map=None, chan_map=None,
+                parallel=False):
+
+    return predict_vis(time_index, antenna1, antenna2,
+                       die1_jones=die1_jones,
+                       base_vis=corrupted_vis,
+                       die2_jones=die2_jones,
+                       die_time_map=time_map,
+                       die_chan_map=chan_map,
+                       parallel=parallel)
+
+
+def stream_predict_vis(time_index, antenna1, antenna2, source_batches,
+                       die1_jones=None, base_vis=None, die2_jones=None,
+                       parallel=False):
+    """
+    Predicts model visibilities from an iterable of source batches,
+    accumulating the coherencies of each batch into the
+    visibilities of the previous batches.
 
-    def impl(time_index, antenna1, antenna2,
-             die1_jones, corrupted_vis, die2_jones):
-        return predict_vis(time_index, antenna1, antenna2,
-                           die1_jones=die1_jones,
-                           base_vis=corrupted_vis,
-                           die2_jones=die2_jones)
+    Peak memory is therefore bounded by roughly two
+    :code:`(row,chan,corr_1,corr_2)` output buffers and a single batch,
+    regardless of the total number of sources.
+    Direction-Independent Effects are applied once,
+    after all batches have been accumulated.
 
-    return impl
+    Parameters
+    ----------
+    time_index : :class:`numpy.ndarray`
+        Time index with shape :code:`(row,)`.
+    antenna1 : :class:`numpy.ndarray`
+        Antenna 1 index with shape :code:`(row,)`.
+    antenna2 : :class:`numpy.ndarray`
+        Antenna 2 index with shape :code:`(row,)`.
+    source_batches : iterable
+        Iterable, such as a generator, of
+        :code:`(dde1_jones, source_coh, dde2_jones)` or
+        :code:`(dde1_jones, source_coh, dde2_jones, source_to_direction)`
+        tuples, each containing a batch of sources.
+        Elements may be ``None`` as in :func:`predict_vis`.
+    die1_jones : :class:`numpy.ndarray`, optional
+        Direction-Independent Jones terms for the
+        first antenna of the baseline.
+    base_vis : :class:`numpy.ndarray`, optional
+        Base coherencies to which the source batches are added.
+    die2_jones : :class:`numpy.ndarray`, optional
+        Direction-Independent Jones terms for the
+        second antenna of the baseline.
+    parallel : {False, True}
+        If ``True``, rows are distributed over numba threads.
+
+    Returns
+    -------
+    visibilities : :class:`numpy.ndarray`
+        Model visibilities of shape :code:`(row,chan,corr_1,corr_2)`
+    """
+    vis = base_vis
+
+    for batch in source_batches:
+        dde1_jones, source_coh, dde2_jones = batch[:3]
+        source_to_direction = batch[3] if len(batch) > 3 else None
+
+        vis = predict_vis(time_index, antenna1, antenna2,
+                          dde1_jones, source_coh, dde2_jones,
+                          None, vis, None,
+                          source_to_direction=source_to_direction,
+                          parallel=parallel)
+
+    if die1_jones is None and die2_jones is None:
+        if vis is None:
+            raise ValueError("No source batches, base_vis or "
+                             "die_jones were supplied")
+
+        return vis
+
+    return predict_vis(time_index, antenna1, antenna2,
+                       die1_jones=die1_jones,
+                       base_vis=vis,
+                       die2_jones=die2_jones,
+                       parallel=parallel)
 
 
 PREDICT_DOCS = DocstringTemplate(r"""
@@ -553,6 +979,11 @@ Notes
   at a particular timestep via the
   ``time_index``, ``antenna1`` and ``antenna2`` inputs.
 * The ``row`` dimension must be an increasing partial order in time.
+* If ``source_to_direction`` is supplied, ``dde1_jones`` and
+  ``dde2_jones`` are indexed by direction rather than source.
+  The coherencies of all sources in a direction are summed
+  before the direction's Jones terms are applied:
+  :math:`\sum_{d} E_{pd} \left(\sum_{s \in d} X_{pqs} \right) E_{qd}^H`.
 $(extra_notes)
 
 
@@ -597,6 +1028,11 @@ die2_jones : $(array_type), optional
     preserves the symmetry of the RIME. ``predict_vis`` will
     perform the conjugate transpose internally.
     shape :code:`(time,ant,chan,corr_1,corr_2)`
+source_to_direction : $(array_type), optional
+    Integer index mapping each source to a direction
+    with shape :code:`(source,)`.
+    If present, ``dde1_jones`` and ``dde2_jones`` have shape
+    :code:`(direction,time,ant,chan,corr_1,corr_2)`.
 $(extra_args)
 
 Returns
@@ -606,12 +1042,46 @@ visibilities : $(array_type)
 """)
 
 
+INDEX_MAP_ARGS = """
+dde_time_map : $(array_type), optional
+    Integer index mapping each timestep of ``time_index``,
+    relative to its minimum, to the time axis of
+    ``dde1_jones`` and ``dde2_jones`` with shape :code:`(time,)`.
+    Allows Direction-Dependent terms to be supplied
+    at the resolution of a solution interval.
+dde_chan_map : $(array_type), optional
+    Integer index mapping each output channel to the
+    channel axis of ``dde1_jones`` and ``dde2_jones``
+    with shape :code:`(chan,)`.
+die_time_map : $(array_type), optional
+    Integer index mapping each timestep of ``time_index``,
+    relative to its minimum, to the time axis of
+    ``die1_jones`` and ``die2_jones`` with shape :code:`(time,)`.
+die_chan_map : $(array_type), optional
+    Integer index mapping each output channel to the
+    channel axis of ``die1_jones`` and ``die2_jones``
+    with shape :code:`(chan,)`.
+"""
+
+
+PARALLEL_ARGS = """
+parallel : {False, True}
+    If ``True``, rows are distributed over numba threads.
+    The number of threads is controlled by
+    :func:`numba.set_num_threads` or the
+    ``NUMBA_NUM_THREADS`` environment variable.
+"""
+
+
 try:
     predict_vis.__doc__ = PREDICT_DOCS.substitute(
                             array_type=":class:`numpy.ndarray`",
                             get_time_index=":code:`np.unique(time, "
                                            "return_inverse=True)[1]`",
-                            extra_args="",
+                            extra_args=(INDEX_MAP_ARGS.replace(
+                                "$(array_type)",
+                                ":class:`numpy.ndarray`") +
+                                PARALLEL_ARGS.lstrip("\n")),
                             extra_notes="")
 except AttributeError:
     pass
@@ -652,6 +1122,16 @@ corrupted_vis : $(array_type), optiona
 gains2 : $(array_type), optional
     :math:`G_{ps}` Gains for the second antenna of the baseline
     with shape :code:`(time,ant,chan,corr_1,corr_2)`.
+time_map : $(array_type), optional
+    Integer index mapping each timestep of ``time_index``,
+    relative to its minimum, to the solution interval
+    of the gains with shape :code:`(time,)`.
+chan_map : $(array_type), optional
+    Integer index mapping each channel of ``corrupted_vis``
+    to the channel solution interval of the gains
+    with shape :code:`(chan,)`.
+parallel : {False, True}
+    If ``True``, rows are distributed over numba threads.
 
 Returns
 -------
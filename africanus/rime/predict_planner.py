@@ -0,0 +1,299 @@
+# -*- coding: utf-8 -*-
+
+from collections import namedtuple
+from functools import reduce
+from operator import mul
+import multiprocessing
+
+import numpy as np
+
+from africanus.rime.predict import predict_checks
+from africanus.util.requirements import requires_optional
+from africanus.util.shapes import aggregate_chunks
+
+try:
+    from dask.utils import parse_bytes
+except ImportError as e:
+    opt_import_error = e
+else:
+    opt_import_error = None
+
+
+PredictPlan = namedtuple("PredictPlan", ["streams",
+                                         "source_chunks",
+                                         "row_chunks",
+                                         "time_chunks",
+                                         "peak_memory",
+                                         "graph_size",
+                                         "fits"])
+
+# Default split_every of dask's tree reductions
+TREE_SPLIT_EVERY = 4
+
+
+def _split_chunks(size, chunk):
+    """ Splits ``size`` into chunks of at most ``chunk`` """
+    chunks = (chunk,) * (size // chunk)
+    return chunks + ((size % chunk,) if size % chunk else ())
+
+
+def _tree_tasks(nblocks):
+    """ Number of tasks in a dask tree reduction over ``nblocks`` """
+    tasks = 0
+
+    while nblocks > 1:
+        nblocks = -(-nblocks // TREE_SPLIT_EVERY)
+        tasks += nblocks
+
+    return max(tasks, 1)
+
+
+def estimate_predict(row_chunks, time_chunks, source_chunks,
+                     nchan_blocks, chan, corr, nant,
+                     in_itemsize, out_itemsize,
+                     have_ddes, have_coh, have_dies_or_bvis,
+                     streams, nthreads):
+    """
+    Estimates the peak memory in bytes and the number of tasks
+    of a dask :func:`~africanus.rime.dask.predict_vis` graph.
+
+    Each of ``nthreads`` concurrently running tasks holds the inputs
+    of a single source chunk and its output block.
+    A tree reduction (``streams=None``) may hold the outputs of every
+    source chunk of an active output block, while each linear
+    stream holds at most two output blocks.
+    """
+    nrow_blocks = len(row_chunks)
+    nsrc_blocks = len(source_chunks) if have_ddes or have_coh else 0
+    nout_blocks = nrow_blocks * nchan_blocks
+
+    R = max(row_chunks)
+    T = max(time_chunks) if time_chunks is not None else 0
+    S = max(source_chunks) if nsrc_blocks > 0 else 0
+
+    out_block = R * chan * corr * out_itemsize
+    in_block = 0
+
+    if have_coh:
+        in_block += S * R * chan * corr * in_itemsize
+
+    if have_ddes:
+        in_block += 2 * S * T * nant * chan * corr * in_itemsize
+
+    active_blocks = min(nthreads, nout_blocks)
+
+    if streams is None:
+        peak = (nthreads * (in_block + out_block) +
+                active_blocks * nsrc_blocks * out_block)
+        reduce_tasks = _tree_tasks(nsrc_blocks) if nsrc_blocks > 0 else 0
+    else:
+        streams = min(streams, nsrc_blocks)
+        running = min(nthreads, nout_blocks * streams)
+        peak = running * (in_block + 2 * out_block)
+
+        if streams > 1:
+            peak += active_blocks * streams * out_block
+
+        reduce_tasks = 1 if streams > 1 else 0
+
+    tasks = nout_blocks * (nsrc_blocks + reduce_tasks)
+
+    if have_dies_or_bvis:
+        peak += active_blocks * out_block
+        tasks += nout_blocks
+
+    return peak, tasks
+
+
+@requires_optional("dask.utils", opt_import_error)
+def plan_predict_vis(time_index, antenna1, antenna2,
+                     dde1_jones=None, source_coh=None, dde2_jones=None,
+                     die1_jones=None, base_vis=None, die2_jones=None,
+                     memory_budget="4GB", nthreads=None):
+    """
+    Plans the reduction shape and chunking of
+    :func:`~africanus.rime.dask.predict_vis` within a memory budget.
+
+    The planner inspects the chunking and dtypes of the dask inputs and
+    searches, in order of decreasing preference:
+
+    1. Aggregations of adjacent row (and time) chunks,
+       largest first, as fewer larger chunks produce smaller graphs.
+    2. Source chunk sizes, halving from the current size.
+    3. Reductions: a tree reduction, followed by ``nthreads``
+       down to a single linear stream.
+
+    The first combination whose estimated peak memory fits
+    within ``memory_budget`` is returned. If none fit,
+    the combination with the smallest estimated peak memory
+    is returned with ``fits=False``.
+
+    Estimates assume that ``nthreads`` tasks run concurrently and
+    exclude the memory of the input arrays themselves if they are
+    already in memory.
+
+    .. code-block:: python
+
+        plan = plan_predict_vis(time_index, ant1, ant2,
+                                dde1_jones=dde, source_coh=coh,
+                                dde2_jones=dde, memory_budget="8GB",
+                                nthreads=16)
+
+        print(plan.peak_memory, plan.graph_size)
+
+        time_index = time_index.rechunk((plan.row_chunks,))
+        coh = coh.rechunk({0: plan.source_chunks, 1: plan.row_chunks})
+        dde = dde.rechunk({0: plan.source_chunks, 1: plan.time_chunks})
+        ...
+
+        vis = predict_vis(time_index, ant1, ant2,
+                          dde1_jones=dde, source_coh=coh,
+                          dde2_jones=dde, streams=plan.streams)
+
+    Parameters
+    ----------
+    time_index, antenna1, antenna2, dde1_jones, source_coh, dde2_jones,\
+    die1_jones, base_vis, die2_jones : :class:`dask.array.Array`
+        Inputs to :func:`~africanus.rime.dask.predict_vis`.
+    memory_budget : int or str, optional
+        Memory budget in bytes, or a string such as ``"4GB"``.
+    nthreads : int, optional
+        Number of concurrently executing tasks.
+        Defaults to the number of CPUs.
+
+    Returns
+    -------
+    plan : :class:`PredictPlan`
+        A namedtuple with the following fields:
+
+        - ``streams``: ``None`` for a tree reduction,
+          otherwise the number of linear streams.
+        - ``source_chunks``: Source dimension chunks.
+        - ``row_chunks``: Row dimension chunks.
+        - ``time_chunks``: Time dimension chunks aligned with
+          ``row_chunks``, or ``None`` if no time-indexed
+          inputs were supplied.
+        - ``peak_memory``: Estimated peak memory in bytes.
+        - ``graph_size``: Estimated number of predict tasks.
+        - ``fits``: Whether ``peak_memory`` is within the budget.
+    """
+    (have_ddes1, have_coh, have_ddes2,
+     have_dies1, have_bvis, have_dies2) = predict_checks(
+                                            time_index, antenna1, antenna2,
+                                            dde1_jones, source_coh,
+                                            dde2_jones, die1_jones,
+                                            base_vis, die2_jones)
+
+    have_ddes = have_ddes1 and have_ddes2
+    have_dies = have_dies1 and have_dies2
+
+    if isinstance(memory_budget, str):
+        memory_budget = parse_bytes(memory_budget)
+
+    if nthreads is None:
+        nthreads = multiprocessing.cpu_count()
+
+    if nthreads < 1:
+        raise ValueError("nthreads %d < 1" % nthreads)
+
+    arrays = (dde1_jones, source_coh, dde2_jones,
+              die1_jones, base_vis, die2_jones)
+    present = [a for a in arrays if a is not None]
+    in_itemsize = max(a.dtype.itemsize for a in present)
+    out_itemsize = np.result_type(*(a.dtype for a in present)).itemsize
+
+    row_chunks = time_index.chunks[0]
+
+    if have_ddes:
+        time_chunks = dde1_jones.chunks[1]
+        chan_chunks = dde1_jones.chunks[3]
+        corr = reduce(mul, dde1_jones.shape[4:], 1)
+        nant = dde1_jones.shape[2]
+    elif have_coh:
+        chan_chunks = source_coh.chunks[2]
+        corr = reduce(mul, source_coh.shape[3:], 1)
+        nant = 0
+    else:
+        chan_chunks = (die1_jones.chunks[2] if have_dies
+                       else base_vis.chunks[1])
+        corr = reduce(mul, (die1_jones.shape[3:] if have_dies
+                            else base_vis.shape[2:]), 1)
+        nant = 0
+
+    if have_dies:
+        time_chunks = die1_jones.chunks[0]
+    elif not have_ddes:
+        time_chunks = None
+
+    if have_ddes:
+        nsrc = dde1_jones.shape[0]
+        src_chunk = max(dde1_jones.chunks[0])
+    elif have_coh:
+        nsrc = source_coh.shape[0]
+        src_chunk = max(source_coh.chunks[0])
+    else:
+        nsrc = src_chunk = 0
+
+    # Candidate row (and time) chunkings, largest first
+    nrow = sum(row_chunks)
+    row_candidates = []
+    max_rows = nrow
+
+    while True:
+        if time_chunks is None:
+            rc, tc = aggregate_chunks(row_chunks, max_rows), None
+        else:
+            rc, tc = aggregate_chunks((row_chunks, time_chunks),
+                                      (max_rows, sum(time_chunks)))
+
+        if not row_candidates or row_candidates[-1][0] != rc:
+            row_candidates.append((rc, tc))
+
+        if max_rows <= max(row_chunks):
+            break
+
+        max_rows = max(max_rows // 2, max(row_chunks))
+
+    # Candidate source chunk sizes, largest first
+    src_candidates = []
+
+    while src_chunk > 0:
+        src_candidates.append(_split_chunks(nsrc, src_chunk))
+        src_chunk //= 2
+
+    if len(src_candidates) == 0:
+        src_candidates.append(())
+
+    # Candidate reductions, tree first
+    if have_ddes or have_coh:
+        stream_candidates = [None] + list(range(nthreads, 0, -1))
+    else:
+        stream_candidates = [None]
+
+    chan = max(chan_chunks)
+    best = None
+
+    for rc, tc in row_candidates:
+        for sc in src_candidates:
+            for streams in stream_candidates:
+                if streams is not None and streams > max(len(sc), 1):
+                    continue
+
+                peak, tasks = estimate_predict(rc, tc, sc,
+                                               len(chan_chunks), chan,
+                                               corr, nant,
+                                               in_itemsize, out_itemsize,
+                                               have_ddes, have_coh,
+                                               have_dies or have_bvis,
+                                               streams, nthreads)
+
+                plan = PredictPlan(streams, sc, rc, tc,
+                                   peak, tasks, peak <= memory_budget)
+
+                if plan.fits:
+                    return plan
+
+                if best is None or peak < best.peak_memory:
+                    best = plan
+
+    return best
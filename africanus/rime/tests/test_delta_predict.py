@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from numpy.testing import assert_array_equal, assert_almost_equal
+import pytest
+
+from africanus.rime.delta_predict import (component_delta,
+                                          delta_predict_vis,
+                                          delta_wsclean_predict)
+from africanus.rime.predict import predict_vis
+from africanus.rime.wsclean_predict import wsclean_predict
+
+
+#  Row indices into time/ant indexed arrays
+time_idx = np.asarray([0, 0, 1, 1, 2, 2, 2, 2, 3, 3])
+ant1 = np.asarray([0, 0, 0, 0, 1, 1, 1, 2, 2, 3])
+ant2 = np.asarray([0, 1, 2, 3, 1, 2, 3, 2, 3, 3])
+
+
+def test_component_delta():
+    old_flux = np.asarray([1.0, 2.0, 3.0, 4.0])
+    new_flux = np.asarray([3.0, 2.5, 1.0, 5.0, 6.0])
+    old_ids = np.asarray([10, 11, 12, 13])
+    new_ids = np.asarray([12, 11, 10, 14, 15])
+
+    delta = component_delta((old_flux, None), (new_flux, None),
+                            old_ids, new_ids)
+
+    assert_array_equal(delta.added, [3, 4])
+    assert_array_equal(delta.removed, [3])
+    assert_array_equal(delta.changed, [1])
+    assert_array_equal(delta.old_changed, [1])
+    assert delta.work_saved == pytest.approx(1.0 - 5.0 / 5.0)
+
+    # Identical models require no work
+    delta = component_delta((old_flux,), (old_flux,))
+    assert delta.work_saved == 1.0
+
+    with pytest.raises(ValueError, match="unique"):
+        component_delta((old_flux,), (old_flux,),
+                        old_ids=np.zeros(4), new_ids=old_ids)
+
+    with pytest.raises(ValueError, match="present in one model"):
+        component_delta((old_flux, None), (new_flux, new_flux))
+
+
+@pytest.mark.parametrize("have_dies", [True, False])
+def test_delta_predict_vis(have_dies):
+    rs = np.random.RandomState(42)
+
+    def rc(shape):
+        return rs.random_sample(shape) + 1j*rs.random_sample(shape)
+
+    src, time, ant, chan, corr = 20, 4, 4, 3, (2, 2)
+    row = time_idx.size
+
+    old_dde = rc((src, time, ant, chan) + corr)
+    old_coh = rc((src, row, chan) + corr)
+    die = rc((time, ant, chan) + corr) if have_dies else None
+
+    # Remove source 3, change source 7 and add two sources
+    keep = np.delete(np.arange(src), 3)
+    new_dde = np.concatenate([old_dde[keep], rc((2, time, ant, chan) + corr)])
+    new_coh = np.concatenate([old_coh[keep], rc((2, row, chan) + corr)])
+    new_coh[6] *= 2.0
+    old_ids = np.arange(src)
+    new_ids = np.concatenate([keep, [src, src + 1]])
+
+    old_model = (old_dde, old_coh, old_dde)
+    new_model = (new_dde, new_coh, new_dde)
+
+    vis = predict_vis(time_idx, ant1, ant2, *old_model,
+                      die1_jones=die, die2_jones=die)
+    expected = predict_vis(time_idx, ant1, ant2, *new_model,
+                           die1_jones=die, die2_jones=die)
+
+    delta = delta_predict_vis(vis, time_idx, ant1, ant2,
+                              old_model, new_model,
+                              die1_jones=die, die2_jones=die,
+                              old_ids=old_ids, new_ids=new_ids)
+
+    assert_array_equal(delta.added, [19, 20])
+    assert_array_equal(delta.removed, [3])
+    assert_array_equal(delta.changed, [6])
+    assert_array_equal(delta.old_changed, [7])
+    assert delta.work_saved == pytest.approx(1.0 - 5.0 / 21.0)
+    assert_almost_equal(vis, expected)
+
+
+def test_delta_wsclean_predict():
+    rs = np.random.RandomState(42)
+    src, row, chan = 30, 10, 4
+
+    source_type = np.where(rs.randint(0, 2, src), "POINT", "GAUSSIAN")
+    gauss_shape = rs.normal(size=(src, 3))
+    uvw = rs.normal(size=(row, 3))
+    lm = rs.normal(size=(src, 2))*1e-5
+    flux = np.abs(rs.normal(size=src))
+    coeffs = np.abs(rs.normal(size=(src, 2)))
+    log_poly = rs.randint(0, 2, src).astype(np.bool_)
+    freq = np.linspace(.856e9, 2*.856e9, chan)
+    ref_freq = np.full(src, freq[freq.shape[0] // 2])
+
+    old_model = (lm, source_type, flux, coeffs,
+                 log_poly, ref_freq, gauss_shape)
+
+    # Drop the first two components, brighten one
+    # and add a new component
+    sel = np.arange(2, src)
+    new_model = tuple(np.concatenate([a[sel], a[:1]]) for a in old_model)
+    new_model[0][-1] += 1e-5
+    new_model[2][5] *= 2.0
+
+    vis = wsclean_predict(uvw, *old_model, freq)
+    expected = wsclean_predict(uvw, *new_model, freq)
+
+    delta = delta_wsclean_predict(vis, uvw, freq, old_model, new_model)
+
+    assert_array_equal(delta.added, [src - 2])
+    assert_array_equal(delta.removed, [0, 1])
+    assert_array_equal(delta.changed, [5])
+    assert delta.work_saved == pytest.approx(1.0 - 5.0 / (src - 1))
+    assert_almost_equal(vis, expected)
+
+    # Everything changes, so a full prediction is performed
+    brighter = (lm, source_type, 2*flux, coeffs,
+                log_poly, ref_freq, gauss_shape)
+    delta = delta_wsclean_predict(vis, uvw, freq, new_model, brighter)
+
+    assert delta.work_saved == 0.0
+    assert_almost_equal(vis, wsclean_predict(uvw, *brighter, freq))
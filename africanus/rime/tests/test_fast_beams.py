@@ -210,6 +210,107 @@ def test_dask_fast_beams(freqs, beam_freq_map):
     assert_array_equal(da_ddes.compute(), ddes)
 
 
+def test_fast_beams_antenna_dedup(freqs, beam_freq_map):
+    from africanus.rime.fast_beam_cubes import antenna_cases
+
+    np.random.seed(42)
+
+    src, time, ants, chans = 5, 4, 6, freqs.shape[0]
+
+    lm = (np.random.random(size=(src, 2)) - 0.5)*0.1
+    beam = rc((10, 10, beam_freq_map.shape[0], 2, 2))
+    beam_lm_extents = np.asarray([[-1.0, 1.0], [-1.0, 1.0]])
+
+    # Homogeneous array, with tiny parallactic angle differences
+    parangles = np.random.random(size=(time, 1)) * np.pi / 12
+    parangles = parangles + np.random.random(size=(time, ants))*1e-9
+    point_errors = np.zeros((time, ants, chans, 2))
+    antenna_scaling = np.ones((ants, chans, 2))
+
+    args = (beam, beam_lm_extents, beam_freq_map, lm, parangles,
+            point_errors, antenna_scaling, freqs)
+
+    ddes = beam_cube_dde(*args)
+    par_ddes = beam_cube_dde(*args, parallel=True)
+    assert_array_almost_equal(par_ddes, ddes)
+
+    case_map, case_ta = antenna_cases(parangles, point_errors,
+                                      antenna_scaling, 1e-8)
+    assert case_ta.shape == (time, 2)
+    assert_array_equal(case_map, np.arange(time)[:, None].repeat(ants, 1))
+
+    dedup_ddes = beam_cube_dde(*args, parallel=True, antenna_dedup=True,
+                               pa_tolerance=1e-8)
+    assert_array_almost_equal(dedup_ddes, ddes)
+
+    view_ddes = beam_cube_dde(*args, antenna_dedup=True,
+                              pa_tolerance=1e-8, broadcast=True)
+    assert view_ddes.strides[2] == 0
+    assert_array_equal(view_ddes, dedup_ddes)
+
+    # Exact parallactic angle matching doesn't group antennas
+    case_map, case_ta = antenna_cases(parangles, point_errors,
+                                      antenna_scaling)
+    assert case_ta.shape == (time*ants, 2)
+
+    # Pointing errors on the first antenna split it into its own case
+    point_errors[:, 0] = 0.001
+    args = args[:5] + (point_errors,) + args[6:]
+    ddes = beam_cube_dde(*args)
+
+    case_map, case_ta = antenna_cases(parangles, point_errors,
+                                      antenna_scaling, 1e-8)
+    assert case_ta.shape == (2*time, 2)
+
+    dedup_ddes = beam_cube_dde(*args, antenna_dedup=True,
+                               pa_tolerance=1e-8, broadcast=True)
+    assert dedup_ddes.strides[2] != 0
+    assert_array_almost_equal(dedup_ddes, ddes)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_fast_beams_pa_step(freqs, beam_freq_map, parallel):
+    from africanus.rime.fast_beam_cubes import pa_sample_times
+
+    np.random.seed(42)
+
+    src, time, ants, chans = 4, 200, 3, freqs.shape[0]
+
+    lm = (np.random.random(size=(src, 2)) - 0.5)*0.2
+    beam = rc((20, 20, beam_freq_map.shape[0], 2, 2))
+    beam_lm_extents = np.asarray([[-1.0, 1.0], [-1.0, 1.0]])
+
+    # Slowly rotating parallactic angles that
+    # wrap around at pi for the last antenna
+    pa_rate = np.asarray([1e-4, 2e-4, 3e-4])
+    parangles = np.arange(time)[:, None] * pa_rate[None, :]
+    parangles[:, -1] += np.pi - 0.03
+    parangles = (parangles + np.pi) % (2*np.pi) - np.pi
+    point_errors = np.zeros((time, ants, chans, 2))
+    antenna_scaling = np.ones((ants, chans, 2))
+
+    pa_step = 5e-3
+    samples = pa_sample_times(parangles, pa_step)
+
+    assert samples[0] == 0 and samples[-1] == time - 1
+    assert np.all(np.diff(samples) > 0)
+    assert samples.size < time // 5
+
+    pa_diff = np.diff(parangles[samples], axis=0)
+    pa_diff = (pa_diff + np.pi) % (2*np.pi) - np.pi
+    assert np.all(np.abs(pa_diff) <= pa_step)
+
+    args = (beam, beam_lm_extents, beam_freq_map, lm, parangles,
+            point_errors, antenna_scaling, freqs)
+
+    ddes = beam_cube_dde(*args, parallel=parallel)
+    coarse_ddes = beam_cube_dde(*args, parallel=parallel, pa_step=pa_step)
+
+    assert coarse_ddes.shape == ddes.shape
+    assert_array_equal(coarse_ddes[:, samples], ddes[:, samples])
+    assert_array_almost_equal(coarse_ddes, ddes, decimal=2)
+
+
 @pytest.mark.parametrize("dtype", [np.float32, np.float64])
 def test_fast_beams_vs_montblanc(freqs, beam_freq_map_montblanc, dtype):
     """ Test that the numba beam matches montblanc implementation """
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from numpy.testing import assert_array_almost_equal
+import pytest
+
+from africanus.rime.phase import phase_delay
+from africanus.rime.predict import predict_vis
+from africanus.rime.fused_predict import fused_predict
+from africanus.model.shape.gaussian_shape import gaussian
+
+
+def rf(*a, **kw):
+    return np.random.random(*a, **kw)
+
+
+def rc(*a, **kw):
+    return rf(*a, **kw) + 1j*rf(*a, **kw)
+
+
+chunk_parametrization = pytest.mark.parametrize("chunks", [
+    {
+        'source':  (2, 3, 4),
+        'time': (2, 1, 1),
+        'rows': (4, 4, 2),
+        'antenna': (4,),
+        'channels': (3, 2),
+    }])
+
+corr_shape_parametrization = pytest.mark.parametrize(
+    'corr_shape, bl_schema', [
+        ((1,), "srf,sfi->srfi"),
+        ((2,), "srf,sfi->srfi"),
+        ((2, 2), "srf,sfij->srfij")
+    ])
+
+
+#  Row indices into time/ant indexed arrays
+time_idx = np.asarray([0, 0, 1, 1, 2, 2, 2, 2, 3, 3])
+ant1 = np.asarray([0, 0, 0, 0, 1, 1, 1, 2, 2, 3])
+ant2 = np.asarray([0, 1, 2, 3, 1, 2, 3, 2, 3, 3])
+
+
+def _gauss_shape(src):
+    gauss_shape = rf((src, 3))
+    gauss_shape[:, :2] *= 1e-4
+    # Make the first source a point source
+    gauss_shape[0, :2] = 0.0
+    return gauss_shape
+
+
+@corr_shape_parametrization
+@pytest.mark.parametrize("have_gauss", [True, False])
+@pytest.mark.parametrize("have_ddes", [True, False])
+@pytest.mark.parametrize("have_dies", [True, False])
+@pytest.mark.parametrize("convention", ["fourier", "casa"])
+@chunk_parametrization
+def test_fused_predict(corr_shape, bl_schema, have_gauss,
+                       have_ddes, have_dies, convention, chunks):
+    s = sum(chunks['source'])
+    t = sum(chunks['time'])
+    a = sum(chunks['antenna'])
+    c = sum(chunks['channels'])
+    r = sum(chunks['rows'])
+
+    lm = (rf((s, 2)) - 0.5)*1e-2
+    uvw = (rf((r, 3)) - 0.5)*1e4
+    frequency = np.linspace(.856e9, 2*.856e9, c)
+    brightness = rc((s, c) + corr_shape)
+    gauss_shape = _gauss_shape(s) if have_gauss else None
+    dde1_jones = rc((s, t, a, c) + corr_shape) if have_ddes else None
+    dde2_jones = rc((s, t, a, c) + corr_shape) if have_ddes else None
+    die1_jones = rc((t, a, c) + corr_shape) if have_dies else None
+    die2_jones = rc((t, a, c) + corr_shape) if have_dies else None
+
+    vis = fused_predict(time_idx, ant1, ant2, lm, uvw, frequency,
+                        brightness, gauss_shape=gauss_shape,
+                        dde1_jones=dde1_jones, dde2_jones=dde2_jones,
+                        die1_jones=die1_jones, die2_jones=die2_jones,
+                        convention=convention)
+
+    assert vis.shape == (r, c) + corr_shape
+
+    # Compute it another way, by materialising the source coherencies
+    phase = phase_delay(lm, uvw, frequency, convention=convention)
+
+    if have_gauss:
+        phase *= gaussian(uvw, frequency, gauss_shape)
+
+    source_coh = np.einsum(bl_schema, phase, brightness)
+
+    expected = predict_vis(time_idx, ant1, ant2,
+                           dde1_jones=dde1_jones,
+                           source_coh=source_coh,
+                           dde2_jones=dde2_jones,
+                           die1_jones=die1_jones,
+                           die2_jones=die2_jones)
+
+    assert_array_almost_equal(vis, expected)
+
+
+@corr_shape_parametrization
+@pytest.mark.parametrize("have_ddes", [True, False])
+@pytest.mark.parametrize("have_dies", [True, False])
+@chunk_parametrization
+def test_dask_fused_predict(corr_shape, bl_schema,
+                            have_ddes, have_dies, chunks):
+    da = pytest.importorskip('dask.array')
+
+    from africanus.rime.dask import fused_predict as dask_fused_predict
+
+    sc = chunks['source']
+    tc = chunks['time']
+    rrc = chunks['rows']
+    ac = chunks['antenna']
+    cc = chunks['channels']
+
+    s = sum(sc)
+    t = sum(tc)
+    a = sum(ac)
+    c = sum(cc)
+    r = sum(rrc)
+
+    lm = (rf((s, 2)) - 0.5)*1e-2
+    uvw = (rf((r, 3)) - 0.5)*1e4
+    frequency = np.linspace(.856e9, 2*.856e9, c)
+    brightness = rc((s, c) + corr_shape)
+    gauss_shape = _gauss_shape(s)
+    dde1_jones = rc((s, t, a, c) + corr_shape) if have_ddes else None
+    dde2_jones = rc((s, t, a, c) + corr_shape) if have_ddes else None
+    die1_jones = rc((t, a, c) + corr_shape) if have_dies else None
+    die2_jones = rc((t, a, c) + corr_shape) if have_dies else None
+
+    np_vis = fused_predict(time_idx, ant1, ant2, lm, uvw, frequency,
+                           brightness, gauss_shape=gauss_shape,
+                           dde1_jones=dde1_jones, dde2_jones=dde2_jones,
+                           die1_jones=die1_jones, die2_jones=die2_jones)
+
+    cdims = tuple(corr_shape)
+    ddes = (sc, tc, ac, cc) + cdims
+    dies = (tc, ac, cc) + cdims
+
+    da_time_idx = da.from_array(time_idx, chunks=rrc)
+    da_ant1 = da.from_array(ant1, chunks=rrc)
+    da_ant2 = da.from_array(ant2, chunks=rrc)
+    da_lm = da.from_array(lm, chunks=(sc, 2))
+    da_uvw = da.from_array(uvw, chunks=(rrc, 3))
+    da_frequency = da.from_array(frequency, chunks=(cc,))
+    da_brightness = da.from_array(brightness, chunks=(sc, cc) + cdims)
+    da_gauss_shape = da.from_array(gauss_shape, chunks=(sc, 3))
+    da_dde1 = da.from_array(dde1_jones, chunks=ddes) if have_ddes else None
+    da_dde2 = da.from_array(dde2_jones, chunks=ddes) if have_ddes else None
+    da_die1 = da.from_array(die1_jones, chunks=dies) if have_dies else None
+    da_die2 = da.from_array(die2_jones, chunks=dies) if have_dies else None
+
+    vis = dask_fused_predict(da_time_idx, da_ant1, da_ant2,
+                             da_lm, da_uvw, da_frequency, da_brightness,
+                             gauss_shape=da_gauss_shape,
+                             dde1_jones=da_dde1, dde2_jones=da_dde2,
+                             die1_jones=da_die1, die2_jones=da_die2)
+
+    assert_array_almost_equal(vis.compute(), np_vis)
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from numpy.testing import assert_array_equal, assert_allclose
+import pytest
+
+from africanus.constants import c as lightspeed
+from africanus.rime.fused_predict import fused_predict
+from africanus.rime.hybrid_predict import hybrid_split
+
+
+def rf(*a, **kw):
+    return np.random.random(*a, **kw)
+
+
+def rc(*a, **kw):
+    return rf(*a, **kw) + 1j*rf(*a, **kw)
+
+
+#  Row indices into time/ant indexed arrays
+time_idx = np.asarray([0, 0, 1, 1, 2, 2, 2, 2, 3, 3])
+ant1 = np.asarray([0, 0, 0, 0, 1, 1, 1, 2, 2, 3])
+ant2 = np.asarray([0, 1, 2, 3, 1, 2, 3, 2, 3, 3])
+
+nx = ny = 32
+cell = 1e-4
+
+
+def _sky_model(nbright, nfaint, nchan, corr_shape):
+    np.random.seed(42)
+    frequency = np.linspace(.856e9, 2*.856e9, nchan)
+
+    # Bright sources anywhere, faint sources on pixel centres
+    bright_lm = (rf((nbright, 2)) - 0.5) * nx * cell
+    pixels = np.random.randint(0, nx, size=(nfaint, 2))
+    faint_lm = (pixels - nx // 2) * cell
+    lm = np.concatenate([bright_lm, faint_lm])
+
+    brightness = rc((nbright + nfaint, nchan) + corr_shape)
+    brightness[nbright:] *= 1e-3
+
+    uvw = ((rf((time_idx.size, 3)) - 0.5) /
+           (cell * frequency[-1] / lightspeed))
+
+    return lm, uvw, frequency, brightness
+
+
+def test_hybrid_split():
+    lm = np.asarray([[0.0, 0.0],
+                     [cell, -cell],
+                     [nx * cell, 0.0],
+                     [0.0, 2*cell]])
+    brightness = np.asarray([10.0, 0.1, 0.1, 0.1])[:, None, None]
+    gauss_shape = np.zeros((4, 3))
+    gauss_shape[3, :2] = 1e-4
+
+    exact = hybrid_split(lm, brightness, 1.0, nx, ny, cell,
+                         gauss_shape=gauss_shape)
+
+    # Bright, faint, outside image, gaussian
+    assert_array_equal(exact, [True, False, True, True])
+
+    with pytest.raises(ValueError, match="must be even"):
+        hybrid_split(lm, brightness, 1.0, nx + 1, ny, cell)
+
+
+@pytest.mark.parametrize("corr_shape", [(1,), (2, 2)])
+@pytest.mark.parametrize("have_dies", [True, False])
+@pytest.mark.parametrize("convention", ["fourier", "casa"])
+def test_hybrid_predict(corr_shape, have_dies, convention):
+    pytest.importorskip('ducc0')
+
+    from africanus.rime.hybrid_predict import hybrid_predict
+
+    lm, uvw, frequency, brightness = _sky_model(3, 20, 4, corr_shape)
+    die_jones = rc((4, 4, 4) + corr_shape) if have_dies else None
+
+    vis = hybrid_predict(time_idx, ant1, ant2, lm, uvw, frequency,
+                         brightness, 0.1, nx, ny, cell,
+                         die1_jones=die_jones, die2_jones=die_jones,
+                         epsilon=1e-10, convention=convention)
+
+    expected = fused_predict(time_idx, ant1, ant2, lm, uvw, frequency,
+                             brightness,
+                             die1_jones=die_jones, die2_jones=die_jones,
+                             convention=convention)
+
+    assert_allclose(vis, expected, rtol=1e-6, atol=1e-8)
+
+
+@pytest.mark.parametrize("corr_shape", [(1,), (2, 2)])
+def test_dask_hybrid_predict(corr_shape):
+    da = pytest.importorskip('dask.array')
+    pytest.importorskip('ducc0')
+
+    from africanus.rime.hybrid_predict import hybrid_predict
+    from africanus.rime.dask import hybrid_predict as dask_hybrid_predict
+
+    lm, uvw, frequency, brightness = _sky_model(3, 20, 4, corr_shape)
+    dde_jones = rc((23, 4, 4, 4) + corr_shape)
+    die_jones = rc((4, 4, 4) + corr_shape)
+    freq_bin_idx = np.asarray([0, 2, 3])
+    freq_bin_counts = np.asarray([2, 1, 1])
+
+    sc, tc, rrc, cc, bc = (10, 13), (2, 1, 1), (4, 4, 2), (2, 2), (1, 2)
+
+    vis = hybrid_predict(time_idx, ant1, ant2, lm, uvw, frequency,
+                         brightness, 0.1, nx, ny, cell,
+                         dde1_jones=dde_jones, dde2_jones=dde_jones,
+                         die1_jones=die_jones, die2_jones=die_jones,
+                         freq_bin_idx=freq_bin_idx,
+                         freq_bin_counts=freq_bin_counts,
+                         epsilon=1e-10)
+
+    da_vis = dask_hybrid_predict(
+                da.from_array(time_idx, chunks=rrc),
+                da.from_array(ant1, chunks=rrc),
+                da.from_array(ant2, chunks=rrc),
+                da.from_array(lm, chunks=(sc, 2)),
+                da.from_array(uvw, chunks=(rrc, 3)),
+                da.from_array(frequency, chunks=cc),
+                da.from_array(brightness, chunks=(sc, cc) + corr_shape),
+                0.1, nx, ny, cell,
+                dde1_jones=da.from_array(dde_jones,
+                                         chunks=(sc, tc, 4, cc) + corr_shape),
+                dde2_jones=da.from_array(dde_jones,
+                                         chunks=(sc, tc, 4, cc) + corr_shape),
+                die1_jones=da.from_array(die_jones,
+                                         chunks=(tc, 4, cc) + corr_shape),
+                die2_jones=da.from_array(die_jones,
+                                         chunks=(tc, 4, cc) + corr_shape),
+                freq_bin_idx=da.from_array(freq_bin_idx, chunks=bc),
+                freq_bin_counts=da.from_array(freq_bin_counts, chunks=bc),
+                epsilon=1e-10)
+
+    assert_allclose(da_vis.compute(), vis, rtol=1e-6, atol=1e-8)
@@ -69,6 +69,7 @@ def _observation_endpoints(year, month, day, hour_duration):
 @pytest.mark.flaky(min_passes=1, max_runs=3)
 @pytest.mark.parametrize('backend', [
     'test',
+    'numba',
     pytest.param('casa', marks=pytest.mark.skipif(
                     no_casa,
                     reason='python-casascore not installed')),
@@ -128,9 +129,39 @@ def test_compare_astropy_and_casa(obs_and_tol, wsrt_ants):
     assert np.all(np.abs(diff) < Angle(rtol))
 
 
+@pytest.mark.skipif(no_casa, reason='python-casacore not installed')
+@pytest.mark.parametrize('obs_and_tol', [
+    ((2018, 1, 1, 4), 5.0),
+    ((2018, 2, 20, 8), 5.0),
+    ((2018, 11, 2, 4), 5.0)])
+@pytest.mark.parametrize('zenith_frame', ['AZEL', 'AZELGEO'])
+def test_compare_numba_and_casa(obs_and_tol, zenith_frame, wsrt_ants):
+    """ Compare numba and python-casacore parallactic angles """
+    from africanus.rime.parangles_casa import casa_parallactic_angles
+    from africanus.rime.parangles_numba import numba_parallactic_angles
+
+    obs, tol = obs_and_tol
+    start, end = _observation_endpoints(*obs)
+
+    time = np.linspace(start, end, 50)
+    ant = wsrt_ants
+    fc = np.array([0.5, 1.04719755], dtype=np.float64)
+
+    casa_pa = casa_parallactic_angles(time, ant, fc,
+                                      zenith_frame=zenith_frame)
+    numba_pa = numba_parallactic_angles(time, ant, fc,
+                                        zenith_frame=zenith_frame)
+
+    # Difference in arcseconds, wrapped at 180 degrees
+    diff = np.angle(np.exp(1j*(numba_pa - casa_pa)))
+    diff = np.rad2deg(np.abs(diff)) * 3600.0
+    assert np.all(diff < tol)
+
+
 @pytest.mark.flaky(min_passes=1, max_runs=3)
 @pytest.mark.parametrize('backend', [
     'test',
+    'numba',
     pytest.param('casa', marks=pytest.mark.skipif(
                                 no_casa,
                                 reason='python-casascore not installed')),
@@ -189,3 +189,319 @@ def test_dask_predict_vis(corr_shape, idm, einsum_sig1, einsum_sig2,
 
     assert_array_almost_equal(fan_model_vis, np_model_vis)
     assert_array_almost_equal(stream_model_vis, fan_model_vis)
+
+
+@corr_shape_parametrization
+@dde_presence_parametrization
+@die_presence_parametrization
+@chunk_parametrization
+def test_parallel_predict_vis(corr_shape, idm, einsum_sig1, einsum_sig2,
+                              a1j, blj, a2j, g1j, bvis, g2j,
+                              chunks):
+    from africanus.rime.predict import predict_vis
+
+    s = sum(chunks['source'])
+    t = sum(chunks['time'])
+    a = sum(chunks['antenna'])
+    c = sum(chunks['channels'])
+    r = sum(chunks['rows'])
+
+    a1_jones = rc((s, t, a, c) + corr_shape)
+    bl_jones = rc((s, r, c) + corr_shape)
+    a2_jones = rc((s, t, a, c) + corr_shape)
+    g1_jones = rc((t, a, c) + corr_shape)
+    base_vis = rc((r, c) + corr_shape)
+    g2_jones = rc((t, a, c) + corr_shape)
+
+    #  Row indices into the above time/ant indexed arrays
+    time_idx = np.asarray([0, 0, 1, 1, 2, 2, 2, 2, 3, 3])
+    ant1 = np.asarray([0, 0, 0, 0, 1, 1, 1, 2, 2, 3])
+    ant2 = np.asarray([0, 1, 2, 3, 1, 2, 3, 2, 3, 3])
+
+    args = (time_idx, ant1, ant2,
+            a1_jones if a1j else None,
+            bl_jones if blj else None,
+            a2_jones if a2j else None,
+            g1_jones if g1j else None,
+            base_vis if bvis else None,
+            g2_jones if g2j else None)
+
+    serial_vis = predict_vis(*args)
+    parallel_vis = predict_vis(*args, parallel=True)
+
+    assert_array_almost_equal(serial_vis, parallel_vis)
+
+
+@pytest.mark.parametrize("corr_shape", [(1,), (2,), (2, 2)])
+def test_parallel_apply_gains(corr_shape):
+    from africanus.rime.predict import apply_gains, predict_vis
+
+    t, a, c = 4, 4, 5
+
+    time_idx = np.asarray([0, 0, 1, 1, 2, 2, 2, 2, 3, 3])
+    ant1 = np.asarray([0, 0, 0, 0, 1, 1, 1, 2, 2, 3])
+    ant2 = np.asarray([0, 1, 2, 3, 1, 2, 3, 2, 3, 3])
+
+    g1_jones = rc((t, a, c) + corr_shape)
+    vis = rc((time_idx.size, c) + corr_shape)
+    g2_jones = rc((t, a, c) + corr_shape)
+
+    expected = predict_vis(time_idx, ant1, ant2,
+                           die1_jones=g1_jones,
+                           base_vis=vis,
+                           die2_jones=g2_jones)
+
+    serial_vis = apply_gains(time_idx, ant1, ant2, g1_jones, vis, g2_jones)
+    parallel_vis = apply_gains(time_idx, ant1, ant2, g1_jones, vis, g2_jones,
+                               parallel=True)
+
+    assert_array_almost_equal(serial_vis, expected)
+    assert_array_almost_equal(parallel_vis, expected)
+
+
+@corr_shape_parametrization
+@pytest.mark.parametrize("parallel", [False, True])
+def test_direction_predict_vis(corr_shape, idm, einsum_sig1, einsum_sig2,
+                               parallel):
+    from africanus.rime.predict import predict_vis
+
+    s, d, t, a, c = 7, 3, 4, 4, 5
+
+    source_to_direction = np.asarray([0, 2, 1, 0, 2, 2, 0])
+
+    a1_jones = rc((d, t, a, c) + corr_shape)
+    bl_jones = rc((s, 10, c) + corr_shape)
+    a2_jones = rc((d, t, a, c) + corr_shape)
+    g1_jones = rc((t, a, c) + corr_shape)
+    g2_jones = rc((t, a, c) + corr_shape)
+
+    time_idx = np.asarray([0, 0, 1, 1, 2, 2, 2, 2, 3, 3])
+    ant1 = np.asarray([0, 0, 0, 0, 1, 1, 1, 2, 2, 3])
+    ant2 = np.asarray([0, 1, 2, 3, 1, 2, 3, 2, 3, 3])
+
+    dir_vis = predict_vis(time_idx, ant1, ant2,
+                          a1_jones, bl_jones, a2_jones,
+                          g1_jones, None, g2_jones,
+                          source_to_direction=source_to_direction,
+                          parallel=parallel)
+
+    # Broadcast direction DDEs to each source
+    src_vis = predict_vis(time_idx, ant1, ant2,
+                          a1_jones[source_to_direction],
+                          bl_jones,
+                          a2_jones[source_to_direction],
+                          g1_jones, None, g2_jones)
+
+    assert_array_almost_equal(dir_vis, src_vis)
+
+
+@corr_shape_parametrization
+@pytest.mark.parametrize("parallel", [False, True])
+def test_index_map_predict_vis(corr_shape, idm, einsum_sig1, einsum_sig2,
+                               parallel):
+    from africanus.rime.predict import apply_gains, predict_vis
+
+    s, t, a, c = 3, 4, 4, 6
+
+    time_idx = np.asarray([0, 0, 1, 1, 2, 2, 2, 2, 3, 3]) + 5
+    ant1 = np.asarray([0, 0, 0, 0, 1, 1, 1, 2, 2, 3])
+    ant2 = np.asarray([0, 1, 2, 3, 1, 2, 3, 2, 3, 3])
+
+    # DDEs on 2 time x 3 channel intervals, DIEs on 4 x 2 intervals
+    dde_time_map = np.asarray([0, 0, 1, 1])
+    dde_chan_map = np.asarray([0, 0, 0, 1, 1, 1])
+    die_time_map = np.asarray([0, 0, 0, 0])
+    die_chan_map = np.asarray([0, 0, 1, 1, 2, 2])
+
+    a1_jones = rc((s, 2, a, 2) + corr_shape)
+    bl_jones = rc((s, time_idx.size, c) + corr_shape)
+    a2_jones = rc((s, 2, a, 2) + corr_shape)
+    g1_jones = rc((1, a, 3) + corr_shape)
+    g2_jones = rc((1, a, 3) + corr_shape)
+
+    vis = predict_vis(time_idx, ant1, ant2,
+                      a1_jones, bl_jones, a2_jones,
+                      g1_jones, None, g2_jones,
+                      dde_time_map=dde_time_map,
+                      dde_chan_map=dde_chan_map,
+                      die_time_map=die_time_map,
+                      die_chan_map=die_chan_map,
+                      parallel=parallel)
+
+    def dde(j):
+        return j[:, dde_time_map][:, :, :, dde_chan_map]
+
+    def die(j):
+        return j[die_time_map][:, :, die_chan_map]
+
+    expected = predict_vis(time_idx, ant1, ant2,
+                           dde(a1_jones), bl_jones, dde(a2_jones),
+                           die(g1_jones), None, die(g2_jones))
+
+    assert_array_almost_equal(vis, expected)
+
+    gains_vis = apply_gains(time_idx, ant1, ant2,
+                            g1_jones, bl_jones[0], g2_jones,
+                            time_map=die_time_map,
+                            chan_map=die_chan_map,
+                            parallel=parallel)
+
+    expected = apply_gains(time_idx, ant1, ant2,
+                           die(g1_jones), bl_jones[0], die(g2_jones))
+
+    assert_array_almost_equal(gains_vis, expected)
+
+    with pytest.raises(ValueError, match="must lie in"):
+        predict_vis(time_idx, ant1, ant2,
+                    die1_jones=g1_jones, die2_jones=g2_jones,
+                    base_vis=bl_jones[0],
+                    die_chan_map=die_chan_map + 1)
+
+    with pytest.raises(ValueError, match="Mismatched channels"):
+        predict_vis(time_idx, ant1, ant2,
+                    die1_jones=g1_jones, die2_jones=g2_jones,
+                    base_vis=bl_jones[0],
+                    die_chan_map=die_chan_map[:4])
+
+    with pytest.raises(ValueError, match="without dde1_jones"):
+        predict_vis(time_idx, ant1, ant2,
+                    source_coh=bl_jones,
+                    dde_time_map=dde_time_map)
+
+
+def test_direction_predict_checks():
+    from africanus.rime.predict import predict_checks
+
+    time_idx = np.asarray([0, 0, 1])
+    ant1 = np.asarray([0, 0, 1])
+    ant2 = np.asarray([0, 1, 1])
+    bl_jones = rc((2, 3, 4, 2, 2))
+
+    with pytest.raises(ValueError, match="source_to_direction requires"):
+        predict_checks(time_idx, ant1, ant2,
+                       None, bl_jones, None,
+                       None, None, None,
+                       source_to_direction=np.asarray([0, 0]))
+
+
+@corr_shape_parametrization
+@pytest.mark.parametrize("streams", [False, True])
+def test_dask_direction_predict_vis(corr_shape, idm, einsum_sig1, einsum_sig2,
+                                    streams):
+    da = pytest.importorskip('dask.array')
+
+    from africanus.rime.predict import predict_vis as np_predict_vis
+    from africanus.rime.dask import predict_vis
+
+    sc = (2, 3, 2)
+    tc = (2, 1, 1)
+    rrc = (4, 4, 2)
+    ac = (4,)
+    cc = (3, 2)
+
+    s, t, a, c, r = sum(sc), sum(tc), sum(ac), sum(cc), sum(rrc)
+    d = 3
+
+    source_to_direction = np.asarray([0, 2, 1, 0, 2, 2, 0])
+
+    a1_jones = rc((d, t, a, c) + corr_shape)
+    bl_jones = rc((s, r, c) + corr_shape)
+    a2_jones = rc((d, t, a, c) + corr_shape)
+
+    time_idx = np.asarray([0, 0, 1, 1, 2, 2, 2, 2, 3, 3])
+    ant1 = np.asarray([0, 0, 0, 0, 1, 1, 1, 2, 2, 3])
+    ant2 = np.asarray([0, 1, 2, 3, 1, 2, 3, 2, 3, 3])
+
+    np_vis = np_predict_vis(time_idx, ant1, ant2,
+                            a1_jones, bl_jones, a2_jones,
+                            source_to_direction=source_to_direction)
+
+    dask_vis = predict_vis(
+        da.from_array(time_idx, chunks=rrc),
+        da.from_array(ant1, chunks=rrc),
+        da.from_array(ant2, chunks=rrc),
+        da.from_array(a1_jones, chunks=((d,), tc, ac, cc) + corr_shape),
+        da.from_array(bl_jones, chunks=(sc, rrc, cc) + corr_shape),
+        da.from_array(a2_jones, chunks=((d,), tc, ac, cc) + corr_shape),
+        source_to_direction=da.from_array(source_to_direction, chunks=sc),
+        streams=streams)
+
+    assert_array_almost_equal(dask_vis.compute(), np_vis)
+
+
+@pytest.mark.parametrize("corr_shape", [(1,), (2, 2)])
+def test_stream_predict_vis(corr_shape):
+    from africanus.rime.predict import predict_vis, stream_predict_vis
+
+    s, t, a, c = 9, 4, 4, 5
+    batch = 4
+
+    time_idx = np.asarray([0, 0, 1, 1, 2, 2, 2, 2, 3, 3])
+    ant1 = np.asarray([0, 0, 0, 0, 1, 1, 1, 2, 2, 3])
+    ant2 = np.asarray([0, 1, 2, 3, 1, 2, 3, 2, 3, 3])
+    r = time_idx.size
+
+    a1_jones = rc((s, t, a, c) + corr_shape)
+    bl_jones = rc((s, r, c) + corr_shape)
+    a2_jones = rc((s, t, a, c) + corr_shape)
+    g1_jones = rc((t, a, c) + corr_shape)
+    base_vis = rc((r, c) + corr_shape)
+    g2_jones = rc((t, a, c) + corr_shape)
+
+    expected = predict_vis(time_idx, ant1, ant2,
+                           a1_jones, bl_jones, a2_jones,
+                           g1_jones, base_vis, g2_jones)
+
+    def batches():
+        for start in range(0, s, batch):
+            end = start + batch
+            yield (a1_jones[start:end],
+                   bl_jones[start:end],
+                   a2_jones[start:end])
+
+    vis = stream_predict_vis(time_idx, ant1, ant2, batches(),
+                             g1_jones, base_vis, g2_jones)
+
+    assert_array_almost_equal(vis, expected)
+
+    with pytest.raises(ValueError, match="No source batches"):
+        stream_predict_vis(time_idx, ant1, ant2, iter([]))
+
+
+@pytest.mark.parametrize("streams", [1, 2, 3, 20])
+def test_dask_predict_vis_streams(streams):
+    da = pytest.importorskip('dask.array')
+
+    from africanus.rime.predict import predict_vis as np_predict_vis
+    from africanus.rime.dask import predict_vis
+
+    sc = (2, 3, 4, 2, 2)
+    tc = (2, 1, 1)
+    rrc = (4, 4, 2)
+    ac = (4,)
+    cc = (3, 2)
+    corr_shape = (2, 2)
+
+    s, t, a, c, r = sum(sc), sum(tc), sum(ac), sum(cc), sum(rrc)
+
+    a1_jones = rc((s, t, a, c) + corr_shape)
+    bl_jones = rc((s, r, c) + corr_shape)
+    a2_jones = rc((s, t, a, c) + corr_shape)
+
+    time_idx = np.asarray([0, 0, 1, 1, 2, 2, 2, 2, 3, 3])
+    ant1 = np.asarray([0, 0, 0, 0, 1, 1, 1, 2, 2, 3])
+    ant2 = np.asarray([0, 1, 2, 3, 1, 2, 3, 2, 3, 3])
+
+    np_vis = np_predict_vis(time_idx, ant1, ant2,
+                            a1_jones, bl_jones, a2_jones)
+
+    dask_vis = predict_vis(
+        da.from_array(time_idx, chunks=rrc),
+        da.from_array(ant1, chunks=rrc),
+        da.from_array(ant2, chunks=rrc),
+        da.from_array(a1_jones, chunks=(sc, tc, ac, cc) + corr_shape),
+        da.from_array(bl_jones, chunks=(sc, rrc, cc) + corr_shape),
+        da.from_array(a2_jones, chunks=(sc, tc, ac, cc) + corr_shape),
+        streams=streams)
+
+    assert_array_almost_equal(dask_vis.compute(), np_vis)
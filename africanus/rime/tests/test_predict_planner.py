@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from numpy.testing import assert_array_almost_equal
+import pytest
+
+
+def _inputs(da, sc, tc, rrc, ac, cc, corr_shape=(2, 2)):
+    s, t, a, c, r = sum(sc), sum(tc), sum(ac), sum(cc), sum(rrc)
+    rs = np.random.RandomState(42)
+
+    def rc(shape):
+        return rs.random_sample(shape) + 1j*rs.random_sample(shape)
+
+    time_idx = np.asarray([0, 0, 1, 1, 2, 2, 2, 2, 3, 3])
+    ant1 = np.asarray([0, 0, 0, 0, 1, 1, 1, 2, 2, 3])
+    ant2 = np.asarray([0, 1, 2, 3, 1, 2, 3, 2, 3, 3])
+    assert time_idx.size == r
+
+    dde = rc((s, t, a, c) + corr_shape)
+    coh = rc((s, r, c) + corr_shape)
+
+    return (da.from_array(time_idx, chunks=rrc),
+            da.from_array(ant1, chunks=rrc),
+            da.from_array(ant2, chunks=rrc),
+            da.from_array(dde, chunks=(sc, tc, ac, cc) + corr_shape),
+            da.from_array(coh, chunks=(sc, rrc, cc) + corr_shape))
+
+
+def test_plan_predict_vis():
+    da = pytest.importorskip("dask.array")
+
+    from africanus.rime.dask import plan_predict_vis, predict_vis
+
+    sc = (2, 3, 4, 2)
+    tc = (2, 1, 1)
+    rrc = (4, 4, 2)
+    ac = (4,)
+    cc = (3, 2)
+
+    time_idx, ant1, ant2, dde, coh = _inputs(da, sc, tc, rrc, ac, cc)
+
+    # A generous budget aggregates all rows into a tree reduction
+    plan = plan_predict_vis(time_idx, ant1, ant2,
+                            dde1_jones=dde, source_coh=coh,
+                            dde2_jones=dde,
+                            memory_budget="1GB", nthreads=4)
+
+    assert plan.fits is True
+    assert plan.streams is None
+    assert plan.row_chunks == (10,)
+    assert plan.time_chunks == (4,)
+    assert plan.source_chunks == (4, 4, 3)
+    assert plan.peak_memory <= 1024**3
+
+    # A tight budget requires smaller chunks and linear streams
+    tight = plan_predict_vis(time_idx, ant1, ant2,
+                             dde1_jones=dde, source_coh=coh,
+                             dde2_jones=dde,
+                             memory_budget=20000, nthreads=4)
+
+    assert tight.peak_memory < plan.peak_memory
+    assert tight.fits is (tight.peak_memory <= 20000)
+
+    # The plan's chunking and reduction produce the same result
+    expected = predict_vis(time_idx, ant1, ant2,
+                           dde1_jones=dde, source_coh=coh, dde2_jones=dde)
+
+    for p in (plan, tight):
+        p_time_idx = time_idx.rechunk((p.row_chunks,))
+        p_dde = dde.rechunk({0: p.source_chunks, 1: p.time_chunks})
+        p_coh = coh.rechunk({0: p.source_chunks, 1: p.row_chunks})
+
+        vis = predict_vis(p_time_idx,
+                          ant1.rechunk((p.row_chunks,)),
+                          ant2.rechunk((p.row_chunks,)),
+                          dde1_jones=p_dde, source_coh=p_coh,
+                          dde2_jones=p_dde, streams=p.streams)
+
+        assert_array_almost_equal(vis.compute(), expected.compute())
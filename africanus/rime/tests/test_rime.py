@@ -50,6 +50,38 @@ def test_phase_delay(convention, sign):
     assert np.all(np.exp(1j*phase) == complex_phase[lm_i, uvw_i, freq_i])
 
 
+@pytest.mark.parametrize("convention", ['fourier', 'casa'])
+def test_phase_delay_recurrence(convention):
+    from africanus.rime import phase_delay
+    from africanus.util.phasor import PHASOR_ANCHOR
+
+    rs = np.random.RandomState(42)
+    uvw = rs.normal(scale=1e3, size=(100, 3))
+    lm = rs.normal(scale=1e-2, size=(10, 2))
+    frequency = np.linspace(.856e9, .856e9*2, 4096, endpoint=True)
+
+    direct = phase_delay(lm, uvw, frequency, convention=convention)
+    recurrence = phase_delay(lm, uvw, frequency, convention=convention,
+                             recurrence=True)
+
+    # Documented error bound (africanus.util.phasor)
+    n = np.sqrt(1.0 - (lm**2).sum(axis=1)) - 1.0
+    lmn = np.concatenate([lm, n[:, None]], axis=1)
+    max_phase = np.abs(lmn.dot(uvw.T)).max() * frequency.max() * 2*np.pi / 3e8
+    eps = np.finfo(np.float64).eps
+    bound = (4*PHASOR_ANCHOR + 16*max_phase)*eps
+
+    assert np.abs(direct - recurrence).max() <= bound
+
+    # Irregularly spaced frequencies fall back to direct evaluation
+    frequency[5] += 1e3
+    direct = phase_delay(lm, uvw, frequency, convention=convention)
+    recurrence = phase_delay(lm, uvw, frequency, convention=convention,
+                             recurrence=True)
+
+    assert np.all(direct == recurrence)
+
+
 def test_feed_rotation():
     import numpy as np
     from africanus.rime import feed_rotation
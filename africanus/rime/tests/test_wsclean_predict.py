@@ -55,6 +55,13 @@ def test_wsclean_predict(chunks):
 
     assert_almost_equal(np_vis, vis)
 
+    # Phase recurrence over the evenly spaced channels
+    rec_vis = wsclean_predict(uvw, lm, source_type, flux, coeffs,
+                              log_poly, ref_freq, gauss_shape, freq,
+                              recurrence=True)
+
+    assert_almost_equal(rec_vis, vis)
+
 
 @chunk_parametrization
 def test_dask_wsclean_predict(chunks):
@@ -102,3 +109,62 @@ def test_dask_wsclean_predict(chunks):
                                   da_gauss_shape, da_freq)
 
     assert_almost_equal(vis, da_vis)
+
+    da_par_vis = dask_wsclean_predict(da_uvw, da_lm, da_source_type,
+                                      da_flux, da_coeffs,
+                                      da_log_poly, da_ref_freq,
+                                      da_gauss_shape, da_freq,
+                                      parallel=True)
+
+    assert_almost_equal(vis, da_par_vis)
+
+
+@pytest.mark.parametrize("dtype, double_accum, decimal", [
+    (None, False, 7),
+    (np.complex64, False, 3),
+    (np.complex64, True, 3),
+])
+def test_parallel_wsclean_predict(dtype, double_accum, decimal):
+    row, src, chan = 20, 15, 16
+
+    rs = np.random.RandomState(42)
+    source_sel = rs.randint(0, 2, src).astype(np.bool)
+    source_type = np.where(source_sel, "POINT", "GAUSSIAN")
+
+    gauss_shape = rs.normal(size=(src, 3))
+    uvw = rs.normal(size=(row, 3))
+    lm = rs.normal(size=(src, 2))*1e-5
+    flux = rs.normal(size=src)
+    coeffs = rs.normal(size=(src, 2))
+    log_poly = rs.randint(0, 2, src, dtype=np.bool)
+    flux[log_poly] = np.abs(flux[log_poly])
+    coeffs[log_poly] = np.abs(coeffs[log_poly])
+    freq = np.linspace(.856e9, 2*.856e9, chan)
+    ref_freq = np.full(src, freq[freq.shape[0] // 2])
+
+    args = (uvw, lm, source_type, flux, coeffs,
+            log_poly, ref_freq, gauss_shape, freq)
+
+    vis = wsclean_predict(*args)
+    par_vis = wsclean_predict(*args, dtype=dtype,
+                              double_accum=double_accum,
+                              parallel=True)
+
+    assert par_vis.dtype == (vis.dtype if dtype is None else dtype)
+    assert_almost_equal(par_vis, vis, decimal=decimal)
+
+
+def test_wsclean_predict_source_type():
+    src, row, chan = 2, 3, 4
+    rs = np.random.RandomState(42)
+
+    with pytest.raises(ValueError, match="POINT or GAUSSIAN"):
+        wsclean_predict(rs.normal(size=(row, 3)),
+                        rs.normal(size=(src, 2))*1e-5,
+                        np.asarray(["POINT", "DISK"]),
+                        rs.normal(size=src),
+                        rs.normal(size=(src, 2)),
+                        np.zeros(src, dtype=np.bool),
+                        np.full(src, 1e9),
+                        rs.normal(size=(src, 3)),
+                        np.linspace(.856e9, 2*.856e9, chan))
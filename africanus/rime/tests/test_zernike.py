@@ -196,6 +196,108 @@ def test_zernike_multiple_dims(coeff_xx, noll_index_xx):
     assert vals.shape == (nsrc, ntime, na, nchan, corr1, corr2)
 
 
+@pytest.mark.parametrize("parallel", [False, True])
+def test_zernike_tables(parallel):
+    """ Tests the tabulated engine against direct evaluation """
+    from africanus.rime.zernike import (nb_zernike_dde, noll_to_nm,
+                                        zernike_dde, zernike_tables)
+
+    # First Noll indices, in zero-based order
+    assert [noll_to_nm(j) for j in range(6)] == [(0, 0), (1, 1), (1, -1),
+                                                 (2, 0), (2, -2), (2, 2)]
+
+    azimuth, rad_coeffs, rad_terms = zernike_tables(4)
+    assert azimuth.tolist() == [0, 1, -1, 0]
+    assert rad_terms.tolist() == [1, 1, 1, 2]
+    # R_2^0 = 2 rho^2 - 1
+    assert rad_coeffs[3].tolist() == [2.0, -1.0]
+
+    rs = np.random.RandomState(42)
+    src, time, ant, chan, corr, poly = 10, 3, 4, 2, 4, 30
+
+    coords = np.zeros((3, src, time, ant, chan))
+    coords[:2] = rs.uniform(-0.8, 0.8, size=(2, src, time, ant, chan))
+    coords[:2, 0] = 0.0  # Origin
+
+    coeffs = (rs.normal(size=(ant, chan, corr, poly)) +
+              1j*rs.normal(size=(ant, chan, corr, poly)))
+    noll_index = rs.randint(0, 40, size=(ant, chan, corr, poly))
+
+    expected = np.empty((src, time, ant, chan, corr), coeffs.dtype)
+    nb_zernike_dde(coords, coeffs, noll_index, expected)
+
+    vals = zernike_dde(coords, coeffs, noll_index, parallel=parallel)
+    assert np.allclose(vals, expected, rtol=1e-10, atol=1e-12)
+
+    # Coordinates outside the unit circle are zero
+    coords[:2, 1] = 0.8
+    vals = zernike_dde(coords, coeffs, noll_index, parallel=parallel)
+    assert np.all(vals[1] == 0)
+
+
+def _fused_inputs(src, time, ant, chan, corr, poly):
+    rs = np.random.RandomState(42)
+
+    lm = rs.uniform(-0.5, 0.5, size=(src, 2))
+    parangles = rs.uniform(-np.pi, np.pi, size=(time, ant))
+    point_errors = rs.normal(scale=0.05, size=(time, ant, 2))
+    ant_scale = rs.uniform(0.9, 1.1, size=(ant, chan))
+    frequency = np.linspace(.856e9, 2*.856e9, chan)
+    coeffs = (rs.normal(size=(ant, chan) + corr + (poly,)) +
+              1j*rs.normal(size=(ant, chan) + corr + (poly,)))
+    noll_index = rs.randint(0, 20, size=(ant, chan) + corr + (poly,))
+
+    return (lm, parangles, point_errors, ant_scale,
+            frequency, coeffs, noll_index)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_fused_zernike_dde(parallel):
+    """ Tests that fused_zernike_dde agrees with the two step pipeline """
+    from africanus.rime import (fused_zernike_dde, transform_sources,
+                                zernike_dde)
+
+    args = _fused_inputs(10, 3, 4, 5, (2, 2), 8)
+    lm, parangles, point_errors, ant_scale, frequency, coeffs, nolls = args
+
+    coords = transform_sources(lm, parangles, point_errors,
+                               ant_scale, frequency)
+    expected = zernike_dde(coords, coeffs, nolls)
+
+    vals = fused_zernike_dde(*args, parallel=parallel)
+    assert vals.shape == (10, 3, 4, 5, 2, 2)
+    assert np.allclose(vals, expected)
+
+    with pytest.raises(ValueError, match="antenna_scaling"):
+        fused_zernike_dde(lm, parangles, point_errors, ant_scale[:, :2],
+                          frequency, coeffs, nolls)
+
+
+def test_dask_fused_zernike_dde():
+    """ Tests that dask fused_zernike_dde agrees with numpy """
+    da = pytest.importorskip("dask.array")
+
+    from africanus.rime import fused_zernike_dde as np_fused_zernike_dde
+    from africanus.rime.dask import fused_zernike_dde
+
+    args = _fused_inputs(10, 4, 5, 6, (2,), 8)
+    lm, parangles, point_errors, ant_scale, frequency, coeffs, nolls = args
+    vals = np_fused_zernike_dde(*args)
+
+    src_c, time_c, ant_c, chan_c = (6, 4), (2, 2), (3, 2), (2, 4)
+
+    dask_vals = fused_zernike_dde(
+        da.from_array(lm, (src_c, 2)),
+        da.from_array(parangles, (time_c, ant_c)),
+        da.from_array(point_errors, (time_c, ant_c, 2)),
+        da.from_array(ant_scale, (ant_c, chan_c)),
+        da.from_array(frequency, (chan_c,)),
+        da.from_array(coeffs, (ant_c, chan_c, 2, 8)),
+        da.from_array(nolls, (ant_c, chan_c, 2, 8)))
+
+    assert np.all(vals == dask_vals.compute())
+
+
 def test_dask_zernike(coeff_xx, noll_index_xx):
     """ Tests that dask zernike_dde agrees with numpy zernike_dde """
     da = pytest.importorskip("dask.array")
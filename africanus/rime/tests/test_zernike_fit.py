@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from numpy.testing import assert_allclose
+import pytest
+
+from africanus.rime import zernike_dde, zernike_fit
+from africanus.rime.zernike_fit import zernike_basis
+
+
+def test_zernike_fit():
+    rs = np.random.RandomState(42)
+    lw, mh, nud, nterms = 33, 31, 3, 10
+    extents = np.asarray([[-1.0, 1.0], [-1.2, 1.2]])
+    beam_freq_map = np.asarray([1e9, 1.5e9, 2e9])
+
+    # Beam cube composed of known Zernike polynomials
+    true_coeffs = (rs.normal(size=(nterms, nud, 2, 2)) +
+                   1j*rs.normal(size=(nterms, nud, 2, 2)))
+    l = np.linspace(-1.0, 1.0, lw)  # noqa: E741
+    m = np.linspace(-1.2, 1.2, mh)
+    ll, mm = np.meshgrid(l, m, indexing="ij")
+    basis = zernike_basis(ll.ravel(), mm.ravel(), nterms)
+    beam = np.einsum("pj,jfxy->pfxy", basis, true_coeffs)
+    beam = beam.reshape(lw, mh, nud, 2, 2)
+
+    frequency = np.asarray([0.9e9, 1e9, 1.25e9, 2e9, 2.1e9])
+    fit = zernike_fit(beam, extents, beam_freq_map, frequency,
+                      nterms, na=4)
+
+    assert fit.radius == 1.0
+    assert fit.coeffs.shape == (4, 5, 2, 2, nterms)
+    assert fit.noll_index.shape == (4, 5, 2, 2, nterms)
+    assert fit.residual.shape == (nud, 2, 2)
+    assert_allclose(fit.residual, 0.0, atol=1e-10)
+
+    expected = np.moveaxis(true_coeffs, 0, -1)
+    # Edge channels, beam channels and an interpolated channel
+    assert_allclose(fit.coeffs[:, 0], expected[None, 0])
+    assert_allclose(fit.coeffs[:, 1], expected[None, 0])
+    assert_allclose(fit.coeffs[:, 2], 0.5*(expected[None, 0] +
+                                            expected[None, 1]))
+    assert_allclose(fit.coeffs[:, 3], expected[None, 2])
+    assert_allclose(fit.coeffs[:, 4], expected[None, 2])
+
+    # Coefficients reproduce the beam within the disk
+    coords = np.zeros((3, lw*mh, 1, 4, 5))
+    coords[0] = ll.ravel()[:, None, None, None]
+    coords[1] = mm.ravel()[:, None, None, None]
+    ddes = zernike_dde(coords, fit.coeffs, fit.noll_index)
+    disk = (ll**2 + mm**2 <= 1.0).ravel()
+    assert_allclose(ddes[disk, 0, 2, 1], beam.reshape(-1, nud, 2, 2)[disk, 0])
+
+    # Fewer terms leave a residual
+    fit = zernike_fit(beam, extents, beam_freq_map, frequency, 3)
+    assert np.all(fit.residual > 1e-3)
+
+    with pytest.raises(ValueError, match="fewer than nterms"):
+        zernike_fit(beam, extents, beam_freq_map, frequency, 10,
+                    radius=0.05)
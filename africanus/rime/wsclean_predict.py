@@ -4,7 +4,9 @@ import numpy as np
 
 from africanus.constants import two_pi_over_c, c as lightspeed
 from africanus.util.docs import DocstringTemplate
-from africanus.util.numba import generated_jit, jit
+from africanus.util.numba import (is_numba_type_none, generated_jit,
+                                  jit, njit, prange)
+from africanus.util.phasor import phasors, regular_channel_width
 from africanus.model.wsclean.spec_model import spectra
 
 
@@ -12,96 +14,213 @@ fwhm = 2.0 * np.sqrt(2.0 * np.log(2.0))
 fwhminv = 1.0 / fwhm
 gauss_scale = fwhminv * np.sqrt(2.0) * np.pi / lightspeed
 
+POINT_TYPE = 0
+GAUSSIAN_TYPE = 1
+
 
 @jit(nopython=True, nogil=True, cache=True)
-def wsclean_predict_impl(uvw, lm, source_type, gauss_shape,
-                         frequency, spectrum, dtype):
+def source_type_enum(source_type):
+    """
+    Converts ``"POINT"`` and ``"GAUSSIAN"`` source type strings
+    into :data:`POINT_TYPE` and :data:`GAUSSIAN_TYPE` integers
+    """
+    stype = np.empty(source_type.shape[0], dtype=np.int32)
+
+    for s in range(source_type.shape[0]):
+        if source_type[s] == "POINT":
+            stype[s] = POINT_TYPE
+        elif source_type[s] == "GAUSSIAN":
+            stype[s] = GAUSSIAN_TYPE
+        else:
+            raise ValueError("source_type must be "
+                             "POINT or GAUSSIAN")
+
+    return stype
+
+
+@njit(nogil=True, inline='always')
+def _wsclean_predict_body(uvw, lm, stype, gauss_shape,
+                          frequency, spectrum, dtype, acc_dtype,
+                          recurrence):
     nrow = uvw.shape[0]
     nchan = frequency.shape[0]
     ncorr = 1
 
     nsrc = spectrum.shape[0]
     n1 = lm.dtype.type(1)
+    constant = lm.dtype.type(two_pi_over_c)
 
     scaled_freq = frequency * frequency.dtype.type(gauss_scale)
 
-    vis = np.zeros((nrow, nchan, ncorr), dtype=dtype)
+    # Per-source terms
+    n = np.empty(nsrc, dtype=lm.dtype)
+    shape_params = np.zeros((nsrc, 3), dtype=lm.dtype)
 
     for s in range(nsrc):
         l = lm[s, 0]  # noqa
         m = lm[s, 1]
-        n = np.sqrt(n1 - l*l - m*m) - n1
+        n[s] = np.sqrt(n1 - l*l - m*m) - n1
 
-        if source_type[s] == "POINT":
-            for r in range(nrow):
-                u = uvw[r, 0]
-                v = uvw[r, 1]
-                w = uvw[r, 2]
+        if stype[s] == GAUSSIAN_TYPE:
+            emaj, emin, angle = gauss_shape[s]
 
-                real_phase = two_pi_over_c*(u*l + v*m + w*n)
+            # Convert to l-projection, m-projection, ratio
+            shape_params[s, 0] = emaj * np.sin(angle)
+            shape_params[s, 1] = emaj * np.cos(angle)
+            shape_params[s, 2] = emin / (1.0 if emaj == 0.0 else emaj)
 
-                for f in range(nchan):
-                    p = real_phase * frequency[f]
-                    re = np.cos(p) * spectrum[s, f]
-                    im = np.sin(p) * spectrum[s, f]
+    if recurrence:
+        regular, chan_width = regular_channel_width(frequency)
+    else:
+        regular, chan_width = False, 0.0
 
-                    vis[r, f, 0] += re + im*1j
-        elif source_type[s] == "GAUSSIAN":
-            emaj, emin, angle = gauss_shape[s]
+    vis = np.empty((nrow, nchan, ncorr), dtype=dtype)
 
-            # Convert to l-projection, m-projection, ratio
-            el = emaj * np.sin(angle)
-            em = emaj * np.cos(angle)
-            er = emin / (1.0 if emaj == 0.0 else emaj)
+    # Each thread predicts a disjoint set of rows
+    for r in prange(nrow):
+        u = uvw[r, 0]
+        v = uvw[r, 1]
+        w = uvw[r, 2]
 
-            for r in range(nrow):
-                u = uvw[r, 0]
-                v = uvw[r, 1]
-                w = uvw[r, 2]
+        phase = np.empty(nchan, dtype=dtype)
+        acc = np.zeros(nchan, dtype=acc_dtype)
 
-                # Compute phase term
-                real_phase = two_pi_over_c*(u*l + v*m + w*n)
+        for s in range(nsrc):
+            # Compute phase term
+            real_phase = constant*(u*lm[s, 0] + v*lm[s, 1] + w*n[s])
+            phasors(real_phase, frequency, regular, chan_width, phase)
+
+            if stype[s] == POINT_TYPE:
+                for f in range(nchan):
+                    acc[f] += phase[f] * spectrum[s, f]
+            else:
+                el = shape_params[s, 0]
+                em = shape_params[s, 1]
+                er = shape_params[s, 2]
 
                 # Gaussian shape term bits
                 u1 = (u*em - v*el)*er
                 v1 = u*el + v*em
 
                 for f in range(nchan):
-                    p = real_phase * frequency[f]
-                    re = np.cos(p) * spectrum[s, f]
-                    im = np.sin(p) * spectrum[s, f]
-
                     # Calculate gaussian shape component and multiply in
                     fu1 = u1 * scaled_freq[f]
                     fv1 = v1 * scaled_freq[f]
                     shape = np.exp(-(fu1 * fu1 + fv1 * fv1))
-                    re *= shape
-                    im *= shape
+                    acc[f] += phase[f] * (spectrum[s, f] * shape)
 
-                    vis[r, f, 0] += re + im*1j
-        else:
-            raise ValueError("source_type must be "
-                             "POINT or GAUSSIAN")
+        for f in range(nchan):
+            vis[r, f, 0] = acc[f]
 
     return vis
 
 
-@generated_jit(nopython=True, nogil=True, cache=True)
-def wsclean_predict(uvw, lm, source_type, flux, coeffs,
-                    log_poly, ref_freq, gauss_shape, frequency):
+@jit(nopython=True, nogil=True, cache=True)
+def wsclean_predict_impl(uvw, lm, source_type, gauss_shape,
+                         frequency, spectrum, dtype, acc_dtype,
+                         recurrence=False):
+    """
+    Predicts visibilities of dtype ``dtype``, accumulating
+    source contributions at ``acc_dtype``.
+    ``source_type`` contains the integer codes
+    produced by :func:`source_type_enum`.
+    """
+    return _wsclean_predict_body(uvw, lm, source_type, gauss_shape,
+                                 frequency, spectrum, dtype, acc_dtype,
+                                 recurrence)
+
+
+@jit(nopython=True, nogil=True, cache=True, parallel=True)
+def parallel_wsclean_predict_impl(uvw, lm, source_type, gauss_shape,
+                                  frequency, spectrum, dtype, acc_dtype,
+                                  recurrence=False):
+    return _wsclean_predict_body(uvw, lm, source_type, gauss_shape,
+                                 frequency, spectrum, dtype, acc_dtype,
+                                 recurrence)
+
+
+def wsclean_dtypes(arg_dtypes, dtype=None, double_accum=False):
+    """
+    Returns the (output, compute, accumulation) dtypes of
+    :func:`wsclean_predict`, given the dtypes of the
+    ``uvw``, ``lm``, ``flux``, ``coeffs``, ``ref_freq`` and ``frequency``
+    inputs and the requested output ``dtype``
+    """
+    if dtype is None:
+        out_dtype = np.result_type(np.complex64, *arg_dtypes)
+    else:
+        out_dtype = np.dtype(dtype)
+
+        if out_dtype.kind != "c":
+            raise TypeError("dtype %s is not complex" % out_dtype)
+
+    real_dtype = np.finfo(out_dtype).dtype
+    acc_dtype = np.dtype(np.complex128) if double_accum else out_dtype
+
+    return out_dtype, real_dtype, acc_dtype
+
+
+def wsclean_predict_generator(impl_fn, uvw, lm, flux, coeffs,
+                              ref_freq, frequency, dtype, acc_dtype):
+    """
+    Generates the numba implementation of :func:`wsclean_predict`
+    which calls ``impl_fn`` from the numba types of the arguments
+    """
     arg_dtypes = tuple(np.dtype(a.dtype.name) for a
                        in (uvw, lm, flux, coeffs, ref_freq, frequency))
-    dtype = np.result_type(np.complex64, *arg_dtypes)
+    out_dtype, real_dtype, acc = wsclean_dtypes(
+        arg_dtypes,
+        dtype=None if is_numba_type_none(dtype) else dtype.dtype.name,
+        double_accum=not is_numba_type_none(acc_dtype))
 
     def impl(uvw, lm, source_type, flux, coeffs, log_poly,
-             ref_freq, gauss_shape, frequency):
+             ref_freq, gauss_shape, frequency, recurrence=False,
+             dtype=None, acc_dtype=None):
         spectrum = spectra(flux, coeffs, log_poly, ref_freq, frequency)
-        return wsclean_predict_impl(uvw, lm, source_type, gauss_shape,
-                                    frequency, spectrum, dtype)
+        return impl_fn(uvw.astype(real_dtype),
+                       lm.astype(real_dtype),
+                       # Convert source type strings once, up front
+                       source_type_enum(source_type),
+                       gauss_shape.astype(real_dtype),
+                       frequency.astype(real_dtype),
+                       spectrum.astype(real_dtype),
+                       out_dtype, acc, recurrence)
 
     return impl
 
 
+@generated_jit(nopython=True, nogil=True, cache=True)
+def serial_wsclean_predict(uvw, lm, source_type, flux, coeffs,
+                           log_poly, ref_freq, gauss_shape, frequency,
+                           recurrence=False, dtype=None, acc_dtype=None):
+    return wsclean_predict_generator(wsclean_predict_impl,
+                                     uvw, lm, flux, coeffs, ref_freq,
+                                     frequency, dtype, acc_dtype)
+
+
+@generated_jit(nopython=True, nogil=True, cache=True)
+def parallel_wsclean_predict(uvw, lm, source_type, flux, coeffs,
+                             log_poly, ref_freq, gauss_shape, frequency,
+                             recurrence=False, dtype=None, acc_dtype=None):
+    return wsclean_predict_generator(parallel_wsclean_predict_impl,
+                                     uvw, lm, flux, coeffs, ref_freq,
+                                     frequency, dtype, acc_dtype)
+
+
+def wsclean_predict(uvw, lm, source_type, flux, coeffs,
+                    log_poly, ref_freq, gauss_shape, frequency,
+                    recurrence=False, dtype=None, double_accum=False,
+                    parallel=False):
+
+    fn = parallel_wsclean_predict if parallel else serial_wsclean_predict
+
+    return fn(uvw, lm, source_type, flux, coeffs,
+              log_poly, ref_freq, gauss_shape, frequency,
+              recurrence,
+              None if dtype is None else np.dtype(dtype),
+              np.dtype(np.complex128) if double_accum else None)
+
+
 WSCLEAN_PREDICT_DOCS = DocstringTemplate("""
     Predict visibilities from a `WSClean sky model
     <https://sourceforge.net/p/wsclean/wiki/ComponentList/>`_.
@@ -138,6 +257,21 @@ WSCLEAN_PREDICT_DOCS = DocstringTemplate("""
         and ``Orientation`` fields in radians, respectively.
     frequency : $(array_type)
         Frequency of shape :code:`(chan,)`.
+    recurrence : {False, True}
+        If ``True`` and ``frequency`` is evenly spaced,
+        per-channel phases are computed by a complex
+        multiply recurrence instead of ``cos`` and ``sin``.
+        See :mod:`africanus.util.phasor` for accuracy guarantees.
+    dtype : :class:`numpy.dtype`, optional
+        Complex output dtype. Inputs are converted to the
+        corresponding real dtype before computation,
+        so that ``np.complex64`` computes in single precision.
+        If ``None``, the dtype is inferred from the inputs.
+    double_accum : {False, True}
+        If ``True``, source contributions are accumulated
+        in double precision, regardless of ``dtype``.
+    parallel : {False, True}
+        If ``True``, rows are distributed over numba threads.
 
     Returns
     -------
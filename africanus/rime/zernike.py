@@ -1,7 +1,10 @@
+from functools import lru_cache
+from math import factorial
+
 import numpy as np
 
 
-from africanus.util.numba import jit
+from africanus.util.numba import jit, njit, prange
 
 
 @jit(nogil=True, nopython=True, cache=True)
@@ -82,26 +85,335 @@ def nb_zernike_dde(coords, coeffs, noll_index, out):
     return out
 
 
-def zernike_dde(coords, coeffs, noll_index):
-    """ Wrapper for :func:`nb_zernike_dde` """
-    _, sources, times, ants, chans = coords.shape
+def noll_to_nm(j):
+    """
+    Converts the zero-based Noll index ``j``
+    into radial order ``n`` and signed azimuthal frequency ``m``,
+    as in :func:`zernike`.
+    """
+    j += 1
+    n = 0
+    j1 = j - 1
+
+    while j1 > n:
+        n += 1
+        j1 -= n
+
+    m = (-1)**j * ((n % 2) + 2 * ((j1 + ((n + 1) % 2)) // 2))
+    return n, m
+
+
+@lru_cache(maxsize=16)
+def zernike_tables(nnoll):
+    """
+    Precomputes radial polynomial tables for
+    the first ``nnoll`` zero-based Noll indices.
+
+    The radial polynomial of Noll index ``j`` is
+    :math:`R(\\rho) = \\rho^{|m|} \\sum_{k=0}^{K} c_{jk}
+    (\\rho^2)^{K - k}` with :math:`K = (n - |m|) / 2`,
+    which is evaluated with Horner's scheme in :math:`\\rho^2`.
+
+    Parameters
+    ----------
+    nnoll : int
+        Number of Noll indices.
+
+    Returns
+    -------
+    azimuth : :class:`numpy.ndarray`
+        Signed azimuthal frequency ``m`` of shape :code:`(nnoll,)`.
+    rad_coeffs : :class:`numpy.ndarray`
+        Radial coefficients :math:`c_{jk}`, highest power of
+        :math:`\\rho^2` first, of shape :code:`(nnoll, K_{max} + 1)`.
+    rad_terms : :class:`numpy.ndarray`
+        Number of radial coefficients :math:`K + 1`
+        of shape :code:`(nnoll,)`.
+    """
+    nm = [noll_to_nm(j) for j in range(nnoll)]
+    nterms = [(n - abs(m)) // 2 + 1 for n, m in nm]
+
+    azimuth = np.asarray([m for _, m in nm], dtype=np.intp)
+    rad_terms = np.asarray(nterms, dtype=np.intp)
+    rad_coeffs = np.zeros((nnoll, max(nterms, default=1)), np.float64)
+
+    for j, (n, m) in enumerate(nm):
+        m = abs(m)
+
+        for k in range(nterms[j]):
+            rad_coeffs[j, k] = ((-1)**k * factorial(n - k) /
+                                (factorial(k) *
+                                 factorial((n + m) // 2 - k) *
+                                 factorial((n - m) // 2 - k)))
+
+    for a in (azimuth, rad_coeffs, rad_terms):
+        a.flags.writeable = False
+
+    return azimuth, rad_coeffs, rad_terms
+
+
+@njit(nogil=True, inline='always')
+def _zernike_point(l, m, coeffs, noll_index, azimuth, rad_coeffs,
+                   rad_terms, zvals, rho_pow, cos_m, sin_m, a, c, out):
+    """
+    Evaluates the Zernike DDE of antenna ``a`` and channel ``c``
+    at ``(l, m)`` into ``out`` of shape :code:`(corr,)`
+    """
+    corrs, npoly = coeffs.shape[2:]
+    rho2 = l * l + m * m
+
+    if rho2 > 1.0:
+        for co in range(corrs):
+            out[co] = 0
+        return
+
+    rho = np.sqrt(rho2)
+
+    # phi = arctan2(l, m) so that the trigonometric
+    # terms follow directly from the coordinates
+    if rho > 0.0:
+        cos_phi = m / rho
+        sin_phi = l / rho
+    else:
+        cos_phi = 1.0
+        sin_phi = 0.0
+
+    # Powers of rho and multiple angle terms by recurrence
+    rho_pow[0] = 1.0
+    cos_m[0] = 1.0
+    sin_m[0] = 0.0
+
+    for k in range(1, rho_pow.shape[0]):
+        rho_pow[k] = rho_pow[k - 1] * rho
+        cos_m[k] = cos_m[k - 1] * cos_phi - sin_m[k - 1] * sin_phi
+        sin_m[k] = sin_m[k - 1] * cos_phi + cos_m[k - 1] * sin_phi
+
+    # Evaluate each polynomial once per coordinate
+    for j in range(azimuth.shape[0]):
+        rad = rad_coeffs[j, 0]
+
+        for k in range(1, rad_terms[j]):
+            rad = rad * rho2 + rad_coeffs[j, k]
+
+        am = abs(azimuth[j])
+        rad *= rho_pow[am]
+
+        if azimuth[j] > 0:
+            rad *= cos_m[am]
+        elif azimuth[j] < 0:
+            rad *= sin_m[am]
+
+        zvals[j] = rad
+
+    for co in range(corrs):
+        zernike_sum = 0
+
+        for p in range(npoly):
+            zn = noll_index[a, c, co, p]
+            zernike_sum += coeffs[a, c, co, p] * zvals[zn]
+
+        out[co] = zernike_sum
+
+
+@njit(nogil=True, inline='always')
+def _max_azimuth(azimuth):
+    mmax = 0
+
+    for j in range(azimuth.shape[0]):
+        mmax = max(mmax, abs(azimuth[j]))
+
+    return mmax
+
+
+@njit(nogil=True, inline='always')
+def _zernike_table_body(coords, coeffs, noll_index,
+                        azimuth, rad_coeffs, rad_terms, out):
+    sources, times, ants, chans, corrs = out.shape
+    nnoll = azimuth.shape[0]
+    mmax = _max_azimuth(azimuth)
+
+    for sa in prange(sources * ants):
+        s = sa // ants
+        a = sa - s * ants
+
+        # Per-thread scratch space
+        zvals = np.empty(nnoll, dtype=coords.dtype)
+        rho_pow = np.empty(mmax + 1, dtype=coords.dtype)
+        cos_m = np.empty(mmax + 1, dtype=coords.dtype)
+        sin_m = np.empty(mmax + 1, dtype=coords.dtype)
+
+        for t in range(times):
+            for c in range(chans):
+                _zernike_point(coords[0, s, t, a, c], coords[1, s, t, a, c],
+                               coeffs, noll_index,
+                               azimuth, rad_coeffs, rad_terms,
+                               zvals, rho_pow, cos_m, sin_m,
+                               a, c, out[s, t, a, c])
+
+    return out
+
+
+@njit(nogil=True, inline='always')
+def _fused_zernike_body(lm, parallactic_angles, pointing_errors,
+                        antenna_scaling, coeffs, noll_index,
+                        azimuth, rad_coeffs, rad_terms, out):
+    sources, times, ants, chans, corrs = out.shape
+    nnoll = azimuth.shape[0]
+    mmax = _max_azimuth(azimuth)
+
+    pa_sin = np.sin(parallactic_angles)
+    pa_cos = np.cos(parallactic_angles)
+
+    for sa in prange(sources * ants):
+        s = sa // ants
+        a = sa - s * ants
+
+        # Per-thread scratch space
+        zvals = np.empty(nnoll, dtype=lm.dtype)
+        rho_pow = np.empty(mmax + 1, dtype=lm.dtype)
+        cos_m = np.empty(mmax + 1, dtype=lm.dtype)
+        sin_m = np.empty(mmax + 1, dtype=lm.dtype)
+
+        for t in range(times):
+            # Transform the source coordinate
+            # as in africanus.rime.transform_sources
+            l = lm[s, 0]  # noqa: E741
+            m = lm[s, 1]
+
+            l = l*pa_cos[t, a] - m*pa_sin[t, a]  # noqa: E741
+            m = l*pa_sin[t, a] + m*pa_cos[t, a]
+
+            l += pointing_errors[t, a, 0]  # noqa: E741
+            m += pointing_errors[t, a, 1]
+
+            for c in range(chans):
+                _zernike_point(l*antenna_scaling[a, c],
+                               m*antenna_scaling[a, c],
+                               coeffs, noll_index,
+                               azimuth, rad_coeffs, rad_terms,
+                               zvals, rho_pow, cos_m, sin_m,
+                               a, c, out[s, t, a, c])
+
+    return out
+
+
+@njit(nogil=True, cache=True)
+def zernike_table_dde(coords, coeffs, noll_index,
+                      azimuth, rad_coeffs, rad_terms, out):
+    """
+    Evaluates Zernike DDEs from the tables produced by
+    :func:`zernike_tables` into ``out`` of shape
+    :code:`(source, time, ant, chan, corr)`
+    with flattened correlations.
+    """
+    return _zernike_table_body(coords, coeffs, noll_index,
+                               azimuth, rad_coeffs, rad_terms, out)
+
+
+@njit(nogil=True, cache=True, parallel=True)
+def parallel_zernike_table_dde(coords, coeffs, noll_index,
+                               azimuth, rad_coeffs, rad_terms, out):
+    return _zernike_table_body(coords, coeffs, noll_index,
+                               azimuth, rad_coeffs, rad_terms, out)
+
+
+@njit(nogil=True, cache=True)
+def fused_zernike_table_dde(lm, parallactic_angles, pointing_errors,
+                            antenna_scaling, coeffs, noll_index,
+                            azimuth, rad_coeffs, rad_terms, out):
+    """
+    Transforms ``lm`` as in :func:`~africanus.rime.transform_sources`
+    and evaluates Zernike DDEs from the tables produced by
+    :func:`zernike_tables` into ``out`` of shape
+    :code:`(source, time, ant, chan, corr)`
+    with flattened correlations.
+    """
+    return _fused_zernike_body(lm, parallactic_angles, pointing_errors,
+                               antenna_scaling, coeffs, noll_index,
+                               azimuth, rad_coeffs, rad_terms, out)
+
+
+@njit(nogil=True, cache=True, parallel=True)
+def parallel_fused_zernike_table_dde(lm, parallactic_angles,
+                                     pointing_errors, antenna_scaling,
+                                     coeffs, noll_index,
+                                     azimuth, rad_coeffs, rad_terms, out):
+    return _fused_zernike_body(lm, parallactic_angles, pointing_errors,
+                               antenna_scaling, coeffs, noll_index,
+                               azimuth, rad_coeffs, rad_terms, out)
+
+
+def _flatten_coeffs(coeffs, noll_index):
+    """ Flattens correlations and produces the matching Noll tables """
+    ants, chans = coeffs.shape[:2]
     # ant, chan, corr_1, ..., corr_n, poly
     corr_shape = coeffs.shape[2:-1]
     npoly = coeffs.shape[-1]
 
     # Flatten correlation dimensions for numba function
     fcorrs = np.product(corr_shape)
-    ddes = np.empty((sources, times, ants, chans, fcorrs), coeffs.dtype)
 
     coeffs = coeffs.reshape((ants, chans, fcorrs, npoly))
     noll_index = noll_index.reshape((ants, chans, fcorrs, npoly))
+    noll_index = noll_index.astype(np.intp)
+
+    if noll_index.size > 0 and noll_index.min() < 0:
+        raise ValueError("Noll indices must be non-negative")
+
+    nnoll = int(noll_index.max()) + 1 if noll_index.size > 0 else 0
+
+    return coeffs, noll_index, zernike_tables(nnoll), corr_shape
+
 
-    result = nb_zernike_dde(coords, coeffs, noll_index, ddes)
+def zernike_dde(coords, coeffs, noll_index, parallel=False):
+    """ Wrapper for :func:`zernike_table_dde` """
+    _, sources, times, ants, chans = coords.shape
+    coeffs, noll_index, tables, corr_shape = _flatten_coeffs(coeffs,
+                                                             noll_index)
+    ddes = np.empty((sources, times, ants, chans, coeffs.shape[2]),
+                    coeffs.dtype)
+
+    fn = parallel_zernike_table_dde if parallel else zernike_table_dde
+    result = fn(coords, coeffs, noll_index, *tables, ddes)
 
     # Reshape to full correlation size
     return result.reshape((sources, times, ants, chans) + corr_shape)
 
 
+def fused_zernike_dde(lm, parallactic_angles, pointing_errors,
+                      antenna_scaling, frequency, coeffs, noll_index,
+                      parallel=False):
+    """ Wrapper for :func:`fused_zernike_table_dde` """
+    ntime, na = parallactic_angles.shape
+    nsrc = lm.shape[0]
+    nchan = frequency.shape[0]
+
+    if pointing_errors.shape != (ntime, na, 2):
+        raise ValueError("pointing_errors.shape %s != %s"
+                         % (pointing_errors.shape, (ntime, na, 2)))
+
+    if antenna_scaling.shape != (na, nchan):
+        raise ValueError("antenna_scaling.shape %s != %s"
+                         % (antenna_scaling.shape, (na, nchan)))
+
+    if coeffs.shape[:2] != (na, nchan):
+        raise ValueError("coeffs.shape[:2] %s != %s"
+                         % (coeffs.shape[:2], (na, nchan)))
+
+    coeffs, noll_index, tables, corr_shape = _flatten_coeffs(coeffs,
+                                                             noll_index)
+    ddes = np.empty((nsrc, ntime, na, nchan, coeffs.shape[2]),
+                    coeffs.dtype)
+
+    fn = (parallel_fused_zernike_table_dde if parallel
+          else fused_zernike_table_dde)
+    result = fn(lm, parallactic_angles, pointing_errors,
+                antenna_scaling, coeffs, noll_index, *tables, ddes)
+
+    # Reshape to full correlation size
+    return result.reshape((nsrc, ntime, na, nchan) + corr_shape)
+
+
 _ZERNICKE_DOCSTRING = (
     """
 Computes Direction Dependent Effects by evaluating
@@ -133,6 +445,9 @@ coeffs : :class:`numpy.ndarray`
 noll_index : :class:`numpy.ndarray`
   Noll index associated with each polynomial coefficient.
   Has shape :code:`(ant, chan, corr_1, ..., corr_n, poly)`.
+parallel : {False, True}
+  If ``True``, sources and antennas are
+  distributed over numba threads.
 
 Returns
 ----------
@@ -142,3 +457,49 @@ dde : :class:`numpy.ndarray`
 """)
 
 zernike_dde.__doc__ = _ZERNICKE_DOCSTRING
+
+
+_FUSED_ZERNIKE_DOCSTRING = (
+    """
+Computes Direction Dependent Effects by evaluating
+Zernike polynomials at the source coordinates produced by
+:func:`~africanus.rime.transform_sources`,
+without forming the intermediate :code:`(3, source, time, ant, chan)`
+coordinate array required by :func:`~africanus.rime.zernike_dde`.
+
+Parameters
+---------------
+lm : :class:`numpy.ndarray`
+   LM coordinates of shape :code:`(source, 2)` in radians
+   offset from the phase centre.
+parallactic_angles : :class:`numpy.ndarray`
+   Parallactic angles of shape :code:`(time, ant)` in radians.
+pointing_errors : :class:`numpy.ndarray`
+   LM pointing errors for each antenna at each timestep
+   in radians. Has shape :code:`(time, ant, 2)`.
+antenna_scaling : :class:`numpy.ndarray`
+   Antenna scaling factor for each channel and
+   each antenna. Has shape :code:`(ant, chan)`.
+frequency : :class:`numpy.ndarray`
+   Frequencies for each channel. Has shape :code:`(chan,)`.
+coeffs : :class:`numpy.ndarray`
+  complex Zernicke polynomial coefficients.
+  Has shape :code:`(ant, chan, corr_1, ..., corr_n, poly)`
+  where ``poly`` is the number of polynomial coefficients
+  and ``corr_1, ..., corr_n`` are a variable number of
+  correlation dimensions.
+noll_index : :class:`numpy.ndarray`
+  Noll index associated with each polynomial coefficient.
+  Has shape :code:`(ant, chan, corr_1, ..., corr_n, poly)`.
+parallel : {False, True}
+  If ``True``, sources and antennas are
+  distributed over numba threads.
+
+Returns
+----------
+dde : :class:`numpy.ndarray`
+   complex values with shape
+   :code:`(source, time, ant, chan, corr_1, ..., corr_n)`
+""")
+
+fused_zernike_dde.__doc__ = _FUSED_ZERNIKE_DOCSTRING
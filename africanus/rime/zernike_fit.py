@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+from collections import namedtuple
+
+import numpy as np
+
+from africanus.rime.fast_beam_cubes import freq_grid_interp
+from africanus.rime.zernike import zernike_dde
+
+
+ZernikeFit = namedtuple("ZernikeFit", ["coeffs", "noll_index",
+                                       "residual", "radius"])
+
+
+def zernike_basis(l, m, nterms):  # noqa: E741
+    """
+    Evaluates the first ``nterms`` Zernike polynomials,
+    in zero-based Noll order, at the unit disk coordinates
+    ``l`` and ``m``, with the engine used by
+    :func:`~africanus.rime.zernike_dde`.
+
+    Parameters
+    ----------
+    l : :class:`numpy.ndarray`
+        l coordinates of shape :code:`(npoint,)`.
+    m : :class:`numpy.ndarray`
+        m coordinates of shape :code:`(npoint,)`.
+    nterms : int
+        Number of Zernike polynomials.
+
+    Returns
+    -------
+    basis : :class:`numpy.ndarray`
+        Zernike polynomials of shape :code:`(npoint, nterms)`.
+        Polynomials are zero outside the unit disk.
+    """
+    npoint = l.shape[0]
+
+    coords = np.zeros((3, npoint, 1, 1, 1), dtype=np.float64)
+    coords[0, :, 0, 0, 0] = l
+    coords[1, :, 0, 0, 0] = m
+
+    # Unit coefficient for each polynomial in its own correlation
+    coeffs = np.ones((1, 1, nterms, 1), dtype=np.float64)
+    noll_index = np.arange(nterms).reshape(1, 1, nterms, 1)
+
+    return zernike_dde(coords, coeffs, noll_index)[:, 0, 0, 0, :]
+
+
+def zernike_fit(beam, beam_lm_extents, beam_freq_map,
+                frequency, nterms, na=1, radius=None):
+    """
+    Fits Zernike polynomials to a beam cube, such as one
+    used by :func:`~africanus.rime.beam_cube_dde`,
+    producing ``coeffs`` and ``noll_index`` arrays
+    suitable for :func:`~africanus.rime.zernike_dde`.
+
+    The beam pixels within ``radius`` of the cube centre are fitted
+    in a least squares sense, for each beam channel and correlation,
+    with the first ``nterms`` Zernike polynomials in
+    zero-based Noll order. Beam cubes are linearly interpolated
+    in frequency, as are Zernike polynomials in their coefficients,
+    so the fitted coefficients are interpolated onto ``frequency``.
+    Coefficients outside the beam frequency range are those
+    of the nearest beam channel.
+
+    Zernike polynomials are defined on the unit disk, so
+    coordinates passed to :func:`~africanus.rime.zernike_dde`
+    must be divided by ``radius``. This can be achieved by
+    including :code:`1 / radius` in the ``antenna_scaling``
+    passed to :func:`~africanus.rime.transform_sources`
+    or :func:`~africanus.rime.fused_zernike_dde`.
+
+    Parameters
+    ----------
+    beam : :class:`numpy.ndarray`
+        Complex beam cube of
+        shape :code:`(beam_lw, beam_mh, beam_nud, corr, corr)`.
+        `beam_lw`, `beam_mh` and `beam_nud` define the size
+        of the cube in the l, m and frequency dimensions, respectively.
+    beam_lm_extents : :class:`numpy.ndarray`
+        lm extents of the beam cube of shape :code:`(2, 2)`.
+        ``[[lower_l, upper_l], [lower_m, upper_m]]``.
+    beam_freq_map : :class:`numpy.ndarray`
+        Beam frequency map of shape :code:`(beam_nud,)`.
+    frequency : :class:`numpy.ndarray`
+        Frequencies of shape :code:`(chan,)`.
+    nterms : int
+        Number of Zernike polynomials.
+    na : int, optional
+        Number of antennas. The same coefficients
+        are assigned to each antenna. Defaults to 1.
+    radius : float, optional
+        Radius of the fitted disk in the units of ``beam_lm_extents``.
+        Defaults to the largest disk centred on
+        :code:`(l, m) = (0, 0)` that fits within the cube.
+
+    Returns
+    -------
+    fit : :class:`ZernikeFit`
+        A namedtuple with the following fields:
+
+        - ``coeffs``: Complex Zernike coefficients of
+          shape :code:`(ant, chan, corr, corr, poly)`.
+        - ``noll_index``: Noll indices of
+          shape :code:`(ant, chan, corr, corr, poly)`.
+        - ``residual``: Root mean square residual of the fit over the
+          fitted pixels of shape :code:`(beam_nud, corr, corr)`.
+        - ``radius``: Radius of the fitted disk.
+    """
+    beam_lw, beam_mh, beam_nud = beam.shape[:3]
+    corrs = beam.shape[3:]
+    ncorrs = int(np.prod(corrs))
+    nchan = frequency.shape[0]
+
+    if beam_lw < 2 or beam_mh < 2 or beam_nud < 2:
+        raise ValueError("beam_lw, beam_mh and beam_nud must be >= 2")
+
+    if nterms < 1:
+        raise ValueError("nterms (%d) must be >= 1" % nterms)
+
+    (lower_l, upper_l), (lower_m, upper_m) = beam_lm_extents
+
+    if radius is None:
+        radius = min(-lower_l, upper_l, -lower_m, upper_m)
+
+    if radius <= 0.0:
+        raise ValueError("radius (%f) must be positive. Does the "
+                         "beam cube contain (l, m) = (0, 0)?" % radius)
+
+    # Beam pixel coordinates on the unit disk
+    l = np.linspace(lower_l, upper_l, beam_lw) / radius  # noqa: E741
+    m = np.linspace(lower_m, upper_m, beam_mh) / radius
+    ll, mm = np.meshgrid(l, m, indexing="ij")
+    disk = ll**2 + mm**2 <= 1.0
+    npix = np.count_nonzero(disk)
+
+    if npix < nterms:
+        raise ValueError("Only %d beam pixels lie within radius %f, "
+                         "fewer than nterms (%d)" % (npix, radius, nterms))
+
+    basis = zernike_basis(ll[disk], mm[disk], nterms)
+    samples = beam.reshape(beam_lw, beam_mh, beam_nud * ncorrs)[disk]
+
+    # Least squares fit of all channels and correlations at once
+    fit = np.linalg.lstsq(basis, samples, rcond=None)[0]
+    residual = samples - basis.dot(fit)
+    residual = np.sqrt(np.mean(np.abs(residual)**2, axis=0))
+
+    # Linearly interpolate coefficients onto frequency
+    fit = fit.T.reshape(beam_nud, ncorrs, nterms)
+    freq_data = freq_grid_interp(frequency, beam_freq_map)
+    weight = freq_data[:, 1, None, None]
+    lower = freq_data[:, 2].astype(np.intp)
+    chan_coeffs = weight*fit[lower] + (1.0 - weight)*fit[lower + 1]
+
+    shape = (na, nchan) + corrs + (nterms,)
+    chan_coeffs = chan_coeffs.reshape((1,) + shape[1:])
+    coeffs = np.ascontiguousarray(np.broadcast_to(chan_coeffs, shape))
+    noll_index = np.broadcast_to(np.arange(nterms), shape).copy()
+
+    return ZernikeFit(coeffs, noll_index,
+                      residual.reshape((beam_nud,) + corrs),
+                      radius)
@@ -0,0 +1,448 @@
+# -*- coding: utf-8 -*-
+
+
+from pathlib import Path
+
+import numpy as np
+
+from africanus.util.requirements import requires_optional
+
+try:
+    import dask
+    import dask.array as da
+except ImportError as e:
+    dask_import_error = e
+else:
+    dask_import_error = None
+
+
+#: MeerKAT latitude in radians
+MEERKAT_LATITUDE = np.deg2rad(-30.7110)
+
+#: Start of the observation in MJD seconds
+DEFAULT_START_TIME = 5.0e9
+
+ROW_COLUMNS = ("TIME", "TIME_CENTROID", "INTERVAL", "EXPOSURE",
+               "ANTENNA1", "ANTENNA2", "UVW", "FLAG_ROW",
+               "WEIGHT", "SIGMA")
+DEFAULT_COLUMNS = ROW_COLUMNS + ("FLAG",)
+
+
+def antenna_layout(na, seed=42, core_radius=500.0, max_radius=4000.0):
+    """
+    Generates a MeerKAT-like antenna layout, with half the antennas
+    in a dense core and the remainder scattered out to ``max_radius``.
+
+    Parameters
+    ----------
+    na : int
+        Number of antennas
+    seed : int, optional
+        Random seed
+    core_radius : float, optional
+        Core radius in metres
+    max_radius : float, optional
+        Maximum antenna distance from the array centre in metres
+
+    Returns
+    -------
+    enu : :class:`numpy.ndarray`
+        East, North and Up antenna positions
+        in metres of shape :code:`(na, 3)`
+    """
+    rs = np.random.RandomState(seed)
+    ncore = na // 2
+    radius = np.concatenate([core_radius*np.sqrt(rs.random_sample(ncore)),
+                             rs.uniform(core_radius, max_radius, na - ncore)])
+    angle = rs.uniform(0, 2*np.pi, na)
+
+    return np.stack([radius*np.cos(angle),
+                     radius*np.sin(angle),
+                     np.zeros(na)], axis=1)
+
+
+def enu_to_uvw(enu, hour_angle, dec, latitude=MEERKAT_LATITUDE):
+    """
+    Rotates East, North and Up baselines of shape :code:`(row, 3)`
+    into UVW coordinates for the given hour angles
+    of shape :code:`(row,)` and declination.
+    """
+    e, n, u = enu.T
+    x = -np.sin(latitude)*n + np.cos(latitude)*u
+    y = e
+    z = np.cos(latitude)*n + np.sin(latitude)*u
+
+    sh, ch = np.sin(hour_angle), np.cos(hour_angle)
+    sd, cd = np.sin(dec), np.cos(dec)
+
+    return np.stack([sh*x + ch*y,
+                     -sd*ch*x + sd*sh*y + cd*z,
+                     cd*ch*x - cd*sh*y + sd*z], axis=1)
+
+
+class SyntheticObservation(object):
+    """
+    Generates a synthetic observation, as Measurement Set
+    style columns, with rows ordered by time and then baseline.
+
+    Each timestep is generated from its own random seed,
+    so that any range of rows can be produced independently
+    and identically, regardless of how the observation is chunked.
+    Observations of :math:`10^8` rows can thus be streamed
+    in row chunks, as numpy or dask arrays, or written
+    to memory-mapped ``.npy`` files, without needing
+    a Measurement Set.
+
+    Parameters
+    ----------
+    ntime : int
+        Number of timesteps
+    nchan : int, optional
+        Number of channels. Defaults to 4096.
+    na : int, optional
+        Number of antennas. Ignored if
+        ``antenna_positions`` is supplied. Defaults to 64.
+    ncorr : int, optional
+        Number of correlations. Defaults to 4.
+    antenna_positions : :class:`numpy.ndarray`, optional
+        East, North and Up antenna positions
+        of shape :code:`(na, 3)` in metres.
+        Defaults to :func:`antenna_layout`.
+    integration : float, optional
+        Integration time in seconds. Defaults to 8.
+    start_time : float, optional
+        Start time in MJD seconds.
+    frequency_range : tuple of float, optional
+        Lower and upper channel centre frequencies in Hz.
+        Defaults to MeerKAT L-band.
+    declination : float, optional
+        Field centre declination in radians. Defaults to -30 degrees.
+    missing_fraction : float, optional
+        Fraction of baselines randomly missing in each timestep.
+    flag_fraction : float, optional
+        Fraction of randomly flagged rows, as well as of
+        randomly flagged visibilities within the remaining rows.
+    auto_correlations : {False, True}
+        Include auto-correlations
+    seed : int, optional
+        Random seed
+    """
+    def __init__(self, ntime, nchan=4096, na=64, ncorr=4,
+                 antenna_positions=None, integration=8.0,
+                 start_time=DEFAULT_START_TIME,
+                 frequency_range=(.856e9, 2*.856e9),
+                 declination=np.deg2rad(-30.0),
+                 missing_fraction=0.05, flag_fraction=0.05,
+                 auto_correlations=False, seed=42):
+
+        if not 0.0 <= missing_fraction < 1.0:
+            raise ValueError("missing_fraction (%f) must lie in [0, 1)"
+                             % missing_fraction)
+
+        if not 0.0 <= flag_fraction <= 1.0:
+            raise ValueError("flag_fraction (%f) must lie in [0, 1]"
+                             % flag_fraction)
+
+        if antenna_positions is None:
+            antenna_positions = antenna_layout(na, seed=seed)
+
+        self.antenna_positions = np.asarray(antenna_positions,
+                                            dtype=np.float64)
+        self.na = na = self.antenna_positions.shape[0]
+        self.ntime = ntime
+        self.nchan = nchan
+        self.ncorr = ncorr
+        self.integration = integration
+        self.start_time = start_time
+        self.declination = declination
+        self.missing_fraction = missing_fraction
+        self.flag_fraction = flag_fraction
+        self.seed = seed
+
+        k = 0 if auto_correlations else 1
+        self.baselines = np.stack(np.triu_indices(na, k), axis=1)
+
+        self.chan_freq = np.linspace(frequency_range[0],
+                                     frequency_range[1], nchan)
+        bandwidth = frequency_range[1] - frequency_range[0]
+        self.chan_width = np.full(nchan, bandwidth / max(nchan - 1, 1))
+
+        # Number of rows in each timestep and the first row of each
+        counts = [self._present_baselines(t).size for t in range(ntime)]
+        self.row_counts = np.asarray(counts, dtype=np.int64)
+        self.row_offsets = np.zeros(ntime + 1, dtype=np.int64)
+        np.cumsum(self.row_counts, out=self.row_offsets[1:])
+
+    @property
+    def nrow(self):
+        """ Number of rows """
+        return int(self.row_offsets[-1])
+
+    @property
+    def nbl(self):
+        """ Number of baselines """
+        return self.baselines.shape[0]
+
+    def _random_state(self, t, stream):
+        # Independent streams per timestep and quantity,
+        # so that each column is identical regardless of
+        # the columns requested
+        return np.random.RandomState([self.seed, t, stream])
+
+    def _present_baselines(self, t):
+        rs = self._random_state(t, 0)
+        present = rs.random_sample(self.nbl) >= self.missing_fraction
+        return np.nonzero(present)[0]
+
+    def _timestep(self, t, columns):
+        bl = self._present_baselines(t)
+        nrow = bl.size
+        ant1, ant2 = self.baselines[bl].T
+        time = self.start_time + (t + 0.5)*self.integration
+        shape = (nrow, self.nchan, self.ncorr)
+
+        data = {}
+
+        data["TIME"] = data["TIME_CENTROID"] = np.full(nrow, time)
+        data["INTERVAL"] = data["EXPOSURE"] = np.full(nrow,
+                                                      self.integration)
+        data["ANTENNA1"] = ant1.astype(np.int32)
+        data["ANTENNA2"] = ant2.astype(np.int32)
+
+        if "UVW" in columns:
+            # Hour angle of -4h at the start of the observation
+            hour_angle = (-np.pi/3 + (time - self.start_time) *
+                          2*np.pi / 86164.0)
+            enu = (self.antenna_positions[ant2] -
+                   self.antenna_positions[ant1])
+            data["UVW"] = enu_to_uvw(enu, np.full(nrow, hour_angle),
+                                     self.declination)
+
+        if "FLAG" in columns or "FLAG_ROW" in columns:
+            rs = self._random_state(t, 1)
+            flag_row = rs.random_sample(nrow) < self.flag_fraction
+            flag = rs.random_sample(shape) < self.flag_fraction
+            flag[flag_row] = True
+            data["FLAG"] = flag
+            data["FLAG_ROW"] = flag_row
+
+        if set(columns).intersection(("WEIGHT", "SIGMA",
+                                      "WEIGHT_SPECTRUM")):
+            rs = self._random_state(t, 2)
+            sigma = rs.uniform(0.5, 2.0, (nrow, 1)).astype(np.float32)
+            weight = 1.0 / sigma**2
+            data["SIGMA"] = np.repeat(sigma, self.ncorr, axis=1)
+            data["WEIGHT"] = np.repeat(weight, self.ncorr, axis=1)
+            data["WEIGHT_SPECTRUM"] = np.broadcast_to(weight[:, :, None],
+                                                      shape)
+
+        if "DATA" in columns:
+            rs = self._random_state(t, 3)
+            vis = rs.normal(size=shape) + 1j*rs.normal(size=shape)
+            data["DATA"] = vis.astype(np.complex64)
+
+        return data
+
+    def column_schema(self, column):
+        """ Returns the :code:`(shape, dtype)` of a ``column`` """
+        ncorr = self.ncorr
+        spectral = (self.nchan, ncorr)
+
+        schema = {
+            "TIME": ((), np.float64),
+            "TIME_CENTROID": ((), np.float64),
+            "INTERVAL": ((), np.float64),
+            "EXPOSURE": ((), np.float64),
+            "ANTENNA1": ((), np.int32),
+            "ANTENNA2": ((), np.int32),
+            "UVW": ((3,), np.float64),
+            "FLAG_ROW": ((), np.bool_),
+            "WEIGHT": ((ncorr,), np.float32),
+            "SIGMA": ((ncorr,), np.float32),
+            "FLAG": (spectral, np.bool_),
+            "WEIGHT_SPECTRUM": (spectral, np.float32),
+            "DATA": (spectral, np.complex64),
+        }
+
+        try:
+            shape, dtype = schema[column]
+        except KeyError:
+            raise ValueError("Invalid column '%s'. Valid columns are %s"
+                             % (column, list(schema.keys())))
+
+        return (self.nrow,) + shape, np.dtype(dtype)
+
+    def rows(self, start, end, columns=DEFAULT_COLUMNS):
+        """
+        Generates rows :code:`[start, end)` of the observation.
+
+        Parameters
+        ----------
+        start : int
+            Starting row
+        end : int
+            Ending row (exclusive)
+        columns : tuple of str, optional
+            Columns to generate
+
+        Returns
+        -------
+        data : dict
+            Dictionary of :code:`{column: array}`
+        """
+        for column in columns:
+            self.column_schema(column)
+
+        start = max(int(start), 0)
+        end = min(int(end), self.nrow)
+
+        if start >= end:
+            schemas = {c: self.column_schema(c) for c in columns}
+            return {c: np.empty((0,) + shape[1:], dtype=dtype)
+                    for c, (shape, dtype) in schemas.items()}
+
+        offsets = self.row_offsets
+        t0 = np.searchsorted(offsets, start, side="right") - 1
+        t1 = np.searchsorted(offsets, end, side="left")
+
+        steps = [self._timestep(t, columns) for t in range(t0, t1)]
+        lower = start - offsets[t0]
+        upper = end - offsets[t0]
+
+        return {c: np.concatenate([s[c] for s in steps])[lower:upper]
+                for c in columns}
+
+    def row_chunks(self, row_chunks):
+        """
+        Returns a tuple of row chunk sizes,
+        given a chunk size or a tuple of chunk sizes.
+        """
+        if isinstance(row_chunks, (tuple, list)):
+            if sum(row_chunks) != self.nrow:
+                raise ValueError("sum(row_chunks) %d != nrow %d"
+                                 % (sum(row_chunks), self.nrow))
+
+            return tuple(row_chunks)
+
+        nrow, row_chunks = self.nrow, int(row_chunks)
+        chunks = (row_chunks,) * (nrow // row_chunks)
+
+        if nrow % row_chunks != 0:
+            chunks += (nrow % row_chunks,)
+
+        return chunks
+
+    def chunks(self, row_chunks, columns=DEFAULT_COLUMNS):
+        """
+        Yields the observation in row chunks.
+
+        Parameters
+        ----------
+        row_chunks : int or tuple of int
+            Row chunk size, or tuple of row chunk sizes.
+        columns : tuple of str, optional
+            Columns to generate
+
+        Yields
+        ------
+        data : dict
+            Dictionary of :code:`{column: array}`
+            for each row chunk.
+        """
+        start = 0
+
+        for chunk in self.row_chunks(row_chunks):
+            yield self.rows(start, start + chunk, columns=columns)
+            start += chunk
+
+    @requires_optional("dask.array", dask_import_error)
+    def dask_arrays(self, row_chunks, columns=DEFAULT_COLUMNS):
+        """
+        Returns the observation as dask arrays, chunked on row.
+        Each row chunk of all columns is generated by a single task.
+
+        Parameters
+        ----------
+        row_chunks : int or tuple of int
+            Row chunk size, or tuple of row chunk sizes.
+        columns : tuple of str, optional
+            Columns to generate
+
+        Returns
+        -------
+        data : dict
+            Dictionary of :code:`{column: dask.array.Array}`
+        """
+        rows = dask.delayed(self.rows, pure=True)
+        start = 0
+        blocks = {c: [] for c in columns}
+
+        for chunk in self.row_chunks(row_chunks):
+            data = rows(start, start + chunk, columns=columns)
+
+            for c in columns:
+                shape, dtype = self.column_schema(c)
+                block = da.from_delayed(data[c], (chunk,) + shape[1:],
+                                        dtype=dtype)
+                blocks[c].append(block)
+
+            start += chunk
+
+        return {c: da.concatenate(b) for c, b in blocks.items()}
+
+    def to_memmap(self, directory, row_chunks=100000,
+                  columns=DEFAULT_COLUMNS):
+        """
+        Writes the observation, in row chunks, to
+        :code:`<directory>/<COLUMN>.npy` files.
+        ``CHAN_FREQ`` and ``CHAN_WIDTH`` are also written.
+
+        Parameters
+        ----------
+        directory : str or :class:`pathlib.Path`
+            Output directory, created if it does not exist
+        row_chunks : int or tuple of int, optional
+            Row chunk size, or tuple of row chunk sizes
+            with which the columns are written.
+        columns : tuple of str, optional
+            Columns to write
+
+        Returns
+        -------
+        data : dict
+            Dictionary of :code:`{column: array}`,
+            where each array is a read-only memory map.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+
+        def filename(column):
+            return str(directory / ("%s.npy" % column))
+
+        np.save(filename("CHAN_FREQ"), self.chan_freq)
+        np.save(filename("CHAN_WIDTH"), self.chan_width)
+
+        memmaps = {}
+
+        for c in columns:
+            shape, dtype = self.column_schema(c)
+            memmaps[c] = np.lib.format.open_memmap(filename(c), mode="w+",
+                                                   dtype=dtype, shape=shape)
+
+        start = 0
+
+        for data in self.chunks(row_chunks, columns=columns):
+            end = start + data[columns[0]].shape[0]
+
+            for c in columns:
+                memmaps[c][start:end] = data[c]
+
+            start = end
+
+        for memmap in memmaps.values():
+            memmap.flush()
+
+        del memmaps
+
+        return {c: np.load(filename(c), mmap_mode="r")
+                for c in ("CHAN_FREQ", "CHAN_WIDTH") + tuple(columns)}
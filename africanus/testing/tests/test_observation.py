@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+from numpy.testing import assert_allclose, assert_array_equal
+import pytest
+
+from africanus.testing.observation import SyntheticObservation
+
+COLUMNS = ("TIME", "ANTENNA1", "ANTENNA2", "UVW",
+           "FLAG_ROW", "FLAG", "WEIGHT", "DATA")
+
+
+@pytest.fixture
+def obs():
+    return SyntheticObservation(10, nchan=16, na=7, ncorr=2,
+                                missing_fraction=0.2, flag_fraction=0.1)
+
+
+def test_synthetic_observation(obs):
+    assert obs.nbl == 21
+    assert 0 < obs.nrow < obs.ntime * obs.nbl
+    assert obs.chan_freq.shape == obs.chan_width.shape == (16,)
+
+    data = obs.rows(0, obs.nrow, columns=COLUMNS)
+
+    for column, array in data.items():
+        shape, dtype = obs.column_schema(column)
+        assert array.shape == shape
+        assert array.dtype == dtype
+
+    # Ordered by time, then baseline
+    assert np.all(np.diff(data["TIME"]) >= 0)
+    assert np.all(data["ANTENNA1"] < data["ANTENNA2"])
+    assert_array_equal(np.unique(data["TIME"], return_counts=True)[1],
+                       obs.row_counts)
+
+    # Flagged rows are entirely flagged
+    assert data["FLAG_ROW"].any()
+    assert np.all(data["FLAG"][data["FLAG_ROW"]])
+    assert 0 < data["FLAG"].mean() < 0.5
+
+    # Baseline length is preserved by the uvw rotation
+    enu = (obs.antenna_positions[data["ANTENNA2"]] -
+           obs.antenna_positions[data["ANTENNA1"]])
+    assert_allclose(np.linalg.norm(data["UVW"], axis=1),
+                    np.linalg.norm(enu, axis=1))
+
+    # Chunking and column selection produce identical data
+    chunks = list(obs.chunks(17, columns=COLUMNS))
+    assert [c["TIME"].shape[0] for c in chunks] == list(obs.row_chunks(17))
+
+    for column in COLUMNS:
+        assert_array_equal(np.concatenate([c[column] for c in chunks]),
+                           data[column])
+
+    flag = obs.rows(5, 40, columns=("FLAG",))
+    assert list(flag.keys()) == ["FLAG"]
+    assert_array_equal(flag["FLAG"], data["FLAG"][5:40])
+
+    with pytest.raises(ValueError, match="Invalid column"):
+        obs.rows(0, 10, columns=("FOO",))
+
+
+def test_synthetic_observation_memmap(obs, tmp_path):
+    data = obs.rows(0, obs.nrow)
+    memmaps = obs.to_memmap(tmp_path / "obs", row_chunks=23)
+
+    assert isinstance(memmaps["FLAG"], np.memmap)
+    assert_array_equal(memmaps["CHAN_FREQ"], obs.chan_freq)
+
+    for column, array in data.items():
+        assert_array_equal(memmaps[column], array)
+
+
+def test_synthetic_observation_dask(obs):
+    da = pytest.importorskip("dask.array")
+
+    data = obs.rows(0, obs.nrow, columns=COLUMNS)
+    dask_data = obs.dask_arrays(25, columns=COLUMNS)
+
+    for column, array in dask_data.items():
+        assert isinstance(array, da.Array)
+        assert array.chunks[0] == obs.row_chunks(25)
+        assert_array_equal(array.compute(), data[column])
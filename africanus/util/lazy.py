@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+
+"""
+Lazy loading of package exports, so that importing a
+package does not import its kernels, numba or other
+dependencies until an export is first accessed.
+"""
+
+import importlib
+import sys
+from types import ModuleType
+
+
+class LazyModule(ModuleType):
+    """
+    Module type that prevents the import system from replacing
+    a lazy export with a submodule of the same name
+    (e.g. ``africanus.rime.wsclean_predict``), when the
+    submodule is imported before the export is accessed.
+    """
+    def __setattr__(self, name, value):
+        if (isinstance(value, ModuleType) and
+                name in self.__dict__.get("_lazy_exports", ()) and
+                value.__name__ == "%s.%s" % (self.__name__, name)):
+            return
+
+        super().__setattr__(name, value)
+
+
+def lazy_exports(module_name, exports, submodules=()):
+    """
+    Creates module level ``__getattr__`` and ``__dir__`` functions
+    (:pep:`562`) that import exports on first access.
+
+    Parameters
+    ----------
+    module_name : str
+        Name of the package, usually ``__name__``.
+    exports : dict
+        Maps export names onto the absolute name
+        of the module defining them.
+    submodules : iterable of str, optional
+        Submodule names that are imported when accessed
+        as attributes of the package.
+
+    Returns
+    -------
+    getattr_fn : callable
+        Module ``__getattr__`` function.
+    dir_fn : callable
+        Module ``__dir__`` function.
+    all_exports : list of str
+        Export names, suitable for ``__all__``.
+    """
+    module = sys.modules[module_name]
+    submodules = frozenset(submodules)
+    all_exports = list(exports.keys())
+
+    def __getattr__(name):
+        try:
+            export_module = exports[name]
+        except KeyError:
+            if name in submodules:
+                return importlib.import_module("%s.%s" % (module_name, name))
+
+            raise AttributeError("module '%s' has no attribute '%s'"
+                                 % (module_name, name))
+
+        value = getattr(importlib.import_module(export_module), name)
+        # Cache, avoiding subsequent __getattr__ calls
+        module.__dict__[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(module.__dict__.keys()) |
+                      set(all_exports) | submodules)
+
+    # Exports sharing the name of their module
+    shadowed = frozenset(n for n, m in exports.items()
+                         if m == "%s.%s" % (module_name, n))
+
+    if shadowed:
+        module.__dict__["_lazy_exports"] = shadowed
+        module.__class__ = LazyModule
+
+    if sys.version_info < (3, 7):
+        # Module __getattr__ is unsupported, import eagerly
+        for name in all_exports:
+            __getattr__(name)
+
+    return __getattr__, __dir__, all_exports
@@ -25,8 +25,9 @@ if on_rtd():
 
     overload = _fake_decorator
     register_jitable = _fake_decorator
+    prange = range
 else:
-    from numba import cfunc, jit, njit, generated_jit, stencil  # noqa
+    from numba import cfunc, jit, njit, generated_jit, stencil, prange  # noqa
     from numba.extending import overload, register_jitable  # noqa
 
 
@@ -47,3 +48,33 @@ def is_numba_type_none(arg):
     """
     return (isinstance(arg, types.misc.NoneType) or
             (isinstance(arg, types.misc.Omitted) and arg.value is None))
+
+
+def index_map_factory(have_map):
+    """
+    Returns an inlined function :code:`lookup(index_map, i)`
+    that maps index ``i`` through ``index_map``,
+    or returns ``i`` unchanged if ``have_map`` is False.
+
+    Parameters
+    ----------
+    have_map : boolean
+        True if an index map is present
+
+    Returns
+    -------
+    callable
+        The lookup function
+    """
+    if have_map:
+        def lookup(index_map, i):
+            return index_map[i]
+    else:
+        def lookup(index_map, i):
+            return i
+
+    return njit(nogil=True, inline='always')(lookup)
+
+
+# Ahead-of-time compilation of the kernels in the numba cache
+from africanus.util.warmup import warmup, warmup_targets  # noqa: E402,F401
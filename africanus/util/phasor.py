@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+"""
+Evaluation of the per-channel phasors
+:math:`e^{i \\phi \\nu_k}` of the DFT and phase delay kernels.
+
+If the channel frequencies are evenly spaced,
+:math:`\\nu_k = \\nu_0 + k \\Delta\\nu`, the phasor at channel :math:`k`
+can be obtained from the phasor at channel :math:`k - 1` by a single
+complex multiply with :math:`e^{i \\phi \\Delta\\nu}`,
+replacing a ``cos``/``sin`` pair per channel.
+
+**Accuracy**
+
+Each complex multiply introduces a rounding error of a few
+machine epsilon :math:`\\epsilon` of the compute dtype.
+To bound the accumulation of this error, the recurrence
+is re-anchored with a direct evaluation every
+:data:`PHASOR_ANCHOR` channels. The absolute difference between
+the recurrence and direct evaluation is therefore bounded by
+approximately :math:`(4 K + 16 |\\phi \\nu|_{max}) \\epsilon`,
+where :math:`K` is :data:`PHASOR_ANCHOR` and
+:math:`|\\phi \\nu|_{max}` is the largest phase in radians.
+The second term is of the same order as the argument
+rounding error already incurred by direct evaluation.
+
+Frequencies are only considered evenly spaced if they
+deviate from a regular grid by at most :math:`4 \\epsilon
+|\\nu|_{max}`. Otherwise, phasors are evaluated directly.
+"""
+
+import numpy as np
+
+from africanus.util.numba import njit
+
+
+#: Number of channels after which the phasor recurrence
+#: is re-anchored with a direct evaluation
+PHASOR_ANCHOR = 32
+
+
+@njit(nogil=True, cache=True)
+def regular_channel_width(frequency):
+    """
+    Determines whether ``frequency`` is evenly spaced.
+
+    Parameters
+    ----------
+    frequency : :class:`numpy.ndarray`
+        Frequencies of shape :code:`(chan,)`
+
+    Returns
+    -------
+    regular : bool
+        True if the frequencies are evenly spaced
+    chan_width : float
+        Channel width if ``regular`` else 0.0
+    """
+    nchan = frequency.shape[0]
+
+    if nchan < 2:
+        return False, 0.0
+
+    f0 = frequency[0]
+    chan_width = (frequency[nchan - 1] - f0) / (nchan - 1)
+    fmax = max(abs(f0), abs(frequency[nchan - 1]))
+    tol = 4 * np.finfo(frequency.dtype).eps * fmax
+
+    for f in range(1, nchan - 1):
+        if abs(frequency[f] - (f0 + f*chan_width)) > tol:
+            return False, 0.0
+
+    return True, chan_width
+
+
+@njit(nogil=True, cache=True)
+def phasors(real_phase, frequency, regular, chan_width, out):
+    """
+    Computes :code:`out[f] = exp(1j * real_phase * frequency[f])`.
+
+    If ``regular`` is True, the phasor recurrence is used,
+    otherwise phasors are evaluated directly.
+
+    Parameters
+    ----------
+    real_phase : float
+        Phase per unit frequency
+    frequency : :class:`numpy.ndarray`
+        Frequencies of shape :code:`(chan,)`
+    regular : bool
+        Whether ``frequency`` is evenly spaced,
+        as determined by :func:`regular_channel_width`
+    chan_width : float
+        Channel width
+    out : :class:`numpy.ndarray`
+        Complex output of shape :code:`(chan,)`
+    """
+    if not regular:
+        for f in range(frequency.shape[0]):
+            p = real_phase * frequency[f]
+            out[f] = np.cos(p) + np.sin(p)*1j
+
+        return
+
+    dp = real_phase * chan_width
+    step = np.cos(dp) + np.sin(dp)*1j
+    z = step
+
+    for f in range(frequency.shape[0]):
+        if f % PHASOR_ANCHOR == 0:
+            # Re-anchor with a direct evaluation
+            p = real_phase * frequency[f]
+            z = np.cos(p) + np.sin(p)*1j
+        else:
+            z *= step
+
+        out[f] = z
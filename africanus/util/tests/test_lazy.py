@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+import subprocess
+import sys
+import textwrap
+
+import pytest
+
+
+@pytest.fixture
+def lazy_package(tmp_path, monkeypatch):
+    pkg = tmp_path / "lazypkg"
+    pkg.mkdir()
+
+    (pkg / "__init__.py").write_text(textwrap.dedent("""
+        from africanus.util.lazy import lazy_exports
+
+        __getattr__, __dir__, __all__ = lazy_exports(__name__, {
+            "foo": "lazypkg.foo",
+            "bar": "lazypkg.other",
+        })
+    """))
+
+    (pkg / "foo.py").write_text("def foo():\n    return 'foo'\n\nhelper = 1\n")
+    (pkg / "other.py").write_text("def bar():\n    return 'bar'\n")
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    yield "lazypkg"
+
+    for name in list(sys.modules):
+        if name.split(".")[0] == "lazypkg":
+            del sys.modules[name]
+
+
+def test_lazy_exports(lazy_package):
+    import lazypkg
+
+    assert lazypkg.__all__ == ["foo", "bar"]
+    assert {"foo", "bar"}.issubset(dir(lazypkg))
+    assert "lazypkg.other" not in sys.modules
+
+    # Importing the submodule first must not shadow the export
+    from lazypkg.foo import helper
+    assert helper == 1
+    from lazypkg import foo, bar
+
+    assert foo() == "foo"
+    assert bar() == "bar"
+    assert lazypkg.foo is foo
+    assert sys.modules["lazypkg.foo"].foo is foo
+
+    with pytest.raises(AttributeError, match="no attribute 'baz'"):
+        lazypkg.baz
+
+
+def test_import_is_lazy():
+    """ Guards against regressions in import africanus startup time """
+    code = textwrap.dedent("""
+        import sys
+        import time
+
+        start = time.perf_counter()
+
+        import africanus
+        import africanus.averaging
+        import africanus.calibration.utils
+        import africanus.dft
+        import africanus.gridding.wgridder
+        import africanus.model.spectral
+        import africanus.rime
+
+        elapsed = time.perf_counter() - start
+        heavy = ("numba", "jax", "dask", "scipy")
+        print(",".join(m for m in heavy if m in sys.modules))
+        print(elapsed, file=sys.stderr)
+    """)
+
+    result = subprocess.run([sys.executable, "-c", code],
+                            stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE,
+                            universal_newlines=True,
+                            check=True)
+
+    assert result.stdout.strip() == "", ("Eagerly imported %s in %ss"
+                                         % (result.stdout.strip(),
+                                            result.stderr.strip()))
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+import pytest
+
+from africanus.util.numba import warmup, warmup_targets
+from africanus.util.warmup import main
+
+
+def test_warmup():
+    results = []
+    kernels = ["predict_vis", "phase_delay"]
+    warmed = warmup(kernels=kernels, dtypes=["complex64"],
+                    corr_shapes=[(2, 2), (1,)], parallel=True,
+                    callback=results.append)
+
+    assert warmed == results
+    # 4 DDE/DIE variants x 2 corr shapes x serial/parallel
+    kernels = [r.kernel for r in results]
+    assert kernels == ["predict_vis"]*16 + ["phase_delay"]*2
+    assert all(r.dtype == "complex64" for r in results)
+    assert all(r.seconds >= 0.0 for r in results)
+    assert results[0].variant == "source_coh[corr=2x2]"
+    assert results[-1].variant == "default[corr=1]"
+
+    with pytest.raises(ValueError, match="Unknown warm-up kernels"):
+        warmup(kernels=["foo"])
+
+
+def test_warmup_cmdline(capsys):
+    assert main(["--list"]) == 0
+    assert capsys.readouterr().out.split() == warmup_targets()
+
+    assert main(["-k", "spectral_model", "-d", "complex128"]) == 0
+    out = capsys.readouterr().out
+    assert "numba cache directory" in out
+    assert "spectral_model" in out
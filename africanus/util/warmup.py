@@ -0,0 +1,303 @@
+# -*- coding: utf-8 -*-
+
+"""
+Ahead-of-time warm-up of numba kernels.
+
+Kernels such as :func:`~africanus.rime.predict_vis` are compiled
+separately for each combination of optional arguments and dtypes,
+so that the first call in a fresh process can take tens of seconds.
+As these kernels are decorated with ``cache=True``, calling them once
+on small dummy inputs writes each specialisation into the numba
+cache directory (``NUMBA_CACHE_DIR``), from which subsequent
+processes load them. This is useful for pre-warming container images.
+"""
+
+import argparse
+from collections import namedtuple, OrderedDict
+import itertools
+import os
+import time
+
+import numpy as np
+
+WarmupResult = namedtuple("WarmupResult", ["kernel", "variant",
+                                           "dtype", "seconds"])
+
+_WARMUP_TARGETS = OrderedDict()
+
+#: Complex dtypes warmed up by default
+DEFAULT_DTYPES = ("complex64", "complex128")
+
+#: Correlation shapes warmed up by default (MeerKAT 4 correlations)
+DEFAULT_CORR_SHAPES = ((2, 2),)
+
+
+def warmup_target(name, parallel=False):
+    """
+    Registers a generator function
+    :code:`fn(dtype, corr_shape, parallel)`
+    yielding :code:`(variant, thunk)` tuples, where calling
+    :code:`thunk()` compiles kernel ``name`` for ``variant``.
+    ``parallel`` indicates whether the kernel has a parallel variant.
+    """
+    def decorator(fn):
+        _WARMUP_TARGETS[name] = (fn, parallel)
+        return fn
+
+    return decorator
+
+
+def warmup_targets():
+    """ Returns the names of the registered warm-up kernels """
+    return list(_WARMUP_TARGETS.keys())
+
+
+def _real_dtype(dtype):
+    return np.empty(0, dtype=dtype).real.dtype
+
+
+@warmup_target("predict_vis", parallel=True)
+def _predict_vis(dtype, corr_shape, parallel):
+    from africanus.rime.predict import predict_vis
+
+    src, row, ntime, na, chan = 2, 6, 2, 3, 4
+    time_index = np.repeat(np.arange(ntime), row // ntime)
+    ant1 = np.zeros(row, dtype=np.int32)
+    ant2 = np.arange(row, dtype=np.int32) % na
+
+    def jones(*shape):
+        return np.ones(shape + corr_shape, dtype=dtype)
+
+    source_coh = jones(src, row, chan)
+    base_vis = jones(row, chan)
+
+    for have_ddes, have_dies in itertools.product((False, True), repeat=2):
+        dde = jones(src, ntime, na, chan) if have_ddes else None
+        die = jones(ntime, na, chan) if have_dies else None
+        variant = "+".join(["source_coh"] +
+                           (["ddes"] if have_ddes else []) +
+                           (["dies", "base_vis"] if have_dies else []))
+
+        def thunk(dde=dde, die=die):
+            return predict_vis(time_index, ant1, ant2,
+                               dde, source_coh, dde,
+                               die, None if die is None else base_vis, die,
+                               parallel=parallel)
+
+        yield variant, thunk
+
+
+@warmup_target("time_and_channel", parallel=True)
+def _time_and_channel(dtype, corr_shape, parallel):
+    from africanus.averaging.time_and_channel_avg import time_and_channel
+
+    row, chan = 6, 4
+    ncorr = int(np.prod(corr_shape))
+    real = _real_dtype(dtype)
+    time = np.repeat(np.arange(2, dtype=np.float64), row // 2)
+    interval = np.ones(row, dtype=np.float64)
+    ant1 = np.zeros(row, dtype=np.int32)
+    ant2 = np.arange(row, dtype=np.int32) % 3
+    flag_row = np.zeros(row, dtype=np.uint8)
+    uvw = np.zeros((row, 3), dtype=np.float64)
+    chan_freq = np.linspace(.856e9, 2*.856e9, chan)
+    chan_width = np.full(chan, chan_freq[1] - chan_freq[0])
+    vis = np.ones((row, chan, ncorr), dtype=dtype)
+    flag = np.zeros((row, chan, ncorr), dtype=np.uint8)
+    weight_spectrum = np.ones((row, chan, ncorr), dtype=real)
+
+    def row_thunk():
+        return time_and_channel(time, interval, ant1, ant2,
+                                time_centroid=time, exposure=interval,
+                                flag_row=flag_row, uvw=uvw,
+                                time_bin_secs=2.0, parallel=parallel)
+
+    def vis_thunk():
+        return time_and_channel(time, interval, ant1, ant2,
+                                time_centroid=time, exposure=interval,
+                                flag_row=flag_row, uvw=uvw,
+                                chan_freq=chan_freq, chan_width=chan_width,
+                                vis=vis, flag=flag,
+                                weight_spectrum=weight_spectrum,
+                                time_bin_secs=2.0, chan_bin_size=2,
+                                parallel=parallel)
+
+    yield "row", row_thunk
+    yield "row+vis+flag+weight_spectrum", vis_thunk
+
+
+@warmup_target("spectral_model")
+def _spectral_model(dtype, corr_shape, parallel):
+    from africanus.model.spectral.spec_model import spectral_model
+
+    real = _real_dtype(dtype)
+    stokes = np.ones((2, 4), dtype=real)
+    spi = np.zeros((2, 2, 4), dtype=real)
+    ref_freq = np.full(2, .856e9, dtype=real)
+    freq = np.linspace(.856e9, 2*.856e9, 4).astype(real)
+
+    yield "std", lambda: spectral_model(stokes, spi, ref_freq, freq, base=0)
+
+
+@warmup_target("im_to_vis")
+def _im_to_vis(dtype, corr_shape, parallel):
+    from africanus.dft.kernels import im_to_vis
+
+    ncorr = int(np.prod(corr_shape))
+    real = _real_dtype(dtype)
+    image = np.ones((2, 4, ncorr), dtype=real)
+    uvw = np.zeros((6, 3), dtype=real)
+    lm = np.zeros((2, 2), dtype=real)
+    freq = np.linspace(.856e9, 2*.856e9, 4).astype(real)
+
+    yield "default", lambda: im_to_vis(image, uvw, lm, freq)
+
+
+@warmup_target("phase_delay")
+def _phase_delay(dtype, corr_shape, parallel):
+    from africanus.rime.phase import phase_delay
+
+    real = _real_dtype(dtype)
+    lm = np.zeros((2, 2), dtype=real)
+    uvw = np.zeros((6, 3), dtype=real)
+    freq = np.linspace(.856e9, 2*.856e9, 4).astype(real)
+
+    yield "default", lambda: phase_delay(lm, uvw, freq)
+
+
+def warmup(kernels=None, dtypes=DEFAULT_DTYPES,
+           corr_shapes=DEFAULT_CORR_SHAPES,
+           parallel=False, callback=None):
+    """
+    Compiles the numba specialisations of registered kernels
+    for each requested dtype and correlation shape,
+    writing them to the numba cache directory.
+
+    Parameters
+    ----------
+    kernels : list of str, optional
+        Kernels to warm up. Defaults to all registered kernels.
+        See :func:`warmup_targets`.
+    dtypes : list of str or :class:`numpy.dtype`, optional
+        Complex visibility dtypes. The corresponding real dtypes
+        are used for real-valued kernels.
+        Defaults to :code:`("complex64", "complex128")`.
+    corr_shapes : list of tuple of int, optional
+        Correlation shapes. Defaults to :code:`((2, 2),)`.
+    parallel : {False, True}
+        Also warm up the parallel variant of kernels supporting it.
+    callback : callable, optional
+        Called with each :class:`WarmupResult` as it is produced.
+
+    Returns
+    -------
+    results : list of :class:`WarmupResult`
+        Kernel, variant, dtype and seconds spent compiling
+        (or loading from the cache) and running each
+        kernel specialisation.
+    """
+    if kernels is None:
+        kernels = warmup_targets()
+
+    unknown = set(kernels).difference(_WARMUP_TARGETS)
+
+    if unknown:
+        raise ValueError("Unknown warm-up kernels %s. Valid kernels "
+                         "are %s" % (sorted(unknown), warmup_targets()))
+
+    results = []
+
+    for kernel in kernels:
+        target, has_parallel = _WARMUP_TARGETS[kernel]
+        variants = [False, True] if parallel and has_parallel else [False]
+
+        for dtype, corr_shape, par in itertools.product(dtypes,
+                                                        corr_shapes,
+                                                        variants):
+            dtype = np.dtype(dtype)
+
+            for variant, thunk in target(dtype, tuple(corr_shape), par):
+                variant = "%s[corr=%s%s]" % (
+                    variant, "x".join(map(str, corr_shape)),
+                    ",parallel" if par else "")
+
+                start = time.perf_counter()
+                thunk()
+                result = WarmupResult(kernel, variant, dtype.name,
+                                      time.perf_counter() - start)
+
+                if callback is not None:
+                    callback(result)
+
+                results.append(result)
+
+    return results
+
+
+def _corr_shape(arg):
+    try:
+        return tuple(int(c) for c in arg.split("x"))
+    except ValueError:
+        raise argparse.ArgumentTypeError("Invalid correlation shape '%s'. "
+                                         "Use, e.g. '2x2' or '4'" % arg)
+
+
+def create_parser():
+    p = argparse.ArgumentParser(
+        description="Compiles africanus numba kernels into the "
+                    "numba cache directory",
+        formatter_class=argparse.ArgumentDefaultsHelpFormatter)
+    p.add_argument("-k", "--kernels", nargs="+", default=None,
+                   help="Kernels to warm up. Defaults to all kernels")
+    p.add_argument("-d", "--dtypes", nargs="+",
+                   default=list(DEFAULT_DTYPES),
+                   help="Complex visibility dtypes")
+    p.add_argument("-c", "--corr-shapes", nargs="+", type=_corr_shape,
+                   default=list(DEFAULT_CORR_SHAPES),
+                   help="Correlation shapes, e.g. 2x2 4 2 1")
+    p.add_argument("-p", "--parallel", action="store_true",
+                   help="Also warm up parallel kernel variants")
+    p.add_argument("--cache-dir", default=None,
+                   help="numba cache directory. "
+                        "Defaults to NUMBA_CACHE_DIR")
+    p.add_argument("-l", "--list", action="store_true",
+                   help="List the available kernels and exit")
+    return p
+
+
+def main(argv=None):
+    args = create_parser().parse_args(argv)
+
+    if args.list:
+        print("\n".join(warmup_targets()))
+        return 0
+
+    if args.cache_dir is not None:
+        # numba reads its configuration when first imported
+        os.environ["NUMBA_CACHE_DIR"] = args.cache_dir
+
+        from numba.core.config import reload_config
+        reload_config()
+
+    from numba.core.config import CACHE_DIR
+    print("numba cache directory: %s" %
+          (CACHE_DIR or "<next to each module's __pycache__>"))
+
+    def report(result):
+        print("%-18s %-11s %8.3fs  %s" % (result.kernel, result.dtype,
+                                          result.seconds, result.variant),
+              flush=True)
+
+    start = time.perf_counter()
+    results = warmup(kernels=args.kernels, dtypes=args.dtypes,
+                     corr_shapes=args.corr_shapes, parallel=args.parallel,
+                     callback=report)
+
+    print("Warmed up %d kernel specialisations in %.3fs"
+          % (len(results), time.perf_counter() - start))
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from africanus.averaging.time_and_channel_mapping import row_mapper
+from africanus.averaging import time_and_channel
+
+from .common import Observation, VisibilityBenchmark
+
+
+class RowMapper(VisibilityBenchmark):
+    params = ([16.0, 64.0],)
+    param_names = ["time_bin_secs"]
+
+    def setup_kernel(self, time_bin_secs):
+        obs = Observation()
+        self.flag_row = np.zeros(obs.nrow, dtype=np.uint8)
+        self.flag_row[::13] = 1
+        self.args = (obs.time, obs.interval, obs.antenna1, obs.antenna2)
+        self.time_bin_secs = time_bin_secs
+        # Rows are mapped
+        self.nvis = obs.nrow
+
+    def run(self):
+        return row_mapper(*self.args, flag_row=self.flag_row,
+                          time_bin_secs=self.time_bin_secs)
+
+    def track_throughput(self, *params):
+        return super().track_throughput(*params)
+
+    track_throughput.unit = "rows/s"
+
+
+class TimeAndChannel(VisibilityBenchmark):
+    params = ([16.0, 64.0], [1, 16], [False, True], [False, True])
+    param_names = ["time_bin_secs", "chan_bin_size",
+                   "parallel", "low_memory"]
+
+    def setup_kernel(self, time_bin_secs, chan_bin_size,
+                     parallel, low_memory):
+        if parallel and low_memory:
+            # Skipped by asv
+            raise NotImplementedError
+
+        obs = Observation()
+        shape = (obs.nrow, obs.nchan, 4)
+        self.flag = np.zeros(shape, dtype=np.uint8)
+        self.flag[::13, ::3] = 1
+
+        self.kwargs = dict(time_centroid=obs.time, exposure=obs.interval,
+                           flag_row=np.zeros(obs.nrow, dtype=np.uint8),
+                           uvw=obs.uvw, weight=np.ones((obs.nrow, 4)),
+                           chan_freq=obs.chan_freq,
+                           chan_width=obs.chan_width,
+                           vis=obs.complex(shape),
+                           flag=self.flag,
+                           weight_spectrum=np.ones(shape),
+                           time_bin_secs=time_bin_secs,
+                           chan_bin_size=chan_bin_size,
+                           parallel=parallel,
+                           low_memory=low_memory)
+        self.args = (obs.time, obs.interval, obs.antenna1, obs.antenna2)
+        self.nvis = obs.nvis
+
+    def run(self):
+        return time_and_channel(*self.args, **self.kwargs)
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from africanus.calibration.phase_only import gauss_newton
+from africanus.calibration.utils import chunkify_rows
+
+from .common import Observation, VisibilityBenchmark
+
+
+class GaussNewton(VisibilityBenchmark):
+    params = ([1, 4],)
+    param_names = ["ndir"]
+
+    # Fixed number of iterations
+    maxiter = 3
+
+    def setup_kernel(self, ndir):
+        obs = Observation()
+        _, tbin_idx, tbin_counts = chunkify_rows(obs.time, obs.ntime)
+        jones_shape = (obs.ntime, obs.na, obs.nchan, ndir, 2)
+        vis_shape = (obs.nrow, obs.nchan, 2)
+
+        self.args = (tbin_idx, tbin_counts, obs.antenna1, obs.antenna2)
+        self.jones = np.exp(1j*obs.rs.normal(scale=0.1, size=jones_shape))
+        self.model = obs.complex((obs.nrow, obs.nchan, ndir, 2))
+        self.vis = obs.complex(vis_shape)
+        self.flag = np.zeros(vis_shape, dtype=np.bool_)
+        self.weight = np.ones(vis_shape)
+        self.nvis = obs.nvis * self.maxiter
+
+    def run(self):
+        # gauss_newton whitens vis and model in place
+        return gauss_newton(*self.args, self.jones.copy(), self.vis.copy(),
+                            self.flag, self.model.copy(), self.weight,
+                            tol=0.0, maxiter=self.maxiter)
@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from africanus.dft import im_to_vis, vis_to_im
+
+from .common import NSRC, Observation, VisibilityBenchmark
+
+
+class ImToVis(VisibilityBenchmark):
+    params = ([False, True],)
+    param_names = ["recurrence"]
+
+    def setup_kernel(self, recurrence):
+        obs = Observation()
+        self.image = obs.rs.normal(size=(NSRC, obs.nchan, 4))
+        self.uvw = obs.uvw
+        self.lm = obs.lm(NSRC)
+        self.freq = obs.chan_freq
+        self.recurrence = recurrence
+        self.nvis = obs.nvis * NSRC
+
+    def run(self):
+        return im_to_vis(self.image, self.uvw, self.lm, self.freq,
+                         recurrence=self.recurrence)
+
+
+class VisToIm(VisibilityBenchmark):
+    def setup_kernel(self):
+        obs = Observation()
+        self.vis = obs.complex((obs.nrow, obs.nchan, 4))
+        self.flags = np.zeros(self.vis.shape, dtype=np.bool_)
+        self.flags[::7] = True
+        self.uvw = obs.uvw
+        self.lm = obs.lm(NSRC)
+        self.freq = obs.chan_freq
+        self.nvis = obs.nvis * NSRC
+
+    def run(self):
+        return vis_to_im(self.vis, self.uvw, self.lm,
+                         self.freq, self.flags)
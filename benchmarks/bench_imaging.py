@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from africanus.deconv.hogbom import hogbom_clean
+from africanus.gridding.perleypolyhedron import (degridder,
+                                                 gridder,
+                                                 kernels)
+
+from .common import Observation, VisibilityBenchmark
+
+NPIX = 1024
+# Kernel support and oversampling
+W = 7
+OS = 7
+
+
+def _gridding_setup(obs):
+    kern = kernels.pack_kernel(kernels.kbsinc(W, oversample=OS),
+                               W, oversample=OS)
+    wavelength = obs.wavelength()
+    chanmap = np.zeros(obs.nchan, dtype=np.int64)
+    # Nyquist sample the longest baseline at the highest frequency
+    umax = np.abs(obs.uvw[:, :2]).max() / wavelength.min()
+    cell = np.rad2deg(1.0 / (2.0 * umax)) * 3600.0
+    return kern, wavelength, chanmap, cell
+
+
+class PerleyPolyhedronGridder(VisibilityBenchmark):
+    def setup_kernel(self):
+        obs = Observation()
+        self.kern, self.wavelength, self.chanmap, self.cell = \
+            _gridding_setup(obs)
+        self.uvw = obs.uvw
+        self.vis = obs.complex((obs.nrow, obs.nchan, 2))
+        self.nvis = obs.nvis
+
+    def run(self):
+        return gridder.gridder(self.uvw, self.vis, self.wavelength,
+                               self.chanmap, NPIX, self.cell,
+                               (0, np.pi / 4.0), (0, np.pi / 4.0),
+                               self.kern, W, OS,
+                               "None", "None", "I_FROM_XXYY",
+                               "conv_1d_axisymmetric_packed_scatter")
+
+
+class PerleyPolyhedronDegridder(VisibilityBenchmark):
+    def setup_kernel(self):
+        obs = Observation()
+        self.kern, self.wavelength, self.chanmap, self.cell = \
+            _gridding_setup(obs)
+        self.uvw = obs.uvw
+        self.grid = obs.complex((1, NPIX, NPIX))
+        self.nvis = obs.nvis
+
+    def run(self):
+        return degridder.degridder(self.uvw, self.grid, self.wavelength,
+                                   self.chanmap, self.cell,
+                                   (0, np.pi / 4.0), (0, np.pi / 4.0),
+                                   self.kern, W, OS,
+                                   "None", "None", "XXYY_FROM_I",
+                                   "conv_1d_axisymmetric_packed_gather")
+
+
+class HogbomClean(object):
+    """ Image plane benchmark, independent of the observation size """
+    timeout = 600
+    params = ([256, 512],)
+    param_names = ["npix"]
+
+    def setup(self, npix):
+        rs = np.random.RandomState(42)
+        x = np.arange(-npix, npix)
+        psf = np.exp(-(x[:, None]**2 + x[None, :]**2) / 8.0)
+        # Point sources convolved with the psf
+        sources = np.zeros((npix, npix))
+        sources[rs.randint(0, npix, 50), rs.randint(0, npix, 50)] = 1.0
+        fft = np.fft.rfft2
+        ifft = np.fft.irfft2
+        centre = psf[npix//2:3*npix//2, npix//2:3*npix//2]
+        self.dirty = ifft(fft(sources) * fft(np.fft.ifftshift(centre)),
+                          s=sources.shape)
+        self.psf = psf
+        self.niter = 500
+
+    def time_hogbom_clean(self, npix):
+        hogbom_clean(self.dirty, self.psf, niter=self.niter)
+
+    def peakmem_hogbom_clean(self, npix):
+        hogbom_clean(self.dirty, self.psf, niter=self.niter)
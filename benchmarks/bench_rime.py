@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from africanus.rime import (beam_cube_dde, phase_delay,
+                            predict_vis, zernike_dde)
+
+from .common import NSRC, Observation, VisibilityBenchmark
+
+
+class PredictVis(VisibilityBenchmark):
+    params = (["complex64", "complex128"], [False, True], [False, True])
+    param_names = ["dtype", "ddes", "parallel"]
+
+    def setup_kernel(self, dtype, ddes, parallel):
+        obs = Observation()
+        jones = (obs.ntime, obs.na, obs.nchan, 2, 2)
+
+        self.args = (obs.time_index, obs.antenna1, obs.antenna2)
+        self.dde = obs.complex((NSRC,) + jones, dtype) if ddes else None
+        self.coh = obs.complex((NSRC, obs.nrow, obs.nchan, 2, 2), dtype)
+        self.die = obs.complex(jones, dtype)
+        self.parallel = parallel
+        self.nvis = obs.nvis * NSRC
+
+    def run(self):
+        return predict_vis(*self.args,
+                           dde1_jones=self.dde, source_coh=self.coh,
+                           dde2_jones=self.dde, die1_jones=self.die,
+                           die2_jones=self.die, parallel=self.parallel)
+
+
+class PhaseDelay(VisibilityBenchmark):
+    params = (["float32", "float64"], [False, True])
+    param_names = ["dtype", "recurrence"]
+
+    def setup_kernel(self, dtype, recurrence):
+        obs = Observation()
+        self.lm = obs.lm(NSRC).astype(dtype)
+        self.uvw = obs.uvw.astype(dtype)
+        self.freq = obs.chan_freq.astype(dtype)
+        self.recurrence = recurrence
+        self.nvis = obs.nvis * NSRC
+
+    def run(self):
+        return phase_delay(self.lm, self.uvw, self.freq,
+                           recurrence=self.recurrence)
+
+
+class BeamCubeDDE(VisibilityBenchmark):
+    params = ([False, True],)
+    param_names = ["parallel"]
+
+    def setup_kernel(self, parallel):
+        obs = Observation()
+        beam_lw = beam_mh = 257
+        beam_nud = 32
+
+        beam = obs.complex((beam_lw, beam_mh, beam_nud, 2, 2))
+        self.args = (beam,
+                     np.asarray([[-1.0, 1.0], [-1.0, 1.0]]),
+                     np.linspace(.856e9, 2*.856e9, beam_nud),
+                     obs.lm(NSRC, radius=0.5),
+                     obs.rs.uniform(-np.pi, np.pi, (obs.ntime, obs.na)),
+                     np.zeros((obs.ntime, obs.na, obs.nchan, 2)),
+                     np.ones((obs.na, obs.nchan, 2)),
+                     obs.chan_freq)
+        self.parallel = parallel
+        # DDEs per (source, time, antenna, channel)
+        self.nvis = NSRC * obs.ntime * obs.na * obs.nchan
+
+    def run(self):
+        return beam_cube_dde(*self.args, parallel=self.parallel)
+
+
+class ZernikeDDE(VisibilityBenchmark):
+    params = ([10, 20], [False, True])
+    param_names = ["npoly", "parallel"]
+
+    def setup_kernel(self, npoly, parallel):
+        obs = Observation()
+        shape = (obs.na, obs.nchan, 2, 2, npoly)
+
+        self.coords = np.zeros((3, NSRC, obs.ntime, obs.na, obs.nchan))
+        self.coords[:2] = obs.lm(NSRC, radius=0.5).T[:, :, None, None, None]
+        self.coeffs = obs.complex(shape)
+        self.noll_index = np.broadcast_to(np.arange(npoly), shape).copy()
+        self.parallel = parallel
+        # DDEs per (source, time, antenna, channel)
+        self.nvis = NSRC * obs.ntime * obs.na * obs.nchan
+
+    def run(self):
+        return zernike_dde(self.coords, self.coeffs, self.noll_index,
+                           parallel=self.parallel)
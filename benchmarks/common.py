@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""
+Synthetic MeerKAT-like observations for the benchmark suite.
+
+The scale of the observation is configured with the
+following environment variables:
+
+- ``AFRICANUS_BENCH_ROWS``: number of rows. Defaults to a single
+  integration of 64 antennas, i.e. 2016 baselines.
+- ``AFRICANUS_BENCH_CHANNELS``: number of channels. Defaults to 4096.
+- ``AFRICANUS_BENCH_SOURCES``: number of sources. Defaults to 2.
+- ``AFRICANUS_BENCH_ANTENNAS``: number of antennas. Defaults to 64.
+"""
+
+import os
+import time
+
+import numpy as np
+
+from africanus.constants import c as lightspeed
+from africanus.testing.observation import antenna_layout, enu_to_uvw
+
+NA = int(os.environ.get("AFRICANUS_BENCH_ANTENNAS", 64))
+NBL = NA * (NA - 1) // 2
+NROW = int(os.environ.get("AFRICANUS_BENCH_ROWS", NBL))
+NCHAN = int(os.environ.get("AFRICANUS_BENCH_CHANNELS", 4096))
+NSRC = int(os.environ.get("AFRICANUS_BENCH_SOURCES", 2))
+
+#: Seconds between integrations
+INTEGRATION = 8.0
+
+
+class Observation(object):
+    """
+    Synthetic MeerKAT-like observation of ``nrow`` rows,
+    ordered by time and then baseline, with uvw tracks
+    derived from a random antenna layout.
+    """
+    def __init__(self, nrow=NROW, nchan=NCHAN, na=NA, seed=42):
+        rs = np.random.RandomState(seed)
+        ant1, ant2 = np.triu_indices(na, 1)
+        nbl = ant1.size
+        ntime = (nrow + nbl - 1) // nbl
+
+        self.na = na
+        self.nrow = nrow
+        self.nchan = nchan
+        self.ntime = ntime
+
+        self.time_index = np.repeat(np.arange(ntime), nbl)[:nrow]
+        self.time = 4.8e9 + INTEGRATION*self.time_index.astype(np.float64)
+        self.interval = np.full(nrow, INTEGRATION)
+        self.antenna1 = np.tile(ant1, ntime)[:nrow].astype(np.int32)
+        self.antenna2 = np.tile(ant2, ntime)[:nrow].astype(np.int32)
+
+        enu = antenna_layout(na, seed=seed)
+        enu = enu[self.antenna2] - enu[self.antenna1]
+        hour_angle = (self.time - self.time[0]) * 2*np.pi / 86164.0
+        self.uvw = enu_to_uvw(enu, hour_angle - np.pi/4, np.deg2rad(-30.0))
+
+        # MeerKAT L-band
+        self.chan_freq = np.linspace(.856e9, 2*.856e9, nchan)
+        self.chan_width = np.full(nchan, .856e9 / nchan)
+
+        self.rs = rs
+
+    @property
+    def nvis(self):
+        """ Number of (row, chan) visibilities """
+        return self.nrow * self.nchan
+
+    def wavelength(self):
+        return lightspeed / self.chan_freq
+
+    def lm(self, nsrc, radius=0.02):
+        """ Random source coordinates within ``radius`` """
+        return self.rs.uniform(-radius, radius, (nsrc, 2))
+
+    def complex(self, shape, dtype=np.complex128):
+        data = self.rs.normal(size=shape) + 1j*self.rs.normal(size=shape)
+        return data.astype(dtype)
+
+
+class VisibilityBenchmark(object):
+    """
+    Base class of kernel benchmarks, recording the time,
+    peak memory and throughput in visibilities per second
+    of :meth:`run`.
+
+    Subclasses implement :meth:`setup_kernel`, which sets
+    :attr:`nvis`, and :meth:`run`. The kernel is called
+    once during setup so that compilation is not timed.
+    """
+    timeout = 600
+    nvis = 0
+
+    def setup(self, *params):
+        self.setup_kernel(*params)
+        self.run()
+
+    def setup_kernel(self, *params):
+        # Skips this base class in asv
+        raise NotImplementedError
+
+    def run(self):
+        raise NotImplementedError
+
+    def time_kernel(self, *params):
+        self.run()
+
+    def peakmem_kernel(self, *params):
+        self.run()
+
+    def track_throughput(self, *params):
+        start = time.perf_counter()
+        self.run()
+        return self.nvis / (time.perf_counter() - start)
+
+    track_throughput.unit = "visibilities/s"
@@ -74,6 +74,11 @@ setup(
         'Programming Language :: Python :: 3.8',
     ],
     description="Radio Astronomy Building Blocks",
+    entry_points={
+        'console_scripts': [
+            'africanus-warmup=africanus.util.warmup:main',
+        ],
+    },
     extras_require=extras_require,
     install_requires=requirements,
     license="BSD-3-Clause",
@@ -82,7 +87,7 @@ setup(
     include_package_data=True,
     keywords='codex-africanus',
     name='codex-africanus',
-    packages=find_packages(),
+    packages=find_packages(exclude=['benchmarks', 'benchmarks.*']),
     python_requires=">=3.6",
     setup_requires=setup_requirements,
     test_suite='tests',